@@ -5,41 +5,17 @@ Downloads daily NSE equity data for April 2025 trading days.
 """
 
 import os
+import sys
 import requests
 from datetime import datetime, timedelta
 import pandas as pd
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from nse_trading_calendar import get_calendar
+
 def get_april_2025_trading_days():
-    """Get all trading days for April 2025 (excluding weekends and holidays)"""
-    trading_days = []
-    
-    # April 2025 trading days (excluding weekends and major holidays)
-    april_dates = [
-        "01042025",  # Apr 1
-        "02042025",  # Apr 2
-        "03042025",  # Apr 3
-        "04042025",  # Apr 4
-        "07042025",  # Apr 7
-        "08042025",  # Apr 8
-        "09042025",  # Apr 9
-        "10042025",  # Apr 10
-        "11042025",  # Apr 11
-        "14042025",  # Apr 14 (Ram Navami might be holiday, but included)
-        "15042025",  # Apr 15
-        "16042025",  # Apr 16
-        "17042025",  # Apr 17
-        "18042025",  # Apr 18 (Good Friday might be holiday)
-        "21042025",  # Apr 21
-        "22042025",  # Apr 22
-        "23042025",  # Apr 23
-        "24042025",  # Apr 24
-        "25042025",  # Apr 25
-        "28042025",  # Apr 28
-        "29042025",  # Apr 29
-        "30042025",  # Apr 30
-    ]
-    
-    return april_dates
+    """Get all trading days for April 2025 (excluding weekends and NSE holidays)"""
+    return [d.strftime("%d%m%Y") for d in get_calendar().trading_days_in_month(2025, 4)]
 
 def download_nse_data(date_str):
     """Download NSE data for a specific date with multiple URL attempts"""
@@ -5,39 +5,17 @@ Downloads daily NSE equity data for February 2025 trading days.
 """
 
 import os
+import sys
 import requests
 from datetime import datetime, timedelta
 import pandas as pd
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from nse_trading_calendar import get_calendar
+
 def get_february_2025_trading_days():
-    """Get all trading days for February 2025 (excluding weekends and holidays)"""
-    trading_days = []
-    
-    # February 2025 trading days (excluding weekends and major holidays)
-    february_dates = [
-        "03022025",  # Feb 3
-        "04022025",  # Feb 4
-        "05022025",  # Feb 5
-        "06022025",  # Feb 6
-        "07022025",  # Feb 7
-        "10022025",  # Feb 10
-        "11022025",  # Feb 11
-        "12022025",  # Feb 12
-        "13022025",  # Feb 13
-        "14022025",  # Feb 14
-        "17022025",  # Feb 17
-        "18022025",  # Feb 18
-        "19022025",  # Feb 19
-        "20022025",  # Feb 20
-        "21022025",  # Feb 21
-        "24022025",  # Feb 24
-        "25022025",  # Feb 25
-        "26022025",  # Feb 26
-        "27022025",  # Feb 27
-        "28022025",  # Feb 28
-    ]
-    
-    return february_dates
+    """Get all trading days for February 2025 (excluding weekends and NSE holidays)"""
+    return [d.strftime("%d%m%Y") for d in get_calendar().trading_days_in_month(2025, 2)]
 
 def download_nse_data(date_str):
     """Download NSE data for a specific date with multiple URL attempts"""
@@ -8,12 +8,16 @@ Step 4 of NSE Data Analysis Project
 import requests
 import zipfile
 import os
+import sys
 import pandas as pd
 from datetime import datetime, timedelta
 import time
 import calendar
 from io import BytesIO
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from nse_trading_calendar import get_calendar
+
 class NSE_FO_UDiFF_Downloader:
     def __init__(self):
         self.base_url = "https://archives.nseindia.com/content/fo"
@@ -38,20 +42,7 @@ class NSE_FO_UDiFF_Downloader:
     
     def get_february_2025_trading_days(self):
         """Get all trading days for February 2025"""
-        # February 2025 trading days (excluding weekends and holidays)
-        trading_days = []
-        
-        # February 2025 calendar
-        for day in range(1, 29):  # February 2025 has 28 days
-            date = datetime(2025, 2, day)
-            
-            # Skip weekends (Saturday = 5, Sunday = 6)
-            if date.weekday() < 5:  # Monday = 0, Friday = 4
-                # Skip known holidays in February 2025
-                if day not in [26]:  # Maha Shivratri on 26th Feb 2025
-                    trading_days.append(date)
-        
-        return trading_days
+        return [datetime(d.year, d.month, d.day) for d in get_calendar().trading_days_in_month(2025, 2)]
     
     def generate_fo_udiff_url(self, date):
         """Generate F&O UDiFF Bhavcopy URL for given date"""
@@ -6,6 +6,7 @@ Downloads available F&O UDiFF Bhavcopy data for historical months
 
 import requests
 import os
+import sys
 import zipfile
 import io
 import csv
@@ -13,6 +14,10 @@ import pandas as pd
 from datetime import datetime, timedelta
 import time
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from nse_url_resolver import URLPatternResolver
+from nse_trading_calendar import get_calendar
+
 class NSE_FO_Historical_Downloader:
     def __init__(self):
         self.session = requests.Session()
@@ -41,23 +46,23 @@ class NSE_FO_Historical_Downloader:
                 'pattern': 'bhav/fo{dd}{mm}{yyyy}bhav.csv.zip'
             }
         ]
+        
+        # URL templates tried per endpoint; the resolver learns which one works
+        # for which dates and skips templates that keep returning 404
+        self.url_templates = [
+            '{base_url}/{yyyy}/{month_upper}/fo{date_str}bhav.csv.zip',
+            '{base_url}/{yyyy}/{mm}/fo{date_str}bhav.csv.zip',
+            '{base_url}/fo{date_str}bhav.csv.zip',
+            '{base_url}/bhav/fo{date_str}bhav.csv.zip',
+            '{base_url}/{yyyy}/{month_upper}/fo{dd}{mm}{yy}bhav.csv.zip',
+            '{base_url}/FO_UDiFF_{date_str}.csv.zip',
+            '{base_url}/BhavCopy_NSE_FO_{date_str}_F_0000.csv.zip',
+        ]
+        self.resolver = URLPatternResolver()
     
     def get_trading_days(self, year, month):
         """Get trading days for a given month"""
-        from calendar import monthrange
-        
-        # Get all days in the month
-        _, last_day = monthrange(year, month)
-        trading_days = []
-        
-        for day in range(1, last_day + 1):
-            date = datetime(year, month, day)
-            
-            # Skip weekends (Saturday=5, Sunday=6)
-            if date.weekday() < 5:  # Monday=0 to Friday=4
-                trading_days.append(date)
-        
-        return trading_days
+        return [datetime(d.year, d.month, d.day) for d in get_calendar().trading_days_in_month(year, month)]
     
     def download_fo_data_for_month(self, year, month):
         """Download F&O data for a specific month"""
@@ -86,56 +91,49 @@ class NSE_FO_Historical_Downloader:
             
             downloaded = False
             
-            # Try different endpoints and patterns
-            for endpoint in self.fo_endpoints:
-                url_patterns = [
-                    f"{endpoint['base_url']}/{yyyy}/{month_name.upper()}/fo{date_str}bhav.csv.zip",
-                    f"{endpoint['base_url']}/{yyyy}/{mm}/fo{date_str}bhav.csv.zip",
-                    f"{endpoint['base_url']}/fo{date_str}bhav.csv.zip",
-                    f"{endpoint['base_url']}/bhav/fo{date_str}bhav.csv.zip",
-                    # Additional patterns
-                    f"{endpoint['base_url']}/{yyyy}/{month_name.upper()}/fo{dd}{mm}{yy}bhav.csv.zip",
-                    f"{endpoint['base_url']}/FO_UDiFF_{date_str}.csv.zip",
-                    f"{endpoint['base_url']}/BhavCopy_NSE_FO_{date_str}_F_0000.csv.zip"
-                ]
-                
-                for url in url_patterns:
-                    try:
-                        print(f"   🔗 Trying: {url.split('/')[-1]}")
-                        response = self.session.get(url, timeout=15)
+            # Try every (endpoint, pattern) combination, learned-good ones first
+            templates = [
+                template.replace('{base_url}', endpoint['base_url'])
+                for endpoint in self.fo_endpoints
+                for template in self.url_templates
+            ]
+            
+            for template in self.resolver.order(templates, date):
+                url = template.format(yyyy=yyyy, month_upper=month_name.upper(), mm=mm,
+                                      dd=dd, yy=yy, date_str=date_str)
+                try:
+                    print(f"   🔗 Trying: {url.split('/')[-1]}")
+                    response = self.session.get(url, timeout=15)
+                    
+                    if response.status_code == 200 and len(response.content) > 1000:
+                        # Save the file
+                        filename = f"fo{date_str}bhav.csv.zip"
+                        filepath = os.path.join(download_dir, filename)
                         
-                        if response.status_code == 200 and len(response.content) > 1000:
-                            # Save the file
-                            filename = f"fo{date_str}bhav.csv.zip"
-                            filepath = os.path.join(download_dir, filename)
-                            
-                            with open(filepath, 'wb') as f:
-                                f.write(response.content)
-                            
-                            print(f"   ✅ Downloaded: {filename} ({len(response.content)} bytes)")
-                            
-                            # Verify the download
-                            if self.verify_fo_file(filepath):
-                                successful_downloads.append({
-                                    'date': date.strftime('%Y-%m-%d'),
-                                    'filename': filename,
-                                    'size': len(response.content),
-                                    'url': url
-                                })
-                                downloaded = True
-                                break
-                            
-                        else:
-                            print(f"   ❌ Failed: {response.status_code}")
-                            
-                    except Exception as e:
-                        print(f"   ❌ Error: {str(e)[:50]}...")
-                        continue
-                
-                if downloaded:
-                    break
-                
-                time.sleep(0.5)  # Be respectful
+                        with open(filepath, 'wb') as f:
+                            f.write(response.content)
+                        
+                        print(f"   ✅ Downloaded: {filename} ({len(response.content)} bytes)")
+                        
+                        # Verify the download
+                        if self.verify_fo_file(filepath):
+                            successful_downloads.append({
+                                'date': date.strftime('%Y-%m-%d'),
+                                'filename': filename,
+                                'size': len(response.content),
+                                'url': url
+                            })
+                            self.resolver.record_success(template, date)
+                            downloaded = True
+                            break
+                        
+                    else:
+                        print(f"   ❌ Failed: {response.status_code}")
+                        self.resolver.record_miss(template, date, response.status_code)
+                        
+                except Exception as e:
+                    print(f"   ❌ Error: {str(e)[:50]}...")
+                    continue
             
             if not downloaded:
                 failed_downloads.append({
@@ -144,6 +142,8 @@ class NSE_FO_Historical_Downloader:
                 })
                 print(f"   ❌ Failed to download data for {date.strftime('%d-%b-%Y')}")
         
+        self.resolver.save()
+        
         # Save download summary
         self.save_download_summary(download_dir, successful_downloads, failed_downloads, year, month)
         
@@ -7,50 +7,17 @@ Organizes data in month-wise folders
 
 import requests
 import os
+import sys
 import time
 from datetime import datetime, timedelta
 import pandas as pd
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from nse_trading_calendar import get_calendar
+
 def get_trading_days(year, month):
-    """Get all trading days for a given month (excluding weekends and major holidays)"""
-    
-    # Known major holidays in 2025 (NSE closed days)
-    holidays_2025 = {
-        # January
-        (2025, 1, 26): "Republic Day",
-        # February  
-        (2025, 2, 26): "Maha Shivratri",
-        # March
-        (2025, 3, 14): "Holi",
-        (2025, 3, 31): "Ram Navami", 
-        # April
-        (2025, 4, 18): "Good Friday",
-        # May
-        (2025, 5, 1): "Maharashtra Day",
-        (2025, 5, 12): "Buddha Purnima",
-        # June - no major holidays
-    }
-    
-    # Get all days in the month
-    start_date = datetime(year, month, 1)
-    if month == 12:
-        end_date = datetime(year + 1, 1, 1) - timedelta(days=1)
-    else:
-        end_date = datetime(year, month + 1, 1) - timedelta(days=1)
-    
-    trading_days = []
-    current_date = start_date
-    
-    while current_date <= end_date:
-        # Skip weekends (Saturday=5, Sunday=6)
-        if current_date.weekday() < 5:  # Monday=0 to Friday=4
-            # Skip known holidays
-            date_tuple = (current_date.year, current_date.month, current_date.day)
-            if date_tuple not in holidays_2025:
-                trading_days.append(current_date.strftime("%d%m%Y"))
-        current_date += timedelta(days=1)
-    
-    return trading_days
+    """Get all trading days for a given month (excluding weekends and NSE holidays)"""
+    return [d.strftime("%d%m%Y") for d in get_calendar().trading_days_in_month(year, month)]
 
 def download_nse_data(date_str, output_folder):
     """Download NSE data for a specific date"""
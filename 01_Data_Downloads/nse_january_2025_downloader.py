@@ -5,42 +5,17 @@ Downloads daily NSE equity data for January 2025 trading days.
 """
 
 import os
+import sys
 import requests
 from datetime import datetime, timedelta
 import pandas as pd
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from nse_trading_calendar import get_calendar
+
 def get_january_2025_trading_days():
-    """Get all trading days for January 2025 (excluding weekends and holidays)"""
-    trading_days = []
-    
-    # January 2025 trading days (excluding weekends and major holidays)
-    january_dates = [
-        "01012025",  # Jan 1 - New Year (Holiday, but sometimes traded)
-        "02012025",  # Jan 2
-        "03012025",  # Jan 3
-        "06012025",  # Jan 6
-        "07012025",  # Jan 7
-        "08012025",  # Jan 8
-        "09012025",  # Jan 9
-        "10012025",  # Jan 10
-        "13012025",  # Jan 13
-        "14012025",  # Jan 14
-        "15012025",  # Jan 15
-        "16012025",  # Jan 16
-        "17012025",  # Jan 17
-        "20012025",  # Jan 20
-        "21012025",  # Jan 21
-        "22012025",  # Jan 22
-        "23012025",  # Jan 23
-        "24012025",  # Jan 24
-        "27012025",  # Jan 27
-        "28012025",  # Jan 28
-        "29012025",  # Jan 29
-        "30012025",  # Jan 30
-        "31012025",  # Jan 31
-    ]
-    
-    return january_dates
+    """Get all trading days for January 2025 (excluding weekends and NSE holidays)"""
+    return [d.strftime("%d%m%Y") for d in get_calendar().trading_days_in_month(2025, 1)]
 
 def download_nse_data(date_str):
     """Download NSE data for a specific date with multiple URL attempts"""
@@ -5,40 +5,17 @@ Downloads daily NSE equity data for June 2025 trading days.
 """
 
 import os
+import sys
 import requests
 from datetime import datetime, timedelta
 import pandas as pd
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from nse_trading_calendar import get_calendar
+
 def get_june_2025_trading_days():
-    """Get all trading days for June 2025 (excluding weekends and holidays)"""
-    trading_days = []
-    
-    # June 2025 trading days (excluding weekends and holidays)
-    june_dates = [
-        "02062025",  # Jun 2
-        "03062025",  # Jun 3
-        "04062025",  # Jun 4
-        "05062025",  # Jun 5
-        "06062025",  # Jun 6
-        "09062025",  # Jun 9
-        "10062025",  # Jun 10
-        "11062025",  # Jun 11
-        "12062025",  # Jun 12
-        "13062025",  # Jun 13
-        "16062025",  # Jun 16
-        "17062025",  # Jun 17
-        "18062025",  # Jun 18
-        "19062025",  # Jun 19
-        "20062025",  # Jun 20
-        "23062025",  # Jun 23
-        "24062025",  # Jun 24
-        "25062025",  # Jun 25
-        "26062025",  # Jun 26
-        "27062025",  # Jun 27
-        "30062025",  # Jun 30
-    ]
-    
-    return june_dates
+    """Get all trading days for June 2025 (excluding weekends and NSE holidays)"""
+    return [d.strftime("%d%m%Y") for d in get_calendar().trading_days_in_month(2025, 6)]
 
 def download_nse_data(date_str):
     """Download NSE data for a specific date with multiple URL attempts"""
@@ -5,40 +5,17 @@ Downloads daily NSE equity data for March 2025 trading days.
 """
 
 import os
+import sys
 import requests
 from datetime import datetime, timedelta
 import pandas as pd
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from nse_trading_calendar import get_calendar
+
 def get_march_2025_trading_days():
-    """Get all trading days for March 2025 (excluding weekends and holidays)"""
-    trading_days = []
-    
-    # March 2025 trading days (excluding weekends and major holidays)
-    march_dates = [
-        "03032025",  # Mar 3
-        "04032025",  # Mar 4
-        "05032025",  # Mar 5
-        "06032025",  # Mar 6
-        "07032025",  # Mar 7
-        "10032025",  # Mar 10
-        "11032025",  # Mar 11
-        "12032025",  # Mar 12
-        "13032025",  # Mar 13
-        "14032025",  # Mar 14
-        "17032025",  # Mar 17
-        "18032025",  # Mar 18
-        "19032025",  # Mar 19
-        "20032025",  # Mar 20
-        "21032025",  # Mar 21
-        "24032025",  # Mar 24
-        "25032025",  # Mar 25
-        "26032025",  # Mar 26
-        "27032025",  # Mar 27
-        "28032025",  # Mar 28
-        "31032025",  # Mar 31
-    ]
-    
-    return march_dates
+    """Get all trading days for March 2025 (excluding weekends and NSE holidays)"""
+    return [d.strftime("%d%m%Y") for d in get_calendar().trading_days_in_month(2025, 3)]
 
 def download_nse_data(date_str):
     """Download NSE data for a specific date with multiple URL attempts"""
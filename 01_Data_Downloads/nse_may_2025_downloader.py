@@ -5,41 +5,17 @@ Downloads daily NSE equity data for May 2025 trading days.
 """
 
 import os
+import sys
 import requests
 from datetime import datetime, timedelta
 import pandas as pd
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from nse_trading_calendar import get_calendar
+
 def get_may_2025_trading_days():
-    """Get all trading days for May 2025 (excluding weekends and holidays)"""
-    trading_days = []
-    
-    # May 2025 trading days (excluding weekends and major holidays)
-    may_dates = [
-        "01052025",  # May 1 (Labor Day might be holiday)
-        "02052025",  # May 2
-        "05052025",  # May 5
-        "06052025",  # May 6
-        "07052025",  # May 7
-        "08052025",  # May 8
-        "09052025",  # May 9
-        "12052025",  # May 12 (Buddha Purnima might be around this time)
-        "13052025",  # May 13
-        "14052025",  # May 14
-        "15052025",  # May 15
-        "16052025",  # May 16
-        "19052025",  # May 19
-        "20052025",  # May 20
-        "21052025",  # May 21
-        "22052025",  # May 22
-        "23052025",  # May 23
-        "26052025",  # May 26
-        "27052025",  # May 27
-        "28052025",  # May 28
-        "29052025",  # May 29
-        "30052025",  # May 30
-    ]
-    
-    return may_dates
+    """Get all trading days for May 2025 (excluding weekends and NSE holidays)"""
+    return [d.strftime("%d%m%Y") for d in get_calendar().trading_days_in_month(2025, 5)]
 
 def download_nse_data(date_str):
     """Download NSE data for a specific date with multiple URL attempts"""
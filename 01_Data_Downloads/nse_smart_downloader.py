@@ -6,10 +6,14 @@ Checks what data is available and downloads accordingly
 
 import requests
 import os
+import sys
 import time
 from datetime import datetime, timedelta
 import pandas as pd
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from nse_trading_calendar import get_calendar
+
 def test_nse_data_availability():
     """Test what NSE data is currently available"""
     
@@ -77,48 +81,8 @@ def test_nse_data_availability():
     return available_months
 
 def get_trading_days_smart(year, month):
-    """Get trading days with better holiday handling"""
-    
-    # More comprehensive holiday list for 2025
-    holidays_2025 = {
-        # January
-        (2025, 1, 1): "New Year's Day",
-        (2025, 1, 26): "Republic Day", 
-        # February
-        (2025, 2, 26): "Maha Shivratri",
-        # March  
-        (2025, 3, 14): "Holi",
-        (2025, 3, 31): "Ram Navami",
-        # April
-        (2025, 4, 14): "Dr. Ambedkar Jayanti", 
-        (2025, 4, 18): "Good Friday",
-        # May
-        (2025, 5, 1): "Maharashtra Day",
-        (2025, 5, 12): "Buddha Purnima",
-        # June
-        (2025, 6, 15): "Eid al-Adha (estimated)",
-        # Add more as needed
-    }
-    
-    start_date = datetime(year, month, 1)
-    if month == 12:
-        end_date = datetime(year + 1, 1, 1) - timedelta(days=1)
-    else:
-        end_date = datetime(year, month + 1, 1) - timedelta(days=1)
-    
-    trading_days = []
-    current_date = start_date
-    
-    while current_date <= end_date:
-        # Skip weekends
-        if current_date.weekday() < 5:
-            # Skip holidays
-            date_tuple = (current_date.year, current_date.month, current_date.day)
-            if date_tuple not in holidays_2025:
-                trading_days.append(current_date.strftime("%d%m%Y"))
-        current_date += timedelta(days=1)
-    
-    return trading_days
+    """Get trading days with holiday handling from the shared NSE calendar"""
+    return [d.strftime("%d%m%Y") for d in get_calendar().trading_days_in_month(year, month)]
 
 def download_available_months():
     """Download data for available months only"""
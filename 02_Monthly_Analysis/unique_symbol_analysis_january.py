@@ -9,6 +9,9 @@ import os
 import pandas as pd
 from datetime import datetime
 import glob
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from nse_monthly_peaks import peak_rows
 
 def load_january_data():
     """Load all January 2025 NSE data files"""
@@ -56,27 +59,10 @@ def analyze_volume_data(df):
     # Convert TTL_TRD_QNTY to numeric, handling any non-numeric values
     df['TTL_TRD_QNTY'] = pd.to_numeric(df['TTL_TRD_QNTY'], errors='coerce')
     
-    # Group by SYMBOL and find the date with maximum TTL_TRD_QNTY for each symbol
-    volume_winners = []
-    
-    for symbol in df['SYMBOL'].unique():
-        symbol_data = df[df['SYMBOL'] == symbol].copy()
-        
-        # Find the row with maximum TTL_TRD_QNTY for this symbol
-        max_volume_idx = symbol_data['TTL_TRD_QNTY'].idxmax()
-        if pd.notna(max_volume_idx):
-            winner_row = df.loc[max_volume_idx]
-            volume_winners.append({
-                'SYMBOL': winner_row['SYMBOL'],
-                'WINNING_DATE': winner_row['DATE1'],
-                'MAX_TTL_TRD_QNTY': winner_row['TTL_TRD_QNTY'],
-                'CLOSE_PRICE': winner_row['CLOSE_PRICE'],
-                'HIGH_PRICE': winner_row['HIGH_PRICE'],
-                'LOW_PRICE': winner_row['LOW_PRICE'],
-                'TURNOVER_LACS': winner_row['TURNOVER_LACS']
-            })
-    
-    volume_df = pd.DataFrame(volume_winners)
+    # Row with maximum TTL_TRD_QNTY per symbol (first one read on ties), in one sort
+    winners = peak_rows(df, {'volume': 'TTL_TRD_QNTY'}, keys=('SYMBOL',), date_column=None, price_columns=())['volume']
+    volume_df = winners[['SYMBOL', 'DATE1', 'TTL_TRD_QNTY', 'CLOSE_PRICE', 'HIGH_PRICE', 'LOW_PRICE', 'TURNOVER_LACS']].rename(
+        columns={'DATE1': 'WINNING_DATE', 'TTL_TRD_QNTY': 'MAX_TTL_TRD_QNTY'})
     
     if len(volume_df) > 0:
         # Sort by volume descending
@@ -108,28 +94,10 @@ def analyze_delivery_data(df):
     
     print(f"Records with valid delivery data: {len(df_delivery)}")
     
-    # Group by SYMBOL and find the date with maximum DELIV_QTY for each symbol
-    delivery_winners = []
-    
-    for symbol in df_delivery['SYMBOL'].unique():
-        symbol_data = df_delivery[df_delivery['SYMBOL'] == symbol].copy()
-        
-        # Find the row with maximum DELIV_QTY for this symbol
-        max_delivery_idx = symbol_data['DELIV_QTY'].idxmax()
-        if pd.notna(max_delivery_idx):
-            winner_row = df_delivery.loc[max_delivery_idx]
-            delivery_winners.append({
-                'SYMBOL': winner_row['SYMBOL'],
-                'WINNING_DATE': winner_row['DATE1'],
-                'MAX_DELIV_QTY': winner_row['DELIV_QTY'],
-                'DELIV_PER': winner_row['DELIV_PER'],
-                'CLOSE_PRICE': winner_row['CLOSE_PRICE'],
-                'HIGH_PRICE': winner_row['HIGH_PRICE'],
-                'LOW_PRICE': winner_row['LOW_PRICE'],
-                'TTL_TRD_QNTY': winner_row['TTL_TRD_QNTY']
-            })
-    
-    delivery_df = pd.DataFrame(delivery_winners)
+    # Row with maximum DELIV_QTY per symbol (first one read on ties), in one sort
+    winners = peak_rows(df_delivery, {'delivery': 'DELIV_QTY'}, keys=('SYMBOL',), date_column=None, price_columns=())['delivery']
+    delivery_df = winners[['SYMBOL', 'DATE1', 'DELIV_QTY', 'DELIV_PER', 'CLOSE_PRICE', 'HIGH_PRICE', 'LOW_PRICE', 'TTL_TRD_QNTY']].rename(
+        columns={'DATE1': 'WINNING_DATE', 'DELIV_QTY': 'MAX_DELIV_QTY'})
     
     if len(delivery_df) > 0:
         # Sort by delivery quantity descending
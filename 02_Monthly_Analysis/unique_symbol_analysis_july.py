@@ -13,6 +13,9 @@ import pandas as pd
 import glob
 import os
 from datetime import datetime
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from nse_monthly_peaks import peak_rows
 
 def create_unique_symbol_analysis_july():
     """Create unique symbol analysis from July 2025 CSV files"""
@@ -136,85 +139,16 @@ def create_unique_symbol_analysis_july():
     # Create unique analysis - keep only the highest volume record per symbol
     print("🎯 Creating unique symbol analysis...")
     
-    # For Volume Analysis: Keep record with highest volume per symbol, prioritizing complete data
-    volume_unique_list = []
-    for symbol in combined_df['_symbol_value'].unique():
-        if pd.isna(symbol) or symbol == '':
-            continue
-            
-        symbol_data = combined_df[combined_df['_symbol_value'] == symbol].copy()
-        
-        # Find max volume for this symbol (ignoring NaN)
-        max_volume = symbol_data['_volume_value'].max()
-        if pd.isna(max_volume):
-            continue
-        
-        # Get all records with max volume
-        max_volume_records = symbol_data[symbol_data['_volume_value'] == max_volume]
-        
-        # If multiple records have same max volume, prioritize the one with most complete price data
-        if len(max_volume_records) > 1:
-            price_cols = ['CLOSE_PRICE', 'OPEN_PRICE', 'HIGH_PRICE', 'LOW_PRICE', 'LAST_PRICE']
-            max_volume_records = max_volume_records.copy()
-            max_volume_records['_completeness_score'] = 0
-            
-            for col in price_cols:
-                if col in max_volume_records.columns:
-                    # Count non-null, non-zero values
-                    max_volume_records['_completeness_score'] += ((max_volume_records[col].notna()) & (max_volume_records[col] != 0)).astype(int)
-            
-            # Select the record with highest completeness score
-            best_idx = max_volume_records['_completeness_score'].idxmax()
-            best_record = max_volume_records.loc[best_idx]
-        else:
-            best_record = max_volume_records.iloc[0]
-        
-        volume_unique_list.append(best_record)
+    named = combined_df[combined_df['_symbol_value'] != '']
+    price_cols = ['CLOSE_PRICE', 'OPEN_PRICE', 'HIGH_PRICE', 'LOW_PRICE', 'LAST_PRICE']
+    peaks = peak_rows(named, {'volume': '_volume_value', 'delivery': '_delivery_value'},
+                      keys=('_symbol_value',), date_column=None, price_columns=price_cols)
     
-    volume_unique = pd.DataFrame(volume_unique_list).reset_index(drop=True) if volume_unique_list else pd.DataFrame()
+    volume_unique = peaks['volume'].sort_values('_volume_value', ascending=False, kind='stable').reset_index(drop=True)
     if not volume_unique.empty:
         print(f"📈 Volume analysis: {len(volume_unique)} unique symbols")
     
-    # For Delivery Analysis: Keep record with highest delivery per symbol, prioritizing complete data
-    delivery_unique_list = []
-    for symbol in combined_df['_symbol_value'].unique():
-        if pd.isna(symbol) or symbol == '':
-            continue
-            
-        symbol_data = combined_df[combined_df['_symbol_value'] == symbol].copy()
-        
-        # Skip if no delivery data
-        if '_delivery_value' not in symbol_data.columns or symbol_data['_delivery_value'].isna().all():
-            continue
-        
-        # Find max delivery for this symbol (ignoring NaN)
-        max_delivery = symbol_data['_delivery_value'].max()
-        if pd.isna(max_delivery):
-            continue
-            
-        # Get all records with max delivery
-        max_delivery_records = symbol_data[symbol_data['_delivery_value'] == max_delivery]
-        
-        # If multiple records have same max delivery, prioritize the one with most complete price data
-        if len(max_delivery_records) > 1:
-            price_cols = ['CLOSE_PRICE', 'OPEN_PRICE', 'HIGH_PRICE', 'LOW_PRICE', 'LAST_PRICE']
-            max_delivery_records = max_delivery_records.copy()
-            max_delivery_records['_completeness_score'] = 0
-            
-            for col in price_cols:
-                if col in max_delivery_records.columns:
-                    # Count non-null, non-zero values
-                    max_delivery_records['_completeness_score'] += ((max_delivery_records[col].notna()) & (max_delivery_records[col] != 0)).astype(int)
-            
-            # Select the record with highest completeness score
-            best_idx = max_delivery_records['_completeness_score'].idxmax()
-            best_record = max_delivery_records.loc[best_idx]
-        else:
-            best_record = max_delivery_records.iloc[0]
-            
-        delivery_unique_list.append(best_record)
-    
-    delivery_unique = pd.DataFrame(delivery_unique_list).reset_index(drop=True) if delivery_unique_list else pd.DataFrame()
+    delivery_unique = peaks['delivery'].sort_values('_delivery_value', ascending=False, kind='stable').reset_index(drop=True)
     if not delivery_unique.empty:
         print(f"📦 Delivery analysis: {len(delivery_unique)} unique symbols")
     
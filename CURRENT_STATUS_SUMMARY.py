@@ -104,7 +104,7 @@ once the data availability issue is resolved!
 
 print(__doc__)
 
-import pyodbc
+import nse_db_pool
 import json
 
 # Show current data summary
@@ -112,12 +112,7 @@ try:
     with open('database_config.json', 'r') as f:
         db_config = json.load(f)
     
-    conn = pyodbc.connect(
-        f"DRIVER={{ODBC Driver 17 for SQL Server}};"
-        f"SERVER={db_config['server']};"
-        f"DATABASE={db_config['database']};"
-        f"Trusted_Connection=yes;"
-    )
+    conn = nse_db_pool.get_connection()
     
     cursor = conn.cursor()
     
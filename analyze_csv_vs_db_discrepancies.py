@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 
 import pandas as pd
-import pyodbc
+import nse_db_pool
 import json
 import os
 from datetime import datetime
@@ -23,8 +23,7 @@ def analyze_csv_vs_db_discrepancies():
         with open('database_config.json', 'r') as f:
             config = json.load(f)
         
-        conn_str = f"DRIVER={config['driver']};SERVER={config['server']};DATABASE={config['database']};Trusted_Connection=yes;"
-        conn = pyodbc.connect(conn_str)
+        conn = nse_db_pool.get_connection()
         
         query = """
         SELECT 
@@ -1,19 +1,11 @@
 """
 Analyze daily F&O record counts to understand inconsistencies
 """
-import pyodbc
-
+import nse_db_pool
 def analyze_daily_counts():
-    conn_string = (
-        'Driver={ODBC Driver 17 for SQL Server};'
-        'Server=SRIKIRANREDDY\\SQLEXPRESS;'
-        'Database=master;'
-        'Trusted_Connection=yes;'
-        'TrustServerCertificate=yes;'
-    )
     
     try:
-        conn = pyodbc.connect(conn_string)
+        conn = nse_db_pool.get_connection()
         cur = conn.cursor()
         
         print("📊 DAILY F&O RECORD COUNT ANALYSIS")
@@ -2,12 +2,11 @@
 """
 Analyze the current data scope for implementing full month 50% reduction analysis
 """
-import pyodbc
-
+import nse_db_pool
 def analyze_data_scope():
     """Analyze current data availability for full month implementation"""
     
-    conn = pyodbc.connect('DRIVER={ODBC Driver 17 for SQL Server};SERVER=SRIKIRANREDDY\\SQLEXPRESS;DATABASE=master;Trusted_Connection=yes;')
+    conn = nse_db_pool.get_connection()
     cursor = conn.cursor()
 
     print('📊 FULL MONTH IMPLEMENTATION - DATA SCOPE ANALYSIS')
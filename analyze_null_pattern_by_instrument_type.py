@@ -1,6 +1,6 @@
 #!/usr/bin/env python3
 
-import pyodbc
+import nse_db_pool
 import json
 import pandas as pd
 
@@ -15,8 +15,7 @@ def analyze_null_pattern_by_instrument_type():
         with open('database_config.json', 'r') as f:
             config = json.load(f)
         
-        conn_str = f"DRIVER={config['driver']};SERVER={config['server']};DATABASE={config['database']};Trusted_Connection=yes;"
-        conn = pyodbc.connect(conn_str)
+        conn = nse_db_pool.get_connection()
         cursor = conn.cursor()
         
         # Check NULL patterns by instrument type in database
@@ -3,17 +3,12 @@
 Analyze Step05_strikepriceAnalysisderived table structure and content
 """
 
-import pyodbc
+import nse_db_pool
 import pandas as pd
 
 def analyze_step05_table():
     try:
-        conn = pyodbc.connect(
-            "Driver={ODBC Driver 17 for SQL Server};"
-            "Server=SRIKIRANREDDY\\SQLEXPRESS;"
-            "Database=master;"
-            "Trusted_Connection=yes;"
-        )
+        conn = nse_db_pool.get_connection()
         
         print("=== TABLE STRUCTURE ===")
         cursor = conn.cursor()
@@ -1,6 +1,6 @@
 #!/usr/bin/env python3
 
-import pyodbc
+import nse_db_pool
 import json
 
 def analyze_column_order_and_compliance():
@@ -23,8 +23,7 @@ def analyze_column_order_and_compliance():
         config = json.load(f)
 
     try:
-        conn_str = f"DRIVER={config['driver']};SERVER={config['server']};DATABASE={config['database']};Trusted_Connection=yes;"
-        conn = pyodbc.connect(conn_str)
+        conn = nse_db_pool.get_connection()
         cursor = conn.cursor()
         
         # Get current table columns in order
@@ -1,4 +1,4 @@
-import pyodbc
+import nse_db_pool
 import pandas as pd
 import json
 
@@ -7,13 +7,7 @@ with open('database_config.json', 'r') as f:
     config = json.load(f)
 
 # Connect to database
-conn_str = (
-    f"DRIVER={{ODBC Driver 17 for SQL Server}};"
-    f"SERVER={config['server']};"
-    f"DATABASE={config['database']};"
-    f"Trusted_Connection=yes;"
-)
-conn = pyodbc.connect(conn_str)
+conn = nse_db_pool.get_connection()
 
 # Check available dates
 df = pd.read_sql("SELECT DISTINCT Trade_date FROM step04_fo_udiff_daily WHERE Trade_date IS NOT NULL ORDER BY Trade_date", conn)
@@ -1,6 +1,6 @@
 #!/usr/bin/env python3
 
-import pyodbc
+import nse_db_pool
 import json
 
 def check_table_structure():
@@ -9,8 +9,7 @@ def check_table_structure():
         config = json.load(f)
 
     try:
-        conn_str = f"DRIVER={config['driver']};SERVER={config['server']};DATABASE={config['database']};Trusted_Connection=yes;"
-        conn = pyodbc.connect(conn_str)
+        conn = nse_db_pool.get_connection()
         cursor = conn.cursor()
         
         # Get current table structure
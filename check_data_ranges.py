@@ -1,9 +1,9 @@
 #!/usr/bin/env python3
-import pyodbc
+import nse_db_pool
 import pandas as pd
 import numpy as np
 
-conn = pyodbc.connect('DRIVER={ODBC Driver 17 for SQL Server};SERVER=SRIKIRANREDDY\\SQLEXPRESS;DATABASE=master;Trusted_Connection=yes;')
+conn = nse_db_pool.get_connection()
 
 query = """
 SELECT TOP 1000
@@ -1,7 +1,7 @@
-import pyodbc
+import nse_db_pool
 import pandas as pd
 
-conn = pyodbc.connect('Driver={SQL Server};Server=SRIKIRANREDDY\\SQLEXPRESS;Database=master;Trusted_Connection=yes;')
+conn = nse_db_pool.get_connection()
 
 print('Checking IDEA data in step01_equity_daily:')
 print('=' * 50)
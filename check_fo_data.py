@@ -1,12 +1,6 @@
-import pyodbc
-
+import nse_db_pool
 # Connect to database
-conn = pyodbc.connect(
-    'DRIVER={ODBC Driver 17 for SQL Server};'
-    'SERVER=SRIKIRANREDDY\\SQLEXPRESS;'
-    'DATABASE=master;'
-    'Trusted_Connection=yes;'
-)
+conn = nse_db_pool.get_connection()
 cursor = conn.cursor()
 
 # Check sample data with non-null values
@@ -1,19 +1,14 @@
 """
 Check Current F&O Database Status
 """
-import pyodbc
+import nse_db_pool
 import json
 
 # Load database configuration
 with open('database_config.json', 'r') as f:
     db_config = json.load(f)
 
-conn = pyodbc.connect(
-    f"DRIVER={{ODBC Driver 17 for SQL Server}};"
-    f"SERVER={db_config['server']};"
-    f"DATABASE={db_config['database']};"
-    f"Trusted_Connection=yes;"
-)
+conn = nse_db_pool.get_connection()
 
 cursor = conn.cursor()
 
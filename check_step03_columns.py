@@ -1,15 +1,9 @@
-import pyodbc
+import nse_db_pool
 import pandas as pd
 
 # Database connection
-connection_string = (
-    "Driver={ODBC Driver 17 for SQL Server};"
-    "Server=SRIKIRANREDDY\\SQLEXPRESS;"
-    "Database=master;"
-    "Trusted_Connection=yes;"
-)
 
-conn = pyodbc.connect(connection_string)
+conn = nse_db_pool.get_connection()
 
 # Check column names
 cursor = conn.cursor()
@@ -1,6 +1,5 @@
-import pyodbc
-
-conn = pyodbc.connect('Driver={SQL Server};Server=SRIKIRANREDDY\\SQLEXPRESS;Database=master;Trusted_Connection=yes;')
+import nse_db_pool
+conn = nse_db_pool.get_connection()
 
 print('CHECKING AVAILABLE DATES IN STEP04:')
 print('=' * 40)
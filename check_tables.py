@@ -2,7 +2,7 @@
 Check available tables in NSE database
 """
 
-import pyodbc
+import nse_db_pool
 import json
 import sys
 
@@ -11,15 +11,7 @@ def main():
         with open('database_config.json', 'r') as f:
             config = json.load(f)
         
-        # Build connection string for Windows Authentication
-        conn_str = (
-            f"DRIVER={{{config['driver']}}};"
-            f"SERVER={config['server']};"
-            f"DATABASE={config['database']};"
-            f"Trusted_Connection=yes;"
-        )
-        
-        connection = pyodbc.connect(conn_str)
+        connection = nse_db_pool.get_connection()
         print(f"✅ Connected to database: {config['database']}")
         
         cursor = connection.cursor()
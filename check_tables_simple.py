@@ -1,4 +1,4 @@
-import pyodbc
+import nse_db_pool
 import json
 
 # Load database configuration
@@ -6,12 +6,7 @@ with open('database_config.json', 'r') as f:
     config = json.load(f)
 
 # Connect to database
-conn = pyodbc.connect(
-    f"DRIVER={{ODBC Driver 17 for SQL Server}};"
-    f"SERVER={config['server']};"
-    f"DATABASE={config['database']};"
-    f"Trusted_Connection=yes"
-)
+conn = nse_db_pool.get_connection()
 
 cursor = conn.cursor()
 
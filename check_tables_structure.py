@@ -1,16 +1,10 @@
-import pyodbc
+import nse_db_pool
 import pandas as pd
 
 def check_step03_structure():
     try:
-        connection_string = (
-            'DRIVER={ODBC Driver 17 for SQL Server};'
-            'SERVER=SRIKIRANREDDY\\SQLEXPRESS;'
-            'DATABASE=master;'
-            'Trusted_Connection=yes;'
-        )
         
-        conn = pyodbc.connect(connection_string)
+        conn = nse_db_pool.get_connection()
         print("Database connected successfully")
         
         # Check if step03 table exists
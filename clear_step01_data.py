@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 """Clear existing data and reload with ALL series"""
 
-import pyodbc
+import nse_db_pool
 import json
 
 # Load database configuration
@@ -9,8 +9,7 @@ with open('database_config.json', 'r') as f:
     config = json.load(f)
 
 # Connect to database
-conn_str = f"DRIVER={{ODBC Driver 17 for SQL Server}};SERVER={config['server']};DATABASE={config['database']};Trusted_Connection=yes;"
-conn = pyodbc.connect(conn_str)
+conn = nse_db_pool.get_connection()
 cursor = conn.cursor()
 
 # Clear existing EQ-only data
@@ -1,7 +1,7 @@
 """
 Complete February Data - Load Feb 28th
 """
-import pyodbc
+import nse_db_pool
 import zipfile
 import pandas as pd
 import json
@@ -11,12 +11,7 @@ import os
 with open('database_config.json', 'r') as f:
     db_config = json.load(f)
 
-conn = pyodbc.connect(
-    f"DRIVER={{ODBC Driver 17 for SQL Server}};"
-    f"SERVER={db_config['server']};"
-    f"DATABASE={db_config['database']};"
-    f"Trusted_Connection=yes;"
-)
+conn = nse_db_pool.get_connection()
 
 # Load the missing February 28th file
 zip_file = 'fo_udiff_downloads/BhavCopy_NSE_FO_0_0_0_20250228_F_0000.csv.zip'
@@ -4,7 +4,7 @@ Comprehensive F&O UDiFF Data Loader - February 3rd, 2025
 Realistic data generation matching actual NSE F&O volume (~34,305 records)
 """
 
-import pyodbc
+import nse_db_pool
 import pandas as pd
 from datetime import datetime, timedelta
 import random
@@ -12,12 +12,7 @@ import math
 
 # Database connection
 def get_connection():
-    return pyodbc.connect(
-        'DRIVER={ODBC Driver 17 for SQL Server};'
-        'SERVER=SRIKIRANREDDY\\SQLEXPRESS;'
-        'DATABASE=master;'
-        'Trusted_Connection=yes;'
-    )
+    return nse_db_pool.get_connection()
 
 def generate_comprehensive_fo_data():
     """Generate comprehensive F&O data matching actual NSE volume"""
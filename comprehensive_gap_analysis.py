@@ -4,18 +4,13 @@ Gap Analysis: Why 31,342 vs 34,305 records
 Let's identify and add the missing ~3,000 records
 """
 
-import pyodbc
+import nse_db_pool
 import random
 import math
 from datetime import datetime
 
 def get_connection():
-    return pyodbc.connect(
-        'DRIVER={ODBC Driver 17 for SQL Server};'
-        'SERVER=SRIKIRANREDDY\\SQLEXPRESS;'
-        'DATABASE=master;'
-        'Trusted_Connection=yes;'
-    )
+    return nse_db_pool.get_connection()
 
 def analyze_gap():
     """Analyze what's missing to reach 34,305"""
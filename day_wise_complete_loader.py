@@ -5,34 +5,19 @@ Each day will have ~34,305 records matching comprehensive NSE F&O volume
 Source file pattern: udiff_YYYYMMDD.zip
 """
 
-import pyodbc
+import nse_db_pool
 import random
 import math
 from datetime import datetime, timedelta
+from nse_trading_calendar import get_calendar
 
 def get_connection():
-    return pyodbc.connect(
-        'DRIVER={ODBC Driver 17 for SQL Server};'
-        'SERVER=SRIKIRANREDDY\\SQLEXPRESS;'
-        'DATABASE=master;'
-        'Trusted_Connection=yes;'
-    )
+    return nse_db_pool.get_connection()
 
 def get_trading_dates():
-    """Get trading dates from Feb 4 to Feb 15, 2025 (excluding weekends)"""
-    start_date = datetime(2025, 2, 4)
-    end_date = datetime(2025, 2, 15)
-    
-    trading_dates = []
-    current_date = start_date
-    
-    while current_date <= end_date:
-        # Exclude weekends (Saturday=5, Sunday=6)
-        if current_date.weekday() < 5:  # Monday=0 to Friday=4
-            trading_dates.append(current_date)
-        current_date += timedelta(days=1)
-    
-    return trading_dates
+    """Get trading dates from Feb 4 to Feb 15, 2025 (excluding weekends and NSE holidays)"""
+    return [datetime(d.year, d.month, d.day)
+            for d in get_calendar().trading_days(datetime(2025, 2, 4), datetime(2025, 2, 15))]
 
 def generate_daily_fo_data(trade_date):
     """Generate comprehensive F&O data for a specific date (~34,305 records)"""
@@ -4,7 +4,7 @@ Debug script for analyzing 5th February 2025 data discrepancies
 """
 
 import pandas as pd
-import pyodbc
+import nse_db_pool
 import json
 import os
 import zipfile
@@ -19,7 +19,6 @@ def debug_feb_5th():
     with open('database_config.json', 'r') as f:
         config = json.load(f)
     
-    conn_str = f"DRIVER={config['driver']};SERVER={config['server']};DATABASE={config['database']};Trusted_Connection=yes;"
     source_dir = r"C:\Users\kiran\NSE_Downloader\fo_udiff_downloads"
     
     # 1. Analyze source file
@@ -52,7 +51,7 @@ def debug_feb_5th():
     # 2. Analyze database data
     print("\n💾 ANALYZING DATABASE DATA:")
     try:
-        conn = pyodbc.connect(conn_str)
+        conn = nse_db_pool.get_connection()
         cursor = conn.cursor()
         
         # Get record count
@@ -1,15 +1,9 @@
 #!/usr/bin/env python3
 """Quick debug to check February 2025 data availability"""
 
-import pyodbc
-
+import nse_db_pool
 try:
-    conn = pyodbc.connect(
-        "Driver={ODBC Driver 17 for SQL Server};"
-        "Server=SRIKIRANREDDY\\SQLEXPRESS;"
-        "Database=master;"
-        "Trusted_Connection=yes;"
-    )
+    conn = nse_db_pool.get_connection()
     cursor = conn.cursor()
     
     # Check step04_fo_udiff_daily for February dates
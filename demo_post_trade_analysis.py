@@ -9,7 +9,7 @@ Purpose: Demonstrate the 50% reduction analysis by using earlier February dates
 This will show how the analysis works when proper future data is available.
 """
 
-import pyodbc
+import nse_db_pool
 import pandas as pd
 import logging
 
@@ -22,13 +22,7 @@ logger = logging.getLogger(__name__)
 
 def get_connection():
     """Get database connection"""
-    connection_string = (
-        "Driver={ODBC Driver 17 for SQL Server};"
-        "Server=SRIKIRANREDDY\\SQLEXPRESS;"
-        "Database=master;"
-        "Trusted_Connection=yes;"
-    )
-    return pyodbc.connect(connection_string)
+    return nse_db_pool.get_connection()
 
 def create_demo_test_data():
     """
@@ -6,7 +6,7 @@ import requests
 import zipfile
 import pandas as pd
 import os
-import pyodbc
+import nse_db_pool
 from datetime import datetime, timedelta
 import json
 import io
@@ -131,12 +131,7 @@ class MissingMonthsDownloader:
     
     def get_connection(self):
         """Get database connection"""
-        return pyodbc.connect(
-            f"DRIVER={{ODBC Driver 17 for SQL Server}};"
-            f"SERVER={self.db_config['server']};"
-            f"DATABASE={self.db_config['database']};"
-            f"Trusted_Connection=yes;"
-        )
+        return nse_db_pool.get_connection()
     
     def check_existing_data(self, month_year):
         """Check what data already exists in database for a month"""
@@ -12,7 +12,7 @@ This implements the enhanced logic:
 Logic: 3 Above + 3 Below + 1 Nearest = 7 strikes × 2 options = 14 records
 """
 
-import pyodbc
+import nse_db_pool
 import pandas as pd
 import numpy as np
 from datetime import datetime
@@ -22,7 +22,7 @@ def find_strikes_above_below_target(trade_date, symbol, target_price):
     Enhanced logic: Find strikes above and below target price
     Returns exactly 14 records (7 strikes × 2 option types)
     """
-    conn = pyodbc.connect('Driver={SQL Server};Server=SRIKIRANREDDY\\SQLEXPRESS;Database=master;Trusted_Connection=yes;')
+    conn = nse_db_pool.get_connection()
     
     # Convert date format if needed (YYYY-MM-DD to YYYYMMDD)
     if isinstance(trade_date, str) and '-' in trade_date:
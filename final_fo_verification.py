@@ -2,6 +2,7 @@
 Final attempt to create step04_fo_udiff_daily table in master database
 """
 import pyodbc
+import nse_db_pool
 import sys
 
 def create_fo_table():
@@ -12,15 +13,8 @@ def create_fo_table():
         # Test connection first
         print("🔌 Testing SQL Server connection...")
         
-        connection_string = (
-            'Driver={ODBC Driver 17 for SQL Server};'
-            'Server=SRIKIRANREDDY\\SQLEXPRESS;'
-            'Database=master;'
-            'Trusted_Connection=yes;'
-            'TrustServerCertificate=yes;'
-        )
         
-        conn = pyodbc.connect(connection_string)
+        conn = nse_db_pool.get_connection()
         cur = conn.cursor()
         
         print("✅ Connected to SQL Server master database!")
@@ -4,17 +4,12 @@ Final Push: Add remaining ~2,400 records to reach 34,305 target
 Current: 31,882 | Target: 34,305 | Need: ~2,423 more
 """
 
-import pyodbc
+import nse_db_pool
 import random
 import math
 
 def get_connection():
-    return pyodbc.connect(
-        'DRIVER={ODBC Driver 17 for SQL Server};'
-        'SERVER=SRIKIRANREDDY\\SQLEXPRESS;'
-        'DATABASE=master;'
-        'Trusted_Connection=yes;'
-    )
+    return nse_db_pool.get_connection()
 
 def add_final_batch():
     """Add the final batch of records to reach target"""
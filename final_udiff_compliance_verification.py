@@ -1,6 +1,6 @@
 #!/usr/bin/env python3
 
-import pyodbc
+import nse_db_pool
 import json
 
 def final_udiff_compliance_verification():
@@ -11,8 +11,7 @@ def final_udiff_compliance_verification():
         config = json.load(f)
 
     try:
-        conn_str = f"DRIVER={config['driver']};SERVER={config['server']};DATABASE={config['database']};Trusted_Connection=yes;"
-        conn = pyodbc.connect(conn_str)
+        conn = nse_db_pool.get_connection()
         cursor = conn.cursor()
         
         print("✅ FINAL UDiFF COMPLIANCE VERIFICATION")
@@ -1,19 +1,11 @@
 """
 Search for the source of 34,305 records
 """
-import pyodbc
-
+import nse_db_pool
 def find_34305_records():
-    conn_string = (
-        'Driver={ODBC Driver 17 for SQL Server};'
-        'Server=SRIKIRANREDDY\\SQLEXPRESS;'
-        'Database=master;'
-        'Trusted_Connection=yes;'
-        'TrustServerCertificate=yes;'
-    )
     
     try:
-        conn = pyodbc.connect(conn_string)
+        conn = nse_db_pool.get_connection()
         cur = conn.cursor()
         
         print("🔍 SEARCHING FOR 34,305 RECORDS SOURCE")
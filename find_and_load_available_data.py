@@ -3,7 +3,7 @@
 import requests
 import zipfile
 import pandas as pd
-import pyodbc
+import nse_db_pool
 import json
 import os
 import time
@@ -27,8 +27,7 @@ def find_available_dates_and_load():
         with open('database_config.json', 'r') as f:
             config = json.load(f)
         
-        conn_str = f"DRIVER={config['driver']};SERVER={config['server']};DATABASE={config['database']};Trusted_Connection=yes;"
-        conn = pyodbc.connect(conn_str)
+        conn = nse_db_pool.get_connection()
         cursor = conn.cursor()
         
         print("💾 Connected to database")
@@ -2,7 +2,7 @@
 Check database tables and help locate index_symbol_masterdata table
 """
 
-import pyodbc
+import nse_db_pool
 import json
 import sys
 
@@ -24,15 +24,7 @@ class DatabaseTableChecker:
     def connect(self):
         """Establish database connection"""
         try:
-            # Build connection string for Windows Authentication
-            conn_str = (
-                f"DRIVER={{{self.config['driver']}}};"
-                f"SERVER={self.config['server']};"
-                f"DATABASE={self.config['database']};"
-                f"Trusted_Connection=yes;"
-            )
-            
-            self.connection = pyodbc.connect(conn_str)
+            self.connection = nse_db_pool.get_connection()
             print(f"✅ Connected to database: {self.config['database']} on server: {self.config['server']}")
             
         except Exception as e:
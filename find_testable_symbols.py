@@ -9,12 +9,12 @@ This script finds symbols that have data in both:
 This ensures we can test our strike finder logic properly.
 """
 
-import pyodbc
+import nse_db_pool
 import pandas as pd
 
 def find_common_symbols_with_data():
     """Find symbols that exist in both step03 and step04 tables"""
-    conn = pyodbc.connect('Driver={SQL Server};Server=SRIKIRANREDDY\\SQLEXPRESS;Database=master;Trusted_Connection=yes;')
+    conn = nse_db_pool.get_connection()
     
     # Get symbols from step03 with their dates and prices
     step03_query = """
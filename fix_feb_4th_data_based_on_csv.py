@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 
 import pandas as pd
-import pyodbc
+import nse_db_pool
 import json
 import os
 from datetime import datetime
@@ -30,8 +30,7 @@ def fix_feb_4th_data_based_on_csv():
         with open('database_config.json', 'r') as f:
             config = json.load(f)
         
-        conn_str = f"DRIVER={config['driver']};SERVER={config['server']};DATABASE={config['database']};Trusted_Connection=yes;"
-        conn = pyodbc.connect(conn_str)
+        conn = nse_db_pool.get_connection()
         cursor = conn.cursor()
         
         # Step 4: Clear existing Feb 4th data
@@ -4,7 +4,7 @@ FIXED F&O Data Loader - Resolves all validation and mapping issues
 """
 
 import pandas as pd
-import pyodbc
+import nse_db_pool
 import json
 import os
 import zipfile
@@ -21,7 +21,6 @@ def fix_feb_5th():
     with open('database_config.json', 'r') as f:
         config = json.load(f)
     
-    conn_str = f"DRIVER={config['driver']};SERVER={config['server']};DATABASE={config['database']};Trusted_Connection=yes;"
     source_dir = r"C:\Users\kiran\NSE_Downloader\fo_udiff_downloads"
     
     # Instrument mapping
@@ -88,7 +87,7 @@ def fix_feb_5th():
 
     # Save to database
     print("\n💾 Saving to database...")
-    conn = pyodbc.connect(conn_str)
+    conn = nse_db_pool.get_connection()
     cursor = conn.cursor()
 
     # Clear existing data
@@ -10,7 +10,7 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-import pyodbc
+import nse_db_pool
 import numpy as np
 from datetime import datetime
 import warnings
@@ -79,12 +79,7 @@ st.markdown("""
 def get_database_connection():
     """Establish database connection"""
     try:
-        conn = pyodbc.connect(
-            'DRIVER={ODBC Driver 17 for SQL Server};'
-            'SERVER=SRIKIRANREDDY\\SQLEXPRESS;'
-            'DATABASE=master;'
-            'Trusted_Connection=yes;'
-        )
+        conn = nse_db_pool.get_connection()
         return conn
     except Exception as e:
         st.error(f"Database connection failed: {e}")
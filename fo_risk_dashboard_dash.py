@@ -11,7 +11,7 @@ import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import pandas as pd
-import pyodbc
+import nse_db_pool
 import numpy as np
 from datetime import datetime
 import warnings
@@ -33,12 +33,7 @@ app = dash.Dash(__name__, external_stylesheets=external_stylesheets)
 def get_database_connection():
     """Establish database connection"""
     try:
-        conn = pyodbc.connect(
-            'DRIVER={ODBC Driver 17 for SQL Server};'
-            'SERVER=SRIKIRANREDDY\\SQLEXPRESS;'
-            'DATABASE=master;'
-            'Trusted_Connection=yes;'
-        )
+        conn = nse_db_pool.get_connection()
         return conn
     except Exception as e:
         print(f"Database connection failed: {e}")
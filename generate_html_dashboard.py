@@ -6,7 +6,7 @@ Data Sources: Step05_monthly_50percent_reduction_analysis & Step05_strikepriceAn
 """
 
 import pandas as pd
-import pyodbc
+import nse_db_pool
 import json
 from datetime import datetime
 import os
@@ -14,12 +14,7 @@ import os
 def get_database_connection():
     """Establish database connection"""
     try:
-        conn = pyodbc.connect(
-            'DRIVER={ODBC Driver 17 for SQL Server};'
-            'SERVER=SRIKIRANREDDY\\SQLEXPRESS;'
-            'DATABASE=master;'
-            'Trusted_Connection=yes;'
-        )
+        conn = nse_db_pool.get_connection()
         return conn
     except Exception as e:
         print(f"Database connection failed: {e}")
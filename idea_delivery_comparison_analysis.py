@@ -10,13 +10,13 @@ Tables used:
 - step01_equity_daily: For February 2025 daily delivery data
 """
 
-import pyodbc
+import nse_db_pool
 import pandas as pd
 from datetime import datetime
 
 def get_january_peak_delivery():
     """Get IDEA's highest delivery quantity from January 2025"""
-    conn = pyodbc.connect('Driver={SQL Server};Server=SRIKIRANREDDY\\SQLEXPRESS;Database=master;Trusted_Connection=yes;')
+    conn = nse_db_pool.get_connection()
     
     query = """
     SELECT 
@@ -47,7 +47,7 @@ def get_january_peak_delivery():
 
 def get_february_daily_deliveries(jan_peak_qty):
     """Get February 2025 daily delivery data for IDEA and compare with January peak"""
-    conn = pyodbc.connect('Driver={SQL Server};Server=SRIKIRANREDDY\\SQLEXPRESS;Database=master;Trusted_Connection=yes;')
+    conn = nse_db_pool.get_connection()
     
     query = """
     SELECT 
@@ -1,6 +1,6 @@
 #!/usr/bin/env python3
 
-import pyodbc
+import nse_db_pool
 import json
 import pandas as pd
 from datetime import datetime, timedelta
@@ -424,8 +424,7 @@ def load_daily_fo_data_with_all_columns(start_date, end_date):
         config = json.load(f)
 
     try:
-        conn_str = f"DRIVER={config['driver']};SERVER={config['server']};DATABASE={config['database']};Trusted_Connection=yes;"
-        conn = pyodbc.connect(conn_str)
+        conn = nse_db_pool.get_connection()
         cursor = conn.cursor()
         
         current_date = datetime.strptime(start_date, '%Y-%m-%d')
@@ -4,19 +4,14 @@ MAXIMUM F&O UDiFF Data Loader - February 3rd, 2025
 Target: EXACTLY ~34,305 records (complete NSE F&O universe)
 """
 
-import pyodbc
+import nse_db_pool
 import pandas as pd
 from datetime import datetime, timedelta
 import random
 import math
 
 def get_connection():
-    return pyodbc.connect(
-        'DRIVER={ODBC Driver 17 for SQL Server};'
-        'SERVER=SRIKIRANREDDY\\SQLEXPRESS;'
-        'DATABASE=master;'
-        'Trusted_Connection=yes;'
-    )
+    return nse_db_pool.get_connection()
 
 def main():
     print("🎯 MAXIMUM F&O UDiFF Data Loader - Target: ~34,305 Records")
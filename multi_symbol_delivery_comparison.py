@@ -10,13 +10,13 @@ Tables used:
 - step01_equity_daily: For February 2025 daily delivery data
 """
 
-import pyodbc
+import nse_db_pool
 import pandas as pd
 from datetime import datetime
 
 def get_january_symbols_with_delivery():
     """Get all symbols with delivery data from January 2025"""
-    conn = pyodbc.connect('Driver={SQL Server};Server=SRIKIRANREDDY\\SQLEXPRESS;Database=master;Trusted_Connection=yes;')
+    conn = nse_db_pool.get_connection()
     
     query = """
     SELECT 
@@ -36,7 +36,7 @@ def get_january_symbols_with_delivery():
 
 def get_february_max_delivery(symbol):
     """Get maximum February 2025 delivery for a specific symbol"""
-    conn = pyodbc.connect('Driver={SQL Server};Server=SRIKIRANREDDY\\SQLEXPRESS;Database=master;Trusted_Connection=yes;')
+    conn = nse_db_pool.get_connection()
     
     query = f"""
     SELECT 
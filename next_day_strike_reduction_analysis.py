@@ -19,7 +19,7 @@ Logic:
 - Calculate: (Previous Strike - Current Strike) / Previous Strike * 100 >= 50%
 """
 
-import pyodbc
+import nse_db_pool
 import pandas as pd
 from datetime import datetime, timedelta
 import logging
@@ -38,13 +38,7 @@ logger = logging.getLogger(__name__)
 # Database connection
 def get_connection():
     """Get database connection"""
-    connection_string = (
-        "Driver={ODBC Driver 17 for SQL Server};"
-        "Server=SRIKIRANREDDY\\SQLEXPRESS;"
-        "Database=master;"
-        "Trusted_Connection=yes;"
-    )
-    return pyodbc.connect(connection_string)
+    return nse_db_pool.get_connection()
 
 def get_current_test_data():
     """
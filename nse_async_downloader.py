@@ -0,0 +1,453 @@
+#!/usr/bin/env python3
+"""
+NSE Async Bhavcopy Downloader
+
+Purpose:
+  One downloader for any date range, replacing the per-month
+  nse_<month>_2025_downloader.py scripts. Trading days are fetched
+  concurrently over a single keep-alive connection pool, bounded by a
+  concurrency limit and a token-bucket request rate so a full-year backfill
+  finishes in minutes without hammering the NSE archives.
+
+  For each day the URL templates are tried until one returns a valid
+  file, in the order learned by nse_url_resolver (templates that worked
+  for nearby dates first, templates that keep 404'ing skipped).
+
+Segments:
+  EQ  equity bhavcopy; zipped responses (cm*bhav.csv.zip) are extracted and
+      saved as sec_bhavdata_full_DDMMYYYY.csv in NSE_<Month>_<Year>_Data
+  FO  F&O UDiFF bhavcopy; saved as-is to
+      fo_udiff_downloads/BhavCopy_NSE_FO_0_0_0_YYYYMMDD_F_0000.csv.zip
+
+Sync mode:
+  With --sync every result is recorded in download_manifest.json (URL, size,
+  SHA-256, ETag/Last-Modified, status) and only trading days that are missing,
+  failed or changed on disk are requested, so a nightly run costs one request
+  per new day and an interrupted run resumes where it stopped. --revalidate
+  additionally sends conditional requests for days already held.
+
+Usage:
+  1. Install: pip install -r requirements_downloader.txt
+  2. Run:
+     python nse_async_downloader.py --start 2025-01-01 --end 2025-12-31
+     python nse_async_downloader.py --month January --year 2025 --concurrency 8 --rate 4
+     python nse_async_downloader.py --sync --segment FO --start 2025-02-01
+
+Testing:
+  Pass url_templates pointing at a local HTTP stub (e.g. http://127.0.0.1:8000/...)
+  that serves fixture zips/CSVs and 404s; no other part of the downloader is
+  tied to the NSE hosts. test_async_downloader.py does exactly that.
+"""
+
+import os
+import io
+import time
+import asyncio
+import hashlib
+import zipfile
+import argparse
+import calendar
+from datetime import date, datetime
+from typing import Dict, List, Optional
+
+import aiohttp
+
+from nse_url_resolver import URLPatternResolver
+from nse_trading_calendar import get_calendar
+from nse_download_manifest import DownloadManifest, STATUS_OK, STATUS_MISSING, STATUS_FAILED
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Accept-Encoding': 'gzip, deflate',
+    'Connection': 'keep-alive',
+    'Referer': 'https://www.nseindia.com/',
+}
+
+# Placeholders: {dd} {mm} {yyyy} -> 05 02 2025, {mon} -> FEB
+BHAVCOPY_URL_TEMPLATES = [
+    "https://nsearchives.nseindia.com/products/content/sec_bhavdata_full_{dd}{mm}{yyyy}.csv",
+    "https://archives.nseindia.com/products/content/sec_bhavdata_full_{dd}{mm}{yyyy}.csv",
+    "https://www1.nseindia.com/products/content/sec_bhavdata_full_{dd}{mm}{yyyy}.csv",
+    "https://nsearchives.nseindia.com/content/historical/EQUITIES/{yyyy}/{mon}/cm{dd}{mon}{yyyy}bhav.csv.zip",
+    "https://archives.nseindia.com/content/historical/EQUITIES/{yyyy}/{mon}/cm{dd}{mon}{yyyy}bhav.csv.zip",
+    "https://www1.nseindia.com/content/historical/EQUITIES/{yyyy}/{mon}/cm{dd}{mon}{yyyy}bhav.csv.zip",
+]
+
+FO_UDIFF_URL_TEMPLATES = [
+    "https://nsearchives.nseindia.com/content/fo/BhavCopy_NSE_FO_0_0_0_{yyyy}{mm}{dd}_F_0000.csv.zip",
+    "https://archives.nseindia.com/content/fo/BhavCopy_NSE_FO_0_0_0_{yyyy}{mm}{dd}_F_0000.csv.zip",
+]
+
+FO_DOWNLOAD_DIR = 'fo_udiff_downloads'
+
+MIN_VALID_SIZE = 1000
+
+# Manifest entries are written to disk in batches, not once per day inside the event loop
+MANIFEST_SAVE_EVERY = 25
+
+
+class TokenBucket:
+    """Async token bucket: `rate` requests per second, bursts up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = float(rate)
+        self.capacity = float(capacity) if capacity else max(1.0, self.rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+def format_url(template: str, trade_date: date) -> str:
+    """Fill a URL template for a trading date"""
+    return template.format(
+        dd=f"{trade_date.day:02d}",
+        mm=f"{trade_date.month:02d}",
+        yyyy=str(trade_date.year),
+        mon=trade_date.strftime('%b').upper(),
+    )
+
+
+def get_date_range_days(start: date, end: date) -> List[date]:
+    """NSE trading days between start and end (inclusive), holidays excluded"""
+    return get_calendar().trading_days(start, end)
+
+
+def month_folder(trade_date: date, root: str = '.') -> str:
+    """NSE_<Month>_<Year>_Data folder used by the loaders"""
+    return os.path.join(root, f"NSE_{calendar.month_name[trade_date.month]}_{trade_date.year}_Data")
+
+
+def eq_local_path(trade_date: date, root: str = '.') -> str:
+    return os.path.join(month_folder(trade_date, root), f"sec_bhavdata_full_{trade_date.strftime('%d%m%Y')}.csv")
+
+
+def existing_file(trade_date: date, root: str = '.') -> Optional[str]:
+    """Return the path of an already-downloaded bhavcopy for the date, if any"""
+    folder = month_folder(trade_date, root)
+    date_str = trade_date.strftime('%d%m%Y')
+    for filename in (f"sec_bhavdata_full_{date_str}.csv", f"cm{date_str}bhav.csv"):
+        path = os.path.join(folder, filename)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def fo_local_path(trade_date: date, root: str = '.') -> str:
+    return os.path.join(root, FO_DOWNLOAD_DIR,
+                        f"BhavCopy_NSE_FO_0_0_0_{trade_date.strftime('%Y%m%d')}_F_0000.csv.zip")
+
+
+def fo_existing_file(trade_date: date, root: str = '.') -> Optional[str]:
+    path = fo_local_path(trade_date, root)
+    return path if os.path.exists(path) else None
+
+
+def extract_csv(content: bytes) -> Optional[bytes]:
+    """Return raw CSV bytes, unzipping if the payload is a zip archive"""
+    if content[:2] == b'PK':
+        try:
+            with zipfile.ZipFile(io.BytesIO(content)) as zf:
+                csv_files = [f for f in zf.namelist() if f.lower().endswith('.csv')]
+                if not csv_files:
+                    return None
+                return zf.read(csv_files[0])
+        except zipfile.BadZipFile:
+            return None
+    return content
+
+
+def is_valid_bhavcopy(csv_bytes: Optional[bytes]) -> bool:
+    """Cheap header check instead of a full pandas parse"""
+    if not csv_bytes or len(csv_bytes) < MIN_VALID_SIZE:
+        return False
+    header = csv_bytes.split(b'\n', 1)[0].upper()
+    return b'SYMBOL' in header and b'SERIES' in header
+
+
+def prepare_eq(content: bytes) -> Optional[bytes]:
+    csv_bytes = extract_csv(content)
+    return csv_bytes if is_valid_bhavcopy(csv_bytes) else None
+
+
+def prepare_fo(content: bytes) -> Optional[bytes]:
+    """Keep the UDiFF zip as-is after checking the inner CSV header"""
+    if len(content) < MIN_VALID_SIZE or content[:2] != b'PK':
+        return None
+    try:
+        with zipfile.ZipFile(io.BytesIO(content)) as zf:
+            csv_files = [f for f in zf.namelist() if f.lower().endswith('.csv')]
+            if not csv_files:
+                return None
+            with zf.open(csv_files[0]) as f:
+                header = f.readline().upper()
+    except zipfile.BadZipFile:
+        return None
+    return content if (b'TCKRSYMB' in header or b'SYMBOL' in header) else None
+
+
+SEGMENTS = {
+    'EQ': {'templates': BHAVCOPY_URL_TEMPLATES, 'local_path': eq_local_path,
+           'existing': existing_file, 'prepare': prepare_eq},
+    'FO': {'templates': FO_UDIFF_URL_TEMPLATES, 'local_path': fo_local_path,
+           'existing': fo_existing_file, 'prepare': prepare_fo},
+}
+
+
+class NSEAsyncDownloader:
+    def __init__(self, output_root: str = '.', concurrency: int = 8, rate: float = 4.0,
+                 url_templates: Optional[List[str]] = None, timeout: int = 30,
+                 headers: Optional[Dict[str, str]] = None, skip_existing: bool = True,
+                 resolver: Optional[URLPatternResolver] = None, segment: str = 'EQ',
+                 manifest: Optional[DownloadManifest] = None):
+        self.output_root = output_root
+        self.concurrency = concurrency
+        self.rate = rate
+        self.segment = segment
+        self.spec = SEGMENTS[segment]
+        self.url_templates = list(url_templates or self.spec['templates'])
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.headers = headers or HEADERS
+        self.skip_existing = skip_existing
+        self.resolver = resolver or URLPatternResolver()
+        self.manifest = manifest
+
+    def candidate_templates(self, trade_date: date) -> List[str]:
+        """URL templates to try for a date, learned-good ones first"""
+        return self.resolver.order(self.url_templates, trade_date)
+
+    async def fetch(self, session: aiohttp.ClientSession, bucket: TokenBucket, url: str,
+                    extra_headers: Optional[Dict[str, str]] = None):
+        """GET one URL; returns (status, body or None, response headers)"""
+        await bucket.acquire()
+        try:
+            async with session.get(url, headers=extra_headers) as response:
+                if response.status != 200:
+                    return response.status, None, response.headers
+                return 200, await response.read(), response.headers
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            return e.__class__.__name__, None, {}
+
+    def save(self, trade_date: date, data: bytes) -> str:
+        """Write atomically so an interrupted run never leaves a partial file"""
+        path = self.spec['local_path'](trade_date, self.output_root)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + '.part'
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        return path
+
+    def conditional_headers(self, trade_date: date) -> Dict[str, str]:
+        """If-None-Match / If-Modified-Since for a day we already hold intact"""
+        entry = self.manifest.get(self.segment, trade_date) if self.manifest else None
+        if not entry or entry['status'] != STATUS_OK or not self.manifest.is_intact(entry):
+            return {}
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    async def download_day(self, session: aiohttp.ClientSession, bucket: TokenBucket,
+                           semaphore: asyncio.Semaphore, trade_date: date) -> Dict:
+        """Try each URL template for one trading day"""
+        result = {'date': trade_date.isoformat(), 'status': 'failed', 'url': None,
+                  'size': 0, 'path': None, 'attempts': []}
+
+        if self.skip_existing:
+            path = self.spec['existing'](trade_date, self.output_root)
+            if path:
+                result.update(status='skipped', path=path, size=os.path.getsize(path))
+                return result
+
+        conditional = self.conditional_headers(trade_date)
+        async with semaphore:
+            for template in self.candidate_templates(trade_date):
+                url = format_url(template, trade_date)
+                status, content, headers = await self.fetch(session, bucket, url, conditional)
+                result['attempts'].append({'url': url, 'status': status})
+                if status == 304:
+                    result.update(status='unchanged', url=url)
+                    break
+                if content is None:
+                    self.resolver.record_miss(template, trade_date, status)
+                    continue
+                data = self.spec['prepare'](content)
+                if data is None:
+                    result['attempts'][-1]['status'] = 'invalid'
+                    continue
+                path = await asyncio.to_thread(self.save, trade_date, data)
+                self.resolver.record_success(template, trade_date)
+                result.update(status='downloaded', url=url, size=len(data), path=path,
+                              sha256=hashlib.sha256(data).hexdigest(),
+                              etag=headers.get('ETag'), last_modified=headers.get('Last-Modified'))
+                break
+
+        if result['status'] == 'failed' and result['attempts'] and \
+                all(a['status'] in (404, 410) for a in result['attempts']):
+            result['status'] = 'missing'
+
+        self.record_manifest(trade_date, result)
+        return result
+
+    def record_manifest(self, trade_date: date, result: Dict):
+        if not self.manifest or result['status'] in ('skipped', 'unchanged'):
+            return
+        if result['status'] == 'downloaded':
+            self.manifest.record(self.segment, trade_date, STATUS_OK, url=result['url'],
+                                 path=result['path'], etag=result.get('etag'),
+                                 last_modified=result.get('last_modified'), sha256=result['sha256'],
+                                 save=False)
+        else:
+            status = STATUS_MISSING if result['status'] == 'missing' else STATUS_FAILED
+            self.manifest.record(self.segment, trade_date, status,
+                                 url=result['attempts'][-1]['url'] if result['attempts'] else None,
+                                 save=False)
+
+    async def download_range_async(self, trading_days: List[date]) -> List[Dict]:
+        bucket = TokenBucket(self.rate)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        connector = aiohttp.TCPConnector(limit=self.concurrency, keepalive_timeout=60)
+        icons = {'downloaded': '✅', 'skipped': '⏭️ ', 'unchanged': '🟰', 'missing': '➖', 'failed': '❌'}
+
+        async with aiohttp.ClientSession(connector=connector, headers=self.headers,
+                                         timeout=self.timeout) as session:
+            tasks = [self.download_day(session, bucket, semaphore, d) for d in trading_days]
+            results = []
+            for i, coro in enumerate(asyncio.as_completed(tasks), 1):
+                result = await coro
+                print(f"[{i:3d}/{len(tasks)}] {icons[result['status']]} {result['date']} {result['status']}"
+                      + (f" ({result['size']:,} bytes)" if result['size'] else ''))
+                results.append(result)
+                if self.manifest and i % MANIFEST_SAVE_EVERY == 0:
+                    self.manifest.save()
+
+        return sorted(results, key=lambda r: r['date'])
+
+    def download_range(self, start: date, end: date) -> List[Dict]:
+        """Download every trading day between start and end (inclusive)"""
+        trading_days = get_date_range_days(start, end)
+        print(f"📅 {len(trading_days)} trading days from {start} to {end} ({self.segment})")
+        return self.download_days(trading_days)
+
+    def sync(self, start: date, end: date, revalidate: bool = False,
+             check_hash: bool = False) -> List[Dict]:
+        """Fetch only the days the manifest says are missing, failed or changed"""
+        if self.manifest is None:
+            self.manifest = DownloadManifest()
+        self.skip_existing = False
+        added = self.manifest.bootstrap(self.segment, start, end,
+                                        lambda d: self.spec['existing'](d, self.output_root))
+        if added:
+            print(f"📥 Indexed {added} files already on disk")
+
+        todo = self.manifest.plan_sync(self.segment, start, end, check_hash=check_hash)
+        if revalidate:
+            todo = sorted(set(todo) | set(get_date_range_days(start, end)))
+        print(f"🔄 Sync {self.segment} {start} → {end}: {len(todo)} day(s) to request")
+        return self.download_days(todo)
+
+    def download_days(self, trading_days: List[date]) -> List[Dict]:
+        print(f"⚙️  Concurrency: {self.concurrency}, rate: {self.rate}/s")
+        if not trading_days:
+            return []
+        try:
+            return asyncio.run(self.download_range_async(trading_days))
+        finally:
+            self.resolver.save()
+            if self.manifest:
+                self.manifest.save()
+
+
+def print_summary(results: List[Dict], elapsed: float):
+    counts = {'downloaded': 0, 'skipped': 0, 'unchanged': 0, 'missing': 0, 'failed': 0}
+    for r in results:
+        counts[r['status']] += 1
+
+    print("\n" + "=" * 60)
+    print("📊 DOWNLOAD SUMMARY")
+    print("=" * 60)
+    print(f"✅ Downloaded: {counts['downloaded']}")
+    print(f"⏭️  Skipped (already on disk): {counts['skipped']}")
+    print(f"🟰 Unchanged (304): {counts['unchanged']}")
+    print(f"➖ Not published (404): {counts['missing']}")
+    print(f"❌ Failed: {counts['failed']}")
+    print(f"⏱️  Elapsed: {elapsed:.1f}s")
+
+    failed = [r['date'] for r in results if r['status'] in ('missing', 'failed')]
+    if failed:
+        print("\n❌ Dates without a file (not yet published or errors):")
+        for d in failed:
+            print(f"  - {d}")
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description='Concurrent NSE equity bhavcopy downloader for any date range')
+    p.add_argument('--start', help='Start date YYYY-MM-DD')
+    p.add_argument('--end', help='End date YYYY-MM-DD (default: today)')
+    p.add_argument('--month', help='Month name (e.g., January); used with --year')
+    p.add_argument('--year', type=int, help='Year (e.g., 2025)')
+    p.add_argument('--output-root', default='.', help='Folder that holds the NSE_<Month>_<Year>_Data folders')
+    p.add_argument('--concurrency', type=int, default=8, help='Maximum in-flight requests')
+    p.add_argument('--rate', type=float, default=4.0, help='Maximum requests per second')
+    p.add_argument('--force', action='store_true', help='Re-download days that already exist on disk')
+    p.add_argument('--segment', choices=sorted(SEGMENTS), default='EQ', help='EQ bhavcopy or FO UDiFF')
+    p.add_argument('--sync', action='store_true', help='Fetch only days missing/changed per the manifest')
+    p.add_argument('--revalidate', action='store_true', help='With --sync, send conditional requests for held days')
+    p.add_argument('--check-hash', action='store_true', help='With --sync, re-hash local files to detect changes')
+    p.add_argument('--manifest', default='download_manifest.json', help='Manifest file used by --sync')
+    return p.parse_args()
+
+
+def resolve_range(args):
+    if args.month and args.year:
+        month = datetime.strptime(args.month[:3], '%b').month
+        last_day = calendar.monthrange(args.year, month)[1]
+        return date(args.year, month, 1), date(args.year, month, last_day)
+    if not args.start:
+        raise SystemExit("❌ Provide --start/--end or --month/--year")
+    start = datetime.strptime(args.start, '%Y-%m-%d').date()
+    end = datetime.strptime(args.end, '%Y-%m-%d').date() if args.end else date.today()
+    return start, end
+
+
+def main():
+    args = parse_args()
+    start, end = resolve_range(args)
+
+    print(f"🚀 NSE Async Bhavcopy Downloader ({args.segment})")
+    print("=" * 60)
+
+    downloader = NSEAsyncDownloader(
+        output_root=args.output_root,
+        concurrency=args.concurrency,
+        rate=args.rate,
+        skip_existing=not args.force,
+        segment=args.segment,
+        manifest=DownloadManifest(args.manifest) if args.sync else None,
+    )
+
+    started = time.monotonic()
+    if args.sync:
+        results = downloader.sync(start, end, revalidate=args.revalidate, check_hash=args.check_hash)
+    else:
+        results = downloader.download_range(start, end)
+    print_summary(results, time.monotonic() - started)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+NSE Bhavcopy Parser - one vectorized reader for daily equity bhavcopy CSVs
+
+Purpose:
+  Shared parser for both equity layouts on disk:
+    cm{DDMMYYYY}bhav.csv              (NSE_January..June_2025_Data)
+    sec_bhavdata_full_{DDMMYYYY}.csv  (NSE_July..August_2025_Data)
+  Both use the same header with a space after every comma
+  ("SYMBOL, SERIES, DATE1, ...") and '-' for missing delivery figures.
+
+Design:
+  pyarrow's CSV reader parses the file with explicit column types (float64
+  numerics, '-' as null); the string columns are then normalized in one
+  vectorized pass each:
+    - SYMBOL / SERIES: whitespace trimmed and dictionary-encoded, returned as
+      pandas categoricals
+    - DATE1: only the distinct values (one per file) go through strptime
+  Nothing runs per cell or per row in Python. If pyarrow is not installed the
+  pandas C engine is used instead (skipinitialspace + declared dtypes).
+
+  read_bhavcopy_files() reads many days into one frame (with SOURCE_FILE),
+  sharing the normalization pass across the whole month.
+
+Usage:
+  from nse_bhavcopy_parser import read_bhavcopy
+  df = read_bhavcopy('NSE_April_2025_Data/cm01042025bhav.csv')
+  python nse_bhavcopy_parser.py --benchmark "NSE_April_2025_Data/cm*.csv"
+"""
+
+import os
+import csv
+import glob
+import time
+import argparse
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.compute as pa_compute
+except ImportError:
+    pa = None
+
+DATE_FORMAT = '%d-%b-%Y'
+
+PRICE_COLUMNS = ['PREV_CLOSE', 'OPEN_PRICE', 'HIGH_PRICE', 'LOW_PRICE', 'LAST_PRICE',
+                 'CLOSE_PRICE', 'AVG_PRICE', 'TURNOVER_LACS', 'DELIV_PER']
+COUNT_COLUMNS = ['TTL_TRD_QNTY', 'NO_OF_TRADES', 'DELIV_QTY']
+NUMERIC_COLUMNS = PRICE_COLUMNS + COUNT_COLUMNS
+CATEGORY_COLUMNS = ['SYMBOL', 'SERIES']
+
+# Counts are read as float64 so a '-' (NaN) never forces a slow re-parse;
+# callers that need integers convert with .astype('Int64')
+BHAVCOPY_DTYPES: Dict[str, str] = {
+    'SYMBOL': 'category',
+    'SERIES': 'category',
+    'DATE1': 'str',
+    **{col: 'float64' for col in NUMERIC_COLUMNS},
+}
+
+NA_VALUES = ['-', '']
+
+
+def _read_header(file_path: str) -> List[str]:
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return [name.strip() for name in f.readline().split(',')]
+
+
+def _read_arrow_table(file_path: str):
+    names = _read_header(file_path)
+    column_types = {name: (pa.float64() if name in NUMERIC_COLUMNS else pa.string()) for name in names}
+    return pa_csv.read_csv(
+        file_path,
+        read_options=pa_csv.ReadOptions(column_names=names, skip_rows=1, use_threads=False),
+        convert_options=pa_csv.ConvertOptions(column_types=column_types,
+                                              null_values=NA_VALUES + [' -'],
+                                              strings_can_be_null=False),
+    )
+
+
+def _arrow_categorical(column) -> pd.Categorical:
+    encoded = pa_compute.dictionary_encode(pa_compute.utf8_trim_whitespace(column)).combine_chunks()
+    return pd.Categorical.from_codes(encoded.indices.to_numpy(zero_copy_only=False),
+                                     pd.Index(encoded.dictionary.to_pylist()))
+
+
+def _arrow_to_frame(table, parse_dates: bool) -> pd.DataFrame:
+    data = {}
+    for name in table.column_names:
+        column = table[name]
+        if name == 'DATE1' and parse_dates:
+            # One distinct date per file: parse the dictionary, then expand
+            encoded = pa_compute.dictionary_encode(column).combine_chunks()
+            dates = pa_compute.strptime(pa_compute.utf8_trim_whitespace(encoded.dictionary),
+                                        format=DATE_FORMAT, unit='s')
+            data[name] = pa_compute.take(dates, encoded.indices).to_numpy(zero_copy_only=False)
+        elif name in CATEGORY_COLUMNS or name == 'SOURCE_FILE':
+            data[name] = _arrow_categorical(column)
+        elif pa.types.is_string(column.type):
+            data[name] = pa_compute.utf8_trim_whitespace(column).to_pandas()
+        else:
+            data[name] = column.to_numpy()
+    return pd.DataFrame(data)
+
+
+def _read_pandas(file_path: str, parse_dates: bool) -> pd.DataFrame:
+    df = pd.read_csv(
+        file_path,
+        engine='c',
+        skipinitialspace=True,
+        dtype=BHAVCOPY_DTYPES,
+        na_values=NA_VALUES,
+        keep_default_na=False,
+    )
+    df.columns = df.columns.str.strip()
+    if parse_dates and 'DATE1' in df.columns:
+        df['DATE1'] = pd.to_datetime(df['DATE1'], format=DATE_FORMAT, cache=True)
+    return df
+
+
+def read_bhavcopy(file_path: str, parse_dates: bool = True,
+                  column_mapping: Optional[Dict[str, str]] = None) -> pd.DataFrame:
+    """
+    Read one bhavcopy CSV into a typed DataFrame.
+
+    Columns keep their bhavcopy names (SYMBOL, SERIES, DATE1, ...) unless
+    column_mapping renames them. With parse_dates, DATE1 becomes datetime64.
+    """
+    if pa is not None:
+        df = _arrow_to_frame(_read_arrow_table(file_path), parse_dates)
+    else:
+        df = _read_pandas(file_path, parse_dates)
+
+    if column_mapping:
+        df = df.rename(columns=column_mapping)
+    return df
+
+
+def read_bhavcopy_files(files: List[str], parse_dates: bool = True,
+                        column_mapping: Optional[Dict[str, str]] = None) -> pd.DataFrame:
+    """Read many bhavcopy CSVs into one frame with a SOURCE_FILE column"""
+    if pa is None:
+        frames = [read_bhavcopy(f, parse_dates).assign(SOURCE_FILE=os.path.basename(f)) for f in files]
+        df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    else:
+        tables = []
+        for file_path in files:
+            table = _read_arrow_table(file_path)
+            tables.append(table.append_column(
+                'SOURCE_FILE', pa.array([os.path.basename(file_path)] * table.num_rows, pa.string())))
+        df = _arrow_to_frame(pa.concat_tables(tables, promote_options='default'), parse_dates) if tables else pd.DataFrame()
+
+    if column_mapping:
+        df = df.rename(columns=column_mapping)
+    return df
+
+
+def legacy_load(file_path: str) -> pd.DataFrame:
+    """Previous step01 approach: per-cell strip + per-column to_numeric (benchmark only)"""
+    df = pd.read_csv(file_path)
+    df.columns = df.columns.str.strip()
+    df = df.map(lambda x: x.strip() if isinstance(x, str) else x)
+    for col in NUMERIC_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+    return df
+
+
+def legacy_dictreader(file_path: str) -> List[tuple]:
+    """Previous NSEDatabase approach: csv.DictReader with per-value conversion (benchmark only)"""
+    def safe_float(value):
+        try:
+            return float(str(value).strip()) if str(value).strip() else None
+        except ValueError:
+            return None
+
+    rows = []
+    with open(file_path, 'r', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            rows.append((row['SYMBOL'].strip(), row[' SERIES'].strip(), row[' DATE1'].strip(),
+                         *(safe_float(row[' ' + col]) for col in NUMERIC_COLUMNS)))
+    return rows
+
+
+def check_equivalence(file_path: str) -> List[str]:
+    """Columns where read_bhavcopy disagrees with the legacy parser (empty = identical)"""
+    new, old = read_bhavcopy(file_path, parse_dates=False), legacy_load(file_path)
+    mismatched = []
+    for col in old.columns:
+        a, b = new[col], old[col]
+        if col in NUMERIC_COLUMNS:
+            same = ((a == b) | (a.isna() & b.isna())).all()
+        else:
+            same = (a.astype(str).str.strip() == b.astype(str)).all()
+        if not same:
+            mismatched.append(col)
+    return mismatched
+
+
+def benchmark(files: List[str], repeat: int = 3) -> Dict[str, float]:
+    """Best-of-repeat seconds to parse all files with each approach"""
+    approaches = {
+        'legacy pandas (map + to_numeric)': lambda: [legacy_load(f) for f in files],
+        'legacy csv.DictReader': lambda: [legacy_dictreader(f) for f in files],
+        'read_bhavcopy (per file)': lambda: [read_bhavcopy(f) for f in files],
+        'read_bhavcopy_files (month)': lambda: read_bhavcopy_files(files),
+    }
+    timings = {}
+    for name, func in approaches.items():
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        timings[name] = best
+    return timings
+
+
+def main():
+    p = argparse.ArgumentParser(description='Parse NSE bhavcopy CSVs / benchmark the parser')
+    p.add_argument('pattern', nargs='?', default='NSE_April_2025_Data/cm*.csv', help='Glob for bhavcopy CSVs')
+    p.add_argument('--benchmark', action='store_true', help='Compare against the legacy parsers')
+    p.add_argument('--repeat', type=int, default=3)
+    args = p.parse_args()
+
+    files = sorted(glob.glob(args.pattern))
+    if not files:
+        print(f"❌ No files found matching pattern: {args.pattern}")
+        return
+
+    print(f"⚙️ Engine: {'pyarrow ' + pa.__version__ if pa is not None else 'pandas C engine'}")
+    mismatched = {os.path.basename(f): check_equivalence(f) for f in files}
+    mismatched = {f: cols for f, cols in mismatched.items() if cols}
+    if mismatched:
+        print(f"❌ Output differs from legacy parser: {mismatched}")
+    else:
+        print(f"✅ Output matches legacy parser for all {len(files)} files")
+
+    if not args.benchmark:
+        return
+
+    rows = len(read_bhavcopy_files(files))
+    print(f"\n⏱️ Benchmark: {len(files)} files, {rows:,} rows, best of {args.repeat}")
+    print("=" * 60)
+    timings = benchmark(files, args.repeat)
+    baseline = timings['legacy pandas (map + to_numeric)']
+    for name, seconds in timings.items():
+        print(f"{name:<36} {seconds:8.3f}s  ({baseline / seconds:5.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
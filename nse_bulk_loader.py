@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+NSE Bulk Loader - vectorized DataFrame -> table loads for every backend
+
+Purpose:
+  The loaders built each record with df.iterrows() and a per-cell NaN check,
+  then ran a plain executemany in 1000-row batches. BulkLoader instead:
+    1. converts whole columns to DB-ready object arrays (NaN -> None by mask,
+       counts -> int, dates -> datetime.date via the few distinct values)
+    2. streams them through the fastest bulk path the connection offers:
+         SQL Server (pyodbc)   cursor.fast_executemany (array-bound parameters)
+         PostgreSQL (psycopg2) COPY ... FROM STDIN (CSV)
+         SQLite (sqlite3)      executemany
+       in chunk_rows pieces, all inside one transaction (one commit per load).
+    3. optionally (quarantine_path) commits chunk by chunk instead; a chunk
+       the database rejects is rolled back and split in halves until the
+       offending rows are isolated, and those rows go to a quarantine CSV
+       with the error, while everything else is saved.
+
+Usage:
+  from nse_bulk_loader import BulkLoader, STEP01_EQUITY_COLUMNS
+  loader = BulkLoader(db_manager.connection, 'step01_equity_daily', STEP01_EQUITY_COLUMNS)
+  loader.load(frame)            # frame uses the table's column names
+
+  fo = BulkLoader(conn, 'step04_fo_udiff_daily', FO_UDIFF_COLUMNS, quarantine_path='fo_quarantine.csv')
+  fo.load(canonical_frame)      # nse_fo_parser frame; rejected rows -> fo_quarantine.csv
+
+  python nse_bulk_loader.py --benchmark                       # SQLite, one month
+  python nse_bulk_loader.py --benchmark --backend all --year 2025
+  python nse_bulk_loader.py --benchmark --dataset fo --days 5
+"""
+
+import io
+import os
+import time
+import argparse
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from nse_fo_parser import DATE_COLUMNS, FLOAT_COLUMNS, INT_COLUMNS, FO_TABLE_COLUMNS
+
+SQLSERVER = 'sqlserver'
+POSTGRES = 'postgres'
+SQLITE = 'sqlite'
+DUCKDB = 'duckdb'
+
+CHUNK_ROWS = 50000
+
+# Column kinds: 'date', 'yyyymmdd' (int32 YYYYMMDD -> 'YYYYMMDD' text, 0 = NULL), 'str', 'float', 'int'
+STEP01_EQUITY_COLUMNS: Dict[str, str] = {
+    'trade_date': 'date', 'symbol': 'str', 'series': 'str',
+    'prev_close': 'float', 'open_price': 'float', 'high_price': 'float', 'low_price': 'float',
+    'last_price': 'float', 'close_price': 'float', 'avg_price': 'float',
+    'ttl_trd_qnty': 'int', 'turnover_lacs': 'float', 'no_of_trades': 'int',
+    'deliv_qty': 'int', 'deliv_per': 'float', 'source_file': 'str',
+}
+
+# Full step04_fo_udiff_daily layout written from the canonical F&O frame
+FO_UDIFF_COLUMNS: Dict[str, str] = {
+    col: ('yyyymmdd' if col in DATE_COLUMNS else 'float' if col in FLOAT_COLUMNS
+          else 'int' if col in INT_COLUMNS else 'str')
+    for col in FO_TABLE_COLUMNS
+}
+
+BACKEND_MODULES = {'pyodbc': SQLSERVER, 'psycopg2': POSTGRES, 'sqlite3': SQLITE,
+                   'duckdb': DUCKDB, '_duckdb': DUCKDB}
+
+
+def detect_backend(connection) -> str:
+    # nse_db_pool connections carry their backend
+    if isinstance(getattr(connection, 'backend', None), str):
+        return connection.backend
+    module = type(connection).__module__.split('.')[0]
+    if module not in BACKEND_MODULES:
+        raise ValueError(f"Unsupported connection type: {type(connection)}")
+    return BACKEND_MODULES[module]
+
+
+def column_values(series: pd.Series, kind: str) -> np.ndarray:
+    """One column as an object array of plain Python values, None where missing"""
+    if kind in ('date', 'yyyymmdd'):
+        # A load has only a handful of distinct dates: convert those, then index
+        if kind == 'date':
+            codes, uniques = pd.factorize(pd.to_datetime(series))
+            converted = [d.date() for d in uniques]
+        else:
+            codes, uniques = pd.factorize(series)
+            converted = [str(int(d)) if d else None for d in uniques]
+        lookup = np.array(converted + [None], dtype=object)
+        return lookup[codes]
+
+    missing = series.isna().to_numpy()
+    if kind == 'str':
+        values = series.astype(object).to_numpy(copy=True)
+    elif kind == 'int':
+        values = np.empty(len(series), dtype=object)
+        values[~missing] = pd.to_numeric(series).to_numpy(dtype=np.float64)[~missing].astype(np.int64).tolist()
+    else:
+        values = pd.to_numeric(series).to_numpy(dtype=np.float64).astype(object)
+    values[missing] = None
+    return values
+
+
+def fo_columns(names: List[str]) -> Dict[str, str]:
+    """FO_UDIFF_COLUMNS (plus the canonical 'underlying') restricted to (and ordered as) names"""
+    kinds = {**FO_UDIFF_COLUMNS, 'underlying': 'str'}
+    return {name: kinds[name] for name in names}
+
+
+def to_records(frame: pd.DataFrame, columns: Dict[str, str]) -> List[tuple]:
+    """Insert-ready tuples in column order; absent columns become None"""
+    arrays = [column_values(frame[col], kind) if col in frame.columns else [None] * len(frame)
+              for col, kind in columns.items()]
+    return list(zip(*arrays))
+
+
+class BulkLoader:
+    def __init__(self, connection, table: str, columns: Dict[str, str],
+                 chunk_rows: int = CHUNK_ROWS, backend: Optional[str] = None,
+                 quarantine_path: Optional[str] = None):
+        self.connection = connection
+        self.table = table
+        self.columns = columns
+        self.chunk_rows = chunk_rows
+        self.backend = backend or detect_backend(connection)
+        self.quarantine_path = quarantine_path
+        self.quarantined = 0
+
+    @property
+    def insert_sql(self) -> str:
+        placeholder = '%s' if self.backend == POSTGRES else '?'
+        return (f"INSERT INTO {self.table} ({', '.join(self.columns)}) "
+                f"VALUES ({', '.join([placeholder] * len(self.columns))})")
+
+    def load(self, frame: pd.DataFrame, commit: bool = True) -> int:
+        """
+        Insert every row of frame; returns rows saved. Without a quarantine
+        the load is one transaction (committed unless commit=False) and any
+        error rolls it back and propagates. With a quarantine each chunk is
+        committed on its own and rejected rows are diverted.
+        """
+        if frame.empty:
+            return 0
+        cursor = self.connection.cursor()
+        try:
+            if self.quarantine_path:
+                return sum(self._load_isolating(cursor, frame.iloc[start:start + self.chunk_rows])
+                           for start in range(0, len(frame), self.chunk_rows))
+
+            for start in range(0, len(frame), self.chunk_rows):
+                self._write(cursor, frame.iloc[start:start + self.chunk_rows])
+            if commit:
+                self.connection.commit()
+        except Exception:
+            self.connection.rollback()
+            raise
+        finally:
+            cursor.close()
+        return len(frame)
+
+    def _write(self, cursor, chunk: pd.DataFrame):
+        if self.backend == POSTGRES:
+            self._copy(cursor, chunk)
+        else:
+            if self.backend == SQLSERVER:
+                cursor.fast_executemany = True
+            cursor.executemany(self.insert_sql, to_records(chunk, self.columns))
+
+    def _load_isolating(self, cursor, chunk: pd.DataFrame) -> int:
+        """Commit chunk; on failure bisect until the bad rows are isolated and quarantined"""
+        try:
+            self._write(cursor, chunk)
+            self.connection.commit()
+            return len(chunk)
+        except Exception as e:
+            self.connection.rollback()
+            if len(chunk) == 1:
+                self._quarantine(chunk, e)
+                return 0
+        middle = len(chunk) // 2
+        return self._load_isolating(cursor, chunk.iloc[:middle]) + self._load_isolating(cursor, chunk.iloc[middle:])
+
+    def _quarantine(self, rows: pd.DataFrame, error: Exception):
+        exists = os.path.exists(self.quarantine_path)
+        rows.assign(error=str(error).replace('\n', ' '),
+                    quarantined_at=datetime.now().isoformat(timespec='seconds')).to_csv(
+            self.quarantine_path, mode='a', header=not exists, index=False)
+        self.quarantined += len(rows)
+
+    def _copy(self, cursor, chunk: pd.DataFrame):
+        """COPY FROM STDIN: empty unquoted CSV fields load as NULL"""
+        prepared = pd.DataFrame({col: column_values(chunk[col], kind) if col in chunk.columns else None
+                                 for col, kind in self.columns.items()})
+        buffer = io.StringIO()
+        prepared.to_csv(buffer, index=False, header=False)
+        buffer.seek(0)
+        cursor.copy_expert(f"COPY {self.table} ({', '.join(self.columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+
+
+def legacy_insert(connection, table: str, columns: Dict[str, str], frame: pd.DataFrame, batch_size: int = 1000) -> int:
+    """Previous step01 path: iterrows + per-cell NaN check + plain executemany (benchmark only)"""
+    cursor = connection.cursor()
+    sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['?'] * len(columns))})"
+    for i in range(0, len(frame), batch_size):
+        records = []
+        for _, row in frame.iloc[i:i + batch_size].iterrows():
+            records.append(tuple(None if pd.isna(row.get(col)) else row.get(col) for col in columns))
+        cursor.executemany(sql, records)
+        connection.commit()
+    return len(frame)
+
+
+def legacy_row_insert(connection, table: str, columns: Dict[str, str], frame: pd.DataFrame) -> int:
+    """Previous step04 path: one cursor.execute per record with per-row try/except (benchmark only)"""
+    from nse_fo_parser import to_db_records
+    cursor = connection.cursor()
+    sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['?'] * len(columns))})"
+    saved = 0
+    for record in to_db_records(frame, list(columns)):
+        try:
+            cursor.execute(sql, record)
+            saved += 1
+        except Exception:
+            continue
+    connection.commit()
+    return saved
+
+
+def benchmark_table(connection, backend: str, source_table: str, columns: Dict[str, str]) -> str:
+    """Empty scratch table shaped like source_table (only the loaded columns)"""
+    name = f"{source_table}_bulk_bench"
+    cursor = connection.cursor()
+    if backend == SQLSERVER:
+        cursor.execute(f"IF OBJECT_ID('tempdb..#{name}') IS NOT NULL DROP TABLE #{name}")
+        cursor.execute(f"SELECT TOP 0 {', '.join(columns)} INTO #{name} FROM {source_table}")
+        return f"#{name}"
+
+    types = {'date': 'DATE', 'yyyymmdd': 'VARCHAR(8)', 'str': 'TEXT', 'float': 'DOUBLE PRECISION', 'int': 'BIGINT'}
+    ddl = ', '.join(f"{col} {types[kind]}" for col, kind in columns.items())
+    cursor.execute(f"DROP TABLE IF EXISTS {name}")
+    cursor.execute(f"CREATE {'TEMP ' if backend == POSTGRES else ''}TABLE {name} ({ddl})")
+    connection.commit()
+    return name
+
+
+def open_connection(backend: str):
+    if backend == SQLITE:
+        import sqlite3
+        # Lets the legacy path bind the Timestamps it passes through, as pyodbc does
+        sqlite3.register_adapter(pd.Timestamp, lambda ts: ts.isoformat())
+        return sqlite3.connect(':memory:')
+    if backend == SQLSERVER:
+        from nse_database_integration import NSEDatabaseManager
+        return NSEDatabaseManager().connection
+    import psycopg2
+    from nse_postgresql_importer_final import load_config
+    config = load_config()
+    return psycopg2.connect(host=config['host'], port=config['port'], database=config['database'],
+                            user=config['username'], password=config['password'])
+
+
+def benchmark_frame(args):
+    """(frame, description) for the chosen dataset"""
+    from nse_parquet_lake import EQ_COLUMN_MAPPING, discover_sources
+
+    sources = discover_sources('EQ' if args.dataset == 'equity' else 'FO')
+    if args.dataset == 'equity':
+        from nse_bhavcopy_parser import read_bhavcopy_files
+        files = [path for d, path in sources.items() if (args.year and d.year == args.year)
+                 or (not args.year and d.month == args.month)]
+        frame = read_bhavcopy_files(files, column_mapping={**EQ_COLUMN_MAPPING, 'SOURCE_FILE': 'source_file'})
+    else:
+        from nse_fo_parser import read_fo_bhavcopy
+        files = list(sources.values())[:args.days]
+        frame = pd.concat([read_fo_bhavcopy(f, fo_only=False).assign(source_file=os.path.basename(f))
+                           for f in files], ignore_index=True)
+    return frame, f"{len(files)} files"
+
+
+def main():
+    p = argparse.ArgumentParser(description='Benchmark bulk loads into step01/step04 tables')
+    p.add_argument('--benchmark', action='store_true')
+    p.add_argument('--dataset', choices=['equity', 'fo'], default='equity')
+    p.add_argument('--backend', choices=[SQLITE, SQLSERVER, POSTGRES, 'all'], default=SQLITE)
+    p.add_argument('--year', type=int, help='equity: every bhavcopy of this year (default: one month)')
+    p.add_argument('--month', type=int, default=4)
+    p.add_argument('--days', type=int, default=5, help='fo: number of UDiFF days')
+    p.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS)
+    p.add_argument('--skip-legacy', action='store_true', help='Do not time the previous row-wise path')
+    args = p.parse_args()
+
+    if not args.benchmark:
+        p.print_help()
+        return
+
+    started = time.perf_counter()
+    frame, description = benchmark_frame(args)
+    print(f"📖 Parsed {description}, {len(frame):,} rows in {time.perf_counter() - started:.1f}s")
+    print("=" * 60)
+
+    if args.dataset == 'equity':
+        source_table, columns, legacy = 'step01_equity_daily', STEP01_EQUITY_COLUMNS, legacy_insert
+    else:
+        source_table, columns, legacy = 'step04_fo_udiff_daily', FO_UDIFF_COLUMNS, legacy_row_insert
+
+    backends = [SQLITE, SQLSERVER, POSTGRES] if args.backend == 'all' else [args.backend]
+    for backend in backends:
+        try:
+            connection = open_connection(backend)
+        except (ImportError, SystemExit, Exception) as e:
+            print(f"⚠️ {backend}: unavailable ({e})")
+            continue
+
+        runs = {
+            'bulk': lambda table: BulkLoader(connection, table, columns, args.chunk_rows, backend).load(frame),
+            'bulk+quarantine': lambda table: BulkLoader(connection, table, columns, args.chunk_rows, backend,
+                                                        quarantine_path=os.devnull).load(frame),
+        }
+        if not args.skip_legacy and backend != POSTGRES:
+            runs['legacy'] = lambda table: legacy(connection, table, columns, frame)
+
+        for name, run in runs.items():
+            table = benchmark_table(connection, backend, source_table, columns)
+            started = time.perf_counter()
+            rows = run(table)
+            elapsed = time.perf_counter() - started
+            print(f"{backend:<10} {name:<16} {rows:>10,} rows {elapsed:8.2f}s {rows / elapsed:>12,.0f} rows/s")
+        connection.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -4,25 +4,20 @@ Complete NSE Data Query Tool
 View and query the entire NSE dataset loaded in Step 01
 """
 
-import pyodbc
-import json
+import nse_db_pool
 import pandas as pd
 from datetime import datetime
 
 class NSEDataQueryTool:
     def __init__(self):
-        """Initialize database connection"""
-        with open('database_config.json', 'r') as f:
-            config = json.load(f)
-        
-        self.conn_str = f"DRIVER={{ODBC Driver 17 for SQL Server}};SERVER={config['server']};DATABASE={config['database']};Trusted_Connection=yes;"
+        """Initialize database connection pool (database_config.json)"""
+        self.pool = nse_db_pool.get_pool()
         
     def run_query(self, query, description=""):
         """Execute a query and return results"""
         try:
-            conn = pyodbc.connect(self.conn_str)
-            df = pd.read_sql(query, conn)
-            conn.close()
+            with self.pool.connection() as conn:
+                df = conn.query_df(query)
             
             if description:
                 print(f"🔍 {description}")
@@ -14,9 +14,40 @@ Date: September 2025
 import sqlite3
 import os
 import csv
+import time
+import argparse
+from contextlib import contextmanager, nullcontext
 from datetime import datetime, timedelta
 import glob
 import pandas as pd
+from nse_bhavcopy_parser import read_bhavcopy, COUNT_COLUMNS
+from nse_load_pipeline import iter_parsed, PipelineStats, DEFAULT_WORKERS
+
+# Bhavcopy columns in stock_data insert order (after symbol, series, date)
+IMPORT_NUMERIC_COLUMNS = ['PREV_CLOSE', 'OPEN_PRICE', 'HIGH_PRICE', 'LOW_PRICE', 'LAST_PRICE',
+                          'CLOSE_PRICE', 'AVG_PRICE', 'TTL_TRD_QNTY', 'TURNOVER_LACS',
+                          'NO_OF_TRADES', 'DELIV_QTY', 'DELIV_PER']
+
+# Secondary indexes; the UNIQUE(symbol, series, date) index is kept for INSERT OR IGNORE
+SECONDARY_INDEXES = {
+    'idx_symbol': 'stock_data(symbol)',
+    'idx_date': 'stock_data(date)',
+    'idx_symbol_date': 'stock_data(symbol, date)',
+    'idx_series': 'stock_data(series)',
+}
+
+# Imports of at least this many files drop secondary indexes and rebuild them once
+BULK_REINDEX_MIN_FILES = 20
+
+def parse_import_file(csv_file_path):
+    """Parse one bhavcopy into stock_data insert tuples (runs in pipeline workers)"""
+    # Vectorized parse; DATE1 stays the trimmed 'DD-Mon-YYYY' string stored before
+    df = read_bhavcopy(csv_file_path, parse_dates=False)
+    for col in COUNT_COLUMNS:
+        df[col] = df[col].astype('Int64')
+    
+    values = df[['SYMBOL', 'SERIES', 'DATE1'] + IMPORT_NUMERIC_COLUMNS].astype(object)
+    return list(values.where(values.notna(), None).itertuples(index=False, name=None))
 
 class NSEDatabase:
     def __init__(self, db_path="nse_data.db"):
@@ -57,10 +88,7 @@ class NSEDatabase:
         """)
         
         # Create indexes for better performance
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_symbol ON stock_data(symbol)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_date ON stock_data(date)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_symbol_date ON stock_data(symbol, date)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_series ON stock_data(series)")
+        self.create_indexes(cursor)
         
         # Create summary table for daily market stats
         cursor.execute("""
@@ -88,71 +116,72 @@ class NSEDatabase:
         filename = os.path.basename(csv_file_path)
         print(f"📥 Importing: {filename}... ", end="", flush=True)
         
+        try:
+            values = parse_import_file(csv_file_path)
+        except Exception as e:
+            print(f"❌ Error importing {filename}: {e}")
+            return False
+        return self.write_import_values(values, filename)
+    
+    def create_indexes(self, cursor=None):
+        """Create (or rebuild after a bulk import) the secondary stock_data indexes"""
+        cursor = cursor or self.conn.cursor()
+        for name, target in SECONDARY_INDEXES.items():
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {target}")
+    
+    @contextmanager
+    def bulk_ingest(self, drop_indexes=True):
+        """
+        WAL + synchronous=OFF for the duration and, optionally, no secondary
+        indexes until the end (one sorted build instead of per-row B-tree
+        updates). Settings and indexes are restored even if the import fails.
+        """
+        cursor = self.conn.cursor()
+        journal_mode = cursor.execute("PRAGMA journal_mode").fetchone()[0]
+        synchronous = cursor.execute("PRAGMA synchronous").fetchone()[0]
+        cursor.execute("PRAGMA journal_mode = WAL")
+        cursor.execute("PRAGMA synchronous = OFF")
+        cursor.execute("PRAGMA temp_store = MEMORY")
+        cursor.execute("PRAGMA cache_size = -262144")     # 256 MB page cache
+        if drop_indexes:
+            for name in SECONDARY_INDEXES:
+                cursor.execute(f"DROP INDEX IF EXISTS {name}")
+            self.conn.commit()
+        try:
+            yield
+        finally:
+            if drop_indexes:
+                started = time.perf_counter()
+                self.create_indexes(cursor)
+                self.conn.commit()
+                print(f"🔧 Rebuilt {len(SECONDARY_INDEXES)} indexes in {time.perf_counter() - started:.1f}s")
+            cursor.execute(f"PRAGMA synchronous = {synchronous}")
+            cursor.execute(f"PRAGMA journal_mode = {journal_mode}")
+    
+    def write_import_values(self, values, filename, summarize=True):
+        """Insert parsed tuples for one file; refresh its daily summary unless summarize=False"""
         cursor = self.conn.cursor()
         imported_count = 0
         skipped_count = 0
         
         try:
-            with open(csv_file_path, 'r', encoding='utf-8') as file:
-                csv_reader = csv.DictReader(file)
-                
-                for row in csv_reader:
-                    try:
-                        # Clean and prepare data
-                        symbol = row['SYMBOL'].strip()
-                        series = row[' SERIES'].strip()  # Note the space in column name
-                        date = row[' DATE1'].strip()
-                        
-                        # Convert numeric fields, handle empty/invalid values
-                        def safe_float(value):
-                            try:
-                                return float(str(value).strip()) if str(value).strip() else None
-                            except:
-                                return None
-                        
-                        def safe_int(value):
-                            try:
-                                return int(float(str(value).strip())) if str(value).strip() else None
-                            except:
-                                return None
-                        
-                        # Insert data
-                        cursor.execute("""
-                            INSERT OR IGNORE INTO stock_data 
-                            (symbol, series, date, prev_close, open_price, high_price, 
-                             low_price, last_price, close_price, avg_price, total_traded_qty, 
-                             turnover_lacs, no_of_trades, delivery_qty, delivery_percentage)
-                            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                        """, (
-                            symbol, series, date,
-                            safe_float(row[' PREV_CLOSE']),
-                            safe_float(row[' OPEN_PRICE']),
-                            safe_float(row[' HIGH_PRICE']),
-                            safe_float(row[' LOW_PRICE']),
-                            safe_float(row[' LAST_PRICE']),
-                            safe_float(row[' CLOSE_PRICE']),
-                            safe_float(row[' AVG_PRICE']),
-                            safe_int(row[' TTL_TRD_QNTY']),
-                            safe_float(row[' TURNOVER_LACS']),
-                            safe_int(row[' NO_OF_TRADES']),
-                            safe_int(row[' DELIV_QTY']),
-                            safe_float(row[' DELIV_PER'])
-                        ))
-                        
-                        if cursor.rowcount > 0:
-                            imported_count += 1
-                        else:
-                            skipped_count += 1
-                            
-                    except Exception as e:
-                        print(f"\n⚠️ Error processing row in {filename}: {e}")
-                        continue
+            changes_before = self.conn.total_changes
+            cursor.executemany("""
+                INSERT OR IGNORE INTO stock_data 
+                (symbol, series, date, prev_close, open_price, high_price, 
+                 low_price, last_price, close_price, avg_price, total_traded_qty, 
+                 turnover_lacs, no_of_trades, delivery_qty, delivery_percentage)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, values)
+            imported_count = self.conn.total_changes - changes_before
+            skipped_count = len(values) - imported_count
             
             self.conn.commit()
             print(f"✅ Imported {imported_count} records, skipped {skipped_count}")
             
             # Update daily summary
-            self.update_daily_summary(date)
+            if summarize:
+                self.refresh_daily_summary({row[2] for row in values})
             
             return True
             
@@ -161,17 +190,24 @@ class NSEDatabase:
             self.conn.rollback()
             return False
     
-    def import_all_csv_files(self, data_folder="NSE_August_2025_Data"):
-        """Import all CSV files from the data folder"""
+    def import_all_csv_files(self, data_folder="NSE_August_2025_Data", workers=DEFAULT_WORKERS, bulk=True):
+        """Import all CSV files from the data folder (parsed in worker processes, written here)"""
         if not os.path.exists(data_folder):
             print(f"❌ Data folder not found: {data_folder}")
             return
         
         csv_files = glob.glob(os.path.join(data_folder, "sec_bhavdata_full_*.csv"))
-        csv_files.sort()
-        
+        self.import_csv_files(csv_files, workers, bulk)
+    
+    def import_csv_files(self, csv_files, workers=DEFAULT_WORKERS, bulk=True):
+        """
+        Import bhavcopy files. bulk=True runs inside bulk_ingest() (indexes are
+        dropped for imports of BULK_REINDEX_MIN_FILES or more) and refreshes
+        daily_summary for all touched dates once at the end.
+        """
+        csv_files = sorted(csv_files)
         if not csv_files:
-            print(f"❌ No CSV files found in {data_folder}")
+            print(f"❌ No CSV files to import")
             return
         
         print(f"🎯 Found {len(csv_files)} CSV files to import")
@@ -179,14 +215,27 @@ class NSEDatabase:
         
         successful = 0
         failed = 0
-        
-        for csv_file in csv_files:
-            if self.import_csv_file(csv_file):
-                successful += 1
-            else:
-                failed += 1
+        touched_dates = set()
+        
+        stats = PipelineStats()
+        ingest = self.bulk_ingest(drop_indexes=len(csv_files) >= BULK_REINDEX_MIN_FILES) if bulk else nullcontext()
+        with ingest:
+            for csv_file, values, error in iter_parsed(csv_files, parse_import_file, workers, stats=stats):
+                filename = os.path.basename(csv_file)
+                print(f"📥 Importing: {filename}... ", end="", flush=True)
+                if error is None and self.write_import_values(values, filename, summarize=not bulk):
+                    successful += 1
+                    touched_dates.update(row[2] for row in values)
+                else:
+                    if error is not None:
+                        print(f"❌ Error importing {filename}: {error}")
+                    failed += 1
+        
+        if bulk and touched_dates:
+            self.refresh_daily_summary(touched_dates)
         
         print("=" * 60)
+        stats.report(workers)
         print(f"📊 Import Summary:")
         print(f"✅ Successfully imported: {successful} files")
         print(f"❌ Failed: {failed} files")
@@ -194,10 +243,12 @@ class NSEDatabase:
         # Show database stats
         self.show_database_stats()
     
-    def update_daily_summary(self, date):
-        """Update daily summary statistics for a specific date"""
+    def refresh_daily_summary(self, dates):
+        """Recompute daily_summary for all given dates in one aggregate statement"""
         cursor = self.conn.cursor()
-        
+        cursor.execute("CREATE TEMP TABLE IF NOT EXISTS touched_dates (date TEXT PRIMARY KEY)")
+        cursor.execute("DELETE FROM touched_dates")
+        cursor.executemany("INSERT OR IGNORE INTO touched_dates (date) VALUES (?)", [(d,) for d in dates])
         cursor.execute("""
             INSERT OR REPLACE INTO daily_summary 
             (date, total_stocks, total_volume, total_turnover, total_trades, avg_delivery_percent)
@@ -209,11 +260,15 @@ class NSEDatabase:
                 SUM(no_of_trades) as total_trades,
                 AVG(delivery_percentage) as avg_delivery_percent
             FROM stock_data 
-            WHERE date = ?
-        """, (date,))
-        
+            WHERE date IN (SELECT date FROM touched_dates)
+            GROUP BY date
+        """)
         self.conn.commit()
     
+    def update_daily_summary(self, date):
+        """Update daily summary statistics for a specific date"""
+        self.refresh_daily_summary([date])
+    
     def show_database_stats(self):
         """Show database statistics"""
         cursor = self.conn.cursor()
@@ -334,12 +389,30 @@ class NSEDatabase:
             self.conn.close()
             print("🔒 Database connection closed")
 
+def parse_args():
+    p = argparse.ArgumentParser(description='NSE SQLite database manager (interactive without --import)')
+    p.add_argument('--db', default='nse_data.db', help='SQLite database path')
+    p.add_argument('--import', dest='import_pattern', help='Import files matching this glob and exit, '
+                   'e.g. "NSE_*_2025_Data/sec_bhavdata_full_*.csv"')
+    p.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help='Parser processes feeding the writer')
+    p.add_argument('--no-bulk', action='store_true',
+                   help='Keep indexes, default pragmas and per-file summaries during the import')
+    return p.parse_args()
+
 def main():
     """Main function with interactive menu"""
+    args = parse_args()
     print("🏦 NSE Database Manager")
     print("=" * 50)
     
-    db = NSEDatabase()
+    db = NSEDatabase(args.db)
+    
+    if args.import_pattern:
+        started = time.perf_counter()
+        db.import_csv_files(glob.glob(args.import_pattern), args.workers, bulk=not args.no_bulk)
+        print(f"⏱️ Import finished in {time.perf_counter() - started:.1f}s")
+        db.close()
+        return
     
     while True:
         print("\n📋 Available Operations:")
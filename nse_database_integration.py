@@ -19,15 +19,18 @@ Database Schema:
 
 Configuration:
   Uses database_config.json for connection settings or environment variables.
+  The connection comes from the shared nse_db_pool (backend chosen there).
 """
 
 import pandas as pd
-import pyodbc
 import json
 import os
 import sys
 from datetime import datetime
 from typing import Dict, List, Optional
+from nse_db_pool import ConnectionPool, load_db_config, describe
+from nse_bulk_loader import SQLSERVER
+from nse_month_key import ensure_trade_month
 
 class NSEDatabaseManager:
     def __init__(self, config_file='database_config.json'):
@@ -37,44 +40,17 @@ class NSEDatabaseManager:
     
     def load_config(self, config_file: str) -> Dict:
         """Load database configuration from file or environment"""
-        if os.path.exists(config_file):
-            with open(config_file, 'r') as f:
-                return json.load(f)
-        else:
-            # Fallback to environment variables or defaults
-            return {
-                "server": os.getenv("DB_SERVER", "localhost"),
-                "database": os.getenv("DB_NAME", "NSE_Analysis"),
-                "username": os.getenv("DB_USER", ""),
-                "password": os.getenv("DB_PASSWORD", ""),
-                "driver": os.getenv("DB_DRIVER", "ODBC Driver 17 for SQL Server"),
-                "trusted_connection": os.getenv("DB_TRUSTED", "yes")
-            }
+        return load_db_config(config_file)
     
     def connect(self):
         """Establish database connection"""
         try:
-            if self.config.get("trusted_connection", "").lower() == "yes":
-                conn_str = f"""
-                    DRIVER={{{self.config['driver']}}};
-                    SERVER={self.config['server']};
-                    DATABASE={self.config['database']};
-                    Trusted_Connection=yes;
-                """
-            else:
-                conn_str = f"""
-                    DRIVER={{{self.config['driver']}}};
-                    SERVER={self.config['server']};
-                    DATABASE={self.config['database']};
-                    UID={self.config['username']};
-                    PWD={self.config['password']};
-                """
-            
-            self.connection = pyodbc.connect(conn_str)
-            print(f"✅ Connected to database: {self.config['database']} on {self.config['server']}")
+            self.pool = ConnectionPool(self.config)
+            self.connection = self.pool.acquire()
+            print(f"✅ Connected to database: {describe(self.config)}")
             
             # Create NSE_Analysis database if it doesn't exist
-            if self.config['database'] == 'master':
+            if self.config['backend'] == SQLSERVER and self.config['database'] == 'master':
                 self.create_nse_database()
             
         except Exception as e:
@@ -134,6 +110,8 @@ class NSEDatabaseManager:
         
         cursor.execute(step01_sql)
         self.connection.commit()
+        # Persisted trade_month + covering index for the monthly step02/step03 queries
+        ensure_trade_month(self.connection)
         print("✅ Step 01 tables created/verified")
     
     def create_step02_tables(self):
@@ -223,26 +201,47 @@ class NSEDatabaseManager:
         """Create tables for Step 04 - F&O UDiFF Data"""
         cursor = self.connection.cursor()
         
+        # Same columns as step04_fo_udiff_loader plus the UDiFF columns of
+        # update_table_for_complete_udiff (the names every F&O loader writes)
         step04_sql = """
         IF NOT EXISTS (SELECT * FROM sysobjects WHERE name='step04_fo_udiff_daily' AND xtype='U')
         CREATE TABLE step04_fo_udiff_daily (
             id BIGINT IDENTITY(1,1) PRIMARY KEY,
             trade_date DATE NOT NULL,
-            instrument NVARCHAR(50) NOT NULL,
+            instrument NVARCHAR(50),
             symbol NVARCHAR(50) NOT NULL,
             expiry_date DATE,
             strike_price DECIMAL(18,4),
-            option_type NVARCHAR(5), -- 'CE', 'PE', NULL for futures
+            option_type NVARCHAR(2), -- 'CE', 'PE', NULL for futures
             open_price DECIMAL(18,4),
             high_price DECIMAL(18,4),
             low_price DECIMAL(18,4),
             close_price DECIMAL(18,4),
             settle_price DECIMAL(18,4),
-            contracts BIGINT,
-            value_lakhs DECIMAL(18,4),
+            contracts_traded BIGINT,
+            value_in_lakh DECIMAL(18,4),
             open_interest BIGINT,
             change_in_oi BIGINT,
-            underlying_value DECIMAL(18,4),
+            underlying NVARCHAR(50),
+            BizDt VARCHAR(8),
+            Sgmt VARCHAR(10),
+            Src VARCHAR(10),
+            FinInstrmId VARCHAR(50), -- with trade_date, the --merge natural key
+            ISIN VARCHAR(12),
+            SctySrs VARCHAR(10),
+            FininstrmActlXpryDt VARCHAR(10),
+            FinInstrmNm VARCHAR(200),
+            LastPric FLOAT,
+            PrvsClsgPric FLOAT,
+            UndrlygPric FLOAT,
+            TtlNbOfTxsExctd INT,
+            SsnId VARCHAR(20),
+            NewBrdLotQty INT,
+            Rmks VARCHAR(500),
+            Rsvd1 VARCHAR(50),
+            Rsvd2 VARCHAR(50),
+            Rsvd3 VARCHAR(50),
+            Rsvd4 VARCHAR(50),
             source_file NVARCHAR(255),
             created_at DATETIME2 DEFAULT GETDATE(),
             INDEX IX_step04_symbol_date (symbol, trade_date),
@@ -291,6 +290,7 @@ class NSEDatabaseManager:
         """Close database connection"""
         if self.connection:
             self.connection.close()
+            self.pool.close()
             print("📝 Database connection closed")
 
 def main():
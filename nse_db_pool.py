@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+"""
+NSE DB Pool - shared, pooled data access for the pipeline scripts
+
+Purpose:
+  Most scripts build their own hard-coded pyodbc connection string, and many
+  open a connection per query (find_enhanced_strikes: one per symbol), so the
+  ODBC handshake + Windows auth dominates short queries. This module owns the
+  connections for the whole process:
+
+    database_config.json ──► backend: sqlserver | postgres | sqlite | duckdb
+                         ──► ConnectionPool     thread-safe; idle connections reused
+                         ──► PooledConnection   DB-API proxy; close() returns it to the pool
+
+Design:
+  - get_pool() is a lazily created process-wide pool (re-created in a forked
+    child). A checkout takes an idle connection or opens a new one; a returned
+    connection is rolled back and kept up to max_idle. There is no hard cap, so
+    a script that never closes behaves as before: the proxy hands its
+    connection back when it is garbage collected.
+  - PooledConnection behaves like the driver connection (cursor(), commit(),
+    autocommit, pd.read_sql); `with conn:` commits or rolls back like pyodbc.
+  - Statement reuse: conn.execute() / conn.query_df() keep one cursor per SQL
+    text, so pyodbc and DuckDB re-execute an already prepared statement and
+    SQLite hits its statement cache. The cursors stay with the driver
+    connection in the pool, so a script that checks out per call (as
+    find_enhanced_strikes does) still reuses them. '?' placeholders become
+    %s on PostgreSQL.
+  - A connection idle for more than PING_AFTER seconds is checked with
+    SELECT 1 before reuse and replaced if the server dropped it.
+
+Config (database_config.json; no "backend" key = sqlserver, the existing format):
+  {"backend": "postgres", "host": ..., "port": 5432, "database": ..., "username": ..., "password": ...}
+  {"backend": "sqlite", "path": "nse_data.db"}
+  {"backend": "duckdb", "path": "nse_data.duckdb"}
+  NSE_DB_CONFIG=<file> selects another config file; NSE_DB_BACKEND and NSE_DB_PATH
+  override it, e.g. CI running analytics on a local file:
+    NSE_DB_BACKEND=sqlite NSE_DB_PATH=ci.db python nse_complete_query_tool.py
+
+Usage:
+  from nse_db_pool import get_connection
+  with get_connection() as conn:
+      df = conn.query_df("SELECT * FROM step01_equity_daily WHERE symbol = ?", [symbol])
+
+  python nse_db_pool.py --benchmark 200      # connect-per-query vs pooled
+"""
+
+import os
+import re
+import json
+import time
+import sqlite3
+import argparse
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Sequence
+
+import pandas as pd
+
+from nse_bulk_loader import SQLSERVER, POSTGRES, SQLITE, DUCKDB
+
+DEFAULT_CONFIG_FILE = 'database_config.json'
+DEFAULT_MAX_IDLE = 8
+STATEMENT_CACHE = 64        # cursors kept per connection by execute()/query_df()
+PING_AFTER = 300            # seconds idle before a connection is validated on checkout
+
+_QUOTED = re.compile(r"('(?:[^']|'')*')")
+
+
+def load_db_config(config_file: Optional[str] = None) -> Dict:
+    """database_config.json (or NSE_DB_CONFIG) plus NSE_DB_BACKEND / NSE_DB_PATH overrides"""
+    path = config_file or os.getenv('NSE_DB_CONFIG', DEFAULT_CONFIG_FILE)
+    if os.path.exists(path):
+        with open(path, 'r') as f:
+            config = json.load(f)
+    else:
+        # Fallback to environment variables or defaults
+        config = {
+            "server": os.getenv("DB_SERVER", "localhost"),
+            "database": os.getenv("DB_NAME", "NSE_Analysis"),
+            "username": os.getenv("DB_USER", ""),
+            "password": os.getenv("DB_PASSWORD", ""),
+            "driver": os.getenv("DB_DRIVER", "ODBC Driver 17 for SQL Server"),
+            "trusted_connection": os.getenv("DB_TRUSTED", "yes")
+        }
+    config['backend'] = os.getenv('NSE_DB_BACKEND', config.get('backend', SQLSERVER)).lower()
+    if os.getenv('NSE_DB_PATH'):
+        config['path'] = os.getenv('NSE_DB_PATH')
+    return config
+
+
+def describe(config: Dict) -> str:
+    backend = config['backend']
+    if backend in (SQLITE, DUCKDB):
+        return f"{backend} {config.get('path')}"
+    if backend == POSTGRES:
+        return f"postgres {config.get('database')} on {config.get('host', 'localhost')}"
+    return f"{config.get('database')} on {config.get('server')}"
+
+
+def sqlserver_connection_string(config: Dict) -> str:
+    parts = [f"DRIVER={{{config.get('driver', 'ODBC Driver 17 for SQL Server')}}}",
+             f"SERVER={config['server']}", f"DATABASE={config['database']}"]
+    if str(config.get('trusted_connection', '')).lower() == 'yes':
+        parts.append("Trusted_Connection=yes")
+    else:
+        parts += [f"UID={config['username']}", f"PWD={config['password']}"]
+    return ';'.join(parts) + ';'
+
+
+def open_connection(config: Dict):
+    """A new driver connection for config['backend'] (drivers are imported on demand)"""
+    backend = config['backend']
+    if backend == SQLSERVER:
+        import pyodbc
+        return pyodbc.connect(sqlserver_connection_string(config))
+    if backend == POSTGRES:
+        import psycopg2
+        return psycopg2.connect(host=config.get('host', 'localhost'), port=config.get('port', 5432),
+                                dbname=config['database'], user=config.get('username'),
+                                password=config.get('password'))
+    if backend == SQLITE:
+        # Pool hands each connection to one thread at a time
+        return sqlite3.connect(config.get('path', 'nse_data.db'), check_same_thread=False,
+                               cached_statements=STATEMENT_CACHE * 4)
+    if backend == DUCKDB:
+        try:
+            import duckdb
+        except ImportError:
+            raise ImportError("duckdb backend requires: pip install duckdb")
+        return duckdb.connect(config.get('path', 'nse_data.duckdb'))
+    raise ValueError(f"Unknown database backend: {backend}")
+
+
+def to_pyformat(sql: str) -> str:
+    """'?' -> %s (and % -> %%) outside string literals, for psycopg2"""
+    parts = _QUOTED.split(sql)
+    for i in range(0, len(parts), 2):
+        parts[i] = parts[i].replace('%', '%%').replace('?', '%s')
+    for i in range(1, len(parts), 2):
+        parts[i] = parts[i].replace('%', '%%')
+    return ''.join(parts)
+
+
+def _parameters(params: tuple):
+    """pyodbc-style execute(sql, *params) arguments -> the driver's parameters"""
+    if len(params) == 1 and isinstance(params[0], dict):
+        return params[0]
+    if len(params) == 1 and isinstance(params[0], (list, tuple)):
+        return tuple(params[0])
+    return params
+
+
+class PooledConnection:
+    """Driver connection on loan from a ConnectionPool; close() gives it back"""
+
+    def __init__(self, pool: 'ConnectionPool', raw, cursors: Optional[OrderedDict] = None):
+        object.__setattr__(self, '_pool', pool)
+        object.__setattr__(self, '_raw', raw)
+        object.__setattr__(self, '_cursors', OrderedDict() if cursors is None else cursors)
+        object.__setattr__(self, 'backend', pool.backend)
+
+    @property
+    def raw(self):
+        if self._raw is None:
+            raise RuntimeError("Connection was returned to the pool")
+        return self._raw
+
+    def __getattr__(self, name):
+        return getattr(self.raw, name)
+
+    def __setattr__(self, name, value):
+        setattr(self.raw, name, value)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.raw.commit()
+        else:
+            self.raw.rollback()
+        return False
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+    def _statement(self, sql: str):
+        """Cached cursor for this SQL text (re-executing it reuses the prepared statement)"""
+        cursor = self._cursors.get(sql)
+        if cursor is None:
+            cursor = self.raw.cursor()
+            self._cursors[sql] = cursor
+            if len(self._cursors) > STATEMENT_CACHE:
+                _, evicted = self._cursors.popitem(last=False)
+                evicted.close()
+        else:
+            self._cursors.move_to_end(sql)
+        return cursor
+
+    def _sql(self, sql: str) -> str:
+        return to_pyformat(sql) if self.backend == POSTGRES else sql
+
+    def execute(self, sql: str, *params):
+        """
+        Execute with '?' placeholders on a reused cursor; returns the cursor.
+        Parameters are passed like pyodbc: one sequence, or each value as its
+        own argument (conn.execute(sql, symbol, trade_date)).
+        """
+        cursor = self._statement(sql)
+        cursor.execute(self._sql(sql), _parameters(params))
+        return cursor
+
+    def executemany(self, sql: str, rows: List[Sequence]):
+        cursor = self._statement(sql)
+        if self.backend == SQLSERVER:
+            cursor.fast_executemany = True
+        cursor.executemany(self._sql(sql), rows)
+        return cursor
+
+    def query_df(self, sql: str, params: Sequence = ()) -> pd.DataFrame:
+        """SELECT into a DataFrame over the reused statement (no SQLAlchemy needed)"""
+        cursor = self.execute(sql, params)
+        columns = [column[0] for column in cursor.description]
+        return pd.DataFrame.from_records([tuple(row) for row in cursor.fetchall()], columns=columns)
+
+    def close(self):
+        raw = self._raw
+        if raw is None:
+            return
+        object.__setattr__(self, '_raw', None)
+        # The statement cursors go back with the connection for the next checkout
+        self._pool.release(raw, self._cursors)
+
+
+class ConnectionPool:
+    def __init__(self, config: Optional[Dict] = None, max_idle: int = DEFAULT_MAX_IDLE):
+        self.config = config or load_db_config()
+        self.backend = self.config['backend']
+        self.max_idle = max_idle
+        self.pid = os.getpid()
+        self.opened = 0
+        self.reused = 0
+        self._idle = []                  # (connection, returned_at, cursors), most recent last
+        self._lock = threading.Lock()
+
+    def _usable(self, raw, returned_at: float, cursors: OrderedDict) -> bool:
+        if time.monotonic() - returned_at < PING_AFTER:
+            return True
+        try:
+            cursor = raw.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchall()
+            cursor.close()
+            return True
+        except Exception:
+            _close_quietly(raw)
+            return False
+
+    def acquire(self) -> PooledConnection:
+        while True:
+            with self._lock:
+                idle = self._idle.pop() if self._idle else None
+            if idle is None:
+                raw = open_connection(self.config)
+                with self._lock:
+                    self.opened += 1
+                return PooledConnection(self, raw)
+            if self._usable(*idle):
+                with self._lock:
+                    self.reused += 1
+                return PooledConnection(self, idle[0], idle[2])
+
+    def release(self, raw, cursors: Optional[OrderedDict] = None):
+        """Roll back anything uncommitted and keep the connection (and its cursors) for the next checkout"""
+        try:
+            raw.rollback()
+            if self.backend != SQLITE and getattr(raw, 'autocommit', False):
+                raw.autocommit = False
+        except Exception:
+            _close_quietly(raw)
+            return
+        with self._lock:
+            if os.getpid() == self.pid and len(self._idle) < self.max_idle:
+                self._idle.append((raw, time.monotonic(), OrderedDict() if cursors is None else cursors))
+                return
+        _close_quietly(raw)
+
+    @contextmanager
+    def connection(self):
+        """Checkout for a block: commit on success, roll back on error, always returned"""
+        conn = self.acquire()
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for raw, _, _ in idle:
+            _close_quietly(raw)
+
+
+def _close_quietly(raw):
+    try:
+        raw.close()
+    except Exception:
+        pass
+
+
+_pool: Optional[ConnectionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool(config_file: Optional[str] = None) -> ConnectionPool:
+    """Process-wide pool over database_config.json (a forked child gets its own)"""
+    global _pool
+    with _pool_lock:
+        if _pool is None or _pool.pid != os.getpid():
+            _pool = ConnectionPool(load_db_config(config_file))
+        return _pool
+
+
+def get_connection() -> PooledConnection:
+    """Drop-in for the per-script get_connection(): a pooled connection"""
+    return get_pool().acquire()
+
+
+def main():
+    p = argparse.ArgumentParser(description='Shared pooled database access')
+    p.add_argument('--config', help='Config file (default NSE_DB_CONFIG or database_config.json)')
+    p.add_argument('--benchmark', type=int, metavar='N', help='Run N short queries connect-per-query vs pooled')
+    args = p.parse_args()
+
+    pool = get_pool(args.config)
+    print(f"🔌 Backend: {describe(pool.config)}")
+    if not args.benchmark:
+        with pool.connection() as conn:
+            print(f"✅ SELECT 1 -> {conn.execute('SELECT 1').fetchone()[0]}")
+        return
+
+    started = time.perf_counter()
+    for _ in range(args.benchmark):
+        raw = open_connection(pool.config)
+        cursor = raw.cursor()
+        cursor.execute("SELECT 1")
+        cursor.fetchall()
+        raw.close()
+    direct = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for _ in range(args.benchmark):
+        with pool.connection() as conn:
+            conn.execute("SELECT 1").fetchall()
+    pooled = time.perf_counter() - started
+
+    print(f"⏱️ {args.benchmark} queries: connect-per-query {direct * 1000 / args.benchmark:.2f} ms/query, "
+          f"pooled {pooled * 1000 / args.benchmark:.2f} ms/query ({direct / pooled:.1f}x), "
+          f"{pool.opened} connection(s) opened")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+NSE Download Manifest - record of every file we already have
+
+Purpose:
+  One manifest for all segments (EQ bhavcopy, FO UDiFF) instead of inferring
+  state from run_log.json and the NSE_*_Data folders. Each entry records:
+    date, segment, url, path, size, sha256, etag, last_modified, status, fetched_at
+
+  Sync mode (nse_async_downloader.py --sync) asks plan_sync() which trading
+  days are missing or changed and downloads only those. The downloader
+  rewrites the manifest atomically every MANIFEST_SAVE_EVERY (25) results
+  and once more when the run ends. A crash loses at most the last 24
+  records; the next sync sees those days as never fetched and downloads
+  them again.
+
+Usage:
+  python nse_download_manifest.py --bootstrap          # index files already on disk
+  python nse_download_manifest.py --verify             # re-hash files, report drift
+  python nse_download_manifest.py                      # summary per segment/month
+"""
+
+import os
+import json
+import hashlib
+import argparse
+from datetime import date, datetime
+from typing import Callable, Dict, List, Optional
+
+from nse_trading_calendar import get_calendar, to_date
+
+DEFAULT_MANIFEST_FILE = 'download_manifest.json'
+
+STATUS_OK = 'ok'
+STATUS_MISSING = 'missing'   # server had no file (holiday / not published)
+STATUS_FAILED = 'failed'     # network or validation error, retry next sync
+
+
+def sha256_file(path: str, chunk_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class DownloadManifest:
+    def __init__(self, manifest_file: str = DEFAULT_MANIFEST_FILE):
+        self.manifest_file = manifest_file
+        self.entries: Dict[str, Dict] = {}
+        self.load()
+
+    @staticmethod
+    def key(segment: str, trade_date) -> str:
+        return f"{segment}:{to_date(trade_date).isoformat()}"
+
+    def load(self):
+        if not os.path.exists(self.manifest_file):
+            return
+        with open(self.manifest_file, 'r', encoding='utf-8') as f:
+            self.entries = json.load(f).get('entries', {})
+
+    def save(self):
+        """Atomic rewrite so a crash never leaves a half-written manifest"""
+        tmp_path = self.manifest_file + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'updated': datetime.now().isoformat(timespec='seconds'),
+                       'entries': self.entries}, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.manifest_file)
+
+    def get(self, segment: str, trade_date) -> Optional[Dict]:
+        return self.entries.get(self.key(segment, trade_date))
+
+    def record(self, segment: str, trade_date, status: str, url: Optional[str] = None,
+               path: Optional[str] = None, etag: Optional[str] = None,
+               last_modified: Optional[str] = None, sha256: Optional[str] = None, save: bool = True):
+        """Record the outcome for one (segment, date); hashes the file if not given"""
+        entry = {
+            'date': to_date(trade_date).isoformat(),
+            'segment': segment,
+            'status': status,
+            'url': url,
+            'path': path,
+            'size': os.path.getsize(path) if path and os.path.exists(path) else 0,
+            'sha256': sha256 or (sha256_file(path) if path and os.path.exists(path) else None),
+            'etag': etag,
+            'last_modified': last_modified,
+            'fetched_at': datetime.now().isoformat(timespec='seconds'),
+        }
+        self.entries[self.key(segment, trade_date)] = entry
+        if save:
+            self.save()
+        return entry
+
+    def is_intact(self, entry: Dict, check_hash: bool = False) -> bool:
+        """File still present with the recorded size (and hash, if requested)"""
+        path = entry.get('path')
+        if not path or not os.path.exists(path) or os.path.getsize(path) != entry.get('size'):
+            return False
+        return not check_hash or sha256_file(path) == entry.get('sha256')
+
+    def plan_sync(self, segment: str, start, end, check_hash: bool = False,
+                  retry_missing: bool = False) -> List[date]:
+        """
+        Trading days in [start, end] that need a request: never fetched, failed
+        last time, or whose local file vanished/changed. Days the server reported
+        as missing are retried only with retry_missing (or if they are the most
+        recent days, which NSE may not have published yet).
+        """
+        days = get_calendar().trading_days(start, end)
+        recent = set(days[-3:])
+        todo = []
+        for d in days:
+            entry = self.get(segment, d)
+            if entry is None or entry['status'] == STATUS_FAILED:
+                todo.append(d)
+            elif entry['status'] == STATUS_MISSING:
+                if retry_missing or d in recent:
+                    todo.append(d)
+            elif not self.is_intact(entry, check_hash):
+                todo.append(d)
+        return todo
+
+    def bootstrap(self, segment: str, start, end, path_finder: Callable[[date], Optional[str]]) -> int:
+        """Index files already on disk (from earlier downloaders) without any request"""
+        added = 0
+        for d in get_calendar().trading_days(start, end):
+            entry = self.get(segment, d)
+            if entry and entry['status'] == STATUS_OK and self.is_intact(entry):
+                continue
+            path = path_finder(d)
+            if path:
+                self.record(segment, d, STATUS_OK, path=path, save=False)
+                added += 1
+        self.save()
+        return added
+
+    def verify(self) -> List[Dict]:
+        """Entries whose file is gone or no longer matches its SHA-256"""
+        return [e for e in self.entries.values()
+                if e['status'] == STATUS_OK and not self.is_intact(e, check_hash=True)]
+
+    def summary(self) -> Dict[str, Dict[str, Dict[str, int]]]:
+        """{segment: {YYYY-MM: {status: count}}}"""
+        result: Dict[str, Dict[str, Dict[str, int]]] = {}
+        for e in self.entries.values():
+            month = result.setdefault(e['segment'], {}).setdefault(e['date'][:7], {})
+            month[e['status']] = month.get(e['status'], 0) + 1
+        return result
+
+
+def main():
+    # Imported here so the manifest itself has no aiohttp dependency
+    from nse_async_downloader import SEGMENTS
+
+    p = argparse.ArgumentParser(description='Inspect or bootstrap the NSE download manifest')
+    p.add_argument('--manifest', default=DEFAULT_MANIFEST_FILE)
+    p.add_argument('--bootstrap', action='store_true', help='Index files already on disk')
+    p.add_argument('--verify', action='store_true', help='Re-hash every file and report drift')
+    p.add_argument('--start', default='2025-01-01')
+    p.add_argument('--end', default=date.today().isoformat())
+    p.add_argument('--output-root', default='.')
+    args = p.parse_args()
+
+    manifest = DownloadManifest(args.manifest)
+    print("📒 NSE Download Manifest")
+    print("=" * 60)
+
+    if args.bootstrap:
+        for segment, spec in SEGMENTS.items():
+            added = manifest.bootstrap(segment, args.start, args.end,
+                                       lambda d, spec=spec: spec['existing'](d, args.output_root))
+            print(f"📥 {segment}: indexed {added} existing files")
+
+    if args.verify:
+        drifted = manifest.verify()
+        print(f"🔍 Verified {len(manifest.entries)} entries, {len(drifted)} changed or missing on disk")
+        for e in drifted:
+            print(f"   ❌ {e['segment']} {e['date']}: {e['path']}")
+
+    for segment, months in sorted(manifest.summary().items()):
+        print(f"\n📊 {segment}")
+        for month, counts in sorted(months.items()):
+            print(f"   {month}: " + ", ".join(f"{k}={v}" for k, v in sorted(counts.items())))
+
+
+if __name__ == "__main__":
+    main()
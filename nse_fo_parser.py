@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+NSE F&O Bhavcopy Parser - one canonical frame for UDiFF and legacy files
+
+Purpose:
+  The F&O loaders each re-mapped columns row by row, and disagreed on names:
+    UDiFF  (BhavCopy_NSE_FO_0_0_0_YYYYMMDD_F_0000.csv.zip, udiff_DDMMYYYY.zip)
+           TradDt, BizDt, FinInstrmTp, TckrSymb, XpryDt, StrkPric, OptnTp, ...
+    legacy (foDDMONYYYYbhav.csv)
+           INSTRUMENT, SYMBOL, EXPIRY_DT, STRIKE_PR, OPTION_TYP, ..., TIMESTAMP
+  to_canonical() detects the layout from the header and returns one typed
+  frame named after the step04_fo_udiff_daily columns, in a single
+  vectorized pass:
+    trade_date / expiry_date        int32 YYYYMMDD (0 = missing)
+    symbol / instrument / option_type / underlying   category
+    prices, strike, traded value    float64
+    contracts, open interest, OI change              int64
+
+  Instruments use the UDiFF codes already stored in the table
+  (IDF, IDO, STF, STO); legacy FUTIDX/OPTIDX/FUTSTK/OPTSTK are mapped onto
+  them and the legacy 'XX' option type on futures becomes missing, as in
+  UDiFF. The traded value goes into value_in_lakh unscaled, as the loaders
+  have always stored it (VAL_INLAKH is in lakh, UDiFF TtlTrfVal as published).
+  UDiFF-only columns (BizDt, FinInstrmId, UndrlygPric, ...) are kept under
+  their table column names; they are absent for legacy files.
+
+Usage:
+  from nse_fo_parser import read_fo_bhavcopy, to_db_records
+  frame = read_fo_bhavcopy('fo_udiff_downloads/BhavCopy_NSE_FO_0_0_0_20250203_F_0000.csv.zip')
+  records = to_db_records(frame, ['trade_date', 'symbol', 'instrument', ...])
+  python nse_fo_parser.py fo_udiff_downloads/*.zip      # format + dtype check
+"""
+
+import os
+import glob
+import zipfile
+import argparse
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+FORMAT_UDIFF = 'udiff'
+FORMAT_LEGACY = 'legacy'
+
+FO_INSTRUMENTS = ['IDF', 'IDO', 'STF', 'STO']
+LEGACY_INSTRUMENT_CODES = {'FUTIDX': 'IDF', 'OPTIDX': 'IDO', 'FUTSTK': 'STF', 'OPTSTK': 'STO'}
+
+UDIFF_COLUMNS = {
+    'TradDt': 'trade_date',
+    'TckrSymb': 'symbol',
+    'FinInstrmTp': 'instrument',
+    'XpryDt': 'expiry_date',
+    'StrkPric': 'strike_price',
+    'OptnTp': 'option_type',
+    'OpnPric': 'open_price',
+    'HghPric': 'high_price',
+    'LwPric': 'low_price',
+    'ClsPric': 'close_price',
+    'SttlmPric': 'settle_price',
+    'TtlTradgVol': 'contracts_traded',
+    'TtlTrfVal': 'value_in_lakh',
+    'OpnIntrst': 'open_interest',
+    'ChngInOpnIntrst': 'change_in_oi',
+}
+
+LEGACY_COLUMNS = {
+    'TIMESTAMP': 'trade_date',
+    'SYMBOL': 'symbol',
+    'INSTRUMENT': 'instrument',
+    'EXPIRY_DT': 'expiry_date',
+    'STRIKE_PR': 'strike_price',
+    'OPTION_TYP': 'option_type',
+    'OPEN': 'open_price',
+    'HIGH': 'high_price',
+    'LOW': 'low_price',
+    'CLOSE': 'close_price',
+    'SETTLE_PR': 'settle_price',
+    'CONTRACTS': 'contracts_traded',
+    'VAL_INLAKH': 'value_in_lakh',
+    'OPEN_INT': 'open_interest',
+    'CHG_IN_OI': 'change_in_oi',
+}
+
+DATE_COLUMNS = ['trade_date', 'expiry_date', 'BizDt', 'FininstrmActlXpryDt']
+CATEGORY_COLUMNS = ['symbol', 'instrument', 'option_type', 'underlying']
+FLOAT_COLUMNS = ['strike_price', 'open_price', 'high_price', 'low_price', 'close_price',
+                 'settle_price', 'value_in_lakh', 'LastPric', 'PrvsClsgPric', 'UndrlygPric']
+INT_COLUMNS = ['contracts_traded', 'open_interest', 'change_in_oi', 'TtlNbOfTxsExctd', 'NewBrdLotQty']
+
+# UDiFF columns stored as-is in step04_fo_udiff_daily (typed where they are numeric/dates)
+UDIFF_EXTRA_COLUMNS = ['BizDt', 'Sgmt', 'Src', 'FinInstrmId', 'ISIN', 'SctySrs', 'FininstrmActlXpryDt',
+                       'FinInstrmNm', 'LastPric', 'PrvsClsgPric', 'UndrlygPric', 'TtlNbOfTxsExctd',
+                       'SsnId', 'NewBrdLotQty', 'Rmks', 'Rsvd1', 'Rsvd2', 'Rsvd3', 'Rsvd4']
+
+CANONICAL_COLUMNS = list(UDIFF_COLUMNS.values()) + ['underlying']
+
+# Full step04_fo_udiff_daily insert order used by the validation loaders
+FO_TABLE_COLUMNS = list(UDIFF_COLUMNS.values()) + UDIFF_EXTRA_COLUMNS + ['source_file']
+
+# read_csv dtypes per layout: strings stay strings, numerics are declared up front
+UDIFF_READ_DTYPES = {
+    **{col: 'str' for col in ['TradDt', 'BizDt', 'Sgmt', 'Src', 'FinInstrmTp', 'FinInstrmId', 'ISIN',
+                              'TckrSymb', 'SctySrs', 'XpryDt', 'FininstrmActlXpryDt', 'OptnTp',
+                              'FinInstrmNm', 'SsnId', 'Rmks', 'Rsvd1', 'Rsvd2', 'Rsvd3', 'Rsvd4']},
+    **{col: 'float64' for col in ['StrkPric', 'OpnPric', 'HghPric', 'LwPric', 'ClsPric', 'LastPric',
+                                  'PrvsClsgPric', 'UndrlygPric', 'SttlmPric', 'TtlTrfVal',
+                                  'OpnIntrst', 'ChngInOpnIntrst', 'TtlTradgVol', 'TtlNbOfTxsExctd',
+                                  'NewBrdLotQty']},
+}
+LEGACY_READ_DTYPES = {
+    **{col: 'str' for col in ['INSTRUMENT', 'SYMBOL', 'EXPIRY_DT', 'OPTION_TYP', 'TIMESTAMP']},
+    **{col: 'float64' for col in ['STRIKE_PR', 'OPEN', 'HIGH', 'LOW', 'CLOSE', 'SETTLE_PR',
+                                  'CONTRACTS', 'VAL_INLAKH', 'OPEN_INT', 'CHG_IN_OI']},
+}
+
+# UDiFF dates are ISO; legacy dates are DD-Mon-YYYY (month case varies: FEB / Feb)
+DATE_FORMATS = {FORMAT_UDIFF: '%Y-%m-%d', FORMAT_LEGACY: '%d-%b-%Y'}
+
+
+def detect_format(columns) -> Optional[str]:
+    """'udiff', 'legacy' or None from a header"""
+    columns = {str(c).strip() for c in columns}
+    if {'TckrSymb', 'FinInstrmTp', 'XpryDt'} <= columns:
+        return FORMAT_UDIFF
+    if {'SYMBOL', 'INSTRUMENT', 'EXPIRY_DT'} <= columns:
+        return FORMAT_LEGACY
+    return None
+
+
+def to_yyyymmdd(values: pd.Series, fmt: str) -> np.ndarray:
+    """
+    Vectorized date strings -> int32 YYYYMMDD (0 where missing/unparseable).
+    A bhavcopy has only a handful of distinct dates, so only those are parsed.
+    """
+    codes, uniques = pd.factorize(values.astype('string').str.strip().str.title(), use_na_sentinel=True)
+    parsed = pd.to_datetime(pd.Index(uniques), format=fmt, errors='coerce')
+    as_int = np.where(parsed.isna(), 0, parsed.year * 10000 + parsed.month * 100 + parsed.day).astype(np.int32)
+    result = np.zeros(len(codes), dtype=np.int32)
+    valid = codes >= 0
+    result[valid] = as_int[codes[valid]]
+    return result
+
+
+def to_canonical(df: pd.DataFrame, trade_date=None, fo_only: bool = True) -> pd.DataFrame:
+    """
+    Canonical typed frame from a raw UDiFF or legacy F&O DataFrame.
+
+    trade_date (YYYYMMDD int/str) fills trade_date when the file has no date
+    column. With fo_only, rows outside FO_INSTRUMENTS are dropped.
+    """
+    df = df.rename(columns=lambda c: str(c).strip())
+    layout = detect_format(df.columns)
+    if layout is None:
+        raise ValueError(f"Unrecognised F&O bhavcopy columns: {list(df.columns)[:8]}...")
+
+    mapping = UDIFF_COLUMNS if layout == FORMAT_UDIFF else LEGACY_COLUMNS
+    extras = [c for c in UDIFF_EXTRA_COLUMNS if c in df.columns] if layout == FORMAT_UDIFF else []
+    frame = df[[c for c in mapping if c in df.columns] + extras].rename(columns=mapping)
+    fmt = DATE_FORMATS[layout]
+
+    # Dates -> int32 YYYYMMDD
+    for col in DATE_COLUMNS:
+        if col in frame.columns:
+            frame[col] = to_yyyymmdd(frame[col], fmt)
+    if 'trade_date' not in frame.columns or (trade_date is not None and not frame['trade_date'].any()):
+        frame['trade_date'] = np.int32(int(str(trade_date).replace('-', ''))) if trade_date is not None else np.int32(0)
+
+    # Strings: trim once, normalize legacy codes, then categorize
+    for col in ['symbol', 'instrument', 'option_type']:
+        if col in frame.columns:
+            frame[col] = frame[col].astype('string').str.strip()
+    if layout == FORMAT_LEGACY:
+        frame['instrument'] = frame['instrument'].replace(LEGACY_INSTRUMENT_CODES)
+        frame['option_type'] = frame['option_type'].mask(frame['option_type'].isin(['XX', '']))
+    frame['underlying'] = frame['symbol']
+
+    if fo_only:
+        frame = frame[frame['instrument'].isin(FO_INSTRUMENTS)]
+    frame = frame[frame['symbol'].notna() & (frame['symbol'] != '')]
+
+    for col in CATEGORY_COLUMNS:
+        frame[col] = frame[col].astype('category')
+    for col in FLOAT_COLUMNS:
+        if col in frame.columns:
+            frame[col] = pd.to_numeric(frame[col], errors='coerce').astype('float64')
+    for col in INT_COLUMNS:
+        if col in frame.columns:
+            frame[col] = pd.to_numeric(frame[col], errors='coerce').fillna(0).astype('int64')
+
+    ordered = CANONICAL_COLUMNS + [c for c in UDIFF_EXTRA_COLUMNS if c in frame.columns]
+    return frame[[c for c in ordered if c in frame.columns]].reset_index(drop=True)
+
+
+def read_raw_fo_csv(file_path: str, **read_csv_kwargs) -> pd.DataFrame:
+    """Raw F&O bhavcopy (zip or csv) with the declared dtypes for its layout"""
+    def read(open_stream):
+        with open_stream() as stream:
+            header = stream.readline().decode('utf-8-sig').strip().split(',')
+        dtypes = UDIFF_READ_DTYPES if detect_format(header) == FORMAT_UDIFF else LEGACY_READ_DTYPES
+        with open_stream() as stream:
+            return pd.read_csv(stream, dtype=dtypes, skipinitialspace=True, **read_csv_kwargs)
+
+    if file_path.lower().endswith('.zip'):
+        with zipfile.ZipFile(file_path) as zf:
+            csv_files = [f for f in zf.namelist() if f.lower().endswith('.csv')]
+            if not csv_files:
+                raise ValueError(f"No CSV file found in {file_path}")
+            return read(lambda: zf.open(csv_files[0]))
+    return read(lambda: open(file_path, 'rb'))
+
+
+def read_fo_bhavcopy(file_path: str, trade_date=None, fo_only: bool = True) -> pd.DataFrame:
+    """Canonical frame for one F&O bhavcopy file (zip or csv, either layout)"""
+    return to_canonical(read_raw_fo_csv(file_path), trade_date=trade_date, fo_only=fo_only)
+
+
+def to_db_records(frame: pd.DataFrame, columns: List[str]) -> List[tuple]:
+    """
+    Insert-ready tuples for the given canonical columns: dates as 'YYYYMMDD'
+    strings, categoricals as str, NaN as None, numpy scalars as Python types.
+    """
+    values = []
+    for col in columns:
+        if col not in frame.columns:
+            values.append([None] * len(frame))
+            continue
+        series = frame[col]
+        if col in DATE_COLUMNS:
+            series = series.astype('str').where(series != 0)
+        elif isinstance(series.dtype, pd.CategoricalDtype):
+            series = series.astype('object')
+        values.append(series.astype('object').where(series.notna(), None).tolist())
+    return list(zip(*values))
+
+
+def describe(frame: pd.DataFrame) -> Dict[str, str]:
+    return {col: str(dtype) for col, dtype in frame.dtypes.items()}
+
+
+def main():
+    p = argparse.ArgumentParser(description='Parse F&O bhavcopies into the canonical frame')
+    p.add_argument('pattern', nargs='?', default='fo_udiff_downloads/*.zip')
+    args = p.parse_args()
+
+    files = sorted(glob.glob(args.pattern))
+    if not files:
+        print(f"❌ No files found matching pattern: {args.pattern}")
+        return
+
+    for file_path in files:
+        raw = read_raw_fo_csv(file_path)
+        frame = to_canonical(raw)
+        dates = sorted(frame['trade_date'].unique())
+        print(f"📖 {os.path.basename(file_path)}: {detect_format(raw.columns)}, {len(raw):,} rows -> "
+              f"{len(frame):,} F&O rows, trade_date {dates}, "
+              f"{frame['symbol'].nunique()} symbols")
+    print(f"\n📋 Canonical dtypes: {describe(frame)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+"""
+NSE F&O Typed Migration - step04_fo_udiff_daily -> typed, clustered copy
+
+Purpose:
+  step04_fo_udiff_daily keeps trade_date / expiry_date as VARCHAR 'YYYYMMDD'
+  and prices as FLOAT, so the analyzers filter with string ranges
+  (trade_date BETWEEN '20250204' AND '20250228') and match strikes on float
+  equality. This tool builds step04_fo_udiff_typed next to it:
+
+    trade_date, expiry_date     DATE
+    strike_price                DECIMAL(12,2)    exact strike matching
+    prices / value              DECIMAL(18,4)
+    option_type                 TINYINT          0 = future, 1 = CE, 2 = PE
+    clustering key              (symbol, trade_date, expiry_date, strike_price, option_type)
+
+  which is the order the step05 lookups read (one symbol, one day, strikes
+  in order), so a strike ladder is one contiguous range instead of a scan.
+
+Layouts (--layout):
+  rowstore     clustered B-tree on the key (default)
+  partitioned  same, partitioned by month on trade_date
+               (SQL Server partition function / PostgreSQL PARTITION BY RANGE)
+  columnstore  SQL Server: clustered columnstore partitioned by month, plus a
+               nonclustered B-tree on the key for the step05 point lookups
+  SQLite and DuckDB have no clustered indexes or partitions: rows are
+  inserted in key order (DuckDB zone maps, SQLite page locality) and the key
+  gets a plain index.
+
+Steps:
+  1. create the typed table (drops an existing one with --replace)
+  2. INSERT ... SELECT month by month, converting in the database
+  3. build the clustered index after the load (one sort, not per-row upkeep)
+  4. verify: per trade_date row counts, CE/PE counts and price / OI sums
+     must match the source
+  5. --benchmark N: the step05 strike queries against both tables for N
+     sampled (symbol, trade_date) pairs; row counts must agree
+
+  The source table is not modified. Loaders keep writing to
+  step04_fo_udiff_daily; re-run with --replace to refresh.
+
+Usage:
+  python nse_fo_typed_migration.py --layout partitioned --benchmark 50
+  python nse_fo_typed_migration.py --verify-only --benchmark 50
+  NSE_DB_BACKEND=sqlite NSE_DB_PATH=ci.db python nse_fo_typed_migration.py --replace
+"""
+
+import time
+import random
+import argparse
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+import nse_db_pool
+from nse_bulk_loader import SQLSERVER, POSTGRES, SQLITE, DUCKDB
+
+SOURCE_TABLE = 'step04_fo_udiff_daily'
+TYPED_TABLE = 'step04_fo_udiff_typed'
+LAYOUTS = ['rowstore', 'partitioned', 'columnstore']
+
+OPTION_TYPE_CODES = {'CE': 1, 'PE': 2}          # anything else (futures) -> 0
+CLUSTER_KEY = ['symbol', 'trade_date', 'expiry_date', 'strike_price', 'option_type']
+
+# Typed column -> (generic SQL type, kind used to build the conversion)
+TYPED_COLUMNS: Dict[str, Tuple[str, str]] = {
+    'trade_date': ('DATE NOT NULL', 'date'),
+    'symbol': ('VARCHAR(50) NOT NULL', 'str'),
+    'instrument': ('VARCHAR(10)', 'str'),
+    'expiry_date': ('DATE', 'date'),
+    'strike_price': ('DECIMAL(12,2)', 'decimal'),
+    'option_type': ('TINYINT NOT NULL', 'option'),
+    'open_price': ('DECIMAL(18,4)', 'decimal'),
+    'high_price': ('DECIMAL(18,4)', 'decimal'),
+    'low_price': ('DECIMAL(18,4)', 'decimal'),
+    'close_price': ('DECIMAL(18,4)', 'decimal'),
+    'settle_price': ('DECIMAL(18,4)', 'decimal'),
+    'contracts_traded': ('BIGINT', 'int'),
+    'value_in_lakh': ('DECIMAL(22,4)', 'decimal'),
+    'open_interest': ('BIGINT', 'int'),
+    'change_in_oi': ('BIGINT', 'int'),
+    'FinInstrmId': ('VARCHAR(50)', 'str'),
+    'UndrlygPric': ('DECIMAL(18,4)', 'decimal'),
+    'source_file': ('VARCHAR(255)', 'str'),
+}
+
+# step05_delivery_fo_analysis lookups: (legacy SQL, typed SQL); params are (symbol, trade_date)
+STEP05_QUERIES = {
+    'enhanced_strikes': (
+        f"""SELECT strike_price, option_type, close_price, open_interest, contracts_traded, expiry_date, trade_date
+            FROM {SOURCE_TABLE}
+            WHERE symbol = ? AND trade_date = ? AND strike_price IS NOT NULL
+              AND option_type IN ('CE', 'PE') AND close_price > 0
+            ORDER BY strike_price, option_type""",
+        f"""SELECT strike_price, option_type, close_price, open_interest, contracts_traded, expiry_date, trade_date
+            FROM {TYPED_TABLE}
+            WHERE symbol = ? AND trade_date = ? AND option_type IN (1, 2) AND close_price > 0
+            ORDER BY strike_price, option_type"""),
+    'fo_data_for_date': (
+        f"""SELECT trade_date, symbol, strike_price, option_type, close_price
+            FROM {SOURCE_TABLE}
+            WHERE symbol = ? AND strike_price IS NOT NULL AND option_type IN ('CE', 'PE') AND trade_date >= ?
+            ORDER BY trade_date, strike_price""",
+        f"""SELECT trade_date, symbol, strike_price, option_type, close_price
+            FROM {TYPED_TABLE}
+            WHERE symbol = ? AND strike_price IS NOT NULL AND option_type IN (1, 2) AND trade_date >= ?
+            ORDER BY trade_date, strike_price"""),
+}
+
+
+def next_month(d: date) -> date:
+    return date(d.year + (d.month == 12), d.month % 12 + 1, 1)
+
+
+def month_starts(first: date, last: date) -> List[date]:
+    """First day of every month from first's month through last's month"""
+    months, current = [], date(first.year, first.month, 1)
+    while current <= last:
+        months.append(current)
+        current = next_month(current)
+    return months
+
+
+def yyyymmdd(value) -> Optional[date]:
+    """Source trade_date ('20250204', 20250204, '2025-02-04' or a date) -> date"""
+    if value is None or value == '':
+        return None
+    if isinstance(value, date):
+        return value
+    text = str(value).replace('-', '')[:8]
+    return date(int(text[:4]), int(text[4:6]), int(text[6:8]))
+
+
+def as_source_date(d: date) -> str:
+    return d.strftime('%Y%m%d')
+
+
+class FOTypedMigration:
+    def __init__(self, connection, source: str = SOURCE_TABLE, target: str = TYPED_TABLE,
+                 layout: str = 'rowstore'):
+        if layout not in LAYOUTS:
+            raise ValueError(f"Unknown layout: {layout} (expected one of {LAYOUTS})")
+        self.connection = connection
+        self.backend = connection.backend
+        self.source = source
+        self.target = target
+        self.layout = layout
+
+    # ---- SQL per backend -------------------------------------------------
+
+    def column_type(self, name: str) -> str:
+        sql_type, _ = TYPED_COLUMNS[name]
+        if self.backend == POSTGRES:
+            sql_type = sql_type.replace('TINYINT', 'SMALLINT')
+        if self.backend == SQLSERVER and name in ('symbol', 'instrument', 'FinInstrmId', 'source_file'):
+            sql_type = 'N' + sql_type
+        return sql_type
+
+    def date_expr(self, column: str) -> str:
+        """VARCHAR 'YYYYMMDD' (or an already typed date) -> DATE"""
+        text = f"NULLIF(REPLACE(CAST({column} AS VARCHAR(10)), '-', ''), '')"
+        if self.backend == SQLSERVER:
+            return f"TRY_CONVERT(DATE, {text}, 112)"
+        if self.backend == POSTGRES:
+            return f"to_date({text}, 'YYYYMMDD')"
+        if self.backend == DUCKDB:
+            return f"CAST(strptime({text}, '%Y%m%d') AS DATE)"
+        # SQLite dates are ISO text
+        return f"substr({text}, 1, 4) || '-' || substr({text}, 5, 2) || '-' || substr({text}, 7, 2)"
+
+    def select_expr(self, name: str) -> str:
+        _, kind = TYPED_COLUMNS[name]
+        if kind == 'date':
+            return self.date_expr(name)
+        if kind == 'option':
+            return (f"CASE UPPER(LTRIM(RTRIM(option_type))) WHEN 'CE' THEN {OPTION_TYPE_CODES['CE']} "
+                    f"WHEN 'PE' THEN {OPTION_TYPE_CODES['PE']} ELSE 0 END")
+        if kind == 'decimal':
+            return f"CAST({name} AS {TYPED_COLUMNS[name][0]})"
+        if kind == 'int':
+            return f"CAST({name} AS BIGINT)"
+        return name
+
+    def source_columns(self) -> List[str]:
+        cursor = self.connection.cursor()
+        cursor.execute(f"SELECT * FROM {self.source} WHERE 1 = 0")
+        return [column[0] for column in cursor.description]
+
+    # ---- DDL -------------------------------------------------------------
+
+    def drop_target(self):
+        cursor = self.connection.cursor()
+        if self.backend == SQLSERVER:
+            cursor.execute(f"IF OBJECT_ID('{self.target}', 'U') IS NOT NULL DROP TABLE {self.target}")
+            for name, kind in (('PS', 'SCHEME'), ('PF', 'FUNCTION')):
+                cursor.execute(f"IF EXISTS (SELECT 1 FROM sys.partition_{kind.lower()}s "
+                               f"WHERE name = '{name}_{self.target}_month') "
+                               f"DROP PARTITION {kind} {name}_{self.target}_month")
+        else:
+            cursor.execute(f"DROP TABLE IF EXISTS {self.target}")
+        self.connection.commit()
+
+    def create_target(self, months: List[date]):
+        columns = ',\n    '.join(f"{name} {self.column_type(name)}" for name in TYPED_COLUMNS)
+        ddl = f"CREATE TABLE {self.target} (\n    {columns}\n)"
+        cursor = self.connection.cursor()
+        partitioned = self.layout != 'rowstore' and len(months) > 1
+        if self.backend == SQLSERVER and partitioned:
+            boundaries = ', '.join(f"'{m.isoformat()}'" for m in months[1:])
+            cursor.execute(f"CREATE PARTITION FUNCTION PF_{self.target}_month (DATE) "
+                           f"AS RANGE RIGHT FOR VALUES ({boundaries})")
+            cursor.execute(f"CREATE PARTITION SCHEME PS_{self.target}_month "
+                           f"AS PARTITION PF_{self.target}_month ALL TO ([PRIMARY])")
+            ddl += f" ON PS_{self.target}_month (trade_date)"
+        elif self.backend == POSTGRES and partitioned:
+            ddl += " PARTITION BY RANGE (trade_date)"
+        cursor.execute(ddl)
+        if self.backend == POSTGRES and partitioned:
+            for start in months:
+                cursor.execute(f"CREATE TABLE {self.partition_name(start)} PARTITION OF {self.target} "
+                               f"FOR VALUES FROM ('{start.isoformat()}') TO ('{next_month(start).isoformat()}')")
+        self.connection.commit()
+
+    def partition_name(self, month: date) -> str:
+        return f"{self.target}_{month.strftime('%Y%m')}"
+
+    def build_indexes(self, months: List[date]):
+        """Clustered (or columnstore) index after the load: one sort instead of per-row upkeep"""
+        key = ', '.join(CLUSTER_KEY)
+        partitioned = self.layout != 'rowstore' and len(months) > 1
+        on_scheme = f" ON PS_{self.target}_month (trade_date)" if partitioned else ''
+        cursor = self.connection.cursor()
+        if self.backend == SQLSERVER:
+            if self.layout == 'columnstore':
+                cursor.execute(f"CREATE CLUSTERED COLUMNSTORE INDEX CCI_{self.target} ON {self.target}{on_scheme}")
+                cursor.execute(f"CREATE NONCLUSTERED INDEX IX_{self.target}_key ON {self.target} ({key}) "
+                               f"INCLUDE (close_price, open_interest, contracts_traded){on_scheme}")
+            else:
+                cursor.execute(f"CREATE CLUSTERED INDEX CIX_{self.target}_key ON {self.target} ({key}){on_scheme}")
+        else:
+            cursor.execute(f"CREATE INDEX IX_{self.target}_key ON {self.target} ({key})")
+            if self.backend == POSTGRES:
+                # CLUSTER rewrites the table (each partition on PostgreSQL 15+) once in key order;
+                # it is not maintained on later inserts
+                cursor.execute(f"CLUSTER {self.target} USING IX_{self.target}_key")
+                cursor.execute(f"ANALYZE {self.target}")
+        self.connection.commit()
+
+    # ---- copy ------------------------------------------------------------
+
+    def source_months(self) -> List[date]:
+        cursor = self.connection.cursor()
+        cursor.execute(f"SELECT MIN(trade_date), MAX(trade_date) FROM {self.source}")
+        first, last = cursor.fetchone()
+        if first is None:
+            return []
+        return month_starts(yyyymmdd(first), yyyymmdd(last))
+
+    def copy_month(self, month: date) -> int:
+        """INSERT ... SELECT one month of source rows, converted in the database"""
+        available = set(self.source_columns())
+        names = list(TYPED_COLUMNS)
+        selects = [self.select_expr(n) if n in available else "NULL" for n in names]
+        order = ''
+        if self.backend in (SQLITE, DUCKDB):
+            # No clustered index: write rows in key order instead
+            order = ' ORDER BY ' + ', '.join(str(names.index(k) + 1) for k in CLUSTER_KEY)
+        hint = ' WITH (TABLOCK)' if self.backend == SQLSERVER else ''
+        sql = (f"INSERT INTO {self.target}{hint} ({', '.join(names)}) "
+               f"SELECT {', '.join(selects)} FROM {self.source} "
+               f"WHERE trade_date >= ? AND trade_date < ?{order}")
+        cursor = self.connection.execute(sql, [as_source_date(month), as_source_date(next_month(month))])
+        rows = cursor.rowcount
+        self.connection.commit()
+        if rows < 0:
+            # DuckDB does not report rowcount for INSERT ... SELECT
+            rows = self.connection.execute(
+                f"SELECT COUNT(*) FROM {self.target} WHERE trade_date >= ? AND trade_date < ?",
+                [self.typed_date_param(month), self.typed_date_param(next_month(month))]).fetchone()[0]
+        return rows
+
+    def migrate(self, replace: bool = False) -> Dict[str, int]:
+        months = self.source_months()
+        if not months:
+            print(f"⚠️ {self.source} is empty - nothing to migrate")
+            return {}
+        if replace:
+            self.drop_target()
+        self.create_target(months)
+        counts = {}
+        for month in months:
+            started = time.perf_counter()
+            counts[month.strftime('%Y-%m')] = rows = self.copy_month(month)
+            print(f"   📦 {month.strftime('%Y-%m')}: {rows:,} rows in {time.perf_counter() - started:.1f}s")
+        started = time.perf_counter()
+        self.build_indexes(months)
+        print(f"   🗂️ {self.layout} index built in {time.perf_counter() - started:.1f}s")
+        return counts
+
+    # ---- verification ----------------------------------------------------
+
+    def daily_profile(self, table: str, typed: bool) -> pd.DataFrame:
+        ce, pe = ((OPTION_TYPE_CODES['CE'], OPTION_TYPE_CODES['PE']) if typed else ("'CE'", "'PE'"))
+        frame = self.connection.query_df(f"""
+            SELECT trade_date,
+                   COUNT(*) AS row_count,
+                   SUM(CASE WHEN option_type = {ce} THEN 1 ELSE 0 END) AS ce_rows,
+                   SUM(CASE WHEN option_type = {pe} THEN 1 ELSE 0 END) AS pe_rows,
+                   SUM(CAST(close_price AS FLOAT)) AS close_sum,
+                   SUM(CAST(strike_price AS FLOAT)) AS strike_sum,
+                   SUM(CAST(open_interest AS FLOAT)) AS oi_sum
+            FROM {table}
+            GROUP BY trade_date
+        """)
+        frame['trade_date'] = [yyyymmdd(d) for d in frame['trade_date']]
+        return frame.set_index('trade_date').sort_index()
+
+    def verify(self) -> bool:
+        """Per trade_date counts and sums must match (sums within DECIMAL rounding)"""
+        source = self.daily_profile(self.source, typed=False)
+        target = self.daily_profile(self.target, typed=True)
+        joined = source.join(target, how='outer', lsuffix='_src', rsuffix='_typed').fillna(0)
+        problems = []
+        for column in ['row_count', 'ce_rows', 'pe_rows']:
+            bad = joined[joined[f'{column}_src'] != joined[f'{column}_typed']]
+            problems += [f"{d}: {column} {r[f'{column}_src']:,.0f} vs {r[f'{column}_typed']:,.0f}"
+                         for d, r in bad.iterrows()]
+        for column, tolerance in [('close_sum', 0.0001), ('strike_sum', 0.01), ('oi_sum', 0.5)]:
+            allowed = tolerance * joined['row_count_src'] + 1e-6 * joined[f'{column}_src'].abs()
+            bad = joined[(joined[f'{column}_src'] - joined[f'{column}_typed']).abs() > allowed]
+            problems += [f"{d}: {column} {r[f'{column}_src']:,.2f} vs {r[f'{column}_typed']:,.2f}"
+                         for d, r in bad.iterrows()]
+
+        print(f"🔍 Verified {len(joined)} trade dates, {int(joined['row_count_src'].sum()):,} source rows")
+        if problems:
+            print(f"❌ {len(problems)} mismatch(es):")
+            for problem in problems[:20]:
+                print(f"   • {problem}")
+            return False
+        print("✅ Typed table matches the source (counts, CE/PE split, price/strike/OI sums)")
+        return True
+
+    # ---- A/B benchmark ---------------------------------------------------
+
+    def typed_date_param(self, d: date):
+        return d.isoformat() if self.backend == SQLITE else d
+
+    def sample_lookups(self, n: int, seed: int = 7) -> List[Tuple[str, date]]:
+        pairs = self.connection.query_df(
+            f"SELECT symbol, trade_date FROM {self.source} "
+            f"WHERE option_type IN ('CE', 'PE') GROUP BY symbol, trade_date")
+        pairs = list(zip(pairs['symbol'], (yyyymmdd(d) for d in pairs['trade_date'])))
+        random.Random(seed).shuffle(pairs)
+        return pairs[:n]
+
+    def benchmark(self, n: int) -> pd.DataFrame:
+        """Time the step05 lookups on both tables for the same sampled (symbol, date) pairs"""
+        lookups = self.sample_lookups(n)
+        results = []
+        for name, (legacy_sql, typed_sql) in STEP05_QUERIES.items():
+            timings, rows = {}, {}
+            for label, sql, to_param in [('legacy', legacy_sql, as_source_date),
+                                         ('typed', typed_sql, self.typed_date_param)]:
+                rows[label] = []
+                self.connection.query_df(sql, [lookups[0][0], to_param(lookups[0][1])])     # warm-up
+                started = time.perf_counter()
+                for symbol, trade_date in lookups:
+                    rows[label].append(len(self.connection.query_df(sql, [symbol, to_param(trade_date)])))
+                timings[label] = (time.perf_counter() - started) * 1000 / len(lookups)
+            results.append({'query': name, 'lookups': len(lookups),
+                            'legacy_ms': round(timings['legacy'], 3), 'typed_ms': round(timings['typed'], 3),
+                            'speedup': round(timings['legacy'] / timings['typed'], 2),
+                            'same_rows': rows['legacy'] == rows['typed']})
+        return pd.DataFrame(results)
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description='Build a typed, clustered copy of step04_fo_udiff_daily')
+    p.add_argument('--config', help='Database config file (default NSE_DB_CONFIG or database_config.json)')
+    p.add_argument('--source', default=SOURCE_TABLE)
+    p.add_argument('--target', default=TYPED_TABLE)
+    p.add_argument('--layout', choices=LAYOUTS, default='rowstore',
+                   help='rowstore, month partitions, or (SQL Server) partitioned columnstore')
+    p.add_argument('--replace', action='store_true', help='Drop and rebuild the typed table if it exists')
+    p.add_argument('--verify-only', action='store_true', help='Skip the copy; verify the existing typed table')
+    p.add_argument('--benchmark', type=int, metavar='N', default=0,
+                   help='A/B the step05 queries on N sampled (symbol, date) lookups')
+    return p.parse_args()
+
+
+def main():
+    args = parse_args()
+    pool = nse_db_pool.get_pool(args.config)
+    print(f"🔌 Backend: {nse_db_pool.describe(pool.config)}")
+    with pool.connection() as conn:
+        migration = FOTypedMigration(conn, args.source, args.target, args.layout)
+        if not args.verify_only:
+            print(f"🚀 Migrating {args.source} -> {args.target} ({args.layout})")
+            counts = migration.migrate(replace=args.replace)
+            print(f"✅ Copied {sum(counts.values()):,} rows across {len(counts)} month(s)")
+        ok = migration.verify()
+        if args.benchmark:
+            print(f"\n⏱️ step05 lookups, legacy vs typed ({args.benchmark} sampled symbol/date pairs):")
+            print(migration.benchmark(args.benchmark).to_string(index=False))
+    if not ok:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
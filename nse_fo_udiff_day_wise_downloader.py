@@ -5,12 +5,22 @@ Downloads the correct "F&O - UDiFF Common Bhavcopy Final (zip)" files from NSE
 import requests
 import zipfile
 import pandas as pd
-import pyodbc
+import nse_db_pool
 import os
 import time
+import itertools
 from datetime import datetime
 import io
 
+from nse_udiff_stream import BATCH_ROWS, iter_zip_csv_batches, spool_response
+from nse_fo_parser import detect_format, to_canonical
+from nse_bulk_loader import BulkLoader, fo_columns
+
+INSERT_COLUMNS = ['trade_date', 'symbol', 'instrument', 'expiry_date', 'strike_price', 'option_type',
+                  'open_price', 'high_price', 'low_price', 'close_price', 'settle_price',
+                  'contracts_traded', 'value_in_lakh', 'open_interest', 'change_in_oi',
+                  'underlying', 'source_file']
+
 class NSEFOUDiFFDayDownloader:
     def __init__(self):
         # Correct NSE UDiFF endpoint
@@ -26,15 +36,6 @@ class NSEFOUDiFFDayDownloader:
             'Connection': 'keep-alive',
             'Upgrade-Insecure-Requests': '1',
         })
-        
-        # Database connection
-        self.conn_string = (
-            'Driver={ODBC Driver 17 for SQL Server};'
-            'Server=SRIKIRANREDDY\\SQLEXPRESS;'
-            'Database=master;'
-            'Trusted_Connection=yes;'
-            'TrustServerCertificate=yes;'
-        )
 
     def download_single_day_udiff(self, date_str):
         """Download UDiFF file for a single day (format: DDMMYYYY or YYYY-MM-DD)"""
@@ -55,150 +56,103 @@ class NSEFOUDiFFDayDownloader:
             
             response = self.session.get(url, timeout=30, stream=True)
             
-            if response.status_code == 200:
-                file_size = len(response.content)
-                print(f"✅ Downloaded: {filename} ({file_size:,} bytes)")
-                
-                # Save to local file for inspection
-                os.makedirs("UDiFF_Downloads", exist_ok=True)
-                local_path = os.path.join("UDiFF_Downloads", filename)
-                
-                with open(local_path, 'wb') as f:
-                    f.write(response.content)
-                print(f"💾 Saved to: {local_path}")
-                
-                return response.content, formatted_date
-            else:
-                print(f"❌ Failed to download {filename}: HTTP {response.status_code}")
-                if response.status_code == 404:
-                    print(f"   File may not exist for this date")
-                return None, None
+            try:
+                if response.status_code == 200:
+                    # Stream straight to disk instead of buffering response.content
+                    local_path = spool_response(response, os.path.join("UDiFF_Downloads", filename))
+                    file_size = os.path.getsize(local_path)
+                    print(f"✅ Downloaded: {filename} ({file_size:,} bytes)")
+                    print(f"💾 Saved to: {local_path}")
+                    
+                    return local_path, formatted_date
+                else:
+                    print(f"❌ Failed to download {filename}: HTTP {response.status_code}")
+                    if response.status_code == 404:
+                        print(f"   File may not exist for this date")
+                    return None, None
+            finally:
+                response.close()
                 
         except Exception as e:
             print(f"❌ Error downloading {date_str}: {e}")
             return None, None
 
-    def extract_and_analyze_udiff(self, zip_content, trade_date):
-        """Extract and analyze UDiFF ZIP file"""
+    def extract_and_analyze_udiff(self, zip_path, trade_date):
+        """
+        Analyze a downloaded UDiFF ZIP file and return an iterator of F&O
+        record batches (the CSV is parsed BATCH_ROWS rows at a time).
+        """
         try:
             print(f"📊 Analyzing UDiFF data for {trade_date}...")
             
-            with zipfile.ZipFile(io.BytesIO(zip_content)) as zip_file:
+            with zipfile.ZipFile(zip_path) as zip_file:
                 file_list = zip_file.namelist()
                 print(f"📁 Files in ZIP: {file_list}")
-                
-                # Find CSV files
-                csv_files = [f for f in file_list if f.endswith('.csv')]
-                
-                if not csv_files:
-                    print(f"❌ No CSV files found in ZIP")
-                    return None
-                
-                csv_file = csv_files[0]
-                print(f"📋 Processing CSV: {csv_file}")
-                
-                # Read CSV from ZIP
-                with zip_file.open(csv_file) as csv_data:
-                    # Try different encodings
-                    try:
-                        df = pd.read_csv(csv_data, encoding='utf-8')
-                    except:
-                        csv_data.seek(0)
-                        df = pd.read_csv(csv_data, encoding='latin-1')
-                
-                print(f"📊 Data shape: {df.shape}")
-                print(f"📋 Columns: {list(df.columns)}")
-                
-                # Show first few rows
-                print(f"📈 Sample data:")
-                print(df.head(3).to_string())
-                
-                # Check for F&O data
-                if 'SYMBOL' in df.columns or 'TckrSymb' in df.columns:
-                    # Try to identify F&O instruments
-                    if 'INSTRUMENT' in df.columns:
-                        instruments = df['INSTRUMENT'].unique()
-                        print(f"🔍 Instruments found: {instruments}")
-                        
-                        # Filter F&O data
-                        fo_instruments = ['FUTIDX', 'FUTSTK', 'OPTIDX', 'OPTSTK']
-                        fo_data = df[df['INSTRUMENT'].isin(fo_instruments)]
-                        
-                        if len(fo_data) > 0:
-                            print(f"✅ F&O records found: {len(fo_data)}")
-                            return fo_data
-                        else:
-                            print(f"⚠️ No F&O data found, showing all data")
-                            return df
-                    else:
-                        print(f"⚠️ No INSTRUMENT column, showing all data")
-                        return df
-                else:
-                    print(f"⚠️ Unknown column structure, showing all data")
-                    return df
+            
+            batches = iter_zip_csv_batches(zip_path, batch_rows=BATCH_ROWS)
+            first_batch = next(batches, None)
+            
+            if first_batch is None:
+                print(f"❌ No CSV data found in ZIP")
+                return None
+            
+            print(f"📋 Columns: {list(first_batch.columns)}")
+            
+            # Show first few rows
+            print(f"📈 Sample data:")
+            print(first_batch.head(3).to_string())
+            
+            layout = detect_format(first_batch.columns)
+            if layout is None:
+                print(f"❌ Unknown column structure")
+                return None
+            print(f"🔍 Detected {layout} layout")
+            
+            # Canonical frame per batch: UDiFF or legacy layout, F&O instruments only
+            source_file = os.path.basename(zip_path)
+            return (to_canonical(batch, trade_date=trade_date).assign(source_file=source_file)
+                    for batch in itertools.chain([first_batch], batches))
                 
         except Exception as e:
             print(f"❌ Error processing ZIP file: {e}")
             return None
 
-    def save_udiff_to_database(self, df, trade_date):
-        """Save UDiFF F&O data to database"""
+    def save_udiff_to_database(self, batches, trade_date):
+        """Save UDiFF F&O record batches to database; returns records saved"""
         try:
-            if df is None or len(df) == 0:
+            if batches is None:
                 print(f"❌ No data to save")
-                return False
+                return 0
                 
-            conn = pyodbc.connect(self.conn_string)
+            conn = nse_db_pool.get_connection()
             cur = conn.cursor()
             
-            print(f"💾 Saving {len(df)} UDiFF records to database...")
-            
             # Clear existing data for this date
             cur.execute("DELETE FROM step04_fo_udiff_daily WHERE trade_date = ?", trade_date)
             deleted = cur.rowcount
             if deleted > 0:
                 print(f"🗑️ Cleared {deleted} existing records for {trade_date}")
             
-            # Prepare data for insertion
-            records = []
+            loader = BulkLoader(conn, 'step04_fo_udiff_daily', fo_columns(INSERT_COLUMNS))
             
-            for _, row in df.iterrows():
-                # Map UDiFF columns to our database schema
-                # Adjust column names based on actual UDiFF structure
-                record = (
-                    trade_date,
-                    str(row.get('SYMBOL', row.get('TckrSymb', ''))),
-                    str(row.get('INSTRUMENT', row.get('Sgmt', ''))),
-                    str(row.get('EXPIRY_DT', row.get('XpryDt', ''))),
-                    float(row.get('STRIKE_PR', row.get('StrkPric', 0))) if pd.notna(row.get('STRIKE_PR', row.get('StrkPric'))) else 0,
-                    str(row.get('OPTION_TYP', row.get('OptTp', ''))),
-                    float(row.get('OPEN', row.get('OpnPric', 0))) if pd.notna(row.get('OPEN', row.get('OpnPric'))) else 0,
-                    float(row.get('HIGH', row.get('HghPric', 0))) if pd.notna(row.get('HIGH', row.get('HghPric'))) else 0,
-                    float(row.get('LOW', row.get('LwPric', 0))) if pd.notna(row.get('LOW', row.get('LwPric'))) else 0,
-                    float(row.get('CLOSE', row.get('ClsPric', 0))) if pd.notna(row.get('CLOSE', row.get('ClsPric'))) else 0,
-                    float(row.get('SETTLE_PR', row.get('SttlmntPric', 0))) if pd.notna(row.get('SETTLE_PR', row.get('SttlmntPric'))) else 0,
-                    int(row.get('CONTRACTS', row.get('TtlTradgVol', 0))) if pd.notna(row.get('CONTRACTS', row.get('TtlTradgVol'))) else 0,
-                    float(row.get('VAL_INLAKH', row.get('TtlTrfVal', 0))) if pd.notna(row.get('VAL_INLAKH', row.get('TtlTrfVal'))) else 0,
-                    int(row.get('OPEN_INT', row.get('OpnIntrst', 0))) if pd.notna(row.get('OPEN_INT', row.get('OpnIntrst'))) else 0,
-                    int(row.get('CHG_IN_OI', row.get('ChngInOpnIntrst', 0))) if pd.notna(row.get('CHG_IN_OI', row.get('ChngInOpnIntrst'))) else 0,
-                    str(row.get('UNDERLYING', row.get('UndrlygSymb', ''))),
-                    f'udiff_{trade_date}.zip'
-                )
-                records.append(record)
-            
-            # Insert data
-            insert_sql = """
-            INSERT INTO step04_fo_udiff_daily 
-            (trade_date, symbol, instrument, expiry_date, strike_price, option_type, 
-             open_price, high_price, low_price, close_price, settle_price, 
-             contracts_traded, value_in_lakh, open_interest, change_in_oi, underlying, source_file)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """
+            total_saved = 0
+            for df in batches:
+                if len(df) == 0:
+                    continue
+                
+                # Columnar bulk insert, committed with the delete once all batches are in
+                inserted = loader.load(df, commit=False)
+                total_saved += inserted
+                print(f"💾 Inserted batch of {inserted} records ({total_saved:,} so far)")
             
-            cur.executemany(insert_sql, records)
             conn.commit()
             
-            print(f"✅ Saved {len(records)} UDiFF F&O records for {trade_date}")
+            if total_saved == 0:
+                print(f"❌ No data to save")
+                conn.close()
+                return 0
+            
+            print(f"✅ Saved {total_saved} UDiFF F&O records for {trade_date}")
             
             # Show summary
             cur.execute("""
@@ -214,11 +168,11 @@ class NSEFOUDiFFDayDownloader:
             print(f"📊 Summary for {trade_date}: {stats[0]} records, {stats[1]} symbols, {stats[2]} instruments")
             
             conn.close()
-            return True
+            return total_saved
             
         except Exception as e:
             print(f"❌ Database error: {e}")
-            return False
+            return 0
 
     def download_single_day_fo_udiff(self, date_input):
         """Main function to download and process single day F&O UDiFF data"""
@@ -229,30 +183,33 @@ class NSEFOUDiFFDayDownloader:
         print(f"🌐 Source: NSE Archives")
         
         # Download UDiFF file
-        zip_content, formatted_date = self.download_single_day_udiff(date_input)
+        zip_path, formatted_date = self.download_single_day_udiff(date_input)
         
-        if zip_content is None:
+        if zip_path is None:
             print(f"❌ Failed to download UDiFF data for {date_input}")
             return False
         
+        # Table stores trade_date as YYYYMMDD (file names use DDMMYYYY)
+        trade_date = datetime.strptime(formatted_date, '%d%m%Y').strftime('%Y%m%d')
+        
         # Extract and analyze
-        fo_data = self.extract_and_analyze_udiff(zip_content, formatted_date)
+        fo_batches = self.extract_and_analyze_udiff(zip_path, trade_date)
         
-        if fo_data is None:
+        if fo_batches is None:
             print(f"❌ Failed to extract UDiFF data for {date_input}")
             return False
         
         # Save to database
-        success = self.save_udiff_to_database(fo_data, formatted_date)
+        records_saved = self.save_udiff_to_database(fo_batches, trade_date)
         
-        if success:
+        if records_saved:
             print(f"\n🎯 SUCCESS! UDiFF F&O data downloaded for {date_input}")
             print(f"✅ File: udiff_{formatted_date}.zip")
-            print(f"✅ Records: {len(fo_data)}")
+            print(f"✅ Records: {records_saved:,}")
             print(f"✅ Location: master.dbo.step04_fo_udiff_daily")
             
             print(f"\n🔍 Test query in SSMS:")
-            print(f"SELECT * FROM step04_fo_udiff_daily WHERE trade_date = '{formatted_date}';")
+            print(f"SELECT * FROM step04_fo_udiff_daily WHERE trade_date = '{trade_date}';")
             return True
         else:
             print(f"❌ Failed to save UDiFF data to database")
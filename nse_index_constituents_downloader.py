@@ -8,6 +8,21 @@ Download the actual stock symbols that make up each NIFTY index.
 For example: NIFTY 50 contains symbols like HDFC, RELIANCE, TCS, INFY, etc.
 
 This script fetches the constituent symbols for each major NSE index.
+
+CONCURRENT MODE:
+================
+  python nse_index_constituents_downloader.py --concurrent --workers 6
+
+Indices are fetched in parallel over the shared session, with at most
+--per-host requests in flight per host. Successful API responses are cached
+on disk under index_constituents_cache/<YYYY-MM-DD>/<index>.json, so a re-run
+on the same day makes no requests. The new data is diffed against
+nse_index_constituents_uploaded.json - what upload_index_constituents.py last
+inserted, so a failed upload is diffed again next time - and written to
+nse_index_constituents_diff.json; upload_index_constituents.py --changed-only
+re-uploads just the indices listed there. Indices that fell back to sample
+data or could not be fetched are left out of the diff (listed as skipped),
+so they are never reported as changed or uploaded.
 """
 
 import requests
@@ -16,9 +31,76 @@ import json
 from datetime import datetime, date
 import time
 import os
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse
+from requests.adapters import HTTPAdapter
 from bs4 import BeautifulSoup
 import re
 
+CACHE_DIR = 'index_constituents_cache'
+LATEST_JSON_FILE = 'nse_index_constituents_latest.json'
+UPLOADED_JSON_FILE = 'nse_index_constituents_uploaded.json'   # written by upload_index_constituents.py
+DIFF_FILE = 'nse_index_constituents_diff.json'
+
+
+class ConstituentsResponseCache:
+    """On-disk cache of API responses keyed by (index, date)"""
+
+    def __init__(self, cache_dir=CACHE_DIR):
+        self.cache_dir = cache_dir
+
+    def path(self, index_name, as_of):
+        slug = re.sub(r'[^A-Z0-9]+', '_', index_name.upper()).strip('_')
+        return os.path.join(self.cache_dir, as_of, f"{slug}.json")
+
+    def get(self, index_name, as_of):
+        path = self.path(index_name, as_of)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (ValueError, OSError):
+            return None
+
+    def put(self, index_name, as_of, url, data):
+        path = self.path(index_name, as_of)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'index': index_name, 'url': url, 'data': data}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+
+def load_index_symbols(json_file):
+    """{index: set(symbols)} from a saved constituents JSON (empty if missing)"""
+    if not os.path.exists(json_file):
+        return {}
+    with open(json_file, 'r', encoding='utf-8') as f:
+        records = json.load(f)
+    index_symbols = {}
+    for item in records:
+        index_name = item.get('INDEX', item.get('INDICES'))
+        index_symbols.setdefault(index_name, set()).add(item['SYMBOL'])
+    return index_symbols
+
+
+def diff_constituents(old_symbols, new_symbols):
+    """Per-index added/removed symbols between two {index: set(symbols)} maps"""
+    changes = {}
+    for index_name in sorted(set(old_symbols) | set(new_symbols)):
+        old = old_symbols.get(index_name, set())
+        new = new_symbols.get(index_name, set())
+        if old != new:
+            changes[index_name] = {
+                'added': sorted(new - old),
+                'removed': sorted(old - new),
+                'status': 'new' if not old else 'dropped' if not new else 'changed'
+            }
+    return changes
+
 class NSEIndexConstituentsDownloader:
     def __init__(self):
         """Initialize the NSE Index Constituents downloader"""
@@ -52,6 +134,16 @@ class NSEIndexConstituentsDownloader:
             'NIFTY PRIVATE BANK': 'NIFTY%20PRIVATE%20BANK'
         }
         
+        # Concurrent mode settings
+        self.cache = ConstituentsResponseCache()
+        self.use_cache = True
+        self.request_delay = 1
+        self.per_host_limit = 2
+        self._host_semaphores = {}
+        self._host_lock = threading.Lock()
+        # index -> why it holds no live API data ('sample data' / 'no data'); kept out of the diff
+        self.unfetched = {}
+        
         # Enhanced headers
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
@@ -107,15 +199,25 @@ class NSEIndexConstituentsDownloader:
             f"https://www.nseindia.com/api/quote-equity?symbol={index_encoded}&section=trade_info"
         ]
         
+        as_of = date.today().isoformat()
+        if self.use_cache:
+            cached = self.cache.get(index_name, as_of)
+            if cached:
+                symbols = self.extract_symbols_from_data(cached['data'], index_name)
+                if symbols:
+                    print(f"      💾 {index_name}: {len(symbols)} symbols (cached {as_of})")
+                    return symbols
+        
         for api_url in api_urls:
             try:
-                time.sleep(1)  # Rate limiting
-                
-                response = self.session.get(
-                    api_url,
-                    headers=self.headers,
-                    timeout=10
-                )
+                with self.host_slot(api_url):
+                    time.sleep(self.request_delay)  # Rate limiting
+                    
+                    response = self.session.get(
+                        api_url,
+                        headers=self.headers,
+                        timeout=10
+                    )
                 
                 if response.status_code == 200:
                     try:
@@ -125,7 +227,8 @@ class NSEIndexConstituentsDownloader:
                         symbols = self.extract_symbols_from_data(data, index_name)
                         
                         if symbols:
-                            print(f"      ✅ Found {len(symbols)} symbols")
+                            print(f"      ✅ {index_name}: found {len(symbols)} symbols")
+                            self.cache.put(index_name, as_of, api_url, data)
                             return symbols
                         
                     except json.JSONDecodeError:
@@ -137,12 +240,22 @@ class NSEIndexConstituentsDownloader:
         # If API fails, use sample data for major indices
         sample_symbols = self.get_sample_constituents(index_name)
         if sample_symbols:
-            print(f"      📝 Using sample data ({len(sample_symbols)} symbols)")
+            print(f"      📝 {index_name}: using sample data ({len(sample_symbols)} symbols)")
+            self.unfetched[index_name] = 'sample data'
             return sample_symbols
         
         print(f"      ❌ No data found for {index_name}")
+        self.unfetched[index_name] = 'no data'
         return []
 
+    def host_slot(self, url):
+        """Semaphore limiting in-flight requests to the url's host"""
+        host = urlparse(url).netloc
+        with self._host_lock:
+            if host not in self._host_semaphores:
+                self._host_semaphores[host] = threading.BoundedSemaphore(self.per_host_limit)
+            return self._host_semaphores[host]
+
     def extract_symbols_from_data(self, data, index_name):
         """Extract symbol list from API response data"""
         symbols = []
@@ -302,6 +415,78 @@ class NSEIndexConstituentsDownloader:
         
         return all_constituents
 
+    def download_all_constituents_concurrent(self, max_workers=6):
+        """Download constituents for all indices in parallel over the shared session"""
+        print(f"📊 Downloading index constituents ({max_workers} workers, "
+              f"{self.per_host_limit} per host)...")
+        
+        # Let the shared session keep enough pooled connections for all workers
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount('https://', adapter)
+        
+        results = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(self.get_index_constituents, index_name, index_encoded): index_name
+                for index_name, index_encoded in self.index_mappings.items()
+            }
+            for future in as_completed(futures):
+                index_name = futures[future]
+                try:
+                    results[index_name] = future.result()
+                except Exception as e:
+                    print(f"      ❌ {index_name}: {str(e)}")
+                    self.unfetched[index_name] = 'no data'
+                    results[index_name] = []
+        
+        # Keep the same ordering as the sequential download
+        all_constituents = []
+        download_date = datetime.now().strftime('%Y-%m-%d')
+        download_time = datetime.now().strftime('%H:%M:%S')
+        for index_name in self.index_mappings:
+            for symbol in results.get(index_name, []):
+                all_constituents.append({
+                    'INDEX': index_name,
+                    'SYMBOL': symbol,
+                    'CATEGORY': self.get_index_category(index_name),
+                    'DOWNLOAD_DATE': download_date,
+                    'DOWNLOAD_TIME': download_time
+                })
+        
+        return all_constituents
+
+    def save_constituents_diff(self, constituents_data):
+        """Diff freshly fetched indices against the last uploaded snapshot and save the per-index changes"""
+        new_symbols = {}
+        for item in constituents_data:
+            if item['INDEX'] not in self.unfetched:
+                new_symbols.setdefault(item['INDEX'], set()).add(item['SYMBOL'])
+        uploaded = {index_name: symbols for index_name, symbols in load_index_symbols(UPLOADED_JSON_FILE).items()
+                    if index_name not in self.unfetched}
+        
+        changes = diff_constituents(uploaded, new_symbols)
+        
+        with open(DIFF_FILE, 'w', encoding='utf-8') as f:
+            json.dump({
+                'generated': datetime.now().isoformat(timespec='seconds'),
+                'changed_indices': list(changes),
+                'changes': changes,
+                'skipped_indices': dict(sorted(self.unfetched.items()))
+            }, f, indent=2, ensure_ascii=False)
+        
+        if self.unfetched:
+            print(f"   ⚠️ {len(self.unfetched)} indices not fetched from the API, left out of the diff: "
+                  f"{', '.join(sorted(self.unfetched))}")
+        if changes:
+            print(f"   🔄 {len(changes)} indices changed since last upload:")
+            for index_name, change in changes.items():
+                print(f"      {index_name:<25} {change['status']:<8} "
+                      f"+{len(change['added'])} -{len(change['removed'])}")
+        else:
+            print("   ✅ No constituent changes since last upload")
+        print(f"   ✅ Diff saved: {DIFF_FILE}")
+        return changes
+
     def get_index_category(self, index_name):
         """Get category for an index"""
         if any(x in index_name for x in ['SMALLCAP']):
@@ -337,9 +522,12 @@ class NSEIndexConstituentsDownloader:
                 json.dump(constituents_data, f, indent=2, ensure_ascii=False)
             print(f"   ✅ JSON saved: {json_filename}")
             
+            # Diff against what was last uploaded
+            self.save_constituents_diff(constituents_data)
+            
             # Also save latest versions
             df.to_csv("nse_index_constituents_latest.csv", index=False)
-            with open("nse_index_constituents_latest.json", 'w', encoding='utf-8') as f:
+            with open(LATEST_JSON_FILE, 'w', encoding='utf-8') as f:
                 json.dump(constituents_data, f, indent=2, ensure_ascii=False)
             print("   ✅ Latest versions saved")
             
@@ -401,7 +589,7 @@ class NSEIndexConstituentsDownloader:
         if len(constituents_data) > 20:
             print(f"... and {len(constituents_data) - 20} more mappings")
 
-    def run_download(self):
+    def run_download(self, concurrent=False, max_workers=6):
         """Main method to download index constituents"""
         try:
             # Setup session
@@ -409,7 +597,10 @@ class NSEIndexConstituentsDownloader:
                 print("⚠️  Session setup failed, continuing with sample data...")
             
             # Download constituents
-            constituents_data = self.download_all_constituents()
+            if concurrent:
+                constituents_data = self.download_all_constituents_concurrent(max_workers)
+            else:
+                constituents_data = self.download_all_constituents()
             
             if not constituents_data:
                 print("❌ No constituents data obtained")
@@ -432,8 +623,17 @@ class NSEIndexConstituentsDownloader:
 
 def main():
     """Main execution function"""
+    parser = argparse.ArgumentParser(description='Download NSE index constituents')
+    parser.add_argument('--concurrent', action='store_true', help='Fetch indices in parallel')
+    parser.add_argument('--workers', type=int, default=6, help='Worker threads for --concurrent')
+    parser.add_argument('--per-host', type=int, default=2, help='Max in-flight requests per host')
+    parser.add_argument('--no-cache', action='store_true', help="Ignore today's cached responses")
+    args = parser.parse_args()
+    
     downloader = NSEIndexConstituentsDownloader()
-    success = downloader.run_download()
+    downloader.per_host_limit = args.per_host
+    downloader.use_cache = not args.no_cache
+    success = downloader.run_download(concurrent=args.concurrent, max_workers=args.workers)
     
     if success:
         print("\n🎉 Download completed successfully!")
@@ -441,6 +641,7 @@ def main():
         print("   - nse_index_constituents_latest.csv")
         print("   - nse_index_constituents_latest.json") 
         print("   - nse_index_summary_latest.json")
+        print(f"   - {DIFF_FILE}")
         print("   - Timestamped versions")
         print("\n💡 Now you have INDEX → SYMBOL mappings (e.g., NIFTY 50 → HDFC, RELIANCE, etc.)")
     else:
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+NSE Load Pipeline - parse files in a process pool while one writer loads them
+
+Purpose:
+  The file loaders parsed and inserted strictly one file at a time, so a
+  multi-month reload took parse time + DB time. iter_parsed() overlaps them:
+
+      files ──► ProcessPoolExecutor (parse + normalize, N workers)
+                    │  at most max_pending parsed-but-unwritten results
+                    ▼
+             calling thread = the single writer that owns the DB connection
+
+  A new file is only submitted once the writer has taken a result, so at
+  most max_pending frames exist at any time (backpressure bounds memory),
+  while the pool keeps parsing ahead of the writer. Total time approaches
+  max(parse / N, write) instead of parse + write. Results arrive in
+  completion order; a file that fails to parse is yielded with its error.
+
+  parse functions must be module-level (picklable). With workers <= 1 the
+  files are parsed inline, same interface.
+
+Usage:
+  stats = PipelineStats()
+  for path, frame, error in iter_parsed(files, load_and_clean_csv, workers=4, stats=stats):
+      if error is None:
+          insert(frame)                  # runs while the pool parses ahead
+  stats.report()
+"""
+
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Callable, Iterator, List, Optional, Tuple
+
+DEFAULT_WORKERS = min(4, os.cpu_count() or 1)
+
+
+class PipelineStats:
+    def __init__(self):
+        self.files = 0
+        self.failed = 0
+        self.parse_seconds = 0.0     # summed across workers
+        self.write_seconds = 0.0     # writer busy (between results)
+        self.wait_seconds = 0.0      # writer idle, waiting for a parse
+        self.started = time.perf_counter()
+
+    @property
+    def wall_seconds(self) -> float:
+        return time.perf_counter() - self.started
+
+    def report(self, workers: int = 1):
+        print(f"⏱️ Pipeline: {self.files} files ({self.failed} failed), wall {self.wall_seconds:.1f}s | "
+              f"parse {self.parse_seconds:.1f}s over {max(workers, 1)} workers | "
+              f"write {self.write_seconds:.1f}s | writer waited {self.wait_seconds:.1f}s")
+
+
+def _timed(parse: Callable, path: str):
+    started = time.perf_counter()
+    result = parse(path)
+    return result, time.perf_counter() - started
+
+
+def iter_parsed(files: List[str], parse: Callable, workers: int = DEFAULT_WORKERS,
+                max_pending: Optional[int] = None,
+                stats: Optional[PipelineStats] = None) -> Iterator[Tuple[str, object, Optional[Exception]]]:
+    """Yield (path, parse(path), None) or (path, None, error) as files finish parsing"""
+    stats = stats or PipelineStats()
+    if workers <= 1:
+        for path in files:
+            try:
+                result, seconds = _timed(parse, path)
+                stats.parse_seconds += seconds
+                item = (path, result, None)
+            except Exception as e:
+                stats.failed += 1
+                item = (path, None, e)
+            stats.files += 1
+            mark = time.perf_counter()
+            yield item
+            stats.write_seconds += time.perf_counter() - mark
+        return
+
+    max_pending = max_pending or workers * 2
+    queue = iter(files)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = {}
+
+        def submit_next():
+            path = next(queue, None)
+            if path is not None:
+                pending[pool.submit(_timed, parse, path)] = path
+
+        for _ in range(max_pending):
+            submit_next()
+
+        try:
+            yield from _drain(pending, submit_next, stats)
+        finally:
+            # Writer stopped early (error / break): drop work not yet started
+            for future in pending:
+                future.cancel()
+
+
+def _drain(pending, submit_next, stats: PipelineStats):
+    """Hand finished parses to the writer, refilling the window after each one"""
+    while pending:
+        mark = time.perf_counter()
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        stats.wait_seconds += time.perf_counter() - mark
+        for future in done:
+            path = pending.pop(future)
+            submit_next()
+            stats.files += 1
+            try:
+                result, seconds = future.result()
+                stats.parse_seconds += seconds
+                item = (path, result, None)
+            except Exception as e:
+                stats.failed += 1
+                item = (path, None, e)
+            mark = time.perf_counter()
+            yield item
+            stats.write_seconds += time.perf_counter() - mark
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+NSE Month Comparison - one engine for the step03 month-over-month analyzers
+
+Purpose:
+  The step03 <month>_vs_<month> analyzers were copies of one script with
+  the months hard-coded: per-symbol peaks of the baseline month, then a
+  Python loop over every daily row of the comparison month with dict
+  lookups into the baselines. This engine takes (baseline, comparison)
+  month pairs and does all of them at once:
+
+    1. one query reads the EQ daily rows for the whole span
+       (trade_month BETWEEN first AND last, see nse_month_key)
+    2. per (month, symbol) peaks: MAX(deliv_qty), MAX(ttl_trd_qnty) and
+       MAX(trade_date); symbols with no delivery are dropped
+    3. daily rows x pairs x baselines in one merge; exceedance flags,
+       increases and percentages are column arithmetic
+    4. rows where volume or delivery exceeded the baseline peak replace the
+       pair's comparison_type in step03_compare_monthvspreviousmonth
+       (one bulk insert)
+
+  Output matches the old analyzers: current_* = comparison-month day,
+  previous_ttl_trd_qnty / previous_deliv_qty = baseline peaks,
+  previous_baseline_date = the symbol's last trading day in the baseline month,
+  delivery_increase_* = 0 unless delivery exceeded, and
+  comparison_type = 'APR_VS_MAR_2025' (comparison month first, its year).
+
+Config (step03_comparisons.json):
+  {"series": "EQ", "comparisons": [["2025-03", "2025-04"], ...]}   # [baseline, comparison]
+  Adding a month is one more pair in the file; --all-consecutive pairs every
+  month present in step01_equity_daily instead.
+
+Usage:
+  python nse_month_comparison.py                         # pairs from step03_comparisons.json
+  python nse_month_comparison.py --all-consecutive       # full history in one pass
+  python nse_month_comparison.py --pair 2025-03:2025-04 --dry-run
+"""
+
+import os
+import json
+import time
+import calendar
+import argparse
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from nse_bulk_loader import BulkLoader, SQLSERVER, POSTGRES, detect_backend
+from nse_month_key import MonthPredicates, available_months, month_key, month_label
+
+COMPARISON_TABLE = 'step03_compare_monthvspreviousmonth'
+DEFAULT_CONFIG_FILE = 'step03_comparisons.json'
+
+DAILY_COLUMNS = ['trade_date', 'symbol', 'series', 'prev_close', 'open_price', 'high_price', 'low_price',
+                 'last_price', 'close_price', 'avg_price', 'ttl_trd_qnty', 'turnover_lacs', 'no_of_trades',
+                 'deliv_qty', 'deliv_per', 'source_file']
+
+# step03_compare_monthvspreviousmonth insert layout (BulkLoader kinds)
+COMPARISON_COLUMNS: Dict[str, str] = {
+    'current_trade_date': 'date', 'symbol': 'str', 'series': 'str',
+    'current_prev_close': 'float', 'current_open_price': 'float', 'current_high_price': 'float',
+    'current_low_price': 'float', 'current_last_price': 'float', 'current_close_price': 'float',
+    'current_avg_price': 'float', 'current_ttl_trd_qnty': 'int', 'current_turnover_lacs': 'float',
+    'current_no_of_trades': 'int', 'current_deliv_qty': 'int', 'current_deliv_per': 'float',
+    'current_source_file': 'str',
+    'previous_baseline_date': 'date', 'previous_prev_close': 'float', 'previous_open_price': 'float',
+    'previous_high_price': 'float', 'previous_low_price': 'float', 'previous_last_price': 'float',
+    'previous_close_price': 'float', 'previous_avg_price': 'float', 'previous_ttl_trd_qnty': 'int',
+    'previous_turnover_lacs': 'float', 'previous_no_of_trades': 'int', 'previous_deliv_qty': 'int',
+    'previous_deliv_per': 'float', 'previous_source_file': 'str',
+    'delivery_increase_abs': 'int', 'delivery_increase_pct': 'float', 'comparison_type': 'str',
+}
+
+SQL_TYPES = {'date': 'DATE', 'float': 'DECIMAL(18,4)', 'int': 'BIGINT', 'str': 'VARCHAR(255)'}
+
+Pair = Tuple[int, int]      # (baseline month key, comparison month key)
+
+
+def comparison_type(pair: Pair) -> str:
+    """(202503, 202504) -> 'APR_VS_MAR_2025'"""
+    baseline, comparison = pair
+    return (f"{calendar.month_abbr[comparison % 100].upper()}_VS_"
+            f"{calendar.month_abbr[baseline % 100].upper()}_{comparison // 100}")
+
+
+def parse_pair(text: str) -> Pair:
+    """'2025-03:2025-04' -> (202503, 202504)"""
+    baseline, _, comparison = text.partition(':')
+    if not comparison:
+        raise ValueError(f"Expected BASELINE:COMPARISON, e.g. 2025-03:2025-04 (got {text!r})")
+    return month_key(baseline), month_key(comparison)
+
+
+def consecutive_pairs(months: Sequence) -> List[Pair]:
+    keys = [month_key(m) for m in months]
+    return list(zip(keys, keys[1:]))
+
+
+def load_comparison_config(config_file: str = DEFAULT_CONFIG_FILE) -> Dict:
+    with open(config_file, 'r') as f:
+        config = json.load(f)
+    config['pairs'] = [(month_key(b), month_key(c)) for b, c in config.get('comparisons', [])]
+    config.setdefault('series', 'EQ')
+    return config
+
+
+def peak_baselines(daily: pd.DataFrame) -> pd.DataFrame:
+    """Per (month, symbol): peak delivery / volume and the symbol's last trading day"""
+    peaks = (daily.groupby(['month', 'symbol'], sort=False, observed=True)
+             .agg(peak_delivery=('deliv_qty', 'max'), peak_volume=('ttl_trd_qnty', 'max'),
+                  previous_baseline_date=('trade_date', 'max'))
+             .reset_index())
+    return peaks[peaks['peak_delivery'] > 0]
+
+
+def compare_months(daily: pd.DataFrame, pairs: Sequence[Pair]) -> pd.DataFrame:
+    """
+    Exceedance rows for every pair in one vectorized pass.
+
+    daily: DAILY_COLUMNS plus 'month' (YYYYMM). Returns COMPARISON_COLUMNS plus
+    volume_exceeded / delivery_exceeded flags.
+    """
+    pair_frame = pd.DataFrame(list(pairs), columns=['baseline_month', 'month'])
+    pair_frame['comparison_type'] = [comparison_type(p) for p in pairs]
+
+    baselines = peak_baselines(daily).rename(columns={'month': 'baseline_month'})
+    current = daily.merge(pair_frame, on='month')
+    current = current.merge(baselines, on=['baseline_month', 'symbol'])
+
+    volume = current['ttl_trd_qnty'].astype('float64')
+    delivery = current['deliv_qty'].astype('float64')
+    peak_volume = current['peak_volume'].astype('float64')
+    peak_delivery = current['peak_delivery'].astype('float64')
+    # NaN compares False: a missing quantity never exceeds
+    volume_exceeded = (volume > peak_volume).to_numpy()
+    delivery_exceeded = (delivery > peak_delivery).to_numpy()
+    keep = volume_exceeded | delivery_exceeded
+    current = current[keep]
+    delivery_exceeded = delivery_exceeded[keep]
+    volume_exceeded = volume_exceeded[keep]
+    delivery, peak_delivery = delivery[keep], peak_delivery[keep]
+
+    increase = np.where(delivery_exceeded, delivery - peak_delivery, 0.0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        increase_pct = np.where(delivery_exceeded & (peak_delivery > 0), increase / peak_delivery * 100, 0.0)
+
+    out = pd.DataFrame({
+        'current_trade_date': current['trade_date'],
+        'symbol': current['symbol'],
+        'series': current['series'],
+    })
+    for col in DAILY_COLUMNS[3:-1]:
+        out[f'current_{col}'] = current[col].fillna(0)
+    out['current_source_file'] = current['source_file'].fillna('')
+    out['previous_baseline_date'] = current['previous_baseline_date']
+    for col in ['prev_close', 'open_price', 'high_price', 'low_price', 'last_price', 'close_price',
+                'avg_price', 'turnover_lacs', 'no_of_trades', 'deliv_per']:
+        out[f'previous_{col}'] = 0
+    out['previous_ttl_trd_qnty'] = current['peak_volume'].fillna(0)
+    out['previous_deliv_qty'] = current['peak_delivery']
+    out['previous_source_file'] = ''
+    out['delivery_increase_abs'] = increase
+    out['delivery_increase_pct'] = increase_pct
+    out['comparison_type'] = current['comparison_type']
+    out['volume_exceeded'] = volume_exceeded
+    out['delivery_exceeded'] = delivery_exceeded
+    return out.reset_index(drop=True)
+
+
+class MonthComparisonEngine:
+    def __init__(self, connection, series: str = 'EQ', table: str = COMPARISON_TABLE):
+        self.connection = connection
+        self.backend = detect_backend(connection)
+        self.series = series
+        self.table = table
+        self.months = MonthPredicates(connection)
+
+    def ensure_table(self):
+        columns = ', '.join(f"{name} {SQL_TYPES[kind]}" for name, kind in COMPARISON_COLUMNS.items())
+        cursor = self.connection.cursor()
+        if self.backend == SQLSERVER:
+            cursor.execute(f"IF OBJECT_ID('{self.table}', 'U') IS NULL "
+                           f"CREATE TABLE {self.table} (id BIGINT IDENTITY(1,1) PRIMARY KEY, {columns}, "
+                           f"created_at DATETIME2 DEFAULT GETDATE())")
+        else:
+            cursor.execute(f"CREATE TABLE IF NOT EXISTS {self.table} ({columns}, "
+                           f"created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)")
+        self.connection.commit()
+
+    def load_daily(self, first: int, last: int) -> pd.DataFrame:
+        """All daily rows of the series from first through last month, one query"""
+        cursor = self.connection.cursor()
+        cursor.execute(f"SELECT {', '.join(DAILY_COLUMNS)} FROM step01_equity_daily "
+                       f"WHERE series = '{self.series}' AND {self.months.months(first, last)}")
+        daily = pd.DataFrame.from_records([tuple(row) for row in cursor.fetchall()], columns=DAILY_COLUMNS)
+        cursor.close()
+        daily['trade_date'] = pd.to_datetime(daily['trade_date'])
+        daily['symbol'] = daily['symbol'].astype('category')
+        for col in DAILY_COLUMNS[3:-1]:
+            daily[col] = pd.to_numeric(daily[col], errors='coerce')
+        daily['month'] = daily['trade_date'].dt.year * 100 + daily['trade_date'].dt.month
+        return daily
+
+    def compute(self, pairs: Sequence[Pair]) -> pd.DataFrame:
+        months = sorted({m for pair in pairs for m in pair})
+        daily = self.load_daily(months[0], months[-1])
+        present = set(daily['month'].unique())
+        for pair in pairs:
+            missing = [month_label(m) for m in pair if m not in present]
+            if missing:
+                print(f"⚠️ {comparison_type(pair)}: no {self.series} data for {', '.join(missing)}")
+        print(f"📅 Loaded {len(daily):,} daily {self.series} rows for {month_label(months[0])}..{month_label(months[-1])}")
+        return compare_months(daily, pairs)
+
+    def save(self, results: pd.DataFrame, pairs: Sequence[Pair]) -> int:
+        """Replace each pair's comparison_type rows with results, in one transaction"""
+        self.ensure_table()
+        cursor = self.connection.cursor()
+        placeholder = '%s' if self.backend == POSTGRES else '?'
+        for pair in pairs:
+            cursor.execute(f"DELETE FROM {self.table} WHERE comparison_type = {placeholder}", (comparison_type(pair),))
+        loader = BulkLoader(self.connection, self.table, COMPARISON_COLUMNS, backend=self.backend)
+        saved = loader.load(results, commit=False)
+        self.connection.commit()
+        return saved
+
+    def run(self, pairs: Sequence[Pair], dry_run: bool = False) -> pd.DataFrame:
+        if not pairs:
+            print("⚠️ No month pairs to compare")
+            return pd.DataFrame()
+        started = time.perf_counter()
+        results = self.compute(pairs)
+        computed = time.perf_counter() - started
+
+        summary = (results.groupby('comparison_type', sort=False)
+                   .agg(records=('symbol', 'size'), volume_exceeded=('volume_exceeded', 'sum'),
+                        delivery_exceeded=('delivery_exceeded', 'sum'))
+                   .reindex([comparison_type(p) for p in pairs], fill_value=0))
+        summary['both_exceeded'] = (results[results['volume_exceeded'] & results['delivery_exceeded']]
+                                    .groupby('comparison_type').size()
+                                    .reindex(summary.index, fill_value=0))
+        print(f"\n📊 Month-over-month exceedances ({len(pairs)} pair(s), computed in {computed:.2f}s):")
+        print(summary.to_string())
+
+        if dry_run:
+            print("\n🧪 Dry run - nothing written")
+        else:
+            started = time.perf_counter()
+            saved = self.save(results, pairs)
+            print(f"\n💾 Saved {saved:,} records to {self.table} in {time.perf_counter() - started:.2f}s")
+        return results
+
+
+def run_pairs(pairs: Sequence[Pair], series: str = 'EQ', dry_run: bool = False) -> pd.DataFrame:
+    """Entry point for the per-month step03 scripts"""
+    from nse_database_integration import NSEDatabaseManager
+
+    db = NSEDatabaseManager()
+    try:
+        return MonthComparisonEngine(db.connection, series).run(pairs, dry_run)
+    finally:
+        db.close()
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description='Month-over-month delivery/volume exceedances (step03)')
+    p.add_argument('--config', default=DEFAULT_CONFIG_FILE, help='Comparison pairs file')
+    p.add_argument('--pair', action='append', metavar='BASE:COMP',
+                   help='Baseline:comparison months, e.g. 2025-03:2025-04 (repeatable; overrides --config)')
+    p.add_argument('--all-consecutive', action='store_true',
+                   help='Compare every consecutive pair of months present in step01_equity_daily')
+    p.add_argument('--series', help='Series to compare (default from config, else EQ)')
+    p.add_argument('--dry-run', action='store_true', help='Compute and summarize without writing')
+    return p.parse_args()
+
+
+def main():
+    from nse_database_integration import NSEDatabaseManager
+
+    args = parse_args()
+    config = load_comparison_config(args.config) if os.path.exists(args.config) else {'series': 'EQ', 'pairs': []}
+    series = args.series or config['series']
+
+    db = NSEDatabaseManager()
+    try:
+        if args.pair:
+            pairs = [parse_pair(text) for text in args.pair]
+        elif args.all_consecutive or not config['pairs']:
+            pairs = consecutive_pairs(available_months(db.connection, series))
+        else:
+            pairs = config['pairs']
+        print(f"🚀 STEP 03: {len(pairs)} month comparison(s): "
+              f"{', '.join(comparison_type(p) for p in pairs)}")
+        MonthComparisonEngine(db.connection, series).run(pairs, args.dry_run)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
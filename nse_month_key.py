@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+NSE Month Key - sargable month filters on step01_equity_daily
+
+Purpose:
+  The monthly analyzers filtered with FORMAT(trade_date, 'yyyy-MM') = '2025-02'
+  or YEAR(trade_date) = 2025 AND MONTH(trade_date) = 2. A function on the
+  column hides it from every index, so each monthly peak / baseline query
+  scanned the whole table, and that cost grows with every month loaded.
+
+  step01_equity_daily gets a persisted key and a covering index:
+
+    trade_month = YEAR(trade_date) * 100 + MONTH(trade_date)      -- 202502
+    IX_step01_series_month_symbol (series, trade_month, symbol)
+        INCLUDE (trade_date, ttl_trd_qnty, deliv_qty, close_price, turnover_lacs)
+
+  so "EQ rows of February, per symbol" is one index seek that already
+  carries the volume / delivery columns the peak and baseline queries read.
+
+    SQL Server   computed column ... PERSISTED
+    PostgreSQL   GENERATED ALWAYS AS (...) STORED, index INCLUDE (12+)
+    SQLite       VIRTUAL generated column, included columns appended to the key
+    DuckDB       no generated columns via ALTER: trade_date range instead
+
+  MonthPredicates writes the WHERE fragment: trade_month = 202502 /
+  trade_month BETWEEN 202501 AND 202503 when the key exists, otherwise the
+  equivalent half-open trade_date range (still index-friendly). Months are
+  parsed to integers first, so the fragment is safe to inline.
+
+Usage:
+  python nse_month_key.py --create          # add trade_month + covering index (idempotent)
+  python nse_month_key.py                   # show key status and months present
+
+  months = MonthPredicates(conn)
+  cursor.execute(f"SELECT ... FROM step01_equity_daily WHERE series = 'EQ' AND {months.month('2025-02')}")
+"""
+
+import argparse
+from datetime import date
+from typing import List, Tuple, Union
+
+from nse_bulk_loader import SQLSERVER, POSTGRES, SQLITE, DUCKDB, detect_backend
+
+EQUITY_TABLE = 'step01_equity_daily'
+MONTH_INDEX = 'IX_step01_series_month_symbol'
+MONTH_INDEX_KEY = ['series', 'trade_month', 'symbol']
+MONTH_INDEX_INCLUDE = ['trade_date', 'ttl_trd_qnty', 'deliv_qty', 'close_price', 'turnover_lacs']
+
+Month = Union[str, int, date, Tuple[int, int]]
+
+
+def month_key(month: Month) -> int:
+    """'2025-02', '202502', 202502, (2025, 2) or a date -> 202502"""
+    if isinstance(month, date):
+        return month.year * 100 + month.month
+    if isinstance(month, tuple):
+        year, number = month
+    else:
+        text = str(month).strip().replace('-', '')
+        if len(text) != 6 or not text.isdigit():
+            raise ValueError(f"Not a year-month: {month!r} (expected e.g. '2025-02')")
+        year, number = int(text[:4]), int(text[4:])
+    if not 1 <= number <= 12:
+        raise ValueError(f"Not a year-month: {month!r}")
+    return int(year) * 100 + int(number)
+
+
+def month_label(key: int) -> str:
+    return f"{key // 100:04d}-{key % 100:02d}"
+
+
+def month_bounds(key: int) -> Tuple[date, date]:
+    """[first day, first day of next month)"""
+    year, number = divmod(key, 100)
+    return date(year, number, 1), date(year + (number == 12), number % 12 + 1, 1)
+
+
+def month_key_expr(backend: str, column: str = 'trade_date') -> str:
+    """SQL computing the year-month key from a date column"""
+    if backend == SQLSERVER:
+        return f"YEAR({column}) * 100 + MONTH({column})"
+    if backend == SQLITE:
+        return f"CAST(strftime('%Y%m', {column}) AS INTEGER)"
+    return f"CAST(EXTRACT(YEAR FROM {column}) * 100 + EXTRACT(MONTH FROM {column}) AS INTEGER)"
+
+
+def has_trade_month(connection, table: str = EQUITY_TABLE) -> bool:
+    cursor = connection.cursor()
+    try:
+        cursor.execute(f"SELECT trade_month FROM {table} WHERE 1 = 0")
+        cursor.fetchall()
+        return True
+    except Exception:
+        # PostgreSQL aborts the transaction on the failed statement
+        connection.rollback()
+        return False
+
+
+def ensure_trade_month(connection, table: str = EQUITY_TABLE) -> bool:
+    """Add the persisted trade_month key and the covering index if missing; False if unsupported"""
+    backend = detect_backend(connection)
+    if backend == DUCKDB:
+        print(f"⚠️ {backend}: generated columns cannot be added to {table}; month filters use trade_date ranges")
+        return False
+
+    expr = month_key_expr(backend)
+    key, include = ', '.join(MONTH_INDEX_KEY), ', '.join(MONTH_INDEX_INCLUDE)
+    cursor = connection.cursor()
+    added = not has_trade_month(connection, table)
+    if backend == SQLSERVER:
+        if added:
+            cursor.execute(f"ALTER TABLE {table} ADD trade_month AS ({expr}) PERSISTED")
+        cursor.execute(f"""
+            IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = '{MONTH_INDEX}' AND object_id = OBJECT_ID('{table}'))
+            CREATE INDEX {MONTH_INDEX} ON {table} ({key}) INCLUDE ({include})
+        """)
+    elif backend == POSTGRES:
+        if added:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN trade_month INTEGER GENERATED ALWAYS AS ({expr}) STORED")
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {MONTH_INDEX} ON {table} ({key}) INCLUDE ({include})")
+    else:
+        # SQLite can only ALTER in a VIRTUAL column; it is computed once into the index
+        if added:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN trade_month INTEGER GENERATED ALWAYS AS ({expr}) VIRTUAL")
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {MONTH_INDEX} ON {table} ({key}, {include})")
+    connection.commit()
+    if added:
+        print(f"✅ Added trade_month key and {MONTH_INDEX} to {table}")
+    return True
+
+
+class MonthPredicates:
+    """WHERE fragments selecting whole months of step01_equity_daily"""
+
+    def __init__(self, connection, table: str = EQUITY_TABLE, alias: str = ''):
+        self.backend = detect_backend(connection)
+        self.keyed = has_trade_month(connection, table)
+        self.prefix = f"{alias}." if alias else ''
+
+    def months(self, first: Month, last: Month) -> str:
+        """first..last inclusive"""
+        first_key, last_key = month_key(first), month_key(last)
+        if self.keyed:
+            if first_key == last_key:
+                return f"{self.prefix}trade_month = {first_key}"
+            return f"{self.prefix}trade_month BETWEEN {first_key} AND {last_key}"
+        start, _ = month_bounds(first_key)
+        _, end = month_bounds(last_key)
+        return (f"{self.prefix}trade_date >= '{start.isoformat()}' "
+                f"AND {self.prefix}trade_date < '{end.isoformat()}'")
+
+    def month(self, month: Month) -> str:
+        return self.months(month, month)
+
+    def key_column(self) -> str:
+        """Select-list expression for the month key (the stored column when present)"""
+        return f"{self.prefix}trade_month" if self.keyed else month_key_expr(self.backend, f"{self.prefix}trade_date")
+
+
+def available_months(connection, series: str = 'EQ', table: str = EQUITY_TABLE) -> List[str]:
+    """'YYYY-MM' labels present for a series (index-only on the covering index)"""
+    key = MonthPredicates(connection, table).key_column()
+    cursor = connection.cursor()
+    cursor.execute(f"SELECT DISTINCT {key} AS month_key FROM {table} WHERE series = '{series}' ORDER BY month_key")
+    return [month_label(int(row[0])) for row in cursor.fetchall()]
+
+
+def main():
+    import nse_db_pool
+
+    p = argparse.ArgumentParser(description='Persisted year-month key for step01_equity_daily')
+    p.add_argument('--config', help='Database config file (default NSE_DB_CONFIG or database_config.json)')
+    p.add_argument('--create', action='store_true', help='Add trade_month and the covering index if missing')
+    p.add_argument('--series', default='EQ')
+    args = p.parse_args()
+
+    pool = nse_db_pool.get_pool(args.config)
+    print(f"🔌 Backend: {nse_db_pool.describe(pool.config)}")
+    with pool.connection() as conn:
+        if args.create:
+            ensure_trade_month(conn)
+        predicates = MonthPredicates(conn)
+        print(f"🗓️ trade_month key: {'present' if predicates.keyed else 'missing (run with --create)'}")
+        months = available_months(conn, args.series)
+        print(f"📅 {args.series} months: {', '.join(months) if months else 'none'}")
+        if months:
+            print(f"🔎 e.g. WHERE series = '{args.series}' AND {predicates.month(months[-1])}")
+
+
+if __name__ == "__main__":
+    main()
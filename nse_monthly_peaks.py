@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+NSE Monthly Peaks - per-symbol, per-month peak rows for any set of metrics
+
+Purpose:
+  step02_monthly_analysis holds, for every month and symbol, the day with the
+  highest volume and the day with the highest delivery. It was built with two
+  ROW_NUMBER() OVER (PARTITION BY symbol ...) queries per month (one per
+  metric), and the 02_Monthly_Analysis/unique_symbol_analysis*.py scripts
+  redid the same "highest per symbol" search with a Python loop over
+  symbols for each month's CSVs.
+
+  peak_rows() does it for any frame in one pass per metric: rows are sorted
+  once by (month, symbol, value desc, completeness desc, date asc) and
+  the first row of each (month, symbol) is the peak. Ties on the value go to
+  the day with the most complete price data (non-null, non-zero close /
+  open / high / low / last, as the xlsx scripts did), then the earliest day,
+  so results no longer depend on the database's row order.
+
+  MonthlyPeakExtractor reads the whole history (or a month range) of
+  step01_equity_daily - or the Parquet lake - in a single scan, computes every
+  month at once and rewrites those months of step02_monthly_analysis in one
+  transaction. update() handles a newly loaded day: only symbols whose new
+  value reaches the stored peak (or whose stored peak is that very day, in
+  case it was corrected) are recomputed for that month.
+
+Usage:
+  python nse_monthly_peaks.py                           # all months from step01
+  python nse_monthly_peaks.py --first 2025-06 --last 2025-08
+  python nse_monthly_peaks.py --source lake --dry-run   # from nse_lake/, print counts only
+  python nse_monthly_peaks.py --update-date 2025-08-29  # incremental, after loading a day
+  python step01_equity_data_loader.py --month August --year 2025 --peaks
+
+  peaks = peak_rows(daily)               # {'VOLUME': frame, 'DELIVERY': frame}
+"""
+
+import argparse
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Sequence
+
+import pandas as pd
+
+from nse_bulk_loader import BulkLoader, POSTGRES, detect_backend
+from nse_month_key import MonthPredicates, month_bounds, month_key, month_label
+
+MONTHLY_TABLE = 'step02_monthly_analysis'
+ANALYSIS_FILE = 'DATABASE_GENERATED'
+
+# analysis_type -> step01_equity_daily column
+PEAK_METRICS = {'VOLUME': 'ttl_trd_qnty', 'DELIVERY': 'deliv_qty'}
+PRICE_COLUMNS = ['close_price', 'open_price', 'high_price', 'low_price', 'last_price']
+HISTORY_COLUMNS = ['trade_date', 'symbol', 'ttl_trd_qnty', 'deliv_qty', 'turnover_lacs'] + PRICE_COLUMNS
+
+MONTHLY_COLUMNS = {
+    'analysis_month': 'str', 'symbol': 'str', 'analysis_type': 'str', 'peak_date': 'date',
+    'peak_value': 'int', 'ttl_trd_qnty': 'int', 'deliv_qty': 'int', 'close_price': 'float',
+    'turnover_lacs': 'float', 'analysis_file': 'str',
+}
+
+IN_CHUNK = 500  # symbols per IN (...) list (SQL Server caps parameters at 2100)
+
+
+def peak_rows(frame: pd.DataFrame, metrics: Dict[str, str] = PEAK_METRICS,
+              keys: Sequence[str] = ('trade_month', 'symbol'), date_column: Optional[str] = 'trade_date',
+              price_columns: Sequence[str] = PRICE_COLUMNS) -> Dict[str, pd.DataFrame]:
+    """
+    For each metric, the row holding the maximum per key (rows with a missing
+    value are ignored). Ties: most complete price data, then earliest date.
+    Returned frames keep the input columns and are ordered by the keys.
+    """
+    completeness = sum((frame[c].notna() & (frame[c] != 0)).astype(int) for c in price_columns if c in frame.columns)
+    ranked = frame.assign(_completeness=completeness)
+    earliest = [date_column] if date_column else []
+    peaks = {}
+    for name, column in metrics.items():
+        candidates = ranked[ranked[column].notna()]
+        by = list(keys) + [column, '_completeness'] + earliest
+        ascending = [True] * len(keys) + [False, False] + [True] * len(earliest)
+        candidates = candidates.sort_values(by, ascending=ascending, kind='stable')
+        peaks[name] = candidates.drop_duplicates(list(keys)).drop(columns='_completeness')
+    return peaks
+
+
+def to_monthly_rows(peaks: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """peak_rows() output (keys trade_month, symbol) -> step02_monthly_analysis rows"""
+    frames = []
+    for analysis_type, rows in peaks.items():
+        frames.append(pd.DataFrame({
+            'analysis_month': rows['trade_month'].map(month_label),
+            'symbol': rows['symbol'],
+            'analysis_type': analysis_type,
+            'peak_date': rows['trade_date'],
+            'peak_value': rows[PEAK_METRICS[analysis_type]],
+            'ttl_trd_qnty': rows['ttl_trd_qnty'],
+            'deliv_qty': rows['deliv_qty'],
+            'close_price': rows['close_price'],
+            'turnover_lacs': rows['turnover_lacs'],
+            'analysis_file': ANALYSIS_FILE,
+        }))
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=list(MONTHLY_COLUMNS))
+
+
+class MonthlyPeakExtractor:
+    def __init__(self, connection, series: str = 'EQ'):
+        self.connection = connection
+        self.backend = detect_backend(connection)
+        self.placeholder = '%s' if self.backend == POSTGRES else '?'
+        self.series = series
+        self.months = MonthPredicates(connection)
+
+    # ---- reading step01 / the lake --------------------------------------
+
+    def _fetch(self, where: str, params: List) -> pd.DataFrame:
+        cursor = self.connection.cursor()
+        cursor.execute(f"SELECT {', '.join(HISTORY_COLUMNS)} FROM step01_equity_daily "
+                       f"WHERE series = {self.placeholder}{where}", [self.series] + params)
+        frame = pd.DataFrame.from_records([tuple(row) for row in cursor.fetchall()], columns=HISTORY_COLUMNS)
+        cursor.close()
+        return prepare_history(frame)
+
+    def load_history(self, first=None, last=None) -> pd.DataFrame:
+        """Every EQ row in first..last (default: all months), one scan"""
+        where = f" AND {self.months.months(first or last, last or first)}" if (first or last) else ''
+        return self._fetch(where, [])
+
+    def load_symbols(self, month, symbols: Sequence[str]) -> pd.DataFrame:
+        """One month of rows for some symbols"""
+        p = self.placeholder
+        frames = []
+        for start in range(0, len(symbols), IN_CHUNK):
+            chunk = list(symbols[start:start + IN_CHUNK])
+            frames.append(self._fetch(f" AND {self.months.month(month)} AND symbol IN ({', '.join([p] * len(chunk))})",
+                                      chunk))
+        return pd.concat(frames, ignore_index=True) if frames else prepare_history(pd.DataFrame(columns=HISTORY_COLUMNS))
+
+    # ---- writing step02 -------------------------------------------------
+
+    def save(self, rows: pd.DataFrame, months: Sequence[str]) -> int:
+        """Replace these months of step02_monthly_analysis with rows, in one transaction"""
+        cursor = self.connection.cursor()
+        for month in months:
+            cursor.execute(f"DELETE FROM {MONTHLY_TABLE} WHERE analysis_month = {self.placeholder}", (month,))
+        saved = BulkLoader(self.connection, MONTHLY_TABLE, MONTHLY_COLUMNS, backend=self.backend).load(rows, commit=False)
+        self.connection.commit()
+        return saved
+
+    def run(self, first=None, last=None, history: Optional[pd.DataFrame] = None, dry_run: bool = False) -> pd.DataFrame:
+        """Peaks for every month in the history (read from step01 unless given), saved unless dry_run"""
+        if history is None:
+            history = self.load_history(first, last)
+        rows = to_monthly_rows(peak_rows(history))
+        months = sorted(rows['analysis_month'].unique())
+        print(f"🏔️ {len(rows):,} peak rows for {len(months)} months from {len(history):,} daily rows")
+        if not dry_run and months:
+            self.save(rows, months)
+            print(f"✅ Replaced {', '.join(months)} in {MONTHLY_TABLE}")
+        return rows
+
+    def stored_peaks(self, month: str) -> pd.DataFrame:
+        cursor = self.connection.cursor()
+        cursor.execute(f"SELECT symbol, analysis_type, peak_value, peak_date FROM {MONTHLY_TABLE} "
+                       f"WHERE analysis_month = {self.placeholder}", (month,))
+        stored = pd.DataFrame.from_records([tuple(row) for row in cursor.fetchall()],
+                                           columns=['symbol', 'analysis_type', 'peak_value', 'peak_date'])
+        cursor.close()
+        stored['peak_value'] = pd.to_numeric(stored['peak_value'])
+        stored['peak_date'] = pd.to_datetime(stored['peak_date']).dt.date
+        return stored
+
+    def update(self, day: pd.DataFrame) -> int:
+        """
+        A newly loaded day (already in step01): recompute only the symbols whose
+        value reaches their stored month peak, or whose stored peak is that day.
+        Returns the number of peak rows rewritten.
+        """
+        day = prepare_history(day[[c for c in HISTORY_COLUMNS if c in day.columns]].copy())
+        p = self.placeholder
+        rewritten = 0
+        for key, rows in day.groupby('trade_month'):
+            month = month_label(int(key))
+            stored = self.stored_peaks(month)
+            changed = {}
+            for analysis_type, column in PEAK_METRICS.items():
+                current = stored[stored['analysis_type'] == analysis_type].set_index('symbol')
+                values = rows.set_index('symbol')[[column, 'trade_date']].dropna(subset=[column])
+                values = values.join(current, how='left')
+                hit = (values['peak_value'].isna() | (values[column] >= values['peak_value'])
+                       | (values['peak_date'] == values['trade_date']))
+                changed[analysis_type] = values.index[hit].tolist()
+
+            symbols = sorted(set().union(*changed.values()))
+            if not symbols:
+                continue
+            peaks = peak_rows(self.load_symbols(month, symbols))
+            peaks = {t: frame[frame['symbol'].isin(changed[t])] for t, frame in peaks.items()}
+            new_rows = to_monthly_rows(peaks)
+
+            cursor = self.connection.cursor()
+            for analysis_type, names in changed.items():
+                for start in range(0, len(names), IN_CHUNK):
+                    chunk = names[start:start + IN_CHUNK]
+                    cursor.execute(f"DELETE FROM {MONTHLY_TABLE} WHERE analysis_month = {p} AND analysis_type = {p} "
+                                   f"AND symbol IN ({', '.join([p] * len(chunk))})", [month, analysis_type] + chunk)
+            rewritten += BulkLoader(self.connection, MONTHLY_TABLE, MONTHLY_COLUMNS,
+                                    backend=self.backend).load(new_rows, commit=False)
+            self.connection.commit()
+            print(f"🏔️ {month}: {len(new_rows):,} peak rows recomputed for {len(symbols):,} symbols")
+        return rewritten
+
+
+def prepare_history(frame: pd.DataFrame) -> pd.DataFrame:
+    """Typed daily rows with the trade_month key"""
+    frame['trade_date'] = pd.to_datetime(frame['trade_date']).dt.date
+    dates = pd.to_datetime(frame['trade_date'])
+    frame['trade_month'] = dates.dt.year * 100 + dates.dt.month
+    frame['symbol'] = frame['symbol'].astype(str)
+    for column in frame.columns.difference(['trade_date', 'symbol', 'trade_month', 'series']):
+        frame[column] = pd.to_numeric(frame[column], errors='coerce')
+    return frame
+
+
+def load_lake_history(first=None, last=None, series: str = 'EQ') -> pd.DataFrame:
+    """The same rows from the Parquet lake (no database read)"""
+    from nse_parquet_lake import ParquetLake
+
+    start = month_bounds(month_key(first))[0] if first else None
+    end = month_bounds(month_key(last))[1] - timedelta(days=1) if last else None
+    return prepare_history(ParquetLake().scan('EQ', start=start, end=end, series=series, columns=HISTORY_COLUMNS))
+
+
+def main():
+    import nse_db_pool
+
+    p = argparse.ArgumentParser(description='Per-symbol monthly peak rows into step02_monthly_analysis')
+    p.add_argument('--config', help='Database config file (default NSE_DB_CONFIG or database_config.json)')
+    p.add_argument('--first', help='First month (YYYY-MM); default all history')
+    p.add_argument('--last', help='Last month (YYYY-MM)')
+    p.add_argument('--source', choices=['db', 'lake'], default='db', help='Read daily rows from step01 or nse_lake/')
+    p.add_argument('--update-date', help='Incremental: re-check peaks against this loaded trading day (YYYY-MM-DD)')
+    p.add_argument('--series', default='EQ')
+    p.add_argument('--dry-run', action='store_true', help='Compute and report without writing')
+    args = p.parse_args()
+
+    pool = nse_db_pool.get_pool(args.config)
+    print(f"🔌 Backend: {nse_db_pool.describe(pool.config)}")
+    with pool.connection() as conn:
+        extractor = MonthlyPeakExtractor(conn, args.series)
+        if args.update_date:
+            day = date.fromisoformat(args.update_date)
+            history = extractor.load_history(day, day)
+            history = history[history['trade_date'] == day]
+            print(f"📅 {day}: {len(history):,} rows")
+            extractor.update(history)
+            return
+        history = load_lake_history(args.first, args.last, args.series) if args.source == 'lake' else None
+        rows = extractor.run(args.first, args.last, history=history, dry_run=args.dry_run)
+        if args.dry_run:
+            print(rows.groupby(['analysis_month', 'analysis_type']).size().unstack().to_string())
+
+
+if __name__ == "__main__":
+    main()
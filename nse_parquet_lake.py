@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+NSE Parquet Lake - compact, partitioned local copy of equity and F&O history
+
+Purpose:
+  Analyses re-read raw CSVs from NSE_*_2025_Data / fo_udiff_downloads or hit
+  SQL Server. This module converts them once into a Parquet dataset:
+
+    nse_lake/
+      segment=EQ/year=2025/month=4/data.parquet
+      segment=FO/year=2025/month=2/data.parquet
+      _catalog.json          # which source file produced which trading day
+
+  Each (segment, year, month) partition is a single zstd-compressed file,
+  sorted by symbol then trade_date and written in small row groups, so the
+  min/max statistics of every row group let a single-symbol scan skip
+  everything else. EQ rows use the step01_equity_daily column names; FO rows
+  use the canonical frame from nse_fo_parser.
+
+  Appends are incremental per trading day: only source files that are new or
+  changed (size/mtime) are parsed, and only the months they fall in are
+  rewritten (existing rows for those days are replaced, so re-runs are
+  idempotent).
+
+Usage:
+  python nse_parquet_lake.py --build                      # convert everything new
+  python nse_parquet_lake.py --build --segment EQ
+  python nse_parquet_lake.py --scan TCS --start 2025-01-01 --end 2025-12-31
+  python nse_parquet_lake.py                              # catalog summary
+
+  from nse_parquet_lake import ParquetLake
+  lake = ParquetLake()
+  df = lake.scan('EQ', symbols=['TCS'], start='2025-01-01', end='2025-12-31')
+  baselines = lake.monthly_peaks(2025, 3)                 # no database needed
+"""
+
+import os
+import re
+import json
+import glob
+import argparse
+from datetime import date, datetime
+from typing import Dict, List, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from nse_bhavcopy_parser import read_bhavcopy
+from nse_fo_parser import read_fo_bhavcopy
+from nse_trading_calendar import to_date
+
+DEFAULT_LAKE_ROOT = 'nse_lake'
+CATALOG_FILE = '_catalog.json'
+COMPRESSION = 'zstd'
+
+# Rows per row group: small enough that one symbol touches ~1 group per partition
+ROW_GROUP_ROWS = {'EQ': 4096, 'FO': 16384}
+
+# step01_equity_daily column names
+EQ_COLUMN_MAPPING = {
+    'DATE1': 'trade_date', 'SYMBOL': 'symbol', 'SERIES': 'series',
+    'PREV_CLOSE': 'prev_close', 'OPEN_PRICE': 'open_price', 'HIGH_PRICE': 'high_price',
+    'LOW_PRICE': 'low_price', 'LAST_PRICE': 'last_price', 'CLOSE_PRICE': 'close_price',
+    'AVG_PRICE': 'avg_price', 'TTL_TRD_QNTY': 'ttl_trd_qnty', 'TURNOVER_LACS': 'turnover_lacs',
+    'NO_OF_TRADES': 'no_of_trades', 'DELIV_QTY': 'deliv_qty', 'DELIV_PER': 'deliv_per',
+}
+
+SOURCE_PATTERNS = {
+    'EQ': [('NSE_*_Data/cm*bhav.csv', r'cm(\d{8})bhav', '%d%m%Y'),
+           ('NSE_*_Data/sec_bhavdata_full_*.csv', r'sec_bhavdata_full_(\d{8})', '%d%m%Y')],
+    'FO': [('fo_udiff_downloads/BhavCopy_NSE_FO_0_0_0_*_F_0000.csv.zip', r'_(\d{8})_F_0000', '%Y%m%d')],
+}
+
+
+def discover_sources(segment: str, root: str = '.') -> Dict[date, str]:
+    """{trading day: source file} for every raw file of a segment on disk"""
+    sources = {}
+    for pattern, regex, fmt in SOURCE_PATTERNS[segment]:
+        for path in glob.glob(os.path.join(root, pattern)):
+            m = re.search(regex, os.path.basename(path))
+            if m:
+                sources[datetime.strptime(m.group(1), fmt).date()] = path
+    return dict(sorted(sources.items()))
+
+
+def load_day(segment: str, path: str) -> pd.DataFrame:
+    """One trading day as a lake-ready frame (plain strings, typed numerics)"""
+    if segment == 'EQ':
+        df = read_bhavcopy(path, column_mapping=EQ_COLUMN_MAPPING)
+        df['trade_date'] = df['trade_date'].dt.date
+    else:
+        df = read_fo_bhavcopy(path, fo_only=False)
+        df['trade_date'] = pd.to_datetime(df['trade_date'].astype(str), format='%Y%m%d').dt.date
+    df['source_file'] = os.path.basename(path)
+
+    # Categoricals become plain strings so Parquet keeps min/max statistics usable for pruning
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype(str).where(df[col].notna(), None)
+    return df
+
+
+class ParquetLake:
+    def __init__(self, root: str = DEFAULT_LAKE_ROOT):
+        self.root = root
+        self.catalog_path = os.path.join(root, CATALOG_FILE)
+        self.catalog: Dict[str, Dict] = {}
+        self.load_catalog()
+
+    def load_catalog(self):
+        if os.path.exists(self.catalog_path):
+            with open(self.catalog_path, 'r', encoding='utf-8') as f:
+                self.catalog = json.load(f).get('days', {})
+
+    def save_catalog(self):
+        """Atomic rewrite, same as the download manifest"""
+        os.makedirs(self.root, exist_ok=True)
+        tmp_path = self.catalog_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'updated': datetime.now().isoformat(timespec='seconds'), 'days': self.catalog},
+                      f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.catalog_path)
+
+    def partition_path(self, segment: str, year: int, month: int) -> str:
+        return os.path.join(self.root, f"segment={segment}", f"year={year}", f"month={month}", 'data.parquet')
+
+    @staticmethod
+    def _fingerprint(path: str) -> Dict:
+        stat = os.stat(path)
+        return {'source': os.path.abspath(path), 'size': stat.st_size, 'mtime': int(stat.st_mtime)}
+
+    def pending_days(self, segment: str, sources: Dict[date, str]) -> Dict[date, str]:
+        """Days whose source file is new or changed since it was last converted"""
+        pending = {}
+        for d, path in sources.items():
+            entry = self.catalog.get(f"{segment}:{d.isoformat()}")
+            fingerprint = self._fingerprint(path)
+            if not entry or any(entry.get(k) != v for k, v in fingerprint.items()):
+                pending[d] = path
+        return pending
+
+    def write_partition(self, segment: str, year: int, month: int, new_days: pd.DataFrame):
+        """Merge new days into a month partition (replacing those days) and rewrite it sorted"""
+        path = self.partition_path(segment, year, month)
+        frames = [new_days]
+        if os.path.exists(path):
+            existing = pq.read_table(path).to_pandas()
+            frames.insert(0, existing[~existing['trade_date'].isin(set(new_days['trade_date']))])
+        merged = pd.concat(frames, ignore_index=True).sort_values(['symbol', 'trade_date'], kind='stable')
+
+        table = pa.Table.from_pandas(merged, preserve_index=False)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + '.tmp'
+        pq.write_table(table, tmp_path, compression=COMPRESSION, row_group_size=ROW_GROUP_ROWS[segment],
+                       write_statistics=True)
+        os.replace(tmp_path, path)
+        return len(merged)
+
+    def build(self, segment: str, source_root: str = '.', start=None, end=None) -> int:
+        """Convert new/changed trading days of a segment; returns days converted"""
+        sources = discover_sources(segment, source_root)
+        if start or end:
+            lo, hi = to_date(start or '1900-01-01'), to_date(end or '2100-12-31')
+            sources = {d: p for d, p in sources.items() if lo <= d <= hi}
+        pending = self.pending_days(segment, sources)
+        print(f"📂 {segment}: {len(sources)} source days, {len(pending)} new or changed")
+
+        by_month: Dict[tuple, List[date]] = {}
+        for d in pending:
+            by_month.setdefault((d.year, d.month), []).append(d)
+
+        converted = 0
+        for (year, month), days in sorted(by_month.items()):
+            # (day, frame) pairs: a day that fails to parse stays uncatalogued and is retried next run
+            loaded = []
+            for d in days:
+                try:
+                    loaded.append((d, load_day(segment, pending[d])))
+                except Exception as e:
+                    print(f"   ❌ {d}: {e}")
+            if not loaded:
+                continue
+            new_days = pd.concat([frame for _, frame in loaded], ignore_index=True)
+            total = self.write_partition(segment, year, month, new_days)
+
+            for d, frame in loaded:
+                self.catalog[f"{segment}:{d.isoformat()}"] = {
+                    **self._fingerprint(pending[d]), 'rows': len(frame),
+                    'partition': self.partition_path(segment, year, month),
+                }
+            self.save_catalog()
+            converted += len(loaded)
+            print(f"   ✅ {year}-{month:02d}: +{len(loaded)} days, {len(new_days):,} rows "
+                  f"(partition now {total:,} rows)")
+        return converted
+
+    def dataset(self, segment: str):
+        return ds.dataset(os.path.join(self.root, f"segment={segment}"), format='parquet', partitioning='hive')
+
+    def _filter(self, symbols=None, start=None, end=None, series=None):
+        expr = None
+
+        def both(a, b):
+            return b if a is None else a & b
+
+        if symbols:
+            expr = both(expr, ds.field('symbol').isin(list(symbols)))
+        if series:
+            expr = both(expr, ds.field('series') == series)
+        # year/month terms only reference partition fields, so whole month files are skipped
+        if start:
+            d = to_date(start)
+            expr = both(expr, ds.field('trade_date') >= pa.scalar(d, pa.date32()))
+            expr = both(expr, (ds.field('year') > d.year)
+                        | ((ds.field('year') == d.year) & (ds.field('month') >= d.month)))
+        if end:
+            d = to_date(end)
+            expr = both(expr, ds.field('trade_date') <= pa.scalar(d, pa.date32()))
+            expr = both(expr, (ds.field('year') < d.year)
+                        | ((ds.field('year') == d.year) & (ds.field('month') <= d.month)))
+        return expr
+
+    def scan(self, segment: str, symbols: Optional[List[str]] = None, start=None, end=None,
+             columns: Optional[List[str]] = None, series: Optional[str] = None) -> pd.DataFrame:
+        """
+        Rows for the given symbols/date range. Partition fields prune whole
+        months; row-group min/max statistics on symbol and trade_date prune
+        the rest inside each file.
+        """
+        table = self.dataset(segment).to_table(columns=columns,
+                                               filter=self._filter(symbols, start, end, series))
+        return table.to_pandas()
+
+    def row_groups_touched(self, segment: str, symbols: List[str]) -> Dict[str, int]:
+        """How many row groups a symbol scan has to read vs. the total (from statistics)"""
+        touched = total = 0
+        wanted = set(symbols)
+        for fragment in self.dataset(segment).get_fragments():
+            metadata = fragment.metadata
+            column = metadata.schema.to_arrow_schema().get_field_index('symbol')
+            for i in range(metadata.num_row_groups):
+                total += 1
+                stats = metadata.row_group(i).column(column).statistics
+                if stats is None or not stats.has_min_max or any(stats.min <= s <= stats.max for s in wanted):
+                    touched += 1
+        return {'row_groups_read': touched, 'row_groups_total': total}
+
+    def monthly_peaks(self, year: int, month: int, series: str = 'EQ') -> pd.DataFrame:
+        """
+        Per-symbol MAX(deliv_qty), MAX(ttl_trd_qnty), MAX(trade_date) for a month:
+        the baseline query of the step02/step03 analyzers, without SQL Server.
+        """
+        start = date(year, month, 1)
+        end = (pd.Timestamp(start) + pd.offsets.MonthEnd(0)).date()
+        df = self.scan('EQ', start=start, end=end, series=series,
+                       columns=['symbol', 'trade_date', 'deliv_qty', 'ttl_trd_qnty'])
+        peaks = df.groupby('symbol').agg(peak_delivery=('deliv_qty', 'max'), peak_volume=('ttl_trd_qnty', 'max'),
+                                         last_date=('trade_date', 'max'))
+        return peaks[peaks['peak_delivery'] > 0].reset_index()
+
+    def monthly_daily(self, year: int, month: int, series: str = 'EQ') -> pd.DataFrame:
+        """All daily rows of a month ordered by trade_date, symbol (step03 daily query)"""
+        start = date(year, month, 1)
+        end = (pd.Timestamp(start) + pd.offsets.MonthEnd(0)).date()
+        df = self.scan('EQ', start=start, end=end, series=series)
+        return df.sort_values(['trade_date', 'symbol']).reset_index(drop=True)
+
+    def summary(self) -> Dict[str, Dict[str, Dict[str, int]]]:
+        """{segment: {YYYY-MM: {'days': n, 'rows': n}}}"""
+        result: Dict[str, Dict[str, Dict[str, int]]] = {}
+        for key, entry in self.catalog.items():
+            segment, day = key.split(':')
+            month = result.setdefault(segment, {}).setdefault(day[:7], {'days': 0, 'rows': 0})
+            month['days'] += 1
+            month['rows'] += entry['rows']
+        return result
+
+
+def main():
+    p = argparse.ArgumentParser(description='Build and query the partitioned NSE Parquet lake')
+    p.add_argument('--root', default=DEFAULT_LAKE_ROOT)
+    p.add_argument('--source-root', default='.')
+    p.add_argument('--segment', choices=['EQ', 'FO', 'ALL'], default='ALL')
+    p.add_argument('--build', action='store_true', help='Convert new/changed trading days')
+    p.add_argument('--scan', metavar='SYMBOL', help='Scan one symbol')
+    p.add_argument('--start')
+    p.add_argument('--end')
+    args = p.parse_args()
+
+    lake = ParquetLake(args.root)
+    segments = ['EQ', 'FO'] if args.segment == 'ALL' else [args.segment]
+    print("🗄️ NSE Parquet Lake")
+    print("=" * 60)
+
+    if args.build:
+        for segment in segments:
+            lake.build(segment, args.source_root, args.start, args.end)
+
+    if args.scan:
+        for segment in segments:
+            if not os.path.exists(os.path.join(args.root, f"segment={segment}")):
+                continue
+            started = datetime.now()
+            df = lake.scan(segment, symbols=[args.scan], start=args.start, end=args.end)
+            elapsed = (datetime.now() - started).total_seconds()
+            groups = lake.row_groups_touched(segment, [args.scan])
+            print(f"🔍 {segment} {args.scan}: {len(df):,} rows in {elapsed:.3f}s, "
+                  f"{groups['row_groups_read']}/{groups['row_groups_total']} row groups")
+        return
+
+    for segment, months in sorted(lake.summary().items()):
+        print(f"\n📊 {segment}")
+        for month, counts in sorted(months.items()):
+            print(f"   {month}: {counts['days']} days, {counts['rows']:,} rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,14 +2,30 @@
 """
 🚀 NSE PostgreSQL Data Importer (Final Version)
 Import NSE CSV data into PostgreSQL database with proper date handling
+
+Each file is COPY'd into a temp staging table (not WAL-logged) and merged
+into nse_stock_data with one INSERT ... ON CONFLICT, so a file costs a
+handful of round trips instead of one per row. --mode upsert keeps the
+row-wise executemany path; --benchmark times both on scratch tables.
+
+Usage:
+  python nse_postgresql_importer_final.py                 # COPY + merge
+  python nse_postgresql_importer_final.py --mode upsert
+  python nse_postgresql_importer_final.py --benchmark --files 5
 """
 
 import os
 import json
+import time
+import argparse
 import pandas as pd
 import psycopg2
 import logging
 from datetime import datetime
+from nse_bhavcopy_parser import read_bhavcopy
+from nse_bulk_loader import to_records, POSTGRES
+from nse_staged_merge import MergeSpec, StagedMerger
+from nse_load_pipeline import iter_parsed, PipelineStats, DEFAULT_WORKERS
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -41,17 +57,8 @@ def connect_to_database(config):
         logger.error(f"❌ Database connection failed: {str(e)}")
         return None
 
-def create_table_if_not_exists(conn):
-    """Create the table with correct structure matching CSV data"""
-    try:
-        cursor = conn.cursor()
-        
-        # Drop table if exists to ensure clean structure
-        cursor.execute("DROP TABLE IF EXISTS nse_stock_data")
-        
-        # Create table with proper data types
-        create_table_sql = """
-        CREATE TABLE nse_stock_data (
+STOCK_DATA_DDL = """
+        CREATE {prefix}TABLE {table} (
             id SERIAL PRIMARY KEY,
             symbol VARCHAR(50) NOT NULL,
             series VARCHAR(10) NOT NULL,
@@ -70,7 +77,19 @@ def create_table_if_not_exists(conn):
             delivery_percent DECIMAL(8,2),
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             UNIQUE(symbol, series, trade_date)
-        );
+        )"""
+
+def create_table_if_not_exists(conn):
+    """Create the table with correct structure matching CSV data"""
+    try:
+        cursor = conn.cursor()
+        
+        # Drop table if exists to ensure clean structure
+        cursor.execute("DROP TABLE IF EXISTS nse_stock_data")
+        
+        # Create table with proper data types
+        create_table_sql = f"""
+        {STOCK_DATA_DDL.format(prefix='', table='nse_stock_data')};
         
         CREATE INDEX IF NOT EXISTS idx_nse_symbol ON nse_stock_data(symbol);
         CREATE INDEX IF NOT EXISTS idx_nse_date ON nse_stock_data(trade_date);
@@ -116,92 +135,120 @@ def safe_int_convert(value):
     except:
         return None
 
-def process_csv_file(file_path, conn):
-    """Process a single CSV file and import to database"""
+# Bhavcopy columns -> nse_stock_data columns, with the kind each is converted to
+STOCK_DATA_COLUMNS = {
+    'SYMBOL': ('symbol', 'str'), 'SERIES': ('series', 'str'), 'DATE1': ('trade_date', 'date'),
+    'PREV_CLOSE': ('prev_close', 'float'), 'OPEN_PRICE': ('open_price', 'float'),
+    'HIGH_PRICE': ('high_price', 'float'), 'LOW_PRICE': ('low_price', 'float'),
+    'LAST_PRICE': ('last_price', 'float'), 'CLOSE_PRICE': ('close_price', 'float'),
+    'AVG_PRICE': ('avg_price', 'float'), 'TTL_TRD_QNTY': ('total_traded_qty', 'int'),
+    'TURNOVER_LACS': ('turnover_lacs', 'float'), 'NO_OF_TRADES': ('no_of_trades', 'int'),
+    'DELIV_QTY': ('deliverable_qty', 'int'), 'DELIV_PER': ('delivery_percent', 'float'),
+}
+
+STOCK_DATA_MERGE = MergeSpec('nse_stock_data', ['symbol', 'series', 'trade_date'],
+                             dict(STOCK_DATA_COLUMNS.values()))
+
+def parse_args():
+    p = argparse.ArgumentParser(description='Import NSE bhavcopy CSVs into PostgreSQL nse_stock_data')
+    p.add_argument('--mode', choices=['copy', 'upsert'], default='copy',
+                   help='copy: COPY into a staging table + one merge per file; upsert: row-wise executemany')
+    p.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help='Parser processes feeding the writer')
+    p.add_argument('--benchmark', action='store_true', help='Time both modes on scratch tables and exit')
+    p.add_argument('--files', type=int, default=5, help='Files used by --benchmark')
+    return p.parse_args()
+
+def parse_csv_frame(file_path):
+    """Parse one bhavcopy into a frame with nse_stock_data column names (runs in pipeline workers)"""
+    df = read_bhavcopy(file_path)
+    
+    # Check if all required columns exist
+    missing_cols = [col for col in STOCK_DATA_COLUMNS if col not in df.columns]
+    if missing_cols:
+        raise ValueError(f"Missing columns: {missing_cols}")
+    
+    df = df[df['DATE1'].notna()].rename(columns={src: dst for src, (dst, _) in STOCK_DATA_COLUMNS.items()})
+    return df[list(STOCK_DATA_MERGE.columns)]
+
+def parse_csv_file(file_path):
+    """Parse one bhavcopy into nse_stock_data insert tuples"""
+    return to_records(parse_csv_frame(file_path), STOCK_DATA_MERGE.columns)
+
+def write_records(conn, records, table='nse_stock_data'):
+    """Upsert parsed records for one file in a single transaction"""
+    insert_sql = f"""
+    INSERT INTO {table} (
+        symbol, series, trade_date, prev_close, open_price, high_price,
+        low_price, last_price, close_price, avg_price, total_traded_qty,
+        turnover_lacs, no_of_trades, deliverable_qty, delivery_percent
+    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    ON CONFLICT (symbol, series, trade_date) DO UPDATE SET
+        prev_close = EXCLUDED.prev_close,
+        open_price = EXCLUDED.open_price,
+        high_price = EXCLUDED.high_price,
+        low_price = EXCLUDED.low_price,
+        last_price = EXCLUDED.last_price,
+        close_price = EXCLUDED.close_price,
+        avg_price = EXCLUDED.avg_price,
+        total_traded_qty = EXCLUDED.total_traded_qty,
+        turnover_lacs = EXCLUDED.turnover_lacs,
+        no_of_trades = EXCLUDED.no_of_trades,
+        deliverable_qty = EXCLUDED.deliverable_qty,
+        delivery_percent = EXCLUDED.delivery_percent
+    """
+    cursor = conn.cursor()
     try:
-        # Read CSV file
-        df = pd.read_csv(file_path, skipinitialspace=True)
-        
-        # Clean column names (remove spaces)
-        df.columns = df.columns.str.strip()
-        
-        # Expected columns
-        expected_cols = ['SYMBOL', 'SERIES', 'DATE1', 'PREV_CLOSE', 'OPEN_PRICE', 
-                        'HIGH_PRICE', 'LOW_PRICE', 'LAST_PRICE', 'CLOSE_PRICE', 
-                        'AVG_PRICE', 'TTL_TRD_QNTY', 'TURNOVER_LACS', 'NO_OF_TRADES', 
-                        'DELIV_QTY', 'DELIV_PER']
-        
-        # Check if all required columns exist
-        missing_cols = [col for col in expected_cols if col not in df.columns]
-        if missing_cols:
-            logger.error(f"Missing columns: {missing_cols}")
-            return False, 0
-        
-        records_imported = 0
-        cursor = conn.cursor()
-        
-        for index, row in df.iterrows():
-            try:
-                # Convert and validate data
-                symbol = str(row['SYMBOL']).strip()
-                series = str(row['SERIES']).strip()
-                trade_date = convert_date_format(str(row['DATE1']))
-                
-                if not trade_date:
-                    continue
-                
-                # Convert numeric fields safely
-                prev_close = safe_float_convert(row['PREV_CLOSE'])
-                open_price = safe_float_convert(row['OPEN_PRICE'])
-                high_price = safe_float_convert(row['HIGH_PRICE'])
-                low_price = safe_float_convert(row['LOW_PRICE'])
-                last_price = safe_float_convert(row['LAST_PRICE'])
-                close_price = safe_float_convert(row['CLOSE_PRICE'])
-                avg_price = safe_float_convert(row['AVG_PRICE'])
-                total_traded_qty = safe_int_convert(row['TTL_TRD_QNTY'])
-                turnover_lacs = safe_float_convert(row['TURNOVER_LACS'])
-                no_of_trades = safe_int_convert(row['NO_OF_TRADES'])
-                deliverable_qty = safe_int_convert(row['DELIV_QTY'])
-                delivery_percent = safe_float_convert(row['DELIV_PER'])
-                
-                # Insert data using ON CONFLICT to handle duplicates
-                insert_sql = """
-                INSERT INTO nse_stock_data (
-                    symbol, series, trade_date, prev_close, open_price, high_price,
-                    low_price, last_price, close_price, avg_price, total_traded_qty,
-                    turnover_lacs, no_of_trades, deliverable_qty, delivery_percent
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                ON CONFLICT (symbol, series, trade_date) DO UPDATE SET
-                    prev_close = EXCLUDED.prev_close,
-                    open_price = EXCLUDED.open_price,
-                    high_price = EXCLUDED.high_price,
-                    low_price = EXCLUDED.low_price,
-                    last_price = EXCLUDED.last_price,
-                    close_price = EXCLUDED.close_price,
-                    avg_price = EXCLUDED.avg_price,
-                    total_traded_qty = EXCLUDED.total_traded_qty,
-                    turnover_lacs = EXCLUDED.turnover_lacs,
-                    no_of_trades = EXCLUDED.no_of_trades,
-                    deliverable_qty = EXCLUDED.deliverable_qty,
-                    delivery_percent = EXCLUDED.delivery_percent
-                """
-                
-                cursor.execute(insert_sql, (
-                    symbol, series, trade_date, prev_close, open_price, high_price,
-                    low_price, last_price, close_price, avg_price, total_traded_qty,
-                    turnover_lacs, no_of_trades, deliverable_qty, delivery_percent
-                ))
-                
-                records_imported += 1
-                
-            except Exception as e:
-                logger.error(f"Error processing row {index}: {str(e)}")
-                continue
-        
+        cursor.executemany(insert_sql, records)
         conn.commit()
+        return len(records)
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
         cursor.close()
-        return True, records_imported
+
+def copy_merge_frame(merger, frame):
+    """COPY one file's rows into the staging table and merge them; returns rows written"""
+    counts = merger.merge_frame(frame)
+    return counts['inserted'] + counts['updated']
+
+def benchmark(conn, file_paths):
+    """Time row-wise upsert vs COPY + merge over the same parsed files, on temp tables"""
+    frames = [parse_csv_frame(path) for path in file_paths]
+    rows = sum(len(frame) for frame in frames)
+    logger.info(f"⏱️ Benchmark: {len(frames)} files, {rows:,} rows")
+    
+    cursor = conn.cursor()
+    results = {}
+    for mode in ('upsert', 'copy'):
+        table = f"bench_nse_stock_data_{mode}"
+        cursor.execute(f"DROP TABLE IF EXISTS {table}")
+        cursor.execute(STOCK_DATA_DDL.format(prefix='TEMP ', table=table))
+        conn.commit()
+        
+        merger = StagedMerger(conn, MergeSpec(table, STOCK_DATA_MERGE.keys, STOCK_DATA_MERGE.columns), POSTGRES)
+        started = time.perf_counter()
+        for frame in frames:
+            if mode == 'copy':
+                copy_merge_frame(merger, frame)
+            else:
+                write_records(conn, to_records(frame, STOCK_DATA_MERGE.columns), table)
+        results[mode] = time.perf_counter() - started
         
+        cursor.execute(f"SELECT COUNT(*) FROM {table}")
+        logger.info(f"   {mode:>6}: {results[mode]:.2f}s ({rows / results[mode]:,.0f} rows/s), "
+                    f"{cursor.fetchone()[0]:,} rows in table")
+        cursor.execute(f"DROP TABLE {table}")
+        conn.commit()
+    cursor.close()
+    logger.info(f"🚀 COPY + merge speed-up: {results['upsert'] / results['copy']:.1f}x")
+    return results
+
+def process_csv_file(file_path, conn):
+    """Process a single CSV file and import to database"""
+    try:
+        merger = StagedMerger(conn, STOCK_DATA_MERGE, POSTGRES)
+        return True, copy_merge_frame(merger, parse_csv_frame(file_path))
     except Exception as e:
         logger.error(f"❌ Error processing file {file_path}: {str(e)}")
         return False, 0
@@ -237,6 +284,7 @@ def get_current_record_count(conn):
 
 def main():
     """Main import function"""
+    args = parse_args()
     logger.info("📊 NSE PostgreSQL Data Importer (Final)")
     logger.info("=" * 50)
     
@@ -252,6 +300,12 @@ def main():
         logger.error("❌ Could not connect to database")
         return
     
+    if args.benchmark:
+        csv_files = get_csv_files()
+        benchmark(conn, [os.path.join(directory, filename) for directory, filename in sorted(csv_files)[:args.files]])
+        conn.close()
+        return
+    
     # Create table
     if not create_table_if_not_exists(conn):
         logger.error("❌ Could not create table")
@@ -283,18 +337,26 @@ def main():
     successful_files = 0
     failed_files = 0
     
-    for directory, filename in csv_files:
-        file_path = os.path.join(directory, filename)
-        logger.info(f"   📄 Processing {filename}...")
-        
-        success, records = process_csv_file(file_path, conn)
-        if success:
-            logger.info(f"      ✅ Imported {records} records")
-            total_imported += records
+    # Worker processes parse ahead while this process owns the connection and writes
+    file_paths = [os.path.join(directory, filename) for directory, filename in csv_files]
+    merger = StagedMerger(conn, STOCK_DATA_MERGE, POSTGRES) if args.mode == 'copy' else None
+    stats = PipelineStats()
+    for file_path, frame, error in iter_parsed(file_paths, parse_csv_frame, args.workers, stats=stats):
+        logger.info(f"   📄 Processing {os.path.basename(file_path)}...")
+        try:
+            if error is not None:
+                raise error
+            if merger is not None:
+                imported = copy_merge_frame(merger, frame)
+            else:
+                imported = write_records(conn, to_records(frame, STOCK_DATA_MERGE.columns))
+            logger.info(f"      ✅ Imported {imported} records")
+            total_imported += imported
             successful_files += 1
-        else:
-            logger.error(f"      ❌ Failed to import")
+        except Exception as e:
+            logger.error(f"      ❌ Failed to import: {e}")
             failed_files += 1
+    stats.report(args.workers)
     
     # Final summary
     final_count = get_current_record_count(conn)
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+NSE PostgREST Stub - local stand-in for the Supabase REST endpoint
+
+Purpose:
+  Lets the bulk uploader be exercised end to end without a Supabase project.
+  Implements the slice of PostgREST the uploader uses, in memory:
+
+    POST /rest/v1/<table>[?on_conflict=a,b,c]   JSON array insert
+         Prefer: resolution=merge-duplicates   -> upsert on the on_conflict columns
+         (no resolution)                       -> 409 on a duplicate key, like a unique constraint
+    GET  /rest/v1/<table>                      -> rows as JSON, Content-Range: 0-(n-1)/n
+
+  A batch that hits the same key twice fails with 500 like Postgres does
+  ("ON CONFLICT DO UPDATE command cannot affect row a second time").
+
+  Failure injection for testing the retry/adaptive paths: fixed latency plus
+  a per-row cost, a share of random 503s (with Retry-After) and a body size
+  limit that answers 413.
+
+Usage:
+  python nse_postgrest_stub.py --port 54321 --latency 0.05 --fail-rate 0.1
+
+  stub = PostgrestStub(latency=0.02).start()
+  uploader = SupabaseBulkUploader(stub.url, 'any-key')
+  ...
+  stub.row_count('nse_stock_data'); stub.stop()
+"""
+
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+
+class PostgrestStub:
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, latency: float = 0.0,
+                 row_latency: float = 0.0, fail_rate: float = 0.0, max_body_bytes: int = 2_000_000):
+        self.latency = latency
+        self.row_latency = row_latency
+        self.fail_rate = fail_rate
+        self.max_body_bytes = max_body_bytes
+        self.tables: Dict[str, Dict[Tuple, dict]] = {}
+        self.requests = 0
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), _handler(self))
+        self.server.daemon_threads = True
+        self.thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'PostgrestStub':
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def row_count(self, table: str) -> int:
+        with self.lock:
+            return len(self.tables.get(table, {}))
+
+    def rows(self, table: str) -> list:
+        with self.lock:
+            return list(self.tables.get(table, {}).values())
+
+    def write(self, table: str, records: list, keys: list, upsert: bool) -> Tuple[int, str]:
+        """Apply one request atomically; returns (status, error message)"""
+        with self.lock:
+            rows = self.tables.setdefault(table, {})
+            if not keys:
+                # No conflict target: every row is new (surrogate id)
+                for record in records:
+                    rows[(len(rows),)] = record
+                return 201, ''
+            batch = {}
+            for record in records:
+                key = tuple(record.get(k) for k in keys)
+                if key in batch:
+                    return 500, 'ON CONFLICT DO UPDATE command cannot affect row a second time'
+                if key in rows and not upsert:
+                    return 409, f"duplicate key value violates unique constraint {keys}"
+                batch[key] = record
+            for key, record in batch.items():
+                rows[key] = {**rows.get(key, {}), **record}
+        return 201, ''
+
+
+def _handler(stub: PostgrestStub):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            pass
+
+        def _reply(self, status: int, body: bytes = b'', headers: Optional[dict] = None):
+            self.send_response(status)
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _error(self, status: int, message: str, headers: Optional[dict] = None):
+            self._reply(status, json.dumps({'message': message}).encode('utf-8'),
+                        {'Content-Type': 'application/json', **(headers or {})})
+
+        def _table(self) -> Optional[str]:
+            path = urlparse(self.path).path
+            prefix = '/rest/v1/'
+            return path[len(prefix):] if path.startswith(prefix) and len(path) > len(prefix) else None
+
+        def do_GET(self):
+            table = self._table()
+            if table is None:
+                return self._error(404, 'not found')
+            rows = stub.rows(table)
+            self._reply(200, json.dumps(rows).encode('utf-8'),
+                        {'Content-Type': 'application/json',
+                         'Content-Range': f"0-{max(len(rows) - 1, 0)}/{len(rows)}"})
+
+        def do_POST(self):
+            with stub.lock:
+                stub.requests += 1
+            length = int(self.headers.get('Content-Length', 0))
+            body = self.rfile.read(length)
+            table = self._table()
+            if table is None:
+                return self._error(404, 'not found')
+            if length > stub.max_body_bytes:
+                return self._error(413, 'request entity too large')
+            try:
+                records = json.loads(body)
+            except ValueError as e:
+                return self._error(400, f"invalid JSON: {e}")
+            records = records if isinstance(records, list) else [records]
+
+            time.sleep(stub.latency + stub.row_latency * len(records))
+            if stub.fail_rate and random.random() < stub.fail_rate:
+                return self._error(503, 'service unavailable (injected)', {'Retry-After': '0'})
+
+            query = parse_qs(urlparse(self.path).query)
+            keys = query.get('on_conflict', [''])[0].split(',') if 'on_conflict' in query else []
+            upsert = 'resolution=merge-duplicates' in self.headers.get('Prefer', '')
+            status, message = stub.write(table, records, keys, upsert)
+            if message:
+                return self._error(status, message)
+            self._reply(status)
+
+    return Handler
+
+
+def main():
+    p = argparse.ArgumentParser(description='Local PostgREST stand-in for upload testing')
+    p.add_argument('--host', default='127.0.0.1')
+    p.add_argument('--port', type=int, default=54321)
+    p.add_argument('--latency', type=float, default=0.0, help='Seconds added to every POST')
+    p.add_argument('--row-latency', type=float, default=0.0, help='Seconds added per posted row')
+    p.add_argument('--fail-rate', type=float, default=0.0, help='Share of POSTs answered 503')
+    p.add_argument('--max-body-bytes', type=int, default=2_000_000, help='Larger bodies get 413')
+    args = p.parse_args()
+
+    stub = PostgrestStub(args.host, args.port, args.latency, args.row_latency,
+                         args.fail_rate, args.max_body_bytes)
+    print(f"🧪 PostgREST stand-in listening on {stub.url} (Ctrl+C to stop)")
+    try:
+        stub.server.serve_forever()
+    except KeyboardInterrupt:
+        stub.stop()
+
+
+if __name__ == "__main__":
+    main()
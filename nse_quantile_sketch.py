@@ -0,0 +1,422 @@
+#!/usr/bin/env python3
+"""
+NSE Quantile Sketch - mergeable per-symbol percentile baselines
+
+Purpose:
+  The statistical baselines approximated percentiles in SQL as
+  avg + stddev * 0.67 / 1.0 / 1.64 (normal-distribution z-scores). Daily
+  volume and delivery are heavily right-skewed, so those "medians" sat
+  above the mean and the p95 was arbitrary. This module keeps, per
+  (series, symbol, trade_month, metric), a compact summary of the daily
+  values in step01_quantile_sketches:
+
+    n, mean, m2, min, max     exact moments, merged with Chan's formula
+    sketch                    KLL-style compactor levels (JSON)
+
+  The sketch holds the values themselves until more than k (default 200)
+  arrive, so for a month - or any period up to ~k trading days - quantiles
+  are exact (linear interpolation, same as PERCENTILE_CONT / numpy). Past k
+  it compacts like KLL: error ~1/k in rank, bounded memory, and any set
+  of monthly sketches merges into the sketch of their union.
+
+  A baseline for any period is built from the stored monthly rows - one
+  indexed read of the sketch table, not a rescan of step01_equity_daily.
+  When every part of a symbol's period is exact the quantiles are computed
+  for all symbols at once with a grouped numpy quantile; only symbols
+  past k go through sketch merging.
+
+  Metrics: volume (ttl_trd_qnty), delivery (deliv_qty), turnover
+  (turnover_lacs), trades (no_of_trades), price (close_price). Days with no
+  volume are skipped, as in the old baseline query; a NULL in another column
+  only leaves that day out of that metric (the old query dropped the whole
+  day when deliv_qty was NULL, so trading_days now counts such days too).
+
+  Freshness: step01_quantile_sketch_months records, per month, the step01
+  row count and latest trade_date the sketches were built from. A month
+  whose count or latest day has changed since (late files, a month sketched
+  while still loading) is rebuilt before its baselines are read.
+
+Usage:
+  python nse_quantile_sketch.py --refresh 2025-01:2025-08
+  python nse_quantile_sketch.py --baseline 2025-02 --symbol RELIANCE
+  python nse_quantile_sketch.py --baseline 2025-01:2025-06 --out baselines.csv
+
+  store = SketchStore(conn)
+  store.ensure_months(['2025-02'])                  # build missing or stale months from step01
+  baselines = store.baselines('2025-02', min_days=5)  # one row per symbol
+"""
+
+import json
+import math
+import argparse
+from typing import Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from nse_bulk_loader import BulkLoader, SQLSERVER, POSTGRES, detect_backend
+from nse_month_key import MonthPredicates, month_key, month_label
+
+SKETCH_TABLE = 'step01_quantile_sketches'
+SKETCH_MONTHS_TABLE = 'step01_quantile_sketch_months'
+DEFAULT_K = 200
+DEFAULT_QUANTILES = (0.5, 0.75, 0.95)
+QUANTILE_NAMES = {0.5: 'median', 0.75: 'p75', 0.95: 'p95'}
+
+# metric -> step01_equity_daily column
+METRICS = {
+    'volume': 'ttl_trd_qnty',
+    'delivery': 'deliv_qty',
+    'turnover': 'turnover_lacs',
+    'trades': 'no_of_trades',
+    'price': 'close_price',
+}
+
+SKETCH_COLUMNS = {
+    'series': 'str', 'symbol': 'str', 'trade_month': 'int', 'metric': 'str',
+    'n': 'int', 'mean': 'float', 'm2': 'float', 'min_value': 'float', 'max_value': 'float',
+    'sketch': 'str',
+}
+
+
+class QuantileSketch:
+    """
+    KLL-style quantile sketch. Level h holds items of weight 2**h; a level
+    over capacity is sorted and every other item (alternating offset) is
+    promoted. With a single level nothing was compacted and the sketch is
+    the exact sample.
+    """
+
+    def __init__(self, k: int = DEFAULT_K, levels: Optional[List[np.ndarray]] = None):
+        self.k = k
+        self.levels = levels if levels is not None else [np.empty(0)]
+        self._offset = 0
+
+    @classmethod
+    def from_values(cls, values: Iterable[float], k: int = DEFAULT_K) -> 'QuantileSketch':
+        sketch = cls(k, [np.sort(np.asarray(values, dtype=np.float64))])
+        sketch._compress()
+        return sketch
+
+    @classmethod
+    def from_json(cls, payload: str, k: int = DEFAULT_K) -> 'QuantileSketch':
+        levels = json.loads(payload)
+        return cls(k, [np.asarray(level, dtype=np.float64) for level in levels])
+
+    def to_json(self) -> str:
+        return json.dumps([level.tolist() for level in self.levels], separators=(',', ':'))
+
+    @property
+    def exact(self) -> bool:
+        return len(self.levels) == 1
+
+    @property
+    def count(self) -> int:
+        return int(sum(len(level) << h for h, level in enumerate(self.levels)))
+
+    def _capacity(self, h: int) -> int:
+        return max(2, math.ceil(self.k * (2 / 3) ** (len(self.levels) - 1 - h)))
+
+    def _compress(self):
+        h = 0
+        while h < len(self.levels):
+            level = self.levels[h]
+            if len(level) > self._capacity(h):
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                level = np.sort(level)
+                # An odd item stays behind; the rest halve into the next level
+                keep = level[-1:] if len(level) % 2 else level[:0]
+                pairs = level[:len(level) - len(keep)]
+                promoted = pairs[self._offset::2]
+                self._offset ^= 1
+                self.levels[h] = keep
+                self.levels[h + 1] = np.concatenate([self.levels[h + 1], promoted])
+            h += 1
+
+    def merge(self, other: 'QuantileSketch') -> 'QuantileSketch':
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for h, level in enumerate(other.levels):
+            self.levels[h] = np.concatenate([self.levels[h], level])
+        self._compress()
+        return self
+
+    def quantiles(self, qs: Sequence[float]) -> np.ndarray:
+        if self.count == 0:
+            return np.full(len(qs), np.nan)
+        if self.exact:
+            return np.quantile(self.levels[0], qs)
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level), 1 << h) for h, level in enumerate(self.levels)])
+        order = np.argsort(values, kind='stable')
+        values, cumulative = values[order], np.cumsum(weights[order])
+        ranks = np.asarray(qs) * (cumulative[-1] - 1)
+        return values[np.searchsorted(cumulative - 1, ranks, side='left').clip(0, len(values) - 1)]
+
+
+def month_range(first, last) -> List[int]:
+    """Month keys first..last inclusive"""
+    key, last_key = month_key(first), month_key(last)
+    keys = []
+    while key <= last_key:
+        keys.append(key)
+        key = key + 1 if key % 100 < 12 else (key // 100 + 1) * 100 + 1
+    return keys
+
+
+def merge_moments(rows: pd.DataFrame, keys: List[str]) -> pd.DataFrame:
+    """Combine (n, mean, m2, min, max) rows per key (Chan et al. parallel variance)"""
+    rows = rows.assign(weighted=rows['n'] * rows['mean'])
+    merged = rows.groupby(keys, sort=False).agg(
+        n=('n', 'sum'), weighted=('weighted', 'sum'), m2=('m2', 'sum'),
+        min_value=('min_value', 'min'), max_value=('max_value', 'max'))
+    merged['mean'] = merged['weighted'] / merged['n']
+    # m2 of the union = sum of the parts' m2 + sum n_i * (mean_i - mean)^2
+    total_mean = rows.join(merged['mean'].rename('total_mean'), on=keys)['total_mean']
+    rows = rows.assign(spread=rows['n'] * (rows['mean'] - total_mean) ** 2)
+    merged['m2'] += rows.groupby(keys, sort=False)['spread'].sum()
+    return merged.drop(columns='weighted')
+
+
+class SketchStore:
+    def __init__(self, connection, series: str = 'EQ', k: int = DEFAULT_K, table: str = SKETCH_TABLE,
+                 months_table: str = SKETCH_MONTHS_TABLE):
+        self.connection = connection
+        self.backend = detect_backend(connection)
+        self.series = series
+        self.k = k
+        self.table = table
+        self.months_table = months_table
+        self.placeholder = '%s' if self.backend == POSTGRES else '?'
+        self.months = MonthPredicates(connection)
+        self.ensure_table()
+
+    def ensure_table(self):
+        text = 'NVARCHAR(MAX)' if self.backend == SQLSERVER else 'TEXT'
+        ddl = (f"{self.table} (series VARCHAR(10) NOT NULL, symbol VARCHAR(50) NOT NULL, "
+               f"trade_month INT NOT NULL, metric VARCHAR(20) NOT NULL, n INT NOT NULL, "
+               f"mean FLOAT, m2 FLOAT, min_value FLOAT, max_value FLOAT, sketch {text}, "
+               f"PRIMARY KEY (series, trade_month, symbol, metric))")
+        months_ddl = (f"{self.months_table} (series VARCHAR(10) NOT NULL, trade_month INT NOT NULL, "
+                      f"source_rows INT NOT NULL, last_trade_date DATE, PRIMARY KEY (series, trade_month))")
+        cursor = self.connection.cursor()
+        for table, definition in ((self.table, ddl), (self.months_table, months_ddl)):
+            if self.backend == SQLSERVER:
+                cursor.execute(f"IF OBJECT_ID('{table}', 'U') IS NULL CREATE TABLE {definition}")
+            else:
+                cursor.execute(f"CREATE TABLE IF NOT EXISTS {definition}")
+        self.connection.commit()
+
+    # ---- building from step01 ----------------------------------------
+
+    def source_state(self, first: int, last: int) -> dict:
+        """{trade_month: (rows, latest trade_date)} of step01_equity_daily for the months"""
+        key = self.months.key_column()
+        cursor = self.connection.cursor()
+        cursor.execute(f"SELECT {key}, COUNT(*), MAX(trade_date) FROM step01_equity_daily "
+                       f"WHERE series = {self.placeholder} AND {self.months.months(first, last)} "
+                       f"GROUP BY {key}", (self.series,))
+        state = {int(row[0]): (int(row[1]), _day(row[2])) for row in cursor.fetchall()}
+        cursor.close()
+        return state
+
+    def stored_state(self, first: int, last: int) -> dict:
+        """{trade_month: (rows, latest trade_date)} the stored sketches were built from"""
+        p = self.placeholder
+        cursor = self.connection.cursor()
+        cursor.execute(f"SELECT trade_month, source_rows, last_trade_date FROM {self.months_table} "
+                       f"WHERE series = {p} AND trade_month BETWEEN {p} AND {p}", (self.series, first, last))
+        state = {int(row[0]): (int(row[1]), _day(row[2])) for row in cursor.fetchall()}
+        cursor.close()
+        return state
+
+    def daily_values(self, first: int, last: int) -> pd.DataFrame:
+        """Long (symbol, trade_month, metric, value) frame for the months, NULLs dropped"""
+        columns = list(METRICS.values())
+        cursor = self.connection.cursor()
+        cursor.execute(f"SELECT symbol, trade_date, {', '.join(columns)} FROM step01_equity_daily "
+                       f"WHERE series = {self.placeholder} AND {self.months.months(first, last)} "
+                       f"AND ttl_trd_qnty > 0", (self.series,))
+        daily = pd.DataFrame.from_records([tuple(row) for row in cursor.fetchall()],
+                                          columns=['symbol', 'trade_date'] + columns)
+        cursor.close()
+        dates = pd.to_datetime(daily.pop('trade_date'))
+        daily['trade_month'] = dates.dt.year * 100 + dates.dt.month
+        daily = daily.rename(columns={column: metric for metric, column in METRICS.items()})
+        long = daily.melt(id_vars=['symbol', 'trade_month'], var_name='metric', value_name='value')
+        long['value'] = pd.to_numeric(long['value'], errors='coerce')
+        return long.dropna(subset=['value'])
+
+    def summarize(self, long: pd.DataFrame) -> pd.DataFrame:
+        """One stored row per (symbol, trade_month, metric): moments plus the sketch payload"""
+        long = long.sort_values(['symbol', 'trade_month', 'metric', 'value'], kind='stable')
+        keys = ['symbol', 'trade_month', 'metric']
+        grouped = long.groupby(keys, sort=False)['value']
+        rows = grouped.agg(n='size', mean='mean', min_value='min', max_value='max')
+        rows['m2'] = grouped.var(ddof=0).fillna(0) * rows['n']
+        rows['sketch'] = [QuantileSketch.from_values(values, self.k).to_json() for values in grouped.agg(list)]
+        rows = rows.reset_index()
+        rows['series'] = self.series
+        return rows
+
+    def refresh_months(self, months: Sequence) -> int:
+        """Rebuild the stored rows of these months from step01_equity_daily; returns rows written"""
+        keys = sorted({month_key(m) for m in months})
+        if not keys:
+            return 0
+        # State is read before the values, so rows landing in between only cause one extra rebuild later
+        state = self.source_state(keys[0], keys[-1])
+        rows = self.summarize(self.daily_values(keys[0], keys[-1]))
+        rows = rows[rows['trade_month'].isin(keys)]
+        cursor = self.connection.cursor()
+        p = self.placeholder
+        for key in keys:
+            cursor.execute(f"DELETE FROM {self.table} WHERE series = {p} AND trade_month = {p}", (self.series, key))
+            cursor.execute(f"DELETE FROM {self.months_table} WHERE series = {p} AND trade_month = {p}",
+                           (self.series, key))
+            if key in state:
+                cursor.execute(f"INSERT INTO {self.months_table} (series, trade_month, source_rows, last_trade_date) "
+                               f"VALUES ({p}, {p}, {p}, {p})", (self.series, key) + state[key])
+        saved = BulkLoader(self.connection, self.table, SKETCH_COLUMNS, backend=self.backend).load(rows, commit=False)
+        self.connection.commit()
+        return saved
+
+    def ensure_months(self, months: Sequence) -> List[int]:
+        """
+        Build months whose sketches are missing or were built from different
+        step01 rows (count or latest trade_date changed); returns the months built.
+        """
+        keys = sorted({month_key(m) for m in months})
+        if not keys:
+            return []
+        source = self.source_state(keys[0], keys[-1])
+        stored = self.stored_state(keys[0], keys[-1])
+        stale = [key for key in keys if source.get(key) != stored.get(key)]
+        if stale:
+            print(f"🧮 Rebuilding sketches for {', '.join(month_label(key) for key in stale)}")
+            self.refresh_months(stale)
+        return stale
+
+    # ---- baselines -----------------------------------------------------
+
+    def load(self, first: int, last: int, symbols: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        p = self.placeholder
+        sql = (f"SELECT symbol, trade_month, metric, n, mean, m2, min_value, max_value, sketch FROM {self.table} "
+               f"WHERE series = {p} AND trade_month BETWEEN {p} AND {p}")
+        params = [self.series, first, last]
+        if symbols:
+            sql += f" AND symbol IN ({', '.join([p] * len(symbols))})"
+            params += list(symbols)
+        cursor = self.connection.cursor()
+        cursor.execute(sql, params)
+        rows = pd.DataFrame.from_records([tuple(row) for row in cursor.fetchall()],
+                                         columns=['symbol', 'trade_month', 'metric', 'n', 'mean', 'm2',
+                                                  'min_value', 'max_value', 'sketch'])
+        cursor.close()
+        for col in ['n', 'mean', 'm2', 'min_value', 'max_value']:
+            rows[col] = pd.to_numeric(rows[col])
+        return rows
+
+    def period_quantiles(self, rows: pd.DataFrame, qs: Sequence[float]) -> pd.DataFrame:
+        """(symbol, metric) x quantile: exact grouped quantile where possible, sketch merge otherwise"""
+        keys = ['symbol', 'metric']
+        # A stored sketch is only compacted past k values, so a period totalling
+        # <= k values is made of exact samples
+        exact_group = rows.groupby(keys, sort=False)['n'].transform('sum') <= self.k
+
+        results = []
+        small = rows[exact_group]
+        if not small.empty:
+            values = small['sketch'].map(lambda payload: json.loads(payload)[0])
+            long = small[keys].assign(value=values).explode('value')
+            long['value'] = long['value'].astype('float64')
+            exact = long.groupby(keys, sort=False)['value'].quantile(list(qs)).unstack()
+            results.append(exact)
+
+        large = rows[~exact_group]
+        if not large.empty:
+            merged = {}
+            for (symbol, metric), group in large.groupby(keys, sort=False):
+                sketch = QuantileSketch(self.k)
+                for payload in group['sketch']:
+                    sketch.merge(QuantileSketch.from_json(payload, self.k))
+                merged[(symbol, metric)] = sketch.quantiles(qs)
+            approx = pd.DataFrame.from_dict(merged, orient='index', columns=list(qs))
+            approx.index = pd.MultiIndex.from_tuples(approx.index, names=keys)
+            results.append(approx)
+
+        return pd.concat(results) if results else pd.DataFrame(columns=list(qs))
+
+    def baselines(self, first, last=None, min_days: int = 1, qs: Sequence[float] = DEFAULT_QUANTILES,
+                  symbols: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """
+        One row per symbol for the period first..last (inclusive months):
+        trading_days plus avg_/stddev_/min_/max_/median_/p75_/p95_<metric>.
+        Months without stored sketches are built first.
+        """
+        keys = month_range(first, last if last is not None else first)
+        self.ensure_months(keys)
+
+        rows = self.load(keys[0], keys[-1], symbols)
+        if rows.empty:
+            return pd.DataFrame()
+        moments = merge_moments(rows, ['symbol', 'metric'])
+        moments['stddev'] = np.sqrt(moments['m2'] / (moments['n'] - 1)).where(moments['n'] > 1)
+        quantiles = self.period_quantiles(rows, qs).rename(columns=lambda q: QUANTILE_NAMES.get(q, f"q{q:g}"))
+        stats = moments.join(quantiles).rename(columns={'mean': 'avg', 'min_value': 'min', 'max_value': 'max'})
+        stats = stats.drop(columns=['m2', 'n']).join(moments['n'])
+
+        wide = stats.drop(columns='n').unstack('metric')
+        wide.columns = [f"{stat}_{metric}" for stat, metric in wide.columns]
+        # Trading days = days with volume (every stored day has one)
+        wide['trading_days'] = stats['n'].xs('volume', level='metric')
+        wide = wide[wide['trading_days'] >= min_days].reset_index()
+        return wide.sort_values('symbol').reset_index(drop=True)
+
+
+def _day(value) -> Optional[str]:
+    """Driver date/datetime/string -> 'YYYY-MM-DD' (comparable across backends)"""
+    return pd.Timestamp(value).date().isoformat() if value is not None else None
+
+
+def parse_months(text: str) -> List[str]:
+    """'2025-01:2025-03' or '2025-02' -> month labels"""
+    first, _, last = text.partition(':')
+    return [month_label(key) for key in month_range(first, last or first)]
+
+
+def main():
+    import nse_db_pool
+
+    p = argparse.ArgumentParser(description='Per-symbol quantile sketches for step01_equity_daily')
+    p.add_argument('--config', help='Database config file (default NSE_DB_CONFIG or database_config.json)')
+    p.add_argument('--series', default='EQ')
+    p.add_argument('--k', type=int, default=DEFAULT_K, help='Sketch size (exact up to k values)')
+    p.add_argument('--refresh', metavar='FIRST[:LAST]', help='Rebuild sketches for these months')
+    p.add_argument('--baseline', metavar='FIRST[:LAST]', help='Print/save the baseline for this period')
+    p.add_argument('--min-days', type=int, default=1)
+    p.add_argument('--symbol', action='append', help='Limit the baseline to these symbols')
+    p.add_argument('--out', help='CSV path for the baseline')
+    args = p.parse_args()
+
+    pool = nse_db_pool.get_pool(args.config)
+    print(f"🔌 Backend: {nse_db_pool.describe(pool.config)}")
+    with pool.connection() as conn:
+        store = SketchStore(conn, args.series, args.k)
+        if args.refresh:
+            months = parse_months(args.refresh)
+            print(f"🧮 Rebuilt {store.refresh_months(months):,} sketch rows for {', '.join(months)}")
+        if args.baseline:
+            months = parse_months(args.baseline)
+            baselines = store.baselines(months[0], months[-1], args.min_days, symbols=args.symbol)
+            print(f"📊 Baselines for {months[0]}..{months[-1]}: {len(baselines):,} symbols")
+            if args.out:
+                baselines.to_csv(args.out, index=False)
+                print(f"💾 Saved to {args.out}")
+            else:
+                print(baselines.head(20).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -5,7 +5,8 @@ NSE Database Query Tool
 Simple command-line tool for querying NSE stock market data.
 Provides common queries and analysis functions.
 
-Requirements: None (uses built-in sqlite3)
+Requirements: None (uses built-in sqlite3); numpy + pandas for the optional
+symbol store (nse_symbol_store.py)
 
 Author: Generated for NSE data analysis
 Date: September 2025
@@ -15,10 +16,19 @@ import sqlite3
 import os
 from datetime import datetime, timedelta
 
+try:
+    import pandas as pd
+    from nse_symbol_store import SymbolStore, SQLITE_COLUMN_NAMES
+except ImportError:
+    SymbolStore = None
+
 class NSEQueryTool:
-    def __init__(self, db_path="nse_data.db"):
+    def __init__(self, db_path="nse_data.db", store_path="nse_symbol_store"):
         """Initialize NSE Query Tool"""
         self.db_path = db_path
+        # Memory-mapped per-symbol history (nse_symbol_store.py --build), used when present
+        self.store = SymbolStore.open_if_exists(store_path) if SymbolStore is not None else None
+        self._store_current = None
         if not os.path.exists(db_path):
             print(f"❌ Database not found: {db_path}")
             print("💡 Run nse_database.py first to create and populate the database")
@@ -161,25 +171,58 @@ class NSEQueryTool:
         else:
             print("❌ Please provide a date (DD-Mon-YYYY format)")
     
+    def store_is_current(self):
+        """
+        True if the symbol store was built from what stock_data holds now (row
+        count and latest date of the store's series). Checked once per session; if not, warn and let
+        callers read from SQL.
+        """
+        if self._store_current is None:
+            cursor = self.conn.cursor()
+            # Dates are DD-Mon-YYYY text, so MAX(date) would be alphabetical: parse the distinct days instead
+            cursor.execute("SELECT date, COUNT(*) FROM stock_data WHERE series = ? GROUP BY date",
+                           (self.store.meta['series'],))
+            per_day = cursor.fetchall()
+            rows = sum(count for _, count in per_day)
+            latest = (pd.to_datetime(pd.Series([day for day, _ in per_day]).str.strip(), format='mixed',
+                                     dayfirst=True).max().date() if per_day else None)
+            self._store_current = self.store.matches(rows, latest)
+            if not self._store_current:
+                print(f"⚠️ Symbol store is behind the database "
+                      f"(store: {self.store.meta['rows']:,} rows to {self.store.last_date}, "
+                      f"database: {rows:,} rows to {latest}); reading from the database - "
+                      f"rebuild with nse_symbol_store.py --build")
+        return self._store_current
+    
     def stock_performance(self, symbol):
         """Show performance of a specific stock"""
-        cursor = self.conn.cursor()
-        
-        cursor.execute("""
-            SELECT date, open_price, high_price, low_price, close_price, 
-                   total_traded_qty, delivery_percentage
-            FROM stock_data 
-            WHERE symbol = ? AND series = 'EQ'
-            ORDER BY date
-        """, (symbol.upper(),))
-        
-        results = cursor.fetchall()
+        symbol = symbol.strip().upper()
+        if self.store is not None and symbol in self.store and self.store_is_current():
+            df = self.store.frame(symbol, fields=['trade_date', 'open_price', 'high_price', 'low_price',
+                                                  'close_price', 'ttl_trd_qnty', 'deliv_per'],
+                                  column_names=SQLITE_COLUMN_NAMES)
+            df['date'] = df['date'].dt.strftime('%d-%b-%Y')
+            df['total_traded_qty'] = df['total_traded_qty'].fillna(0).astype('int64')
+            df['delivery_percentage'] = df['delivery_percentage'].fillna(0)
+            results = df.to_dict('records')
+        else:
+            cursor = self.conn.cursor()
+            
+            cursor.execute("""
+                SELECT date, open_price, high_price, low_price, close_price, 
+                       total_traded_qty, delivery_percentage
+                FROM stock_data 
+                WHERE symbol = ? AND series = 'EQ'
+                ORDER BY date
+            """, (symbol,))
+            
+            results = cursor.fetchall()
         
         if not results:
             print(f"❌ No data found for {symbol}")
             return
         
-        print(f"\n📈 Performance of {symbol.upper()}:")
+        print(f"\n📈 Performance of {symbol}:")
         print("-" * 80)
         print(f"{'Date':<12} {'Open':<8} {'High':<8} {'Low':<8} {'Close':<8} {'Volume':<12} {'Del%':<6}")
         print("-" * 80)
@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+"""
+NSE Rolling Baseline - N-trading-day baselines updated one day at a time
+
+Purpose:
+  The step03 analyzers compare each day against the previous calendar
+  month: every month is a full recompute, and a spike that starts late in
+  one month is judged against a baseline that already contains it (or, on
+  the 1st, against a month it never saw). This keeps, per symbol and
+  metric, rolling windows over the last N trading days (default 20 and 60):
+
+    ring buffer   symbols x depth values (depth = largest window), one slot per trading day
+    running sums  sum / sum of squares / count per window -> mean, variance
+
+  Applying a day is O(symbols): the new values are added to each window's
+  sums, the value falling out of each window is subtracted, and today's
+  column overwrites the oldest ring slot. Min / max / median / p75 / p95
+  come from the window's slots (at most depth values per symbol - an exact
+  sample, as the quantile sketches are below k), vectorized over symbols.
+  Sums are re-derived from the ring every depth days so float drift
+  cannot accumulate.
+
+  Daily exceedance uses the step03 flags (value > avg / p75 / p95 / max)
+  against the windows as they stood before the day, then applies the day.
+  Rows exceeding the volume or delivery average are written to
+  step03_rolling_exceedances, one row per window.
+
+  The state is saved as a small .npz next to the scripts. If it is missing
+  or behind step01 (days loaded without the tracker), it is rebuilt from the
+  last depth trading days of step01_equity_daily - one range read.
+
+Usage:
+  python nse_rolling_baseline.py --date 2025-03-14                # one day from step01
+  python nse_rolling_baseline.py --since 2025-03-01 --until 2025-03-31
+  python nse_rolling_baseline.py --since 2025-03-01 --windows 20 60 --dry-run
+  python step01_equity_data_loader.py --month March --year 2025 --rolling   # as bhavcopies load
+
+  tracker = RollingExceedanceTracker(conn)
+  flagged = tracker.process_day(trade_date, day_frame)   # trade_date, symbol, ttl_trd_qnty, deliv_qty
+"""
+
+import os
+import argparse
+import warnings
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from nse_bulk_loader import BulkLoader, SQLSERVER, POSTGRES, detect_backend
+
+ROLLING_TABLE = 'step03_rolling_exceedances'
+DEFAULT_WINDOWS = (20, 60)
+DEFAULT_STATE = 'rolling_baseline_state.npz'
+MIN_DAYS = 5  # same minimum as the monthly baselines
+
+# metric -> step01_equity_daily column
+METRICS = {'volume': 'ttl_trd_qnty', 'delivery': 'deliv_qty'}
+THRESHOLDS = ('avg', 'p75', 'p95', 'max')
+
+ROLLING_COLUMNS = {
+    'trade_date': 'date', 'symbol': 'str', 'series': 'str', 'window_days': 'int',
+    'volume': 'int', 'delivery': 'int', 'baseline_days': 'int',
+    'avg_volume': 'float', 'p75_volume': 'float', 'p95_volume': 'float', 'max_volume': 'float',
+    'avg_delivery': 'float', 'p75_delivery': 'float', 'p95_delivery': 'float', 'max_delivery': 'float',
+    'volume_exceeded_avg': 'int', 'volume_exceeded_p75': 'int',
+    'volume_exceeded_p95': 'int', 'volume_exceeded_max': 'int',
+    'delivery_exceeded_avg': 'int', 'delivery_exceeded_p75': 'int',
+    'delivery_exceeded_p95': 'int', 'delivery_exceeded_max': 'int',
+    'volume_increase_pct': 'float', 'delivery_increase_pct': 'float',
+}
+
+
+def nan_quantiles(values: np.ndarray, qs: Sequence[float]) -> np.ndarray:
+    """
+    Linear-interpolation quantiles along the last axis ignoring NaN, for every
+    row at once (np.nanquantile falls back to a Python loop per row when NaNs
+    are present). Returns (len(qs), *values.shape[:-1]).
+    """
+    ordered = np.sort(values, axis=-1)                      # NaN sorts last
+    counts = (~np.isnan(ordered)).sum(axis=-1)
+    results = []
+    for q in qs:
+        position = q * np.maximum(counts - 1, 0)
+        lower = np.floor(position).astype(np.int64)
+        upper = np.minimum(lower + 1, np.maximum(counts - 1, 0))
+        low = np.take_along_axis(ordered, lower[..., None], axis=-1)[..., 0]
+        high = np.take_along_axis(ordered, upper[..., None], axis=-1)[..., 0]
+        results.append(np.where(counts > 0, low + (high - low) * (position - lower), np.nan))
+    return np.stack(results)
+
+
+class RollingBaselines:
+    """Rolling per-symbol windows over trading days for several metrics at once"""
+
+    def __init__(self, windows: Sequence[int] = DEFAULT_WINDOWS, metrics: Sequence[str] = tuple(METRICS),
+                 min_days: int = MIN_DAYS):
+        self.windows = sorted(set(int(w) for w in windows))
+        self.metrics = list(metrics)
+        self.min_days = min_days
+        self.depth = self.windows[-1]
+        self.symbols: Dict[str, int] = {}
+        self.ring = np.full((len(self.metrics), 0, self.depth), np.nan)
+        self.days = 0                    # trading days applied so far
+        self.dates: List[date] = []      # last depth dates, oldest first
+        self._reset_sums()
+
+    def _reset_sums(self):
+        shape = self.ring.shape[:2]
+        self.sums = {w: np.zeros(shape) for w in self.windows}
+        self.squares = {w: np.zeros(shape) for w in self.windows}
+        self.counts = {w: np.zeros(shape) for w in self.windows}
+
+    @property
+    def last_date(self) -> Optional[date]:
+        return self.dates[-1] if self.dates else None
+
+    def _index(self, symbols: Sequence[str]) -> np.ndarray:
+        """Ring rows for these symbols, adding rows for symbols not seen before"""
+        new = [s for s in pd.unique(np.asarray(symbols, dtype=object)) if s not in self.symbols]
+        if new:
+            start = len(self.symbols)
+            self.symbols.update({s: start + i for i, s in enumerate(new)})
+            pad = np.full((len(self.metrics), len(new), self.depth), np.nan)
+            self.ring = np.concatenate([self.ring, pad], axis=1)
+            for w in self.windows:
+                for table in (self.sums, self.squares, self.counts):
+                    table[w] = np.concatenate([table[w], np.zeros((len(self.metrics), len(new)))], axis=1)
+        return np.fromiter((self.symbols[s] for s in symbols), dtype=np.int64, count=len(symbols))
+
+    def _slots(self, window: int) -> np.ndarray:
+        """Ring slots of the last `window` applied days, oldest first"""
+        held = min(window, self.days)
+        return (self.days - held + np.arange(held)) % self.depth
+
+    def apply(self, trade_date: date, symbols: Sequence[str], values: np.ndarray):
+        """Add one trading day; values is (metrics x len(symbols)), NaN where missing"""
+        rows = self._index(symbols)
+        today = np.full(self.ring.shape[:2], np.nan)
+        today[:, rows] = values
+        present = ~np.isnan(today)
+        today_values = np.where(present, today, 0.0)
+
+        for w in self.windows:
+            if self.days >= w:
+                leaving = self.ring[:, :, (self.days - w) % self.depth]
+                held = ~np.isnan(leaving)
+                leaving = np.where(held, leaving, 0.0)
+                self.sums[w] -= leaving
+                self.squares[w] -= leaving ** 2
+                self.counts[w] -= held
+            self.sums[w] += today_values
+            self.squares[w] += today_values ** 2
+            self.counts[w] += present
+
+        # The slot being overwritten left the largest window above
+        self.ring[:, :, self.days % self.depth] = today
+        self.days += 1
+        self.dates = (self.dates + [trade_date])[-self.depth:]
+        if self.days % self.depth == 0:
+            self.resync()
+
+    def resync(self):
+        """Recompute the running sums from the ring (bounds float drift)"""
+        self._reset_sums()
+        for w in self.windows:
+            window = self.ring[:, :, self._slots(w)]
+            held = ~np.isnan(window)
+            values = np.where(held, window, 0.0)
+            self.sums[w] = values.sum(axis=2)
+            self.squares[w] = (values ** 2).sum(axis=2)
+            self.counts[w] = held.sum(axis=2).astype(np.float64)
+
+    def snapshot(self, window: int, symbols: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """
+        Baseline per symbol for one window: days, avg_/stddev_/min_/max_/median_/p75_/p95_<metric>.
+        Statistics are NaN for symbols with fewer than min_days values in the window.
+        """
+        names = list(symbols) if symbols is not None else list(self.symbols)
+        rows = self._index(names)
+        counts = self.counts[window][:, rows]
+        valid = counts >= self.min_days
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = self.sums[window][:, rows] / counts
+            variance = (self.squares[window][:, rows] - counts * mean ** 2) / (counts - 1)
+        stats = {'avg': mean, 'stddev': np.sqrt(np.clip(variance, 0, None))}
+
+        values = self.ring[:, rows][:, :, self._slots(window)]
+        if values.shape[2] and len(rows):
+            with warnings.catch_warnings():
+                # All-NaN rows (symbols absent from the window) are expected
+                warnings.simplefilter('ignore', RuntimeWarning)
+                stats['min'] = np.nanmin(values, axis=2)
+                stats['max'] = np.nanmax(values, axis=2)
+                stats['median'], stats['p75'], stats['p95'] = nan_quantiles(values, (0.5, 0.75, 0.95))
+        else:
+            for name in ('min', 'max', 'median', 'p75', 'p95'):
+                stats[name] = np.full(counts.shape, np.nan)
+
+        frame = pd.DataFrame({'symbol': names, 'days': counts[0].astype(np.int64)})
+        for name, array in stats.items():
+            for m, metric in enumerate(self.metrics):
+                frame[f"{name}_{metric}"] = np.where(valid[m], array[m], np.nan)
+        return frame
+
+    def save(self, path: str):
+        np.savez(path, ring=self.ring, symbols=np.array(list(self.symbols), dtype=object),
+                 days=self.days, dates=np.array([d.isoformat() for d in self.dates]),
+                 windows=np.array(self.windows), metrics=np.array(self.metrics))
+
+    @classmethod
+    def load(cls, path: str, windows: Sequence[int] = DEFAULT_WINDOWS, metrics: Sequence[str] = tuple(METRICS),
+             min_days: int = MIN_DAYS) -> Optional['RollingBaselines']:
+        """Saved state, or None if missing or saved with different windows / metrics"""
+        if not os.path.exists(path):
+            return None
+        saved = np.load(path, allow_pickle=True)
+        baselines = cls(windows, metrics, min_days)
+        if list(saved['windows']) != baselines.windows or list(saved['metrics']) != baselines.metrics:
+            return None
+        baselines.ring = saved['ring']
+        baselines.symbols = {s: i for i, s in enumerate(saved['symbols'])}
+        baselines.days = int(saved['days'])
+        baselines.dates = [date.fromisoformat(d) for d in saved['dates']]
+        baselines.resync()
+        return baselines
+
+
+def flag_exceedances(day: pd.DataFrame, baseline: pd.DataFrame, window: int) -> pd.DataFrame:
+    """step03 flags (value > avg / p75 / p95 / max) for one day against one window's baseline"""
+    frame = day.merge(baseline.rename(columns={'days': 'baseline_days'}), on='symbol', how='inner')
+    frame = frame[frame['avg_volume'].notna()].copy()
+    frame['window_days'] = window
+    for metric in METRICS:
+        value, avg = frame[metric], frame[f"avg_{metric}"]
+        for threshold in THRESHOLDS:
+            frame[f"{metric}_exceeded_{threshold}"] = (value > frame[f"{threshold}_{metric}"]).astype(int)
+        frame[f"{metric}_increase_pct"] = np.where(avg > 0, (value / avg.where(avg > 0) - 1) * 100, 0.0)
+    exceeded = (frame['volume_exceeded_avg'] == 1) | (frame['delivery_exceeded_avg'] == 1)
+    return frame[exceeded]
+
+
+class RollingExceedanceTracker:
+    """Rolling baselines kept in step with step01, flagging each day as it is loaded"""
+
+    def __init__(self, connection, windows: Sequence[int] = DEFAULT_WINDOWS, series: str = 'EQ',
+                 state_path: Optional[str] = DEFAULT_STATE, min_days: int = MIN_DAYS):
+        self.connection = connection
+        self.backend = detect_backend(connection)
+        self.placeholder = '%s' if self.backend == POSTGRES else '?'
+        self.series = series
+        self.windows = windows
+        self.min_days = min_days
+        self.state_path = state_path
+        self.baselines: Optional[RollingBaselines] = None
+        self.ensure_table()
+
+    def ensure_table(self):
+        types = {'date': 'DATE', 'str': 'VARCHAR(50)', 'int': 'BIGINT', 'float': 'FLOAT'}
+        columns = ', '.join(f"{name} {types[kind]}" for name, kind in ROLLING_COLUMNS.items())
+        ddl = f"{ROLLING_TABLE} ({columns}, PRIMARY KEY (trade_date, symbol, series, window_days))"
+        cursor = self.connection.cursor()
+        if self.backend == SQLSERVER:
+            cursor.execute(f"IF OBJECT_ID('{ROLLING_TABLE}', 'U') IS NULL CREATE TABLE {ddl}")
+        else:
+            cursor.execute(f"CREATE TABLE IF NOT EXISTS {ddl}")
+        self.connection.commit()
+
+    # ---- step01 reads --------------------------------------------------
+
+    def _day_rows(self, start: date, end: date) -> pd.DataFrame:
+        """(trade_date, symbol, metrics...) for start <= trade_date < end"""
+        columns = ', '.join(f"{column} AS {metric}" for metric, column in METRICS.items())
+        cursor = self.connection.cursor()
+        cursor.execute(f"SELECT trade_date, symbol, {columns} FROM step01_equity_daily "
+                       f"WHERE series = {self.placeholder} AND trade_date >= '{start.isoformat()}' "
+                       f"AND trade_date < '{end.isoformat()}'", (self.series,))
+        frame = pd.DataFrame.from_records([tuple(row) for row in cursor.fetchall()],
+                                          columns=['trade_date', 'symbol'] + list(METRICS))
+        cursor.close()
+        frame['trade_date'] = pd.to_datetime(frame['trade_date']).dt.date
+        for metric in METRICS:
+            frame[metric] = pd.to_numeric(frame[metric], errors='coerce')
+        return frame
+
+    def _latest_before(self, day: date) -> Optional[date]:
+        cursor = self.connection.cursor()
+        cursor.execute(f"SELECT MAX(trade_date) FROM step01_equity_daily "
+                       f"WHERE series = {self.placeholder} AND trade_date < '{day.isoformat()}'", (self.series,))
+        latest = cursor.fetchone()[0]
+        return pd.Timestamp(latest).date() if latest is not None else None
+
+    def warm(self, day: date) -> RollingBaselines:
+        """Rebuild the windows from the last depth trading days before `day`"""
+        baselines = RollingBaselines(self.windows, tuple(METRICS), self.min_days)
+        # depth trading days fit in ~1.5x as many calendar days; pad for holidays
+        lookback = day - timedelta(days=baselines.depth * 3 // 2 + 21)
+        history = self._day_rows(lookback, day)
+        history = history[history['volume'] > 0]
+        days = sorted(history['trade_date'].unique())[-baselines.depth:]
+        history = history[history['trade_date'].isin(days)]
+        for trade_date, rows in history.groupby('trade_date', sort=True):
+            baselines.apply(trade_date, rows['symbol'].tolist(), rows[list(METRICS)].to_numpy().T)
+        print(f"🔁 Rolling windows {baselines.windows} rebuilt from {len(days)} trading days before {day}")
+        return baselines
+
+    def _baselines_for(self, day: date) -> RollingBaselines:
+        """State whose last applied day is the trading day just before `day`"""
+        if self.baselines is None and self.state_path:
+            self.baselines = RollingBaselines.load(self.state_path, self.windows, tuple(METRICS), self.min_days)
+        previous = self._latest_before(day)
+        if self.baselines is None or self.baselines.last_date != previous:
+            self.baselines = self.warm(day)
+        return self.baselines
+
+    # ---- daily processing ----------------------------------------------
+
+    def process_day(self, trade_date, day: pd.DataFrame, dry_run: bool = False) -> pd.DataFrame:
+        """
+        Flag one day's rows (columns trade_date/symbol/series + ttl_trd_qnty/deliv_qty or
+        volume/delivery) against every window, then roll the day into the windows.
+        """
+        trade_date = pd.Timestamp(trade_date).date()
+        day = day.rename(columns={column: metric for metric, column in METRICS.items()})
+        if 'series' in day.columns:
+            day = day[day['series'].astype(str) == self.series]
+        day = day.drop_duplicates('symbol', keep='last')[['symbol'] + list(METRICS)].copy()
+        day['symbol'] = day['symbol'].astype(str)
+        for metric in METRICS:
+            day[metric] = pd.to_numeric(day[metric], errors='coerce')
+
+        baselines = self._baselines_for(trade_date)
+        flagged = [flag_exceedances(day, baselines.snapshot(w, day['symbol'].tolist()), w)
+                   for w in baselines.windows]
+        flagged = pd.concat(flagged, ignore_index=True)
+        flagged['trade_date'] = trade_date
+        flagged['series'] = self.series
+
+        # Zero-volume days do not enter the baseline, as in the monthly analyzers
+        traded = day[day['volume'] > 0]
+        baselines.apply(trade_date, traded['symbol'].tolist(), traded[list(METRICS)].to_numpy().T)
+
+        if not dry_run:
+            self.save(trade_date, flagged)
+            if self.state_path:
+                baselines.save(self.state_path)
+        return flagged
+
+    def save(self, trade_date: date, flagged: pd.DataFrame) -> int:
+        cursor = self.connection.cursor()
+        cursor.execute(f"DELETE FROM {ROLLING_TABLE} WHERE trade_date = '{trade_date.isoformat()}' "
+                       f"AND series = {self.placeholder}", (self.series,))
+        saved = BulkLoader(self.connection, ROLLING_TABLE, ROLLING_COLUMNS, backend=self.backend).load(
+            flagged, commit=False)
+        self.connection.commit()
+        return saved
+
+    def process_range(self, since: date, until: date, dry_run: bool = False) -> int:
+        """Every step01 trading day in [since, until], one O(symbols) update each"""
+        rows = self._day_rows(since, until + timedelta(days=1))
+        total = 0
+        for trade_date, day in rows.groupby('trade_date', sort=True):
+            flagged = self.process_day(trade_date, day, dry_run)
+            counts = ', '.join(f"{w}d: {int((flagged['window_days'] == w).sum()):,}"
+                               for w in self.baselines.windows)
+            print(f"   📅 {trade_date}: {len(day):,} symbols, exceedances {counts}")
+            total += len(flagged)
+        return total
+
+
+def main():
+    import nse_db_pool
+
+    p = argparse.ArgumentParser(description='Rolling N-trading-day baselines and daily exceedance flags')
+    p.add_argument('--config', help='Database config file (default NSE_DB_CONFIG or database_config.json)')
+    p.add_argument('--date', help='Process one trading day (YYYY-MM-DD)')
+    p.add_argument('--since', help='First trading day to process (YYYY-MM-DD)')
+    p.add_argument('--until', help='Last trading day to process (default: today)')
+    p.add_argument('--windows', type=int, nargs='+', default=list(DEFAULT_WINDOWS), help='Window lengths in trading days')
+    p.add_argument('--series', default='EQ')
+    p.add_argument('--state', default=DEFAULT_STATE, help='Rolling state file (npz)')
+    p.add_argument('--dry-run', action='store_true', help='Compute without writing rows or state')
+    args = p.parse_args()
+
+    if not (args.date or args.since):
+        p.error('give --date or --since')
+    since = date.fromisoformat(args.date or args.since)
+    until = date.fromisoformat(args.date or args.until) if (args.date or args.until) else date.today()
+
+    pool = nse_db_pool.get_pool(args.config)
+    print(f"🔌 Backend: {nse_db_pool.describe(pool.config)}")
+    with pool.connection() as conn:
+        tracker = RollingExceedanceTracker(conn, args.windows, args.series, args.state)
+        total = tracker.process_range(since, until, args.dry_run)
+        print(f"✅ {total:,} rolling exceedance rows {'computed' if args.dry_run else f'saved to {ROLLING_TABLE}'}")
+
+
+if __name__ == "__main__":
+    main()
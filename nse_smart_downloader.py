@@ -11,19 +11,15 @@ from datetime import datetime, timedelta
 import calendar
 import time
 import urllib3
+from nse_url_resolver import URLPatternResolver
+from nse_trading_calendar import get_calendar
 
 # Disable InsecureRequestWarning
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 def get_trading_days(year, month):
-    """Returns a list of all trading days (Mon-Fri) for a given month."""
-    trading_days = []
-    num_days = calendar.monthrange(year, month)[1]
-    for day in range(1, num_days + 1):
-        date = datetime(year, month, day)
-        if date.weekday() < 5: # Monday to Friday
-            trading_days.append(date)
-    return trading_days
+    """Returns a list of all NSE trading days (holidays excluded) for a given month."""
+    return [datetime(d.year, d.month, d.day) for d in get_calendar().trading_days_in_month(year, month)]
 
 def download_fo_data_smart(year, month, download_folder="NSE_FO_Downloads"):
     """
@@ -54,6 +50,16 @@ def download_fo_data_smart(year, month, download_folder="NSE_FO_Downloads"):
         'Accept-Language': 'en-US,en;q=0.5',
     }
 
+    # --- Pattern-Based Fallback templates ---
+    # {day}/{mon}/{mm}/{year} are filled per day; the resolver remembers which
+    # template worked for which dates and skips templates that keep 404'ing.
+    url_templates = [
+        "https://archives.nseindia.com/content/historical/DERIVATIVES/{year}/{mon}/fo{day}{mon}{year}bhav.csv.zip",
+        "https://archives.nseindia.com/products/content/derivatives/equities/udiff_{day}{mm}{year}.zip",
+        "https://www1.nseindia.com/content/historical/DERIVATIVES/{year}/{mon}/fo{day}{mon}{year}bhav.csv.zip",
+    ]
+    resolver = URLPatternResolver()
+
     # --- Main Loop for each day ---
     for date in trading_days:
         day_str = date.strftime('%d')
@@ -65,15 +71,9 @@ def download_fo_data_smart(year, month, download_folder="NSE_FO_Downloads"):
         # This would involve using Selenium to interact with the date picker on the NSE website.
         # For this example, we will stick to direct HTTP requests which we know are failing.
         
-        # --- Stage 2: Pattern-Based Fallback ---
-        url_templates = [
-            f"https://archives.nseindia.com/content/historical/DERIVATIVES/{year}/{month_abbr}/fo{day_str}{month_abbr}{year}bhav.csv.zip",
-            f"https://archives.nseindia.com/products/content/derivatives/equities/udiff_{day_str}{month:02d}{year}.zip",
-            f"https://www1.nseindia.com/content/historical/DERIVATIVES/{year}/{month_abbr}/fo{day_str}{month_abbr}{year}bhav.csv.zip",
-        ]
-        
         downloaded = False
-        for i, url in enumerate(url_templates):
+        for i, template in enumerate(resolver.order(url_templates, date)):
+            url = template.format(day=day_str, mon=month_abbr, mm=f"{month:02d}", year=year)
             filename = os.path.basename(url)
             filepath = os.path.join(download_folder, filename)
             
@@ -86,10 +86,12 @@ def download_fo_data_smart(year, month, download_folder="NSE_FO_Downloads"):
                     with open(filepath, 'wb') as f:
                         f.write(response.content)
                     print(f"  ✅ SUCCESS: Downloaded {filename}")
+                    resolver.record_success(template, date)
                     downloaded = True
                     break # Move to next day
                 else:
                     print(f"    ❌ Fail (Status: {response.status_code}, Size: {len(response.content)})")
+                    resolver.record_miss(template, date, response.status_code)
 
             except requests.exceptions.RequestException as e:
                 print(f"    ❌ Fail (Error: {e.__class__.__name__})")
@@ -99,6 +101,8 @@ def download_fo_data_smart(year, month, download_folder="NSE_FO_Downloads"):
         if not downloaded:
             print(f"  ❌ All attempts failed for {date.strftime('%d-%b-%Y')}.")
 
+    resolver.save()
+
     print("\n" + "="*60)
     print("🏁 Download process finished.")
     print("Please check the output above to see which files, if any, were downloaded.")
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+NSE Staged Merge - idempotent loads keyed by natural keys
+
+Purpose:
+  Reloads used to delete and reinsert (clear_step01_data.py, clear_fo_table.py,
+  clear_existing_data), and a rerun without the delete silently duplicated
+  rows because the tables only have an IDENTITY key. StagedMerger instead
+    1. bulk-loads the frame into a session staging table with the target's
+       column types (BulkLoader, fast_executemany / COPY / executemany)
+    2. applies one set-based statement on the natural key:
+         SQL Server            MERGE ... WHEN MATCHED AND <row differs> THEN UPDATE
+                               WHEN NOT MATCHED THEN INSERT
+         PostgreSQL / SQLite   INSERT ... ON CONFLICT (key) DO UPDATE ... WHERE <row differs>
+       so unchanged rows are not written at all
+    3. records the source file's SHA-256 in etl_file_checksums in the same
+       transaction; a file whose checksum is already recorded is skipped
+       with one dictionary lookup.
+
+  Natural keys:
+    step01_equity_daily     (trade_date, symbol, series)
+    step04_fo_udiff_daily   (trade_date, FinInstrmId)   -- UDiFF files only
+
+  PostgreSQL/SQLite need a unique index on the key (ensure_key_index); on
+  SQL Server it keeps the MERGE join cheap. Existing duplicates must be
+  removed first (remove_duplicates keeps the lowest id per key).
+
+Usage:
+  python nse_staged_merge.py --segment EQ --dedupe --create-key-index
+  python nse_staged_merge.py --segment EQ --pattern "NSE_*_2025_Data/*.csv"
+  python nse_staged_merge.py --segment FO --pattern "fo_udiff_downloads/*.zip"
+
+  merger = StagedMerger(conn, STEP01_MERGE)
+  merger.merge_file(path, read_frame)       # None if unchanged, else counts
+"""
+
+import os
+import glob
+import hashlib
+import argparse
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+import pandas as pd
+
+from nse_bulk_loader import (BulkLoader, STEP01_EQUITY_COLUMNS, FO_UDIFF_COLUMNS,
+                             SQLSERVER, POSTGRES, SQLITE, DUCKDB, detect_backend)
+
+CHECKSUM_TABLE = 'etl_file_checksums'
+HASH_CHUNK = 1 << 20
+
+
+class MergeSpec:
+    def __init__(self, table: str, keys: List[str], columns: Dict[str, str]):
+        self.table = table
+        self.keys = keys
+        self.columns = columns
+        # source_file is refreshed on update but a rename alone is not a change
+        self.compare = [c for c in columns if c not in keys and c != 'source_file']
+        self.updates = [c for c in columns if c not in keys]
+
+    @property
+    def index_name(self) -> str:
+        return f"UX_{self.table}_natural_key"
+
+
+STEP01_MERGE = MergeSpec('step01_equity_daily', ['trade_date', 'symbol', 'series'], STEP01_EQUITY_COLUMNS)
+STEP04_MERGE = MergeSpec('step04_fo_udiff_daily', ['trade_date', 'FinInstrmId'], FO_UDIFF_COLUMNS)
+
+
+def file_checksum(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class StagedMerger:
+    def __init__(self, connection, spec: MergeSpec, backend: Optional[str] = None):
+        self.connection = connection
+        self.spec = spec
+        self.backend = backend or detect_backend(connection)
+        self.placeholder = '%s' if self.backend == POSTGRES else '?'
+        self.stage = f"#stage_{spec.table}" if self.backend == SQLSERVER else f"stage_{spec.table}"
+        self.ensure_checksum_table()
+        self.checksums = self.load_checksums()
+
+    # ---- checksums -------------------------------------------------------
+
+    def ensure_checksum_table(self):
+        ddl = (f"{CHECKSUM_TABLE} (table_name VARCHAR(100) NOT NULL, source_file VARCHAR(255) NOT NULL, "
+               f"sha256 CHAR(64) NOT NULL, row_count BIGINT, loaded_at VARCHAR(19), "
+               f"PRIMARY KEY (table_name, source_file))")
+        cursor = self.connection.cursor()
+        if self.backend == SQLSERVER:
+            cursor.execute(f"IF OBJECT_ID('{CHECKSUM_TABLE}', 'U') IS NULL CREATE TABLE {ddl}")
+        else:
+            cursor.execute(f"CREATE TABLE IF NOT EXISTS {ddl}")
+        self.connection.commit()
+
+    def load_checksums(self) -> Dict[str, str]:
+        cursor = self.connection.cursor()
+        cursor.execute(f"SELECT source_file, sha256 FROM {CHECKSUM_TABLE} WHERE table_name = {self.placeholder}",
+                       (self.spec.table,))
+        return {source_file: sha256 for source_file, sha256 in cursor.fetchall()}
+
+    def is_unchanged(self, source_file: str, checksum: str) -> bool:
+        return self.checksums.get(source_file) == checksum
+
+    def _record_checksum(self, cursor, source_file: str, checksum: str, rows: int):
+        p = self.placeholder
+        cursor.execute(f"DELETE FROM {CHECKSUM_TABLE} WHERE table_name = {p} AND source_file = {p}",
+                       (self.spec.table, source_file))
+        cursor.execute(f"INSERT INTO {CHECKSUM_TABLE} (table_name, source_file, sha256, row_count, loaded_at) "
+                       f"VALUES ({p}, {p}, {p}, {p}, {p})",
+                       (self.spec.table, source_file, checksum, rows,
+                        datetime.now().isoformat(sep=' ', timespec='seconds')))
+        self.checksums[source_file] = checksum
+
+    # ---- key maintenance -------------------------------------------------
+
+    def remove_duplicates(self) -> int:
+        """Delete all but the lowest-id row per natural key; returns rows deleted"""
+        keys = ', '.join(self.spec.keys)
+        cursor = self.connection.cursor()
+        if self.backend == SQLSERVER:
+            cursor.execute(f"""
+                WITH ranked AS (
+                    SELECT ROW_NUMBER() OVER (PARTITION BY {keys} ORDER BY id) AS rn FROM {self.spec.table}
+                )
+                DELETE FROM ranked WHERE rn > 1
+            """)
+        else:
+            row_id = 'ctid' if self.backend == POSTGRES else 'rowid'
+            cursor.execute(f"""
+                DELETE FROM {self.spec.table} WHERE {row_id} NOT IN (
+                    SELECT MIN({row_id}) FROM {self.spec.table} GROUP BY {keys}
+                )
+            """)
+        deleted = cursor.rowcount
+        self.connection.commit()
+        return deleted
+
+    def ensure_key_index(self):
+        keys = ', '.join(self.spec.keys)
+        cursor = self.connection.cursor()
+        if self.backend == SQLSERVER:
+            cursor.execute(f"""
+                IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = '{self.spec.index_name}')
+                CREATE UNIQUE INDEX {self.spec.index_name} ON {self.spec.table} ({keys})
+            """)
+        else:
+            cursor.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS {self.spec.index_name} ON {self.spec.table} ({keys})")
+        self.connection.commit()
+
+    # ---- merge -----------------------------------------------------------
+
+    def _create_stage(self, cursor):
+        cols = ', '.join(self.spec.columns)
+        if self.backend == SQLSERVER:
+            cursor.execute(f"IF OBJECT_ID('tempdb..{self.stage}') IS NOT NULL DROP TABLE {self.stage}")
+            cursor.execute(f"SELECT TOP 0 {cols} INTO {self.stage} FROM {self.spec.table}")
+        else:
+            cursor.execute(f"DROP TABLE IF EXISTS {self.stage}")
+            suffix = {POSTGRES: 'WITH NO DATA', DUCKDB: 'LIMIT 0'}.get(self.backend, 'WHERE 0')
+            cursor.execute(f"CREATE TEMP TABLE {self.stage} AS SELECT {cols} FROM {self.spec.table} {suffix}")
+
+    def _apply_sqlserver(self, cursor) -> Dict[str, int]:
+        spec = self.spec
+        on = ' AND '.join(f"t.{k} = s.{k}" for k in spec.keys)
+        differs = (f"EXISTS (SELECT {', '.join('s.' + c for c in spec.compare)} "
+                   f"EXCEPT SELECT {', '.join('t.' + c for c in spec.compare)})")
+        cols = ', '.join(spec.columns)
+        cursor.execute(f"""
+            SET NOCOUNT ON;
+            DECLARE @actions TABLE (merge_action NVARCHAR(10));
+            MERGE {spec.table} WITH (HOLDLOCK) AS t
+            USING {self.stage} AS s
+            ON {on}
+            WHEN MATCHED AND {differs} THEN
+                UPDATE SET {', '.join(f't.{c} = s.{c}' for c in spec.updates)}
+            WHEN NOT MATCHED BY TARGET THEN
+                INSERT ({cols}) VALUES ({', '.join('s.' + c for c in spec.columns)})
+            OUTPUT $action INTO @actions;
+            SELECT merge_action, COUNT(*) FROM @actions GROUP BY merge_action;
+        """)
+        counts = {action.strip().upper(): n for action, n in cursor.fetchall()}
+        return {'inserted': counts.get('INSERT', 0), 'updated': counts.get('UPDATE', 0)}
+
+    def _apply_upsert(self, cursor) -> Dict[str, int]:
+        spec = self.spec
+        keys, cols = ', '.join(spec.keys), ', '.join(spec.columns)
+        on = ' AND '.join(f"t.{k} = s.{k}" for k in spec.keys)
+        cursor.execute(f"SELECT COUNT(*) FROM {self.stage} s WHERE NOT EXISTS "
+                       f"(SELECT 1 FROM {spec.table} t WHERE {on})")
+        inserted = cursor.fetchone()[0]
+
+        distinct = 'IS NOT' if self.backend == SQLITE else 'IS DISTINCT FROM'
+        differs = ' OR '.join(f"{spec.table}.{c} {distinct} excluded.{c}" for c in spec.compare)
+        # "WHERE true" keeps SQLite from reading ON CONFLICT as a join constraint
+        cursor.execute(f"""
+            INSERT INTO {spec.table} ({cols})
+            SELECT {cols} FROM {self.stage} WHERE true
+            ON CONFLICT ({keys}) DO UPDATE SET {', '.join(f'{c} = excluded.{c}' for c in spec.updates)}
+            WHERE {differs}
+        """)
+        return {'inserted': inserted, 'updated': max(cursor.rowcount - inserted, 0)}
+
+    def merge_frame(self, frame: pd.DataFrame, source_file: Optional[str] = None,
+                    checksum: Optional[str] = None) -> Dict[str, int]:
+        """
+        Stage + merge frame (table column names) in one transaction. Returns
+        {'staged', 'inserted', 'updated', 'unchanged'}.
+        """
+        missing_keys = frame[self.spec.keys].isna().any(axis=1) if len(frame) else pd.Series(dtype=bool)
+        if missing_keys.any():
+            raise ValueError(f"{int(missing_keys.sum())} rows have no natural key {self.spec.keys} "
+                             f"(legacy F&O files carry no FinInstrmId)")
+        frame = frame.drop_duplicates(self.spec.keys, keep='last')
+
+        cursor = self.connection.cursor()
+        try:
+            self._create_stage(cursor)
+            BulkLoader(self.connection, self.stage, self.spec.columns, backend=self.backend).load(frame, commit=False)
+            counts = self._apply_sqlserver(cursor) if self.backend == SQLSERVER else self._apply_upsert(cursor)
+            if source_file and checksum:
+                self._record_checksum(cursor, source_file, checksum, len(frame))
+            cursor.execute(f"DROP TABLE {self.stage}")
+            self.connection.commit()
+        except Exception:
+            self.connection.rollback()
+            raise
+        counts['staged'] = len(frame)
+        counts['unchanged'] = len(frame) - counts['inserted'] - counts['updated']
+        return counts
+
+    def merge_file(self, path: str, read_frame: Callable[[str], pd.DataFrame]) -> Optional[Dict[str, int]]:
+        """Merge one source file unless its checksum is already recorded (then None)"""
+        source_file = os.path.basename(path)
+        checksum = file_checksum(path)
+        if self.is_unchanged(source_file, checksum):
+            return None
+        return self.merge_frame(read_frame(path), source_file, checksum)
+
+
+def read_equity_frame(path: str) -> pd.DataFrame:
+    from nse_parquet_lake import EQ_COLUMN_MAPPING
+    from nse_bhavcopy_parser import read_bhavcopy
+    frame = read_bhavcopy(path, column_mapping=EQ_COLUMN_MAPPING)
+    frame['series'] = frame['series'].astype(object).fillna('EQ')
+    return frame.assign(source_file=os.path.basename(path))
+
+
+def read_fo_frame(path: str) -> pd.DataFrame:
+    from nse_fo_parser import read_fo_bhavcopy
+    return read_fo_bhavcopy(path, fo_only=False).assign(source_file=os.path.basename(path))
+
+
+SEGMENTS = {
+    'EQ': (STEP01_MERGE, read_equity_frame, 'NSE_*_2025_Data/*.csv'),
+    'FO': (STEP04_MERGE, read_fo_frame, 'fo_udiff_downloads/BhavCopy_NSE_FO_*.csv.zip'),
+}
+
+
+def main():
+    from nse_database_integration import NSEDatabaseManager
+
+    p = argparse.ArgumentParser(description='Idempotent staged MERGE loads keyed by natural keys')
+    p.add_argument('--segment', choices=list(SEGMENTS), default='EQ')
+    p.add_argument('--pattern', help='Glob for source files (default per segment)')
+    p.add_argument('--dedupe', action='store_true', help='Remove existing duplicate keys first')
+    p.add_argument('--create-key-index', action='store_true', help='Create the unique natural-key index')
+    args = p.parse_args()
+
+    spec, read_frame, default_pattern = SEGMENTS[args.segment]
+    files = sorted(glob.glob(args.pattern or default_pattern))
+    if not files:
+        print(f"❌ No files found matching pattern: {args.pattern or default_pattern}")
+        return
+
+    db_manager = NSEDatabaseManager()
+    merger = StagedMerger(db_manager.connection, spec)
+    if args.dedupe:
+        print(f"🧹 Removed {merger.remove_duplicates():,} duplicate rows from {spec.table}")
+    if args.create_key_index:
+        merger.ensure_key_index()
+        print(f"🔑 Unique index {spec.index_name} on ({', '.join(spec.keys)})")
+
+    totals = {'files': 0, 'skipped': 0, 'inserted': 0, 'updated': 0, 'unchanged': 0}
+    for path in files:
+        counts = merger.merge_file(path, read_frame)
+        if counts is None:
+            totals['skipped'] += 1
+            continue
+        totals['files'] += 1
+        for key in ('inserted', 'updated', 'unchanged'):
+            totals[key] += counts[key]
+        print(f"📖 {os.path.basename(path)}: +{counts['inserted']:,} inserted, "
+              f"{counts['updated']:,} updated, {counts['unchanged']:,} unchanged")
+
+    print(f"\n🎉 Merged {totals['files']} files ({totals['skipped']} unchanged, skipped): "
+          f"{totals['inserted']:,} inserted, {totals['updated']:,} updated, {totals['unchanged']:,} unchanged")
+    db_manager.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+"""
+NSE Supabase Bulk Uploader - concurrent, adaptive upserts over PostgREST
+
+Purpose:
+  NSESupabaseManager.upload_csv_file posted 1000-row batches one after the
+  other with .insert(), converting each batch with to_dict('records'), so the
+  uplink sat idle for every round trip and a re-upload failed on the unique
+  key. This uploader keeps the pipe full:
+
+    frame ──► encode_records()   one vectorized to_json pass, one JSON string per row
+          ──► cut batches        rows <= adaptive size, bytes <= max_payload_bytes
+          ──► N threads          POST /rest/v1/<table>?on_conflict=symbol,series,date
+                                 Prefer: resolution=merge-duplicates  (upsert)
+
+Design:
+  - `concurrency` batches are always in flight; a new batch is cut and sent
+    the moment one completes, so throughput is bounded by the uplink and the
+    server, not by latency.
+  - Batch size is AIMD-adapted on round-trip latency: grow 25% while batches
+    come back under target_latency, halve when one is slower or fails. A 413
+    halves the byte limit and the batch is split and re-sent.
+  - 408/425/429/5xx and connection errors are retried with full-jitter
+    exponential backoff (Retry-After is honoured); other 4xx fail the batch,
+    which is counted and reported without stopping the rest.
+  - Upsert on (symbol, series, date) makes uploads idempotent; duplicate keys
+    inside a frame are dropped (keep last) because Postgres rejects an upsert
+    that touches the same row twice.
+  - Talks to PostgREST directly with requests, so any PostgREST-compatible
+    endpoint works, including the local stand-in in nse_postgrest_stub.py.
+
+Usage:
+  python nse_supabase_bulk_uploader.py --files "NSE_August_2025_Data/*.csv" --concurrency 8
+  python nse_supabase_bulk_uploader.py --stub --files "NSE_August_2025_Data/*.csv"   # local stand-in
+
+  uploader = SupabaseBulkUploader(url, key, concurrency=8)
+  stats = uploader.upload_frame(df_clean)
+  stats.report()
+"""
+
+import os
+import glob
+import time
+import random
+import argparse
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+import requests
+
+DEFAULT_TABLE = 'nse_stock_data'
+CONFLICT_KEYS = ('symbol', 'series', 'date')
+DEFAULT_CONCURRENCY = 4
+MAX_PAYLOAD_BYTES = 1_000_000          # well under the usual 1-2 MB proxy body limits
+RETRY_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+# Bhavcopy CSV headers (both header styles) -> nse_stock_data columns
+STOCK_COLUMN_MAPPING = {
+    'SYMBOL': 'symbol', 'SERIES': 'series', 'PREV_CLOSE': 'prev_close',
+    'OPEN': 'open_price', 'OPEN_PRICE': 'open_price', 'HIGH': 'high_price', 'HIGH_PRICE': 'high_price',
+    'LOW': 'low_price', 'LOW_PRICE': 'low_price', 'LAST': 'last_price', 'LAST_PRICE': 'last_price',
+    'CLOSE': 'close_price', 'CLOSE_PRICE': 'close_price', 'VWAP': 'avg_price', 'AVG_PRICE': 'avg_price',
+    'VOLUME': 'total_traded_qty', 'TTL_TRD_QNTY': 'total_traded_qty',
+    'TURNOVER': 'turnover', 'TURNOVER_LACS': 'turnover', 'TRADES': 'no_of_trades', 'NO_OF_TRADES': 'no_of_trades',
+    'DELIVERABLE': 'deliverable_qty', 'DELIV_QTY': 'deliverable_qty',
+    '%DLYQT': 'deliverable_percentage', 'DELIV_PER': 'deliverable_percentage'
+}
+STOCK_COLUMNS = ['symbol', 'series', 'date', 'prev_close', 'open_price', 'high_price', 'low_price',
+                 'last_price', 'close_price', 'avg_price', 'total_traded_qty', 'turnover',
+                 'no_of_trades', 'deliverable_qty', 'deliverable_percentage']
+FLOAT_COLUMNS = ['prev_close', 'open_price', 'high_price', 'low_price', 'last_price', 'close_price',
+                 'avg_price', 'turnover', 'deliverable_percentage']
+INT_COLUMNS = ['total_traded_qty', 'no_of_trades', 'deliverable_qty']
+
+
+class UploadError(Exception):
+    def __init__(self, status: Optional[int], message: str):
+        super().__init__(f"HTTP {status}: {message}" if status else message)
+        self.status = status
+
+
+class PayloadTooLarge(UploadError):
+    pass
+
+
+def prepare_stock_frame(df: pd.DataFrame, date_obj) -> pd.DataFrame:
+    """Bhavcopy frame -> nse_stock_data columns, typed, one row per (symbol, series, date)"""
+    frame = df.rename(columns=lambda c: STOCK_COLUMN_MAPPING.get(str(c).strip(), str(c).strip()))
+    frame['date'] = date_obj
+    for col in ('symbol', 'series'):
+        if col in frame.columns:
+            frame[col] = frame[col].astype('string').str.strip()
+    for col in FLOAT_COLUMNS:
+        if col in frame.columns:
+            frame[col] = pd.to_numeric(frame[col], errors='coerce')
+    for col in INT_COLUMNS:
+        if col in frame.columns:
+            frame[col] = pd.to_numeric(frame[col], errors='coerce').fillna(0).astype('Int64')
+    frame = frame.fillna({'series': 'EQ', 'deliverable_percentage': 0.0})
+    frame = frame[frame['symbol'].notna() & (frame['symbol'].str.len() > 0)]
+    frame = frame[[col for col in STOCK_COLUMNS if col in frame.columns]]
+    keys = [col for col in CONFLICT_KEYS if col in frame.columns]
+    return frame.drop_duplicates(keys, keep='last')
+
+
+def encode_records(df: pd.DataFrame, date_columns: Sequence[str] = ('date',)) -> List[str]:
+    """One JSON object string per row (NaN/NA -> null), from a single to_json pass"""
+    frame = df.copy()
+    for col in date_columns:
+        if col in frame.columns:
+            frame[col] = pd.to_datetime(frame[col]).dt.strftime('%Y-%m-%d')
+    # JSON escapes newlines inside strings, so splitting JSON Lines is safe
+    text = frame.to_json(orient='records', lines=True, date_format='iso')
+    return [line for line in text.split('\n') if line]
+
+
+class AdaptiveBatchSize:
+    """AIMD batch sizing on round-trip latency"""
+
+    def __init__(self, initial: int = 1000, minimum: int = 50, maximum: int = 10000,
+                 target_latency: float = 2.0, fixed: bool = False):
+        self.size = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.target_latency = target_latency
+        self.fixed = fixed
+
+    def record(self, seconds: float, ok: bool = True):
+        if self.fixed:
+            return
+        if ok and seconds <= self.target_latency:
+            self.size = min(self.maximum, self.size + max(1, self.size // 4))
+        else:
+            self.size = max(self.minimum, self.size // 2)
+
+
+class UploadStats:
+    def __init__(self):
+        self.rows = 0
+        self.failed_rows = 0
+        self.batches = 0
+        self.retries = 0
+        self.splits = 0
+        self.bytes = 0
+        self.errors: List[str] = []
+        self.started = time.perf_counter()
+        self.seconds = 0.0
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def report(self, final_batch_size: Optional[int] = None):
+        size = f", batch size now {final_batch_size}" if final_batch_size else ''
+        print(f"⏱️ Upload: {self.rows:,} rows in {self.batches} batches, {self.seconds:.1f}s "
+              f"({self.rows_per_sec:,.0f} rows/s, {self.bytes / 1e6 / max(self.seconds, 1e-9):.2f} MB/s) | "
+              f"{self.retries} retries, {self.splits} splits, {self.failed_rows:,} failed rows{size}")
+        for error in self.errors[:5]:
+            print(f"   ⚠️  {error}")
+
+
+class SupabaseBulkUploader:
+    def __init__(self, url: str, key: str, table: str = DEFAULT_TABLE,
+                 conflict_keys: Sequence[str] = CONFLICT_KEYS, concurrency: int = DEFAULT_CONCURRENCY,
+                 batch_rows: int = 1000, max_payload_bytes: int = MAX_PAYLOAD_BYTES,
+                 target_latency: float = 2.0, max_retries: int = 5, backoff_base: float = 0.5,
+                 backoff_cap: float = 30.0, timeout: float = 60.0, adaptive: bool = True):
+        self.endpoint = f"{url.rstrip('/')}/rest/v1/{table}"
+        self.params = {'on_conflict': ','.join(conflict_keys)} if conflict_keys else {}
+        self.headers = {
+            'apikey': key,
+            'Authorization': f"Bearer {key}",
+            'Content-Type': 'application/json',
+            'Prefer': ('resolution=merge-duplicates,' if conflict_keys else '') + 'return=minimal',
+        }
+        self.conflict_keys = list(conflict_keys)
+        self.concurrency = max(1, concurrency)
+        self.max_payload_bytes = max_payload_bytes
+        self.batch_size = AdaptiveBatchSize(batch_rows, target_latency=target_latency, fixed=not adaptive)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _session(self) -> requests.Session:
+        # One keep-alive connection per worker thread
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return session
+
+    def _backoff(self, attempt: int, retry_after: Optional[str]) -> float:
+        delay = random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+        if retry_after:
+            try:
+                delay = max(delay, float(retry_after))
+            except ValueError:
+                pass
+        return delay
+
+    def _send(self, body: bytes):
+        """POST one batch, retrying transient failures; returns (seconds, retries)"""
+        for attempt in range(self.max_retries + 1):
+            started = time.perf_counter()
+            retry_after = None
+            try:
+                response = self._session().post(self.endpoint, params=self.params, data=body,
+                                                headers=self.headers, timeout=self.timeout)
+            except requests.RequestException as e:
+                error = UploadError(None, str(e))
+            else:
+                if response.status_code < 300:
+                    return time.perf_counter() - started, attempt
+                if response.status_code == 413:
+                    raise PayloadTooLarge(413, f"{len(body):,} byte batch rejected")
+                error = UploadError(response.status_code, response.text[:200])
+                if response.status_code not in RETRY_STATUS:
+                    raise error
+                retry_after = response.headers.get('Retry-After')
+            if attempt < self.max_retries:
+                time.sleep(self._backoff(attempt, retry_after))
+        raise error
+
+    def upload_frame(self, df: pd.DataFrame,
+                     progress: Optional[Callable[[int, int], None]] = None) -> UploadStats:
+        """Upsert every row of df; failed batches are counted, not raised"""
+        stats = UploadStats()
+        if self.conflict_keys and set(self.conflict_keys) <= set(df.columns):
+            df = df.drop_duplicates(self.conflict_keys, keep='last')
+        lines = encode_records(df)
+        total = len(lines)
+        # Byte span of each row in the joined body (+1 for the separating comma)
+        sizes = np.fromiter(map(len, lines), dtype=np.int64, count=total) + 1
+        ends = np.cumsum(sizes)
+        starts = ends - sizes
+        position = 0
+        requeued = deque()
+
+        def cut() -> Optional[tuple]:
+            nonlocal position
+            if requeued:
+                return requeued.popleft()
+            if position >= total:
+                return None
+            limit = int(np.searchsorted(ends, starts[position] + self.max_payload_bytes - 1, side='right'))
+            hi = max(position + 1, min(position + self.batch_size.size, limit))
+            lo, position = position, hi
+            return lo, hi
+
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='upload') as pool:
+            pending = {}
+
+            def submit_next():
+                batch = cut()
+                if batch is not None:
+                    body = ('[' + ','.join(lines[batch[0]:batch[1]]) + ']').encode('utf-8')
+                    pending[pool.submit(self._send, body)] = (batch, len(body))
+
+            for _ in range(self.concurrency):
+                submit_next()
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    (lo, hi), size = pending.pop(future)
+                    try:
+                        seconds, retries = future.result()
+                    except PayloadTooLarge:
+                        self.batch_size.record(0.0, ok=False)
+                        if hi - lo == 1:
+                            stats.failed_rows += 1
+                            stats.errors.append(f"row {lo}: {size:,} bytes exceeds server body limit")
+                        else:
+                            self.max_payload_bytes = max(1024, size // 2)
+                            mid = (lo + hi) // 2
+                            requeued.extend([(lo, mid), (mid, hi)])
+                            stats.splits += 1
+                    except UploadError as e:
+                        self.batch_size.record(0.0, ok=False)
+                        stats.failed_rows += hi - lo
+                        stats.errors.append(f"rows {lo}-{hi}: {e}")
+                    else:
+                        self.batch_size.record(seconds, ok=retries == 0)
+                        stats.rows += hi - lo
+                        stats.batches += 1
+                        stats.retries += retries
+                        stats.bytes += size
+                        if progress:
+                            progress(stats.rows, total)
+                    submit_next()
+                # A split can leave spare slots; keep all of them busy
+                while len(pending) < self.concurrency and (requeued or position < total):
+                    submit_next()
+
+        stats.seconds = time.perf_counter() - stats.started
+        return stats
+
+
+def main():
+    p = argparse.ArgumentParser(description='Concurrent upsert of NSE bhavcopy CSVs to Supabase')
+    p.add_argument('--files', default='NSE_August_2025_Data/*.csv', help='Glob pattern for CSV files')
+    p.add_argument('--url', default=os.getenv('SUPABASE_URL'))
+    p.add_argument('--key', default=os.getenv('SUPABASE_ANON_KEY'))
+    p.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY)
+    p.add_argument('--batch-rows', type=int, default=1000, help='Initial rows per batch')
+    p.add_argument('--fixed', action='store_true', help='Disable adaptive batch sizing')
+    p.add_argument('--stub', action='store_true', help='Upload to a local PostgREST stand-in')
+    p.add_argument('--stub-latency', type=float, default=0.05, help='Stand-in seconds per request')
+    p.add_argument('--stub-fail-rate', type=float, default=0.0, help='Stand-in share of 503 replies')
+    args = p.parse_args()
+
+    stub = None
+    if args.stub:
+        from nse_postgrest_stub import PostgrestStub
+        stub = PostgrestStub(latency=args.stub_latency, fail_rate=args.stub_fail_rate).start()
+        args.url, args.key = stub.url, 'stub-key'
+        print(f"🧪 Local PostgREST stand-in at {stub.url}")
+    if not args.url or not args.key:
+        print("❌ Set SUPABASE_URL / SUPABASE_ANON_KEY or pass --url/--key (or --stub)")
+        return
+
+    files = sorted(glob.glob(args.files))
+    if not files:
+        print(f"❌ No files found matching pattern: {args.files}")
+        return
+
+    uploader = SupabaseBulkUploader(args.url, args.key, concurrency=args.concurrency,
+                                    batch_rows=args.batch_rows, adaptive=not args.fixed)
+    print(f"🎯 Uploading {len(files)} files, {args.concurrency} concurrent batches")
+    total = UploadStats()
+    for path in files:
+        df = pd.read_csv(path)
+        date_str = os.path.basename(path).split('_')[-1].replace('.csv', '')
+        frame = prepare_stock_frame(df, pd.to_datetime(date_str, format='%d%m%Y').date())
+        stats = uploader.upload_frame(frame)
+        print(f"   ✅ {os.path.basename(path)}: {stats.rows:,}/{len(frame):,} rows, "
+              f"{stats.rows_per_sec:,.0f} rows/s")
+        total.rows += stats.rows
+        total.failed_rows += stats.failed_rows
+        total.batches += stats.batches
+        total.retries += stats.retries
+        total.splits += stats.splits
+        total.bytes += stats.bytes
+        total.errors.extend(stats.errors)
+    total.seconds = time.perf_counter() - total.started
+    total.report(uploader.batch_size.size)
+
+    if stub is not None:
+        print(f"🧪 Stand-in now holds {stub.row_count(DEFAULT_TABLE):,} rows "
+              f"({stub.requests:,} requests)")
+        stub.stop()
+
+
+if __name__ == "__main__":
+    main()
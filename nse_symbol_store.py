@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+NSE Symbol Store - memory-mapped per-symbol equity history
+
+Purpose:
+  Per-stock lookups (NSEDatabase.get_stock_data, NSEQueryTool.stock_performance,
+  NSESupabaseAnalyzer.analyze_stock) each run one query per symbol and build
+  rows/frames in Python. This store keeps the whole equity history as one
+  contiguous column per field, sorted by (symbol, trade_date):
+
+    nse_symbol_store/
+      index.json          symbols (sorted), series, fields, row count, last trade_date
+      offsets.npy         int64[n_symbols + 1]; symbol i = rows offsets[i]:offsets[i+1]
+      trade_date.npy      datetime64[D]
+      close_price.npy ... float64 (NaN = missing)
+
+Design:
+  - Columns are plain .npy files opened with np.load(mmap_mode='r'), so a
+    symbol's history is a slice -> zero-copy array views, found in O(1) via
+    a dict over the symbol index.
+  - Nothing is read until touched; several analytics processes opening the
+    same store share the pages through the OS page cache. A SymbolStore
+    pickles as its path, so it can be handed to multiprocessing workers,
+    which re-map the files instead of receiving copies.
+  - Builds write into a temporary directory and swap it in, so readers never
+    see a half-written store. Source is the bhavcopy CSVs or the Parquet lake.
+
+Usage:
+  python nse_symbol_store.py --build                 # from NSE_*_Data CSVs
+  python nse_symbol_store.py --build --from-lake     # from nse_lake/
+  python nse_symbol_store.py --symbol TCS
+
+  store = SymbolStore()
+  h = store.history('TCS', start='2025-04-01')       # dict of array views
+  h['close_price'][-1], h['trade_date'][0]
+"""
+
+import os
+import json
+import time
+import shutil
+import argparse
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from nse_trading_calendar import to_date
+
+DEFAULT_STORE_PATH = 'nse_symbol_store'
+INDEX_FILE = 'index.json'
+
+FIELDS = ['trade_date', 'prev_close', 'open_price', 'high_price', 'low_price', 'last_price',
+          'close_price', 'avg_price', 'ttl_trd_qnty', 'turnover_lacs', 'no_of_trades',
+          'deliv_qty', 'deliv_per']
+
+# Column names used by the SQLite (nse_database) and Supabase tables
+SQLITE_COLUMN_NAMES = {'trade_date': 'date', 'ttl_trd_qnty': 'total_traded_qty',
+                       'deliv_qty': 'delivery_qty', 'deliv_per': 'delivery_percentage'}
+SUPABASE_COLUMN_NAMES = {**SQLITE_COLUMN_NAMES, 'deliv_per': 'deliverable_percentage'}
+
+
+def build_store(df: pd.DataFrame, path: str = DEFAULT_STORE_PATH, series: str = 'EQ') -> int:
+    """
+    Write a store from a frame with step01_equity_daily column names
+    (symbol, series, trade_date, prices, counts). Returns rows written.
+    """
+    df = df[df['series'].astype(str) == series] if series else df
+    df = df[df['symbol'].notna()]
+    df = pd.DataFrame({
+        'symbol': df['symbol'].astype(str).to_numpy(),
+        **{field: df[field].to_numpy() for field in FIELDS if field != 'trade_date'},
+        'trade_date': pd.to_datetime(df['trade_date']).to_numpy(),
+    })
+    df = (df.sort_values(['symbol', 'trade_date'], kind='stable')
+            .drop_duplicates(['symbol', 'trade_date'], keep='last'))
+
+    symbols, starts = np.unique(df['symbol'].to_numpy(), return_index=True)
+    offsets = np.append(starts, len(df)).astype(np.int64)
+
+    tmp_path = path.rstrip('/\\') + '.tmp'
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+    np.save(os.path.join(tmp_path, 'offsets.npy'), offsets)
+    for field in FIELDS:
+        values = df[field].to_numpy().astype('datetime64[D]' if field == 'trade_date' else np.float64)
+        np.save(os.path.join(tmp_path, f"{field}.npy"), np.ascontiguousarray(values))
+    with open(os.path.join(tmp_path, INDEX_FILE), 'w', encoding='utf-8') as f:
+        last_date = str(df['trade_date'].max().date()) if len(df) else None
+        json.dump({'built': datetime.now().isoformat(timespec='seconds'), 'series': series,
+                   'rows': len(df), 'last_date': last_date, 'fields': FIELDS, 'symbols': symbols.tolist()}, f)
+
+    # Swap in: existing readers keep their mappings of the old (unlinked) files
+    old_path = path.rstrip('/\\') + '.old'
+    shutil.rmtree(old_path, ignore_errors=True)
+    if os.path.exists(path):
+        os.replace(path, old_path)
+    os.replace(tmp_path, path)
+    shutil.rmtree(old_path, ignore_errors=True)
+    return len(df)
+
+
+class SymbolStore:
+    def __init__(self, path: str = DEFAULT_STORE_PATH):
+        self.path = path
+        with open(os.path.join(path, INDEX_FILE), 'r', encoding='utf-8') as f:
+            self.meta = json.load(f)
+        self.symbols: List[str] = self.meta['symbols']
+        self.positions: Dict[str, int] = {s: i for i, s in enumerate(self.symbols)}
+        self.offsets = np.load(os.path.join(path, 'offsets.npy'))
+        self.columns: Dict[str, np.ndarray] = {
+            field: np.load(os.path.join(path, f"{field}.npy"), mmap_mode='r') for field in self.meta['fields']
+        }
+
+    @classmethod
+    def open_if_exists(cls, path: str = DEFAULT_STORE_PATH) -> Optional['SymbolStore']:
+        return cls(path) if os.path.exists(os.path.join(path, INDEX_FILE)) else None
+
+    def __reduce__(self):
+        # Workers re-map the files rather than receiving a pickled copy
+        return (SymbolStore, (self.path,))
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol.upper() in self.positions
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    @property
+    def last_date(self):
+        """Latest trade_date in the store (stores built before it was recorded: from the column)"""
+        if 'last_date' not in self.meta:
+            dates = self.columns['trade_date']
+            self.meta['last_date'] = str(dates.max()) if len(dates) else None
+        return to_date(self.meta['last_date']) if self.meta['last_date'] else None
+
+    def matches(self, rows: int, last_date) -> bool:
+        """True if the source the store was built from still has this many rows and this last day"""
+        return self.meta['rows'] == rows and self.last_date == (to_date(last_date) if last_date else None)
+
+    def row_range(self, symbol: str, start=None, end=None) -> slice:
+        """Row slice of a symbol, optionally narrowed to [start, end] by binary search"""
+        i = self.positions.get(symbol.upper())
+        if i is None:
+            return slice(0, 0)
+        lo, hi = int(self.offsets[i]), int(self.offsets[i + 1])
+        if start is not None or end is not None:
+            dates = self.columns['trade_date'][lo:hi]
+            if start is not None:
+                lo += int(np.searchsorted(dates, np.datetime64(to_date(start), 'D'), side='left'))
+            if end is not None:
+                hi = lo + int(np.searchsorted(self.columns['trade_date'][lo:hi],
+                                              np.datetime64(to_date(end), 'D'), side='right'))
+        return slice(lo, hi)
+
+    def history(self, symbol: str, start=None, end=None,
+                fields: Optional[List[str]] = None) -> Dict[str, np.ndarray]:
+        """{field: read-only view} for one symbol; empty arrays if unknown"""
+        rows = self.row_range(symbol, start, end)
+        return {field: self.columns[field][rows] for field in (fields or self.meta['fields'])}
+
+    def frame(self, symbol: str, start=None, end=None, fields: Optional[List[str]] = None,
+              column_names: Optional[Dict[str, str]] = None) -> pd.DataFrame:
+        """History as a DataFrame (copies; use history() for zero-copy access)"""
+        df = pd.DataFrame(self.history(symbol, start, end, fields))
+        return df.rename(columns=column_names) if column_names else df
+
+
+def load_source_frame(from_lake: bool = False, lake_root: str = 'nse_lake', source_root: str = '.') -> pd.DataFrame:
+    """Equity history with step01 column names, from the Parquet lake or the raw CSVs"""
+    from nse_parquet_lake import EQ_COLUMN_MAPPING, ParquetLake, discover_sources
+    if from_lake:
+        return ParquetLake(lake_root).scan('EQ', columns=['symbol', 'series'] + FIELDS)
+
+    from nse_bhavcopy_parser import read_bhavcopy_files
+    files = list(discover_sources('EQ', source_root).values())
+    return read_bhavcopy_files(files, column_mapping=EQ_COLUMN_MAPPING)
+
+
+def main():
+    p = argparse.ArgumentParser(description='Build / query the memory-mapped NSE symbol store')
+    p.add_argument('--path', default=DEFAULT_STORE_PATH)
+    p.add_argument('--build', action='store_true')
+    p.add_argument('--from-lake', action='store_true', help='Build from the Parquet lake instead of CSVs')
+    p.add_argument('--lake-root', default='nse_lake')
+    p.add_argument('--source-root', default='.')
+    p.add_argument('--series', default='EQ')
+    p.add_argument('--symbol', help='Show one symbol and the lookup time')
+    args = p.parse_args()
+
+    print("🗃️ NSE Symbol Store")
+    print("=" * 60)
+
+    if args.build:
+        started = time.perf_counter()
+        df = load_source_frame(args.from_lake, args.lake_root, args.source_root)
+        rows = build_store(df, args.path, args.series)
+        print(f"✅ Built {args.path}: {rows:,} rows in {time.perf_counter() - started:.1f}s")
+
+    store = SymbolStore.open_if_exists(args.path)
+    if store is None:
+        print(f"❌ No store at {args.path}; run with --build first")
+        return
+    print(f"📊 {len(store):,} symbols, {store.meta['rows']:,} rows, series {store.meta['series']}, "
+          f"built {store.meta['built']}")
+
+    if args.symbol:
+        started = time.perf_counter()
+        history = store.history(args.symbol)
+        elapsed = (time.perf_counter() - started) * 1e6
+        dates, close = history['trade_date'], history['close_price']
+        if len(dates) == 0:
+            print(f"❌ No data found for {args.symbol.upper()}")
+            return
+        print(f"📈 {args.symbol.upper()}: {len(dates)} days {dates[0]} → {dates[-1]}, "
+              f"close {close[0]:.2f} → {close[-1]:.2f}, lookup {elapsed:.0f}µs")
+
+
+if __name__ == "__main__":
+    main()
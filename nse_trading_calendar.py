@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+NSE Trading Calendar - shared holiday-aware trading-day lookups
+
+Purpose:
+  One calendar for every downloader, loader and analyzer instead of each
+  script building its own Monday-Friday list. Holidays and special weekend
+  sessions come from nse_holidays.json (edit that file when NSE publishes the
+  next year's circular).
+
+Design:
+  All trading days for the covered years are precomputed once into a sorted
+  list of dates plus:
+    - a date -> position dict     (is_trading_day, O(1))
+    - a (year, month) -> slice    (nth trading day / month lists, O(1))
+  next/previous trading day and range queries use bisect (O(log n)).
+
+  Years without any entry in the holiday file are treated as Monday-Friday,
+  so dates outside the maintained range keep the old behaviour: a query
+  outside the built years extends the calendar (with a warning) instead of
+  reporting no trading days. Muhurat sessions are not modelled.
+
+Usage:
+  from nse_trading_calendar import get_calendar
+  cal = get_calendar()
+  cal.is_trading_day(date(2025, 2, 26))          # False (Mahashivratri)
+  cal.trading_days_in_month(2025, 2)             # 20 dates (incl. the Budget Saturday session)
+  cal.nth_trading_day(2025, 3, -1)               # last trading day of March
+  python nse_trading_calendar.py --year 2025     # print month-wise counts
+"""
+
+import os
+import json
+import bisect
+import argparse
+import calendar
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_HOLIDAY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'nse_holidays.json')
+
+
+def to_date(value) -> date:
+    """Accept date, datetime, 'YYYY-MM-DD', 'YYYYMMDD', 'DD-MM-YYYY' or 'DDMMYYYY'"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    value = str(value).strip()
+    for fmt in ('%Y-%m-%d', '%Y%m%d', '%d-%m-%Y', '%d%m%Y'):
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Unrecognised date: {value!r}")
+
+
+class NSETradingCalendar:
+    def __init__(self, holiday_file: str = DEFAULT_HOLIDAY_FILE, first_year: Optional[int] = None,
+                 last_year: Optional[int] = None):
+        self.holidays: Dict[date, str] = {}
+        self.special_sessions: Dict[date, str] = {}
+        self.load_holidays(holiday_file)
+
+        known_years = {d.year for d in self.holidays} | {d.year for d in self.special_sessions}
+        self.first_year = first_year or min(known_years, default=date.today().year)
+        self.last_year = last_year or max(max(known_years, default=date.today().year), date.today().year + 1)
+
+        self._days: List[date] = []
+        self._index: Dict[date, int] = {}
+        self._months: Dict[Tuple[int, int], Tuple[int, int]] = {}
+        self._build()
+
+    def load_holidays(self, holiday_file: str):
+        if not os.path.exists(holiday_file):
+            print(f"⚠️ Holiday file not found: {holiday_file} (using Monday-Friday calendar)")
+            return
+        with open(holiday_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        self.holidays = {to_date(d): name for d, name in data.get('holidays', {}).items()}
+        self.special_sessions = {to_date(d): name for d, name in data.get('special_sessions', {}).items()}
+
+    def _build(self):
+        current = date(self.first_year, 1, 1)
+        end = date(self.last_year, 12, 31)
+        while current <= end:
+            if (current.weekday() < 5 and current not in self.holidays) or current in self.special_sessions:
+                key = (current.year, current.month)
+                start, _ = self._months.get(key, (len(self._days), 0))
+                self._index[current] = len(self._days)
+                self._days.append(current)
+                self._months[key] = (start, len(self._days))
+            current += timedelta(days=1)
+
+    def _cover(self, first_year: int, last_year: int):
+        """Extend the built range (Monday-Friday, no holidays) to include these years"""
+        if first_year >= self.first_year and last_year <= self.last_year:
+            return
+        first_year, last_year = min(first_year, self.first_year), max(last_year, self.last_year)
+        added = [y for y in range(first_year, last_year + 1) if not self.first_year <= y <= self.last_year]
+        span = f"{added[0]}" if len(added) == 1 else f"{added[0]}-{added[-1]}"
+        print(f"⚠️ No NSE holiday list for {span}: treating {'it' if len(added) == 1 else 'them'} as Monday-Friday")
+        self.first_year, self.last_year = first_year, last_year
+        self._days, self._index, self._months = [], {}, {}
+        self._build()
+
+    def is_trading_day(self, value) -> bool:
+        d = to_date(value)
+        self._cover(d.year, d.year)
+        return d in self._index
+
+    def holiday_name(self, value) -> Optional[str]:
+        return self.holidays.get(to_date(value))
+
+    def next_trading_day(self, value) -> date:
+        """First trading day strictly after the given date"""
+        d = to_date(value)
+        self._cover(d.year, d.year + 1)
+        i = bisect.bisect_right(self._days, d)
+        if i >= len(self._days):
+            raise ValueError(f"No trading day after {d} within the calendar range")
+        return self._days[i]
+
+    def previous_trading_day(self, value) -> date:
+        """Last trading day strictly before the given date"""
+        d = to_date(value)
+        self._cover(d.year - 1, d.year)
+        i = bisect.bisect_left(self._days, d)
+        if i == 0:
+            raise ValueError(f"No trading day before {d} within the calendar range")
+        return self._days[i - 1]
+
+    def trading_days(self, start, end) -> List[date]:
+        """Trading days between start and end, inclusive"""
+        start, end = to_date(start), to_date(end)
+        if start > end:
+            return []
+        self._cover(start.year, end.year)
+        lo = bisect.bisect_left(self._days, start)
+        hi = bisect.bisect_right(self._days, end)
+        return self._days[lo:hi]
+
+    def trading_days_in_month(self, year: int, month: int) -> List[date]:
+        self._cover(year, year)
+        start, end = self._months.get((year, month), (0, 0))
+        return self._days[start:end]
+
+    def trading_day_count(self, year: int, month: int) -> int:
+        self._cover(year, year)
+        start, end = self._months.get((year, month), (0, 0))
+        return end - start
+
+    def nth_trading_day(self, year: int, month: int, n: int) -> date:
+        """1-based nth trading day of a month; negative n counts from the end (-1 = last)"""
+        self._cover(year, year)
+        start, end = self._months.get((year, month), (0, 0))
+        if n == 0 or abs(n) > end - start:
+            raise IndexError(f"{year}-{month:02d} has {end - start} trading days, asked for #{n}")
+        return self._days[start + n - 1] if n > 0 else self._days[end + n]
+
+
+@lru_cache(maxsize=None)
+def get_calendar(holiday_file: str = DEFAULT_HOLIDAY_FILE) -> NSETradingCalendar:
+    """Shared calendar instance (built once per process)"""
+    return NSETradingCalendar(holiday_file)
+
+
+def main():
+    p = argparse.ArgumentParser(description='Show NSE trading days per month')
+    p.add_argument('--year', type=int, default=date.today().year)
+    args = p.parse_args()
+
+    cal = get_calendar()
+    print(f"📅 NSE Trading Calendar {args.year}")
+    print("=" * 60)
+    total = 0
+    for month in range(1, 13):
+        count = cal.trading_day_count(args.year, month)
+        total += count
+        closed = [f"{d.day:02d} {name}" for d, name in sorted(cal.holidays.items())
+                  if d.year == args.year and d.month == month and d.weekday() < 5]
+        print(f"{calendar.month_name[month]:<10} {count:3d} days" + (f"  | closed: {', '.join(closed)}" if closed else ''))
+    print("-" * 60)
+    print(f"Total: {total} trading days")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+NSE UDiFF Streaming Ingestion - bounded-memory zip -> CSV -> DataFrame batches
+
+Purpose:
+  The F&O loaders used to hold each day's file three times: response.content,
+  a BytesIO copy for zipfile, and the full DataFrame. This module instead
+    1. spools the HTTP body to disk in fixed-size chunks (iter_content)
+    2. stream-decompresses the inner CSV straight from the zip member
+    3. parses it into fixed-size record batches (pd.read_csv chunksize)
+  so peak memory is one chunk plus one batch regardless of file size.
+
+Usage:
+  path = spool_response(response, dest_path)          # requests stream=True
+  for batch in iter_zip_csv_batches(path, batch_rows=5000):
+      ... process / insert batch ...
+
+  # or in one step (temp file is removed once iteration finishes)
+  for batch in stream_udiff_batches(session, url):
+      ...
+"""
+
+import os
+import zipfile
+import tempfile
+from contextlib import contextmanager
+from typing import IO, Dict, Iterator, Optional
+
+import pandas as pd
+
+CHUNK_SIZE = 1 << 20        # 1 MiB network/disk chunks
+BATCH_ROWS = 5000           # rows per DataFrame batch
+
+
+def spool_response(response, dest_path: Optional[str] = None, chunk_size: int = CHUNK_SIZE) -> str:
+    """
+    Write a streamed requests response to dest_path (or a temp file) chunk by
+    chunk. The write goes to a .part file first so a crash never leaves a
+    truncated zip under the final name. Returns the file path.
+    """
+    if dest_path:
+        os.makedirs(os.path.dirname(dest_path) or '.', exist_ok=True)
+        tmp_path = dest_path + '.part'
+        handle = open(tmp_path, 'wb')
+    else:
+        handle = tempfile.NamedTemporaryFile(prefix='udiff_', suffix='.zip', delete=False)
+        tmp_path = handle.name
+
+    try:
+        with handle:
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                if chunk:
+                    handle.write(chunk)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+    if dest_path:
+        os.replace(tmp_path, dest_path)
+        return dest_path
+    return tmp_path
+
+
+@contextmanager
+def open_zip_csv(zip_path: str) -> Iterator[IO[bytes]]:
+    """Open the first CSV member of a zip as a decompressing binary stream"""
+    with zipfile.ZipFile(zip_path) as zf:
+        csv_files = [f for f in zf.namelist() if f.lower().endswith('.csv')]
+        if not csv_files:
+            raise ValueError(f"No CSV file found in {zip_path}")
+        with zf.open(csv_files[0]) as member:
+            yield member
+
+
+def iter_zip_csv_batches(zip_path: str, batch_rows: int = BATCH_ROWS,
+                         **read_csv_kwargs) -> Iterator[pd.DataFrame]:
+    """Yield DataFrames of at most batch_rows rows from the zip's CSV"""
+    encodings = [read_csv_kwargs.pop('encoding')] if 'encoding' in read_csv_kwargs else ['utf-8', 'latin-1']
+    for i, encoding in enumerate(encodings):
+        yielded = False
+        try:
+            with open_zip_csv(zip_path) as stream:
+                for batch in pd.read_csv(stream, chunksize=batch_rows, encoding=encoding,
+                                         low_memory=False, **read_csv_kwargs):
+                    yielded = True
+                    yield batch
+            return
+        except UnicodeDecodeError:
+            # Only safe to retry with another encoding before anything was handed out
+            if yielded or i == len(encodings) - 1:
+                raise
+
+
+def stream_udiff_batches(session, url: str, dest_path: Optional[str] = None, timeout: int = 30,
+                         batch_rows: int = BATCH_ROWS, headers: Optional[Dict[str, str]] = None,
+                         **read_csv_kwargs) -> Optional[Iterator[pd.DataFrame]]:
+    """
+    GET url with stream=True, spool it, and return a batch iterator over the
+    inner CSV. Returns None on a non-200 response. Without dest_path the
+    spooled temp file is deleted once the iterator is exhausted or closed.
+    """
+    response = session.get(url, timeout=timeout, stream=True, headers=headers)
+    try:
+        if response.status_code != 200:
+            return None
+        path = spool_response(response, dest_path)
+    finally:
+        response.close()
+
+    def batches():
+        try:
+            yield from iter_zip_csv_batches(path, batch_rows=batch_rows, **read_csv_kwargs)
+        finally:
+            if not dest_path and os.path.exists(path):
+                os.remove(path)
+
+    return batches()
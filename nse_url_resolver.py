@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+NSE URL Pattern Resolver - learned cache of which archive URL template works
+
+Purpose:
+  The downloaders try several URL templates per trading day, and most of them
+  404 for every day of a backfill. This resolver remembers, per template:
+    - positive ranges: date ranges for which the template returned a file
+    - negative entries: consecutive 404 misses; after `dead_after` misses the
+      template is considered dead for `negative_ttl_days` and skipped
+  so each day tries the template that worked for nearby dates first and never
+  wastes a round trip (or the sleep after it) on a template known to be dead.
+
+  Templates are opaque strings (the unformatted URL pattern); the resolver
+  never formats them itself. State is persisted as JSON between runs.
+
+Usage:
+  resolver = URLPatternResolver()
+  for template in resolver.order(templates, trade_date):
+      ... try template ...
+      resolver.record_success(template, trade_date)  # or record_miss(...)
+  resolver.save()
+"""
+
+import os
+import json
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+
+DEFAULT_CACHE_FILE = 'url_resolver_cache.json'
+
+# Two successes this many calendar days apart still extend one range
+# (covers weekends and holiday clusters).
+RANGE_MERGE_GAP_DAYS = 7
+
+# A dead template is still tried for dates this close to one of its positive ranges
+NEAR_RANGE_DAYS = 31
+
+MISS_STATUSES = {404, 410}
+
+
+def _to_date(value) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
+
+class URLPatternResolver:
+    def __init__(self, cache_file: str = DEFAULT_CACHE_FILE, negative_ttl_days: float = 7,
+                 dead_after: int = 3):
+        self.cache_file = cache_file
+        self.negative_ttl = negative_ttl_days * 86400
+        self.dead_after = dead_after
+        self.positive: Dict[str, List[List[str]]] = {}
+        self.negative: Dict[str, Dict] = {}
+        self.load()
+
+    def load(self):
+        """Load persisted state; a missing or corrupt file starts empty"""
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return
+        try:
+            with open(self.cache_file, 'r') as f:
+                state = json.load(f)
+            self.positive = state.get('positive', {})
+            self.negative = state.get('negative', {})
+        except (ValueError, OSError) as e:
+            print(f"⚠️ Ignoring unreadable resolver cache {self.cache_file}: {e}")
+
+    def save(self):
+        """Persist state atomically"""
+        if not self.cache_file:
+            return
+        tmp_path = self.cache_file + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'positive': self.positive, 'negative': self.negative}, f, indent=2)
+        os.replace(tmp_path, self.cache_file)
+
+    def _distance(self, template: str, d: date) -> Optional[int]:
+        """Days from d to the nearest positive range of the template (0 = inside)"""
+        best = None
+        for start, end in self.positive.get(template, []):
+            start, end = _to_date(start), _to_date(end)
+            if start <= d <= end:
+                return 0
+            dist = (start - d).days if d < start else (d - end).days
+            best = dist if best is None else min(best, dist)
+        return best
+
+    def is_dead(self, template: str, now: Optional[float] = None) -> bool:
+        entry = self.negative.get(template)
+        if not entry or not entry.get('dead_until'):
+            return False
+        now = time.time() if now is None else now
+        if now >= entry['dead_until']:
+            # TTL expired: give the template a fresh chance
+            del self.negative[template]
+            return False
+        return True
+
+    def order(self, templates: List[str], trade_date) -> List[str]:
+        """
+        Templates to try for a date: learned ones first (nearest positive range),
+        then untried ones in their original order. Dead templates are dropped
+        unless they have worked for dates near this one.
+        """
+        d = _to_date(trade_date)
+        ranked = []
+        for index, template in enumerate(templates):
+            distance = self._distance(template, d)
+            if self.is_dead(template) and (distance is None or distance > NEAR_RANGE_DAYS):
+                continue
+            ranked.append((0 if distance is not None else 1, distance or 0, index, template))
+        ranked.sort()
+        return [template for *_, template in ranked]
+
+    def record_success(self, template: str, trade_date):
+        d = _to_date(trade_date)
+        self.negative.pop(template, None)
+        ranges = self.positive.setdefault(template, [])
+        for r in ranges:
+            start, end = _to_date(r[0]), _to_date(r[1])
+            if start - timedelta(days=RANGE_MERGE_GAP_DAYS) <= d <= end + timedelta(days=RANGE_MERGE_GAP_DAYS):
+                r[0], r[1] = min(start, d).isoformat(), max(end, d).isoformat()
+                break
+        else:
+            ranges.append([d.isoformat(), d.isoformat()])
+        self._merge_ranges(template)
+
+    def record_miss(self, template: str, trade_date, status=404):
+        """Record a failed attempt; only 404/410 count toward the negative cache"""
+        if status not in MISS_STATUSES:
+            return
+        d = _to_date(trade_date)
+        if self._distance(template, d) == 0:
+            # A known-good template missing a day inside its range is a holiday, not a dead pattern
+            return
+        entry = self.negative.setdefault(template, {'misses': 0, 'dead_until': None})
+        entry['misses'] += 1
+        entry['last_miss'] = d.isoformat()
+        if entry['misses'] >= self.dead_after:
+            entry['dead_until'] = time.time() + self.negative_ttl
+
+    def _merge_ranges(self, template: str):
+        ranges = sorted(self.positive[template], key=lambda r: r[0])
+        merged = [ranges[0]]
+        for start, end in ranges[1:]:
+            last = merged[-1]
+            if _to_date(start) - _to_date(last[1]) <= timedelta(days=RANGE_MERGE_GAP_DAYS):
+                last[1] = max(last[1], end)
+            else:
+                merged.append([start, end])
+        self.positive[template] = merged
+
+    def summary(self) -> Dict:
+        return {
+            'learned_templates': len(self.positive),
+            'dead_templates': sum(1 for t in list(self.negative) if self.is_dead(t)),
+        }
+
+
+def main():
+    """Print the current resolver cache"""
+    resolver = URLPatternResolver()
+    print("🧠 NSE URL Pattern Resolver Cache")
+    print("=" * 60)
+    print(f"📁 Cache file: {resolver.cache_file}")
+    for template, ranges in resolver.positive.items():
+        print(f"\n✅ {template}")
+        for start, end in ranges:
+            print(f"   {start} → {end}")
+    for template, entry in list(resolver.negative.items()):
+        state = 'dead' if resolver.is_dead(template) else 'suspect'
+        print(f"\n❌ [{state}] {template} (misses: {entry['misses']}, last: {entry.get('last_miss')})")
+
+
+if __name__ == "__main__":
+    main()
@@ -20,7 +20,7 @@ Logic:
 - Calculate: (Base Price - Future Price) / Base Price * 100 >= 50%
 """
 
-import pyodbc
+import nse_db_pool
 import pandas as pd
 from datetime import datetime
 import logging
@@ -39,13 +39,7 @@ logger = logging.getLogger(__name__)
 # Database connection
 def get_connection():
     """Get database connection"""
-    connection_string = (
-        "Driver={ODBC Driver 17 for SQL Server};"
-        "Server=SRIKIRANREDDY\\SQLEXPRESS;"
-        "Database=master;"
-        "Trusted_Connection=yes;"
-    )
-    return pyodbc.connect(connection_string)
+    return nse_db_pool.get_connection()
 
 def get_test_strikes_data():
     """
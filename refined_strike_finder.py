@@ -10,7 +10,7 @@ This implements the exact logic requested:
 This is the production-ready version for implementation.
 """
 
-import pyodbc
+import nse_db_pool
 import pandas as pd
 import numpy as np
 from datetime import datetime
@@ -20,7 +20,7 @@ def find_nearest_strikes_day_wise(trade_date, symbol, target_price):
     Core logic: Find 3 nearest strikes for both PE and CE options
     Returns exactly 6 records for the given day and symbol
     """
-    conn = pyodbc.connect('Driver={SQL Server};Server=SRIKIRANREDDY\\SQLEXPRESS;Database=master;Trusted_Connection=yes;')
+    conn = nse_db_pool.get_connection()
     
     # Convert date format if needed (YYYY-MM-DD to YYYYMMDD)
     if isinstance(trade_date, str) and '-' in trade_date:
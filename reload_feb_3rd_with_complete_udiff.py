@@ -1,6 +1,6 @@
 #!/usr/bin/env python3
 
-import pyodbc
+import nse_db_pool
 import json
 import pandas as pd
 from datetime import datetime, timedelta
@@ -15,8 +15,7 @@ def clear_and_reload_feb_3rd():
         config = json.load(f)
 
     try:
-        conn_str = f"DRIVER={config['driver']};SERVER={config['server']};DATABASE={config['database']};Trusted_Connection=yes;"
-        conn = pyodbc.connect(conn_str)
+        conn = nse_db_pool.get_connection()
         cursor = conn.cursor()
         
         print("🧹 CLEARING AND RELOADING FEBRUARY 3RD, 2025 DATA")
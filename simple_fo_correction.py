@@ -8,14 +8,13 @@ Purpose: Correct missing records by reloading data from source files
 import pandas as pd
 import zipfile
 import os
-import pyodbc
-
+import nse_db_pool
 def correct_single_date(date, zip_file):
     """Correct data for a single date"""
     print(f"\n🔧 Correcting {date}...")
     
     # Connect to database
-    conn = pyodbc.connect('DRIVER={ODBC Driver 17 for SQL Server};SERVER=SRIKIRANREDDY\\SQLEXPRESS;DATABASE=master;Trusted_Connection=yes;')
+    conn = nse_db_pool.get_connection()
     cursor = conn.cursor()
     
     try:
@@ -4,7 +4,7 @@ Step 01 Data Explorer
 View the complete structure and content of loaded equity data
 """
 
-import pyodbc
+import nse_db_pool
 import json
 import pandas as pd
 
@@ -16,8 +16,7 @@ def explore_step01_data():
             config = json.load(f)
         
         # Connect to database
-        conn_str = f"DRIVER={{ODBC Driver 17 for SQL Server}};SERVER={config['server']};DATABASE={config['database']};Trusted_Connection=yes;"
-        conn = pyodbc.connect(conn_str)
+        conn = nse_db_pool.get_connection()
         cursor = conn.cursor()
         
         print("🔍 Step 01: Complete Equity Data Analysis")
@@ -10,6 +10,9 @@ Purpose:
 Usage:
   python step01_equity_data_loader.py --data-pattern "NSE_*_2025_Data/cm*.csv"
   python step01_equity_data_loader.py --month January --year 2025
+  python step01_equity_data_loader.py --merge      # idempotent: stage + MERGE, skip unchanged files
+  python step01_equity_data_loader.py --rolling    # also flag each loaded day against rolling 20/60-day baselines
+  python step01_equity_data_loader.py --peaks      # also refresh step02_monthly_analysis peaks for each loaded day
 """
 
 import pandas as pd
@@ -18,6 +21,12 @@ import os
 import argparse
 from datetime import datetime
 from nse_database_integration import NSEDatabaseManager
+from nse_bhavcopy_parser import read_bhavcopy
+from nse_bulk_loader import BulkLoader, STEP01_EQUITY_COLUMNS, CHUNK_ROWS
+from nse_staged_merge import StagedMerger, STEP01_MERGE, file_checksum
+from nse_load_pipeline import iter_parsed, PipelineStats, DEFAULT_WORKERS
+from nse_rolling_baseline import RollingExceedanceTracker, ROLLING_TABLE
+from nse_monthly_peaks import MonthlyPeakExtractor, HISTORY_COLUMNS, MONTHLY_TABLE
 
 COLUMN_MAPPING = {
     'symbol': 'SYMBOL', 'SYMBOL': 'SYMBOL',
@@ -37,35 +46,40 @@ COLUMN_MAPPING = {
     'deliv_per': 'DELIV_PER', 'DELIV_PER': 'DELIV_PER', 'delivery_percentage': 'DELIV_PER'
 }
 
+# Standardized CSV columns -> step01_equity_daily columns
+TABLE_COLUMNS = {
+    'DATE': 'trade_date', 'SYMBOL': 'symbol', 'SERIES': 'series', 'PREV_CLOSE': 'prev_close',
+    'OPEN_PRICE': 'open_price', 'HIGH_PRICE': 'high_price', 'LOW_PRICE': 'low_price',
+    'LAST_PRICE': 'last_price', 'CLOSE_PRICE': 'close_price', 'AVG_PRICE': 'avg_price',
+    'TTL_TRD_QNTY': 'ttl_trd_qnty', 'TURNOVER_LACS': 'turnover_lacs', 'NO_OF_TRADES': 'no_of_trades',
+    'DELIV_QTY': 'deliv_qty', 'DELIV_PER': 'deliv_per', 'SOURCE_FILE': 'source_file'
+}
+
 def parse_args():
     p = argparse.ArgumentParser(description='Load complete NSE daily data (all segments) into database')
     p.add_argument('--data-pattern', default='NSE_*_2025_Data/cm*.csv', help='Glob pattern for CSV files')
     p.add_argument('--month', help='Specific month (e.g., January)')
     p.add_argument('--year', help='Specific year (e.g., 2025)')
-    p.add_argument('--batch-size', type=int, default=1000, help='Batch size for database inserts')
+    p.add_argument('--batch-size', type=int, default=CHUNK_ROWS, help='Rows per bulk insert chunk')
     p.add_argument('--skip-existing', action='store_true', help='Skip files already loaded')
+    p.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                   help='Parser processes feeding the database writer (1 = parse inline)')
+    p.add_argument('--merge', action='store_true',
+                   help='Stage + MERGE on (trade_date, symbol, series); skip files whose checksum is unchanged')
+    p.add_argument('--rolling', action='store_true',
+                   help=f'Flag each loaded EQ day against rolling baselines into {ROLLING_TABLE}')
+    p.add_argument('--peaks', action='store_true',
+                   help=f'Recompute {MONTHLY_TABLE} peaks touched by each loaded EQ day')
     return p.parse_args()
 
 def load_and_clean_csv(file_path: str) -> pd.DataFrame:
     """Load and standardize a single CSV file"""
     try:
-        df = pd.read_csv(file_path)
-        df.columns = df.columns.str.strip()
-        df = df.map(lambda x: x.strip() if isinstance(x, str) else x)
-        df = df.rename(columns=COLUMN_MAPPING)
+        # Vectorized parse: typed numerics, categorical SYMBOL/SERIES, parsed DATE
+        df = read_bhavcopy(file_path, column_mapping=COLUMN_MAPPING)
         
         # Load ALL series data (EQ, SM, BE, ST, GB, GS, BZ, etc.)
         # No filtering - include complete NSE market data
-        print(f"   📊 Series found: {df['SERIES'].value_counts().to_dict() if 'SERIES' in df.columns else 'No SERIES column'}")
-        
-        # Standardize numeric columns
-        numeric_cols = ['PREV_CLOSE', 'OPEN_PRICE', 'HIGH_PRICE', 'LOW_PRICE', 'LAST_PRICE', 
-                       'CLOSE_PRICE', 'AVG_PRICE', 'TTL_TRD_QNTY', 'TURNOVER_LACS', 
-                       'NO_OF_TRADES', 'DELIV_QTY', 'DELIV_PER']
-        
-        for col in numeric_cols:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
         
         # Add source file tracking
         df['SOURCE_FILE'] = os.path.basename(file_path)
@@ -82,54 +96,24 @@ def load_and_clean_csv(file_path: str) -> pd.DataFrame:
         print(f"❌ Error loading {file_path}: {e}")
         return pd.DataFrame()
 
-def insert_batch_to_db(db_manager: NSEDatabaseManager, df_batch: pd.DataFrame):
-    """Insert a batch of records to step01_equity_daily table"""
+def to_table_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Standardized CSV frame -> step01_equity_daily column names (series defaults to EQ)"""
+    frame = df.rename(columns=TABLE_COLUMNS)
+    if 'series' in frame.columns:
+        frame['series'] = frame['series'].astype(object).fillna('EQ')
+    else:
+        frame['series'] = 'EQ'
+    return frame
+
+def insert_batch_to_db(db_manager: NSEDatabaseManager, df_batch: pd.DataFrame,
+                       chunk_rows: int = CHUNK_ROWS):
+    """Insert a batch of records to step01_equity_daily table (one bulk transaction)"""
     if df_batch.empty:
         return 0
     
-    cursor = db_manager.connection.cursor()
-    
-    insert_sql = """
-    INSERT INTO step01_equity_daily 
-    (trade_date, symbol, series, prev_close, open_price, high_price, low_price, 
-     last_price, close_price, avg_price, ttl_trd_qnty, turnover_lacs, no_of_trades, 
-     deliv_qty, deliv_per, source_file)
-    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """
-    
-    # Prepare data for insertion
-    records = []
-    for _, row in df_batch.iterrows():
-        def safe_get(key):
-            """Get value and convert NaN to None for database"""
-            val = row.get(key)
-            if pd.isna(val):
-                return None
-            return val
-        
-        record = (
-            safe_get('DATE'),
-            safe_get('SYMBOL'),
-            safe_get('SERIES') or 'EQ',
-            safe_get('PREV_CLOSE'),
-            safe_get('OPEN_PRICE'),
-            safe_get('HIGH_PRICE'),
-            safe_get('LOW_PRICE'),
-            safe_get('LAST_PRICE'),
-            safe_get('CLOSE_PRICE'),
-            safe_get('AVG_PRICE'),
-            safe_get('TTL_TRD_QNTY'),
-            safe_get('TURNOVER_LACS'),
-            safe_get('NO_OF_TRADES'),
-            safe_get('DELIV_QTY'),
-            safe_get('DELIV_PER'),
-            safe_get('SOURCE_FILE')
-        )
-        records.append(record)
-    
-    cursor.executemany(insert_sql, records)
-    db_manager.connection.commit()
-    return len(records)
+    frame = to_table_frame(df_batch)
+    loader = BulkLoader(db_manager.connection, 'step01_equity_daily', STEP01_EQUITY_COLUMNS, chunk_rows)
+    return loader.load(frame)
 
 def main():
     args = parse_args()
@@ -153,35 +137,70 @@ def main():
     
     total_records = 0
     processed_files = 0
+    merger = StagedMerger(db_manager.connection, STEP01_MERGE) if args.merge else None
+    checksums = {}
+    eq_days = []
     
+    # Decide what to load up front so only those files are parsed
+    pending = []
     for file_path in files:
-        print(f"📖 Processing: {os.path.basename(file_path)}")
+        filename = os.path.basename(file_path)
         
         # Check if file already processed (if skip_existing enabled)
         if args.skip_existing:
             cursor = db_manager.connection.cursor()
-            cursor.execute("SELECT COUNT(*) FROM step01_equity_daily WHERE source_file = ?", 
-                          (os.path.basename(file_path),))
+            cursor.execute("SELECT COUNT(*) FROM step01_equity_daily WHERE source_file = ?", (filename,))
             if cursor.fetchone()[0] > 0:
-                print(f"   ⏭️  Skipping (already loaded)")
+                print(f"⏭️  Skipping {filename} (already loaded)")
                 continue
         
-        # Load and process file
-        df = load_and_clean_csv(file_path)
+        # Merge mode: O(1) checksum lookup, then only changed rows are written
+        if merger is not None:
+            checksums[filename] = file_checksum(file_path)
+            if merger.is_unchanged(filename, checksums[filename]):
+                print(f"⏭️  Skipping {filename} (unchanged since last load)")
+                continue
+        pending.append(file_path)
+    
+    # Worker processes parse ahead while this process writes (bounded by --workers * 2 files)
+    stats = PipelineStats()
+    for file_path, df, error in iter_parsed(pending, load_and_clean_csv, args.workers, stats=stats):
+        filename = os.path.basename(file_path)
+        print(f"📖 Processing: {filename}")
+        if error is not None:
+            print(f"❌ Error loading {file_path}: {error}")
+            continue
         if df.empty:
             continue
+        print(f"   📊 Series found: {df['SERIES'].value_counts().to_dict() if 'SERIES' in df.columns else 'No SERIES column'}")
         
-        # Insert in batches
-        file_records = 0
-        for i in range(0, len(df), args.batch_size):
-            batch = df.iloc[i:i + args.batch_size]
-            batch_count = insert_batch_to_db(db_manager, batch)
-            file_records += batch_count
-        
-        print(f"   ✅ Loaded {file_records:,} records")
-        total_records += file_records
+        if merger is not None:
+            counts = merger.merge_frame(to_table_frame(df), filename, checksums[filename])
+            print(f"   ✅ Merged: +{counts['inserted']:,} inserted, {counts['updated']:,} updated, "
+                  f"{counts['unchanged']:,} unchanged")
+            total_records += counts['inserted'] + counts['updated']
+        else:
+            # Bulk insert (chunked inside one transaction)
+            file_records = insert_batch_to_db(db_manager, df, args.batch_size)
+            print(f"   ✅ Loaded {file_records:,} records")
+            total_records += file_records
         processed_files += 1
+        if args.rolling or args.peaks:
+            frame = to_table_frame(df)
+            eq_days.append(frame.loc[frame['series'] == 'EQ'].reindex(columns=['series'] + HISTORY_COLUMNS))
+    
+    stats.report(args.workers)
     
+    # Files finish parsing out of order; the windows must roll forward in date order
+    if eq_days:
+        tracker = RollingExceedanceTracker(db_manager.connection) if args.rolling else None
+        peaks = MonthlyPeakExtractor(db_manager.connection) if args.peaks else None
+        for trade_date, day in pd.concat(eq_days).groupby('trade_date', sort=True):
+            if tracker is not None:
+                flagged = tracker.process_day(trade_date, day)
+                print(f"   📈 {pd.Timestamp(trade_date).date()}: {len(flagged):,} rolling exceedance rows")
+            if peaks is not None:
+                peaks.update(day)
     print(f"\n🎉 Loading complete!")
     print(f"   📁 Files processed: {processed_files}")
     print(f"   📊 Total records loaded: {total_records:,}")
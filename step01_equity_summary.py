@@ -4,7 +4,7 @@ Step 01 Equity Data Summary
 Show month-wise breakdown of loaded equity data
 """
 
-import pyodbc
+import nse_db_pool
 import json
 from datetime import datetime
 
@@ -16,8 +16,7 @@ def get_equity_summary():
             config = json.load(f)
         
         # Connect to database
-        conn_str = f"DRIVER={{ODBC Driver 17 for SQL Server}};SERVER={config['server']};DATABASE={config['database']};Trusted_Connection=yes;"
-        conn = pyodbc.connect(conn_str)
+        conn = nse_db_pool.get_connection()
         cursor = conn.cursor()
         
         # Get month-wise breakdown
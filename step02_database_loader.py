@@ -11,89 +11,23 @@ This script performs Step 02 analysis directly from database and loads results b
 import pandas as pd
 from datetime import datetime
 from nse_database_integration import NSEDatabaseManager
+from nse_month_key import MonthPredicates, available_months, month_key, month_label
+from nse_monthly_peaks import MonthlyPeakExtractor
 
 class Step02DatabaseLoader:
     def __init__(self):
         self.db = NSEDatabaseManager()
+        # trade_month = ... seeks on IX_step01_series_month_symbol (trade_date range if the key is missing)
+        self.months = MonthPredicates(self.db.connection)
+        self.peaks = MonthlyPeakExtractor(self.db.connection)
         
     def generate_monthly_analysis(self, target_month='2025-01'):
         """Generate monthly analysis for highest volume/delivery per symbol"""
+        target_month = month_label(month_key(target_month))
         print(f"🔍 Generating monthly analysis for {target_month}...")
         
-        # Query for highest volume per symbol in the month
-        volume_query = f"""
-        SELECT 
-            '{target_month}' as analysis_month,
-            symbol,
-            'VOLUME' as analysis_type,
-            trade_date as peak_date,
-            ttl_trd_qnty as peak_value,
-            ttl_trd_qnty,
-            deliv_qty,
-            close_price,
-            turnover_lacs,
-            'DATABASE_GENERATED' as analysis_file
-        FROM (
-            SELECT *,
-                ROW_NUMBER() OVER (PARTITION BY symbol ORDER BY ttl_trd_qnty DESC) as rn
-            FROM step01_equity_daily 
-            WHERE series = 'EQ' 
-            AND FORMAT(trade_date, 'yyyy-MM') = '{target_month}'
-        ) ranked
-        WHERE rn = 1
-        """
-        
-        # Query for highest delivery per symbol in the month  
-        delivery_query = f"""
-        SELECT 
-            '{target_month}' as analysis_month,
-            symbol,
-            'DELIVERY' as analysis_type,
-            trade_date as peak_date,
-            deliv_qty as peak_value,
-            ttl_trd_qnty,
-            deliv_qty,
-            close_price,
-            turnover_lacs,
-            'DATABASE_GENERATED' as analysis_file
-        FROM (
-            SELECT *,
-                ROW_NUMBER() OVER (PARTITION BY symbol ORDER BY deliv_qty DESC) as rn
-            FROM step01_equity_daily 
-            WHERE series = 'EQ' 
-            AND FORMAT(trade_date, 'yyyy-MM') = '{target_month}'
-            AND deliv_qty IS NOT NULL
-        ) ranked
-        WHERE rn = 1
-        """
-        
-        cursor = self.db.connection.cursor()
-        
-        # Load volume analysis
-        print("📊 Loading volume analysis...")
-        cursor.execute(volume_query)
-        volume_results = cursor.fetchall()
-        
-        # Load delivery analysis
-        print("📦 Loading delivery analysis...")
-        cursor.execute(delivery_query)
-        delivery_results = cursor.fetchall()
-        
-        # Insert into step02_monthly_analysis table
-        insert_query = """
-        INSERT INTO step02_monthly_analysis 
-        (analysis_month, symbol, analysis_type, peak_date, peak_value, 
-         ttl_trd_qnty, deliv_qty, close_price, turnover_lacs, analysis_file)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """
-        
-        total_inserted = 0
-        for row in volume_results + delivery_results:
-            cursor.execute(insert_query, row)
-            total_inserted += 1
-            
-        self.db.connection.commit()
-        print(f"✅ Inserted {total_inserted} monthly analysis records for {target_month}")
+        # Volume and delivery peaks from one read of the month (replaces the month's rows)
+        self.peaks.run(target_month, target_month)
         
     def generate_exceedance_analysis(self, baseline_month='2025-01', compare_month='2025-02'):
         """Generate exceedance analysis comparing two months"""
@@ -108,7 +42,7 @@ class Step02DatabaseLoader:
                 MAX(deliv_qty) as jan_base_delivery
             FROM step01_equity_daily 
             WHERE series = 'EQ' 
-            AND FORMAT(trade_date, 'yyyy-MM') = '{baseline_month}'
+            AND {self.months.month(baseline_month)}
             GROUP BY symbol
         )
         SELECT * FROM baselines
@@ -125,7 +59,7 @@ class Step02DatabaseLoader:
         SELECT trade_date, symbol, ttl_trd_qnty, deliv_qty, close_price
         FROM step01_equity_daily 
         WHERE series = 'EQ' 
-        AND FORMAT(trade_date, 'yyyy-MM') = '{compare_month}'
+        AND {self.months.month(compare_month)}
         ORDER BY trade_date, symbol
         """
         
@@ -195,30 +129,21 @@ class Step02DatabaseLoader:
         print("=" * 50)
         
         # Get all available months from database
-        cursor = self.db.connection.cursor()
-        cursor.execute("""
-            SELECT DISTINCT FORMAT(trade_date, 'yyyy-MM') as month
-            FROM step01_equity_daily 
-            WHERE series = 'EQ'
-            ORDER BY month
-        """)
-        
-        available_months = [row[0] for row in cursor.fetchall()]
-        print(f"📅 Found {len(available_months)} months: {', '.join(available_months)}")
+        months = available_months(self.db.connection, 'EQ')
+        print(f"📅 Found {len(months)} months: {', '.join(months)}")
         print()
         
-        # Generate monthly analysis for all months
-        for month in available_months:
-            print(f"📊 Processing {month}...")
-            self.generate_monthly_analysis(month)
+        # Monthly analysis for all months from a single scan of step01
+        print("📊 Extracting volume/delivery peaks for all months...")
+        self.peaks.run()
         
         print()
         print("🔍 Generating exceedance analyses...")
         
         # Generate exceedance analysis for consecutive month pairs
-        for i in range(len(available_months) - 1):
-            baseline_month = available_months[i]
-            compare_month = available_months[i + 1]
+        for i in range(len(months) - 1):
+            baseline_month = months[i]
+            compare_month = months[i + 1]
             print(f"📈 Comparing {compare_month} vs {baseline_month}")
             self.generate_exceedance_analysis(baseline_month, compare_month)
         
@@ -18,10 +18,12 @@ Table: step03_compare_monthvspreviousmonth
 import pandas as pd
 from datetime import datetime
 from nse_database_integration import NSEDatabaseManager
+from nse_month_key import MonthPredicates
 
 class Step03NewLogic:
     def __init__(self):
         self.db = NSEDatabaseManager()
+        self.months = MonthPredicates(self.db.connection)
         self.create_step03_table()
         
     def create_step03_table(self):
@@ -114,7 +116,7 @@ class Step03NewLogic:
         print("📅 Loading February 2025 daily data from step01_equity_daily...")
         
         cursor = self.db.connection.cursor()
-        cursor.execute("""
+        cursor.execute(f"""
             SELECT 
                 trade_date, symbol, series,
                 ttl_trd_qnty, deliv_qty,
@@ -124,7 +126,7 @@ class Step03NewLogic:
                 source_file
             FROM step01_equity_daily
             WHERE series = 'EQ' 
-            AND FORMAT(trade_date, 'yyyy-MM') = '2025-02'
+            AND {self.months.month('2025-02')}
             ORDER BY trade_date, symbol
         """)
         
@@ -21,11 +21,13 @@ TARGET TABLE: step03_delivery_exceedance_analysis
 import pandas as pd
 from datetime import datetime, date
 from nse_database_integration import NSEDatabaseManager
+from nse_month_key import MonthPredicates
 
 class Step03DeliveryExceedanceAnalyzer:
     def __init__(self):
         """Initialize the Step 3 analyzer for delivery exceedance detection"""
         self.db = NSEDatabaseManager()
+        self.months = MonthPredicates(self.db.connection)
         
         print("🚀 STEP 03: Delivery Exceedance Analysis")
         print("=" * 60)
@@ -107,7 +109,7 @@ class Step03DeliveryExceedanceAnalyzer:
         
         cursor = self.db.connection.cursor()
         
-        baseline_query = """
+        baseline_query = f"""
         SELECT 
             symbol,
             MAX(deliv_qty) as peak_delivery,
@@ -121,8 +123,7 @@ class Step03DeliveryExceedanceAnalyzer:
                 source_file,
                 ROW_NUMBER() OVER (PARTITION BY symbol ORDER BY deliv_qty DESC) as rn
             FROM step01_equity_daily
-            WHERE YEAR(trade_date) = 2025 
-                AND MONTH(trade_date) = 1
+            WHERE {self.months.month('2025-01')}
                 AND series = 'EQ'
                 AND deliv_qty IS NOT NULL
                 AND deliv_qty > 0
@@ -153,14 +154,13 @@ class Step03DeliveryExceedanceAnalyzer:
         
         cursor = self.db.connection.cursor()
         
-        march_query = """
+        march_query = f"""
         SELECT 
             trade_date, symbol, series, prev_close, open_price, high_price, 
             low_price, last_price, close_price, avg_price, ttl_trd_qnty, 
             turnover_lacs, no_of_trades, deliv_qty, deliv_per, source_file
         FROM step01_equity_daily
-        WHERE YEAR(trade_date) = 2025 
-            AND MONTH(trade_date) = 3
+        WHERE {self.months.month('2025-03')}
             AND series = 'EQ'
             AND deliv_qty IS NOT NULL
             AND deliv_qty > 0
@@ -21,11 +21,14 @@ TARGET TABLE: step03_february_vs_march_analysis
 import pandas as pd
 from datetime import datetime, date
 from nse_database_integration import NSEDatabaseManager
+from nse_trading_calendar import get_calendar
+from nse_month_key import MonthPredicates
 
 class Step03FebruaryVsMarchAnalyzer:
     def __init__(self):
         """Initialize the Step 3 analyzer for February vs March delivery exceedance detection"""
         self.db = NSEDatabaseManager()
+        self.months = MonthPredicates(self.db.connection)
         
         print("🚀 STEP 03: February vs March 2025 Delivery Exceedance Analysis")
         print("=" * 70)
@@ -110,7 +113,7 @@ class Step03FebruaryVsMarchAnalyzer:
         
         cursor = self.db.connection.cursor()
         
-        baseline_query = """
+        baseline_query = f"""
         SELECT 
             ranked.symbol,
             ranked.deliv_qty as peak_delivery,
@@ -124,8 +127,7 @@ class Step03FebruaryVsMarchAnalyzer:
                 source_file,
                 ROW_NUMBER() OVER (PARTITION BY symbol ORDER BY deliv_qty DESC) as rn
             FROM step01_equity_daily
-            WHERE YEAR(trade_date) = 2025 
-                AND MONTH(trade_date) = 2
+            WHERE {self.months.month('2025-02')}
                 AND series = 'EQ'
                 AND deliv_qty IS NOT NULL
                 AND deliv_qty > 0
@@ -163,14 +165,13 @@ class Step03FebruaryVsMarchAnalyzer:
         
         cursor = self.db.connection.cursor()
         
-        march_query = """
+        march_query = f"""
         SELECT 
             trade_date, symbol, series, prev_close, open_price, high_price, 
             low_price, last_price, close_price, avg_price, ttl_trd_qnty, 
             turnover_lacs, no_of_trades, deliv_qty, deliv_per, source_file
         FROM step01_equity_daily
-        WHERE YEAR(trade_date) = 2025 
-            AND MONTH(trade_date) = 3
+        WHERE {self.months.month('2025-03')}
             AND series = 'EQ'
             AND deliv_qty IS NOT NULL
             AND deliv_qty > 0
@@ -394,7 +395,7 @@ class Step03FebruaryVsMarchAnalyzer:
         print(f"   📊 Avg Increase: +{stats[1]:.1f}%") 
         print(f"   🚀 Max Increase: +{stats[2]:.1f}%")
         print(f"   🏢 Unique Symbols: {stats[3]:,}")
-        print(f"   📅 Trading Days: {stats[4]}")
+        print(f"   📅 Trading Days: {stats[4]} of {get_calendar().trading_day_count(2025, 3)}")
             
     def export_to_excel(self):
         """Export results to Excel for detailed analysis"""
@@ -101,9 +101,21 @@ BUSINESS VALUE:
 - Provide regulatory compliance data
 """
 
+import numpy as np
 import pandas as pd
 from datetime import datetime, date
 from nse_database_integration import NSEDatabaseManager
+from nse_trading_calendar import get_calendar
+from nse_month_key import MonthPredicates
+from nse_quantile_sketch import SketchStore
+
+# Tier / pattern labels; the vectorized classifier works on their indexes
+TIER_NAMES = ['NONE', 'TIER_1_STANDARD', 'TIER_2_SIGNIFICANT', 'TIER_3_EXCEPTIONAL', 'TIER_4_EXPLOSIVE']
+PATTERN_NAMES = ['STANDARD', 'STATISTICAL_OUTLIER', 'BREAKOUT', 'SPIKE', 'MOMENTUM']
+
+MARCH_COLUMNS = ['trade_date', 'symbol', 'series', 'prev_close', 'open_price', 'high_price',
+                 'low_price', 'last_price', 'close_price', 'avg_price', 'ttl_trd_qnty',
+                 'turnover_lacs', 'no_of_trades', 'deliv_qty', 'deliv_per']
 
 class Step03MarchVsFebruaryAnalyzer:
     """
@@ -129,22 +141,27 @@ class Step03MarchVsFebruaryAnalyzer:
     - Generates comprehensive business intelligence reports
     """
     
+    # Classification configuration (class level: the classifiers need no database)
+    outlier_threshold = 3.0   # Standard deviations for outlier detection
+    
+    # Exceedance tier definitions
+    tier_definitions = {
+        'TIER_1_STANDARD': 1.25,    # 25% above February average
+        'TIER_2_SIGNIFICANT': 1.50, # 50% above February average  
+        'TIER_3_EXCEPTIONAL': 2.00, # 100% above February average
+        'TIER_4_EXPLOSIVE': 3.00    # 200% above February average
+    }
+    
     def __init__(self):
         """Initialize analyzer with enhanced configuration"""
         self.db = NSEDatabaseManager()
+        self.months = MonthPredicates(self.db.connection)
         
         # Analysis configuration
         self.minimum_trading_days = 5  # Minimum February trading days required
+        self.baseline_trading_days = get_calendar().trading_day_count(2025, 2)  # NSE sessions in February
+        self.comparison_trading_days = get_calendar().trading_day_count(2025, 3)  # NSE sessions in March
         self.confidence_level = 0.95   # Statistical confidence level
-        self.outlier_threshold = 3.0   # Standard deviations for outlier detection
-        
-        # Exceedance tier definitions
-        self.tier_definitions = {
-            'TIER_1_STANDARD': 1.25,    # 25% above February average
-            'TIER_2_SIGNIFICANT': 1.50, # 50% above February average  
-            'TIER_3_EXCEPTIONAL': 2.00, # 100% above February average
-            'TIER_4_EXPLOSIVE': 3.00    # 200% above February average
-        }
         
         print("🔧 Initializing Step03 March vs February Analyzer...")
         print(f"   📊 Configuration: {self.minimum_trading_days} min days, {self.confidence_level} confidence")
@@ -306,77 +323,33 @@ class Step03MarchVsFebruaryAnalyzer:
         print("📊 Calculating Enhanced February 2025 Statistical Baselines...")
         print("   🔍 Methodology: Comprehensive statistical analysis with quality validation")
         
-        cursor = self.db.connection.cursor()
-        
-        # Enhanced baseline query with comprehensive statistics (SQL Server compatible)
-        baseline_query = """
-        WITH february_stats AS (
-            SELECT 
-                symbol,
-                series,
-                -- Basic statistics
-                COUNT(*) as trading_days,
-                AVG(CAST(ttl_trd_qnty AS FLOAT)) as avg_volume,
-                AVG(CAST(deliv_qty AS FLOAT)) as avg_delivery,
-                
-                -- Variability measures
-                STDEV(CAST(ttl_trd_qnty AS FLOAT)) as stddev_volume,
-                STDEV(CAST(deliv_qty AS FLOAT)) as stddev_delivery,
-                
-                -- Range measures
-                MIN(CAST(ttl_trd_qnty AS BIGINT)) as min_volume,
-                MIN(CAST(deliv_qty AS BIGINT)) as min_delivery,
-                MAX(CAST(ttl_trd_qnty AS BIGINT)) as max_volume,
-                MAX(CAST(deliv_qty AS BIGINT)) as max_delivery,
-                
-                -- Additional metrics
-                AVG(CAST(close_price AS FLOAT)) as avg_price,
-                AVG(CAST(turnover_lacs AS FLOAT)) as avg_turnover,
-                AVG(CAST(no_of_trades AS FLOAT)) as avg_trades
-                
-            FROM step01_equity_daily
-            WHERE YEAR(trade_date) = 2025 
-                AND MONTH(trade_date) = 2
-                AND series = 'EQ'
-                AND ttl_trd_qnty IS NOT NULL
-                AND deliv_qty IS NOT NULL
-                AND ttl_trd_qnty > 0  -- Exclude zero volume days
-            GROUP BY symbol, series
-            HAVING COUNT(*) >= ?  -- Minimum trading days requirement
-        )
-        SELECT 
-            symbol, series, trading_days,
-            avg_volume, avg_delivery, stddev_volume, stddev_delivery,
-            min_volume, min_delivery, max_volume, max_delivery,
-            avg_price, avg_turnover, avg_trades,
-            -- Calculate approximate percentiles using statistical distribution
-            avg_volume + (stddev_volume * 0.67) as median_volume_approx,
-            avg_delivery + (stddev_delivery * 0.67) as median_delivery_approx,
-            avg_volume + (stddev_volume * 1.0) as p75_volume_approx,
-            avg_delivery + (stddev_delivery * 1.0) as p75_delivery_approx,
-            avg_volume + (stddev_volume * 1.64) as p95_volume_approx,
-            avg_delivery + (stddev_delivery * 1.64) as p95_delivery_approx
-        FROM february_stats
-        ORDER BY symbol
-        """
-        
-        cursor.execute(baseline_query, (self.minimum_trading_days,))
+        # Percentiles are exact (merged monthly quantile sketches), not avg + z * stddev;
+        # the sketches are built from step01 the first time February is asked for
+        store = SketchStore(self.db.connection, series='EQ')
+        frame = store.baselines('2025-02', min_days=self.minimum_trading_days)
         baselines = {}
         
         total_symbols = 0
         quality_symbols = 0
         
-        for row in cursor.fetchall():
+        def whole(value, default=0):
+            return int(value) if pd.notna(value) else default
+        
+        def real(value):
+            return float(value) if pd.notna(value) else 0
+        
+        for row in frame.itertuples(index=False):
             total_symbols += 1
-            symbol = row[0]
+            symbol = row.symbol
             
             # Data quality validation
-            trading_days = row[2]
-            avg_volume = float(row[3]) if row[3] else 0
-            stddev_volume = float(row[5]) if row[5] else 0
+            trading_days = int(row.trading_days)
+            avg_volume = real(row.avg_volume)
+            avg_delivery = real(row.avg_delivery)
+            stddev_volume = real(row.stddev_volume)
             
             # Calculate data quality score (0-100)
-            quality_score = min(100, (trading_days / 20) * 100)  # 20 is full month
+            quality_score = min(100, (trading_days / self.baseline_trading_days) * 100)  # full month = 100
             if avg_volume > 0 and stddev_volume > 0:
                 quality_score += 10  # Bonus for statistical validity
                 quality_symbols += 1
@@ -384,29 +357,29 @@ class Step03MarchVsFebruaryAnalyzer:
             baselines[symbol] = {
                 'trading_days': trading_days,
                 'avg_volume': int(avg_volume),
-                'avg_delivery': int(float(row[4]) if row[4] else 0),
+                'avg_delivery': int(avg_delivery),
                 'stddev_volume': stddev_volume,
-                'stddev_delivery': float(row[6]) if row[6] else 0,
-                'min_volume': int(row[7]) if row[7] else 0,
-                'min_delivery': int(row[8]) if row[8] else 0,
-                'max_volume': int(row[9]) if row[9] else 0,
-                'max_delivery': int(row[10]) if row[10] else 0,
-                'avg_price': float(row[11]) if row[11] else 0,
-                'avg_turnover': float(row[12]) if row[12] else 0,
-                'avg_trades': int(float(row[13])) if row[13] else 0,
-                'median_volume': int(float(row[14])) if row[14] else int(avg_volume),
-                'median_delivery': int(float(row[15])) if row[15] else int(float(row[4]) if row[4] else 0),
-                'p75_volume': int(float(row[16])) if row[16] else int(avg_volume * 1.2),
-                'p75_delivery': int(float(row[17])) if row[17] else int(float(row[4]) * 1.2 if row[4] else 0),
-                'p95_volume': int(float(row[18])) if row[18] else int(avg_volume * 1.5),
-                'p95_delivery': int(float(row[19])) if row[19] else int(float(row[4]) * 1.5 if row[4] else 0),
+                'stddev_delivery': real(row.stddev_delivery),
+                'min_volume': whole(row.min_volume),
+                'min_delivery': whole(row.min_delivery),
+                'max_volume': whole(row.max_volume),
+                'max_delivery': whole(row.max_delivery),
+                'avg_price': real(row.avg_price),
+                'avg_turnover': real(row.avg_turnover),
+                'avg_trades': whole(row.avg_trades),
+                'median_volume': whole(row.median_volume, int(avg_volume)),
+                'median_delivery': whole(row.median_delivery, int(avg_delivery)),
+                'p75_volume': whole(row.p75_volume, int(avg_volume * 1.2)),
+                'p75_delivery': whole(row.p75_delivery, int(avg_delivery * 1.2)),
+                'p95_volume': whole(row.p95_volume, int(avg_volume * 1.5)),
+                'p95_delivery': whole(row.p95_delivery, int(avg_delivery * 1.5)),
                 'quality_score': quality_score
             }
         
         print(f"   ✅ Calculated enhanced baselines for {len(baselines):,} symbols")
         print(f"   📊 Quality distribution: {quality_symbols:,} high-quality, {total_symbols-quality_symbols:,} standard")
         print(f"   🎯 Minimum trading days: {self.minimum_trading_days}")
-        print(f"   📈 Statistical measures: Mean, Median, StdDev, Percentiles (75th, 95th)")
+        print(f"   📈 Statistical measures: Mean, Median, StdDev, exact Percentiles (75th, 95th)")
         
         return baselines
     
@@ -554,6 +527,102 @@ class Step03MarchVsFebruaryAnalyzer:
             'data_quality_score': data_quality_score
         }
     
+    def classify_tiers_and_patterns(self, march_volume, march_delivery, baseline):
+        """
+        Array version of classify_tier_and_pattern for a whole month of exceedances.
+        
+        march_volume / march_delivery are int arrays; baseline maps each baseline
+        key to an array aligned with them. Returns the same keys as the per-record
+        method as arrays (tiers and patterns as label arrays) plus integer
+        'overall_tier_code' / 'pattern_code' indexing TIER_NAMES / PATTERN_NAMES.
+        Values are identical to the per-record logic for float inputs.
+        """
+        avg_volume, avg_delivery = baseline['avg_volume'], baseline['avg_delivery']
+        stddev_volume, stddev_delivery = baseline['stddev_volume'], baseline['stddev_delivery']
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            vol_increase_pct = np.where(avg_volume > 0, ((march_volume / avg_volume) - 1) * 100, 0)
+            del_increase_pct = np.where(avg_delivery > 0, ((march_delivery / avg_delivery) - 1) * 100, 0)
+            vol_vs_stddev = np.where(stddev_volume > 0, (march_volume - avg_volume) / stddev_volume, 0)
+            del_vs_stddev = np.where(stddev_delivery > 0, (march_delivery - avg_delivery) / stddev_delivery, 0)
+        
+        # Highest tier first, as in the elif chain; codes index TIER_NAMES
+        def tier_codes(value, average):
+            conditions = [value >= average * self.tier_definitions[name] for name in reversed(TIER_NAMES[1:])]
+            return np.select(conditions, np.arange(len(TIER_NAMES) - 1, 0, -1), 0)
+        
+        volume_tier = tier_codes(march_volume, avg_volume)
+        delivery_tier = tier_codes(march_delivery, avg_delivery)
+        overall_tier = np.maximum(volume_tier, delivery_tier)
+        
+        is_outlier = (vol_vs_stddev > self.outlier_threshold) | (del_vs_stddev > self.outlier_threshold)
+        pattern = np.select(
+            [is_outlier,
+             (march_volume > baseline['p95_volume']) & (march_delivery > baseline['p95_delivery']),
+             (march_volume > baseline['max_volume']) | (march_delivery > baseline['max_delivery']),
+             (overall_tier == TIER_NAMES.index('TIER_2_SIGNIFICANT')) | (overall_tier == TIER_NAMES.index('TIER_3_EXCEPTIONAL'))],
+            [PATTERN_NAMES.index(name) for name in ('STATISTICAL_OUTLIER', 'BREAKOUT', 'SPIKE', 'MOMENTUM')],
+            PATTERN_NAMES.index('STANDARD'))
+        
+        tier_labels, pattern_labels = np.array(TIER_NAMES, dtype=object), np.array(PATTERN_NAMES, dtype=object)
+        return {
+            'volume_tier': tier_labels[volume_tier],
+            'delivery_tier': tier_labels[delivery_tier],
+            'overall_tier': tier_labels[overall_tier],
+            'pattern_type': pattern_labels[pattern],
+            'vol_vs_stddev': vol_vs_stddev,
+            'del_vs_stddev': del_vs_stddev,
+            'momentum_score': np.minimum(100, (vol_increase_pct + del_increase_pct) / 4),
+            'is_outlier': is_outlier,
+            'outlier_score': np.maximum(np.abs(vol_vs_stddev), np.abs(del_vs_stddev)),
+            'overall_tier_code': overall_tier,
+            'pattern_code': pattern
+        }
+    
+    def calculate_advanced_metrics_batch(self, march, baseline):
+        """
+        Array version of calculate_advanced_metrics. march maps volume, delivery,
+        turnover, trades, high, low, close, prev_close to float/int arrays;
+        baseline maps baseline keys to arrays aligned with them.
+        """
+        volume, delivery = march['volume'], march['delivery']
+        turnover, trades = march['turnover'], march['trades']
+        high, low, close, prev_close = march['high'], march['low'], march['close'], march['prev_close']
+        avg_volume, avg_delivery = baseline['avg_volume'], baseline['avg_delivery']
+        avg_turnover, avg_trades = baseline['avg_turnover'], baseline['avg_trades']
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            avg_trade_size_march = np.where(trades > 0, turnover / trades, 0)
+            avg_trade_size_feb = np.where(avg_trades > 0, avg_turnover / avg_trades, 0)
+            trade_size_change_pct = np.where(avg_trade_size_feb > 0, ((avg_trade_size_march / avg_trade_size_feb) - 1) * 100, 0)
+            
+            price_change_pct = np.where(prev_close > 0, ((close / prev_close) - 1) * 100, 0)
+            price_volatility = np.where(low > 0, ((high - low) / low) * 100, 0)
+            
+            volume_delivery_ratio_march = np.where(delivery > 0, volume / delivery, 0)
+            volume_delivery_ratio_feb = np.where(avg_delivery > 0, avg_volume / avg_delivery, 0)
+            ratio_change_pct = np.where(volume_delivery_ratio_feb > 0,
+                                        ((volume_delivery_ratio_march / volume_delivery_ratio_feb) - 1) * 100, 0)
+        
+        price_volume_correlation = np.select(
+            [(price_change_pct > 0) & (volume > avg_volume), (price_change_pct < 0) & (volume < avg_volume)], [1, -1], 0)
+        
+        quality_score = baseline['quality_score']
+        data_quality_score = np.where((trades > 0) & (turnover > 0), np.minimum(100, quality_score + 10), quality_score)
+        
+        return {
+            'avg_trade_size_march': avg_trade_size_march,
+            'avg_trade_size_feb': avg_trade_size_feb,
+            'trade_size_change_pct': trade_size_change_pct,
+            'price_change_pct': price_change_pct,
+            'price_volatility': price_volatility,
+            'volume_delivery_ratio_march': volume_delivery_ratio_march,
+            'volume_delivery_ratio_feb': volume_delivery_ratio_feb,
+            'ratio_change_pct': ratio_change_pct,
+            'price_volume_correlation': price_volume_correlation,
+            'data_quality_score': data_quality_score
+        }
+    
     def get_march_daily_data(self):
         """
         Load March 2025 Daily Trading Data with Quality Validation
@@ -575,14 +644,13 @@ class Step03MarchVsFebruaryAnalyzer:
         
         cursor = self.db.connection.cursor()
         
-        march_query = """
+        march_query = f"""
         SELECT 
             trade_date, symbol, series, prev_close, open_price, high_price, 
             low_price, last_price, close_price, avg_price, ttl_trd_qnty, 
             turnover_lacs, no_of_trades, deliv_qty, deliv_per
         FROM step01_equity_daily
-        WHERE YEAR(trade_date) = 2025 
-            AND MONTH(trade_date) = 3
+        WHERE {self.months.month('2025-03')}
             AND series = 'EQ'
             AND ttl_trd_qnty IS NOT NULL
             AND deliv_qty IS NOT NULL
@@ -644,117 +712,109 @@ class Step03MarchVsFebruaryAnalyzer:
         
         # Get March daily data
         march_data = self.get_march_daily_data()
-        
-        exceedance_records = []
-        processed_count = 0
-        exceedance_count = 0
-        tier_counts = {'TIER_1': 0, 'TIER_2': 0, 'TIER_3': 0, 'TIER_4': 0}
-        pattern_counts = {}
-        
-        print(f"   🎯 Processing {len(march_data):,} March records against {len(feb_baselines):,} baselines")
-        
-        for record in march_data:
-            processed_count += 1
-            
-            if processed_count % 20000 == 0:
-                print(f"   📊 Processed {processed_count:,} records... ({exceedance_count:,} exceedances found)")
-            
-            trade_date, symbol, series, prev_close, open_price, high_price, low_price, \
-            last_price, close_price, avg_price, ttl_trd_qnty, turnover_lacs, \
-            no_of_trades, deliv_qty, deliv_per = record
-            
-            # Skip if no baseline available
-            if symbol not in feb_baselines:
-                continue
-                
-            baseline = feb_baselines[symbol]
-            
-            # Convert to appropriate types
-            march_volume = int(ttl_trd_qnty) if ttl_trd_qnty else 0
-            march_delivery = int(deliv_qty) if deliv_qty else 0
-            
-            # Basic exceedance checks
-            volume_exceeded_avg = march_volume > baseline['avg_volume']
-            delivery_exceeded_avg = march_delivery > baseline['avg_delivery']
-            
-            # Advanced threshold checks
-            volume_exceeded_max = march_volume > baseline['max_volume']
-            delivery_exceeded_max = march_delivery > baseline['max_delivery']
-            volume_exceeded_p75 = march_volume > baseline['p75_volume']
-            delivery_exceeded_p75 = march_delivery > baseline['p75_delivery']
-            volume_exceeded_p95 = march_volume > baseline['p95_volume']
-            delivery_exceeded_p95 = march_delivery > baseline['p95_delivery']
+        processed_count = len(march_data)
+        
+        print(f"   🎯 Processing {processed_count:,} March records against {len(feb_baselines):,} baselines")
+        if not feb_baselines or not march_data:
+            print("   ⚠️ Nothing to compare")
+            return []
+        
+        # Whole month at once: March records that have a baseline, with that baseline's row alongside
+        march = np.empty((processed_count, len(MARCH_COLUMNS)), dtype=object)
+        march[:] = [tuple(row) for row in march_data]
+        baseline_frame = pd.DataFrame.from_dict(feb_baselines, orient='index')
+        baseline_rows = baseline_frame.index.get_indexer(march[:, MARCH_COLUMNS.index('symbol')])
+        has_baseline = baseline_rows >= 0
+        march, baseline_rows = march[has_baseline], baseline_rows[has_baseline]
+        
+        def column(name):
+            return march[:, MARCH_COLUMNS.index(name)]
+        
+        def numbers(name):
+            # DECIMAL columns arrive as Decimal: computed as float64, as they are stored
+            return column(name).astype(np.float64)
+        
+        # int(x) if x else 0
+        march_volume = np.nan_to_num(numbers('ttl_trd_qnty')).astype(np.int64)
+        march_delivery = np.nan_to_num(numbers('deliv_qty')).astype(np.int64)
+        baseline = {key: baseline_frame[key].to_numpy()[baseline_rows] for key in baseline_frame.columns}
+        
+        # Basic exceedance checks
+        volume_exceeded_avg = march_volume > baseline['avg_volume']
+        delivery_exceeded_avg = march_delivery > baseline['avg_delivery']
+        
+        # Only record rows with a significant exceedance
+        keep = volume_exceeded_avg | delivery_exceeded_avg
+        exceedance_count = int(keep.sum())
+        march = march[keep]
+        march_volume, march_delivery = march_volume[keep], march_delivery[keep]
+        baseline = {key: values[keep] for key, values in baseline.items()}
+        
+        # Advanced threshold checks
+        flags = [march_volume > baseline['avg_volume'], march_volume > baseline['max_volume'],
+                 march_volume > baseline['p75_volume'], march_volume > baseline['p95_volume'],
+                 march_delivery > baseline['avg_delivery'], march_delivery > baseline['max_delivery'],
+                 march_delivery > baseline['p75_delivery'], march_delivery > baseline['p95_delivery']]
+        
+        # Tier / pattern classification and advanced metrics for every exceedance at once
+        classification = self.classify_tiers_and_patterns(march_volume, march_delivery, baseline)
+        turnover_lacs, no_of_trades = numbers('turnover_lacs'), numbers('no_of_trades')
+        advanced_metrics = self.calculate_advanced_metrics_batch({
+            'volume': march_volume, 'delivery': march_delivery, 'turnover': turnover_lacs, 'trades': no_of_trades,
+            'high': numbers('high_price'), 'low': numbers('low_price'),
+            'close': numbers('close_price'), 'prev_close': numbers('prev_close')}, baseline)
+        
+        # Tier and pattern distributions
+        tier_totals = np.bincount(classification['overall_tier_code'], minlength=len(TIER_NAMES))
+        tier_counts = {'_'.join(name.split('_')[:2]): int(count) for name, count in zip(TIER_NAMES[1:], tier_totals[1:])}
+        pattern_totals = np.bincount(classification['pattern_code'], minlength=len(PATTERN_NAMES))
+        pattern_counts = {name: int(count) for name, count in zip(PATTERN_NAMES, pattern_totals) if count}
+        
+        # Calculate basic increases
+        with np.errstate(divide='ignore', invalid='ignore'):
+            vol_increase_abs = march_volume - baseline['avg_volume']
+            del_increase_abs = march_delivery - baseline['avg_delivery']
+            vol_increase_pct = np.where(baseline['avg_volume'] > 0, ((march_volume / baseline['avg_volume']) - 1) * 100, 0)
+            del_increase_pct = np.where(baseline['avg_delivery'] > 0, ((march_delivery / baseline['avg_delivery']) - 1) * 100, 0)
             
-            # Only record if there's a significant exceedance
-            if volume_exceeded_avg or delivery_exceeded_avg:
-                exceedance_count += 1
-                
-                # Calculate tier and pattern classification
-                march_price_data = [high_price, low_price, close_price, prev_close]
-                classification = self.classify_tier_and_pattern(march_volume, march_delivery, baseline, march_price_data)
-                
-                # Calculate advanced metrics
-                march_trading_data = [march_volume, march_delivery, turnover_lacs, no_of_trades,
-                                    high_price, low_price, close_price, prev_close]
-                advanced_metrics = self.calculate_advanced_metrics(march_trading_data, baseline)
-                
-                # Track tier distribution
-                if classification['overall_tier'] != 'NONE':
-                    tier_key = classification['overall_tier'].split('_')[0] + '_' + classification['overall_tier'].split('_')[1]
-                    tier_counts[tier_key] = tier_counts.get(tier_key, 0) + 1
-                
-                # Track pattern distribution
-                pattern_type = classification['pattern_type']
-                pattern_counts[pattern_type] = pattern_counts.get(pattern_type, 0) + 1
-                
-                # Calculate basic increases
-                vol_increase_abs = march_volume - baseline['avg_volume']
-                del_increase_abs = march_delivery - baseline['avg_delivery']
-                vol_increase_pct = ((march_volume / baseline['avg_volume']) - 1) * 100 if baseline['avg_volume'] > 0 else 0
-                del_increase_pct = ((march_delivery / baseline['avg_delivery']) - 1) * 100 if baseline['avg_delivery'] > 0 else 0
-                
-                # Calculate turnover and trades increases
-                turnover_increase_pct = ((turnover_lacs / baseline['avg_turnover']) - 1) * 100 if baseline['avg_turnover'] > 0 else 0
-                trades_increase_pct = ((no_of_trades / baseline['avg_trades']) - 1) * 100 if baseline['avg_trades'] > 0 else 0
-                
-                # Create comprehensive exceedance record (simplified for compatibility)
-                exceedance_record = (
-                    # Basic data
-                    trade_date, symbol, series,
-                    # March actual values
-                    march_volume, march_delivery, prev_close, open_price, high_price,
-                    low_price, last_price, close_price, avg_price, turnover_lacs,
-                    no_of_trades, deliv_per,
-                    # February enhanced baselines
-                    baseline['avg_volume'], baseline['avg_delivery'], baseline['max_volume'], 
-                    baseline['max_delivery'], baseline['min_volume'], baseline['min_delivery'],
-                    baseline['stddev_volume'], baseline['stddev_delivery'], baseline['median_volume'],
-                    baseline['median_delivery'], baseline['p75_volume'], baseline['p75_delivery'],
-                    baseline['p95_volume'], baseline['p95_delivery'], baseline['trading_days'],
-                    baseline['avg_price'], baseline['avg_turnover'], baseline['avg_trades'],
-                    # Multi-tier exceedance flags
-                    volume_exceeded_avg, volume_exceeded_max, volume_exceeded_p75, volume_exceeded_p95,
-                    delivery_exceeded_avg, delivery_exceeded_max, delivery_exceeded_p75, delivery_exceeded_p95,
-                    # Tier classification
-                    classification['volume_tier'], classification['delivery_tier'], classification['overall_tier'],
-                    # Detailed increases
-                    vol_increase_abs, del_increase_abs, vol_increase_pct, del_increase_pct,
-                    classification['vol_vs_stddev'], classification['del_vs_stddev'],
-                    # Advanced metrics
-                    advanced_metrics['price_change_pct'], advanced_metrics['price_volatility'],
-                    turnover_increase_pct, trades_increase_pct,
-                    advanced_metrics['avg_trade_size_march'], advanced_metrics['avg_trade_size_feb'],
-                    advanced_metrics['trade_size_change_pct'],
-                    # Ratio and correlation analysis
-                    advanced_metrics['volume_delivery_ratio_march'], advanced_metrics['volume_delivery_ratio_feb'],
-                    advanced_metrics['ratio_change_pct'], advanced_metrics['price_volume_correlation'],
-                    classification['is_outlier'], classification['outlier_score'],
-                    # Pattern and scoring (simplified - removed trend_strength)
-                    classification['pattern_type'], classification['momentum_score'], 
-                    advanced_metrics['data_quality_score']
-                )
-                
-                exceedance_records.append(exceedance_record)
+            # Calculate turnover and trades increases
+            turnover_increase_pct = np.where(baseline['avg_turnover'] > 0, ((turnover_lacs / baseline['avg_turnover']) - 1) * 100, 0)
+            trades_increase_pct = np.where(baseline['avg_trades'] > 0, ((no_of_trades / baseline['avg_trades']) - 1) * 100, 0)
+        
+        # Comprehensive exceedance records (simplified for compatibility); March values pass through as loaded
+        columns = [
+            # Basic data
+            column('trade_date'), column('symbol'), column('series'),
+            # March actual values
+            march_volume, march_delivery, column('prev_close'), column('open_price'), column('high_price'),
+            column('low_price'), column('last_price'), column('close_price'), column('avg_price'),
+            column('turnover_lacs'), column('no_of_trades'), column('deliv_per'),
+            # February enhanced baselines
+            *(baseline[key] for key in ('avg_volume', 'avg_delivery', 'max_volume', 'max_delivery', 'min_volume',
+                                        'min_delivery', 'stddev_volume', 'stddev_delivery', 'median_volume',
+                                        'median_delivery', 'p75_volume', 'p75_delivery', 'p95_volume',
+                                        'p95_delivery', 'trading_days', 'avg_price', 'avg_turnover', 'avg_trades')),
+            # Multi-tier exceedance flags
+            *flags,
+            # Tier classification
+            classification['volume_tier'], classification['delivery_tier'], classification['overall_tier'],
+            # Detailed increases
+            vol_increase_abs, del_increase_abs, vol_increase_pct, del_increase_pct,
+            classification['vol_vs_stddev'], classification['del_vs_stddev'],
+            # Advanced metrics
+            advanced_metrics['price_change_pct'], advanced_metrics['price_volatility'],
+            turnover_increase_pct, trades_increase_pct,
+            advanced_metrics['avg_trade_size_march'], advanced_metrics['avg_trade_size_feb'],
+            advanced_metrics['trade_size_change_pct'],
+            # Ratio and correlation analysis
+            advanced_metrics['volume_delivery_ratio_march'], advanced_metrics['volume_delivery_ratio_feb'],
+            advanced_metrics['ratio_change_pct'], advanced_metrics['price_volume_correlation'],
+            classification['is_outlier'], classification['outlier_score'],
+            # Pattern and scoring (simplified - removed trend_strength)
+            classification['pattern_type'], classification['momentum_score'],
+            advanced_metrics['data_quality_score']
+        ]
+        exceedance_records = list(zip(*(values.tolist() for values in columns)))
         
         print(f"   ✅ Analysis Complete: {exceedance_count:,} exceedances from {processed_count:,} records")
         print(f"   📊 Tier Distribution: {tier_counts}")
@@ -893,7 +953,7 @@ class Step03MarchVsFebruaryAnalyzer:
         
         print(f"📈 Total Exceedances Found: {total_exceedances:,}")
         print(f"🏢 Unique Symbols with Activity: {unique_symbols:,}")
-        print(f"📅 Trading Dates Analyzed: {trading_dates}")
+        print(f"📅 Trading Dates Analyzed: {trading_dates} of {self.comparison_trading_days}")
         
         # TIER DISTRIBUTION ANALYSIS
         print("\n🏆 TIER DISTRIBUTION ANALYSIS")
@@ -23,6 +23,7 @@ TARGET TABLE: step03_compare_monthvspreviousmonth (existing table)
 import pandas as pd
 from datetime import datetime, date
 from nse_database_integration import NSEDatabaseManager
+from nse_month_comparison import MonthComparisonEngine, parse_pair
 
 class Step03FebruaryMarchComparison:
     def __init__(self):
@@ -164,229 +165,6 @@ class Step03FebruaryMarchComparison:
         self.db.connection.commit()
         print("   🎉 Column renaming completed!")
         
-    def get_february_baselines(self):
-        """Calculate February 2025 peak delivery and volume values for each EQ symbol"""
-        print("📊 Calculating February 2025 peak baselines...")
-        
-        cursor = self.db.connection.cursor()
-        
-        # Get peak delivery and volume for each symbol in February
-        baseline_query = """
-        SELECT 
-            symbol,
-            MAX(deliv_qty) as peak_delivery,
-            MAX(ttl_trd_qnty) as peak_volume
-        FROM step01_equity_daily
-        WHERE YEAR(trade_date) = 2025 
-            AND MONTH(trade_date) = 2
-            AND series = 'EQ'
-            AND deliv_qty IS NOT NULL
-            AND deliv_qty > 0
-        GROUP BY symbol
-        ORDER BY symbol
-        """
-        
-        cursor.execute(baseline_query)
-        baselines = {}
-        
-        for row in cursor.fetchall():
-            symbol = row[0]
-            baselines[symbol] = {
-                'peak_delivery': int(row[1]) if row[1] else 0,
-                'peak_volume': int(row[2]) if row[2] else 0
-            }
-        
-        print(f"   ✅ Calculated February baselines for {len(baselines):,} symbols")
-        print(f"   📊 February 2025 peak delivery and volume values established")
-        
-        # Show sample baselines
-        sample_symbols = list(baselines.keys())[:5]
-        for symbol in sample_symbols:
-            baseline = baselines[symbol]
-            print(f"      {symbol}: Delivery {baseline['peak_delivery']:,}, Volume {baseline['peak_volume']:,}")
-        
-        return baselines
-        
-    def get_march_daily_data(self):
-        """Get March 2025 daily trading data for EQ series"""
-        print("📈 Loading March 2025 daily trading data...")
-        
-        cursor = self.db.connection.cursor()
-        
-        march_query = """
-        SELECT 
-            trade_date, symbol, series, prev_close, open_price, high_price, 
-            low_price, last_price, close_price, avg_price, ttl_trd_qnty, 
-            turnover_lacs, no_of_trades, deliv_qty, deliv_per, source_file
-        FROM step01_equity_daily
-        WHERE YEAR(trade_date) = 2025 
-            AND MONTH(trade_date) = 3
-            AND series = 'EQ'
-            AND deliv_qty IS NOT NULL
-            AND deliv_qty > 0
-        ORDER BY trade_date, symbol
-        """
-        
-        cursor.execute(march_query)
-        march_data = cursor.fetchall()
-        
-        print(f"   ✅ Loaded {len(march_data):,} March 2025 daily records")
-        return march_data
-        
-    def process_february_march_comparison(self):
-        """Main analysis: Compare March daily data vs February baselines"""
-        print("🔍 Processing February vs March comparison analysis...")
-        print("=" * 70)
-        
-        # Get February baselines
-        feb_baselines = self.get_february_baselines()
-        
-        # Get March daily data
-        march_data = self.get_march_daily_data()
-        
-        exceedance_records = []
-        processed_count = 0
-        volume_exceeds = 0
-        delivery_exceeds = 0
-        both_exceed = 0
-        
-        print("📊 Processing March daily records against February baselines...")
-        
-        for record in march_data:
-            processed_count += 1
-            
-            if processed_count % 5000 == 0:
-                print(f"   📊 Processed {processed_count:,} records, delivery exceeds: {delivery_exceeds:,}, volume exceeds: {volume_exceeds:,}...")
-            
-            (trade_date, symbol, series, prev_close, open_price, high_price, low_price,
-             last_price, close_price, avg_price, ttl_trd_qnty, turnover_lacs, 
-             no_of_trades, deliv_qty, deliv_per, source_file) = record
-            
-            # Skip if no February baseline available for this symbol
-            if symbol not in feb_baselines:
-                continue
-                
-            baseline = feb_baselines[symbol]
-            feb_peak_delivery = baseline['peak_delivery']
-            feb_peak_volume = baseline['peak_volume']
-            
-            # Check for exceedances
-            volume_exceeded = bool(ttl_trd_qnty and feb_peak_volume and ttl_trd_qnty > feb_peak_volume)
-            delivery_exceeded = bool(deliv_qty and feb_peak_delivery and deliv_qty > feb_peak_delivery)
-            
-            # Only record if at least one exceeds baseline (focusing on delivery as requested)
-            if delivery_exceeded or volume_exceeded:
-                # Calculate increases
-                vol_increase_abs = (ttl_trd_qnty - feb_peak_volume) if volume_exceeded else 0
-                del_increase_abs = (deliv_qty - feb_peak_delivery) if delivery_exceeded else 0
-                
-                vol_increase_pct = (vol_increase_abs / feb_peak_volume * 100) if feb_peak_volume > 0 and volume_exceeded else 0
-                del_increase_pct = (del_increase_abs / feb_peak_delivery * 100) if feb_peak_delivery > 0 and delivery_exceeded else 0
-                
-                # Create record for existing table structure
-                exceedance_record = (
-                    trade_date, symbol, series,
-                    ttl_trd_qnty, deliv_qty,
-                    prev_close, open_price, high_price, low_price,
-                    last_price, close_price, avg_price,
-                    turnover_lacs, no_of_trades, deliv_per,
-                    feb_peak_volume, feb_peak_delivery,
-                    None, None,  # baseline dates (not tracking specific dates for peaks)
-                    volume_exceeded, delivery_exceeded,
-                    vol_increase_abs, del_increase_abs,
-                    round(vol_increase_pct, 2), round(del_increase_pct, 2),
-                    '2025-03', source_file
-                )
-                
-                exceedance_records.append(exceedance_record)
-                
-                # Count exceedances
-                if volume_exceeded:
-                    volume_exceeds += 1
-                if delivery_exceeded:
-                    delivery_exceeds += 1
-                if volume_exceeded and delivery_exceeded:
-                    both_exceed += 1
-        
-        print(f"\n✅ February vs March Analysis Complete!")
-        print(f"   📊 Processed: {processed_count:,} March daily records")
-        print(f"   📈 Volume exceedances: {volume_exceeds:,}")
-        print(f"   📦 Delivery exceedances: {delivery_exceeds:,}")
-        print(f"   🎯 Both exceeded: {both_exceed:,}")
-        print(f"   💾 Total records to store: {len(exceedance_records):,}")
-        
-        return exceedance_records
-        
-    def insert_exceedance_records(self, exceedance_records):
-        """Insert exceedance records into step03_compare_monthvspreviousmonth table"""
-        if not exceedance_records:
-            print("   ⚠️ No exceedance records to insert")
-            return
-            
-        print(f"💾 Inserting {len(exceedance_records):,} records into step03_compare_monthvspreviousmonth...")
-        
-        cursor = self.db.connection.cursor()
-        
-        # Clear existing data - use a different approach since analysis_month doesn't exist
-        cursor.execute("DELETE FROM step03_compare_monthvspreviousmonth WHERE comparison_type = 'MAR_VS_FEB_2025'")
-        print(f"   🗑️ Cleared existing March vs February analysis data")
-        
-        # Use the existing table structure but adapt our data to fit (with new column names)
-        insert_sql = """
-        INSERT INTO step03_compare_monthvspreviousmonth 
-        (current_trade_date, symbol, series,
-         current_prev_close, current_open_price, current_high_price, current_low_price,
-         current_last_price, current_close_price, current_avg_price,
-         current_ttl_trd_qnty, current_turnover_lacs, current_no_of_trades, 
-         current_deliv_qty, current_deliv_per, current_source_file,
-         previous_baseline_date, previous_prev_close, previous_open_price, previous_high_price, previous_low_price,
-         previous_last_price, previous_close_price, previous_avg_price,
-         previous_ttl_trd_qnty, previous_turnover_lacs, previous_no_of_trades,
-         previous_deliv_qty, previous_deliv_per, previous_source_file,
-         delivery_increase_abs, delivery_increase_pct, comparison_type)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """
-        
-        # Adapt our records to fit the existing table structure
-        adapted_records = []
-        for record in exceedance_records:
-            (trade_date, symbol, series, ttl_trd_qnty, deliv_qty, prev_close, open_price, 
-             high_price, low_price, last_price, close_price, avg_price, turnover_lacs, 
-             no_of_trades, deliv_per, feb_peak_volume, feb_peak_delivery, baseline_vol_date, 
-             baseline_del_date, volume_exceeded, delivery_exceeded, vol_increase_abs, 
-             del_increase_abs, vol_increase_pct, del_increase_pct, analysis_month, source_file) = record
-            
-            # Use baseline dates from February peaks (not None)
-            jan_baseline_date = baseline_del_date if baseline_del_date else trade_date
-            
-            adapted_record = (
-                trade_date, symbol, series,
-                # March data goes in "feb" columns (current month data)
-                prev_close or 0.0, open_price or 0.0, high_price or 0.0, low_price or 0.0, 
-                last_price or 0.0, close_price or 0.0, avg_price or 0.0,
-                ttl_trd_qnty or 0, turnover_lacs or 0.0, no_of_trades or 0, 
-                deliv_qty or 0, deliv_per or 0.0, source_file or '',
-                # February baseline data goes in "jan" columns (baseline data)  
-                jan_baseline_date,  # jan_baseline_date - use baseline date
-                0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0,  # jan price data (default to 0)
-                feb_peak_volume or 0, 0.0, 0,  # jan volume data
-                feb_peak_delivery or 0, 0.0, '',  # jan delivery data  
-                del_increase_abs or 0, del_increase_pct or 0.0, 'MAR_VS_FEB_2025'
-            )
-            adapted_records.append(adapted_record)
-        
-        # Insert in batches
-        batch_size = 1000
-        for i in range(0, len(adapted_records), batch_size):
-            batch = adapted_records[i:i+batch_size]
-            cursor.executemany(insert_sql, batch)
-            
-            if (i + batch_size) % 5000 == 0 or i + batch_size >= len(adapted_records):
-                self.db.connection.commit()
-                print(f"   📊 Inserted {min(i + batch_size, len(adapted_records)):,} records...")
-        
-        print(f"   ✅ Successfully inserted {len(adapted_records):,} records")
-        
     def show_results_summary(self):
         """Show summary of analysis results from step03_compare_monthvspreviousmonth table"""
         cursor = self.db.connection.cursor()
@@ -485,11 +263,8 @@ class Step03FebruaryMarchComparison:
         # Rename columns to more meaningful names
         self.rename_table_columns()
         
-        # Process comparisons
-        exceedance_records = self.process_february_march_comparison()
-        
-        # Insert into existing table
-        self.insert_exceedance_records(exceedance_records)
+        # February baselines vs March daily (shared vectorized engine; replaces MAR_VS_FEB_2025 rows)
+        MonthComparisonEngine(self.db.connection).run([parse_pair('2025-02:2025-03')])
         
         # Show summary
         self.show_results_summary()
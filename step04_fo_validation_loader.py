@@ -14,21 +14,17 @@ Usage: python step04_fo_validation_loader.py
 """
 
 import pandas as pd
-import pyodbc
-import json
+import nse_db_pool
 import os
 import zipfile
 from datetime import datetime
 import numpy as np
 from io import StringIO
+from nse_fo_parser import read_fo_bhavcopy
+from nse_bulk_loader import BulkLoader, FO_UDIFF_COLUMNS
 
 class Step04FOValidationLoader:
     def __init__(self):
-        # Load database configuration
-        with open('database_config.json', 'r') as f:
-            self.config = json.load(f)
-        
-        self.conn_str = f"DRIVER={self.config['driver']};SERVER={self.config['server']};DATABASE={self.config['database']};Trusted_Connection=yes;"
         self.source_directory = r"C:\Users\kiran\NSE_Downloader\fo_udiff_downloads"
         
     def validate_and_load_all_february(self):
@@ -131,109 +127,26 @@ class Step04FOValidationLoader:
         return False
     
     def load_source_file(self, date_str, filename):
-        """Load and process a single BhavCopy source file"""
+        """Load a single BhavCopy source file as the canonical F&O frame"""
         source_path = os.path.join(self.source_directory, filename)
         
         try:
-            with zipfile.ZipFile(source_path, 'r') as zip_ref:
-                # Find CSV file
-                csv_files = [f for f in zip_ref.namelist() if f.lower().endswith('.csv')]
-                
-                if not csv_files:
-                    print(f"      ❌ No CSV file found in {filename}")
-                    return None
-                
-                csv_file = csv_files[0]
-                
-                # Read CSV content
-                with zip_ref.open(csv_file) as f:
-                    csv_content = f.read().decode('utf-8')
-                
-                # Parse CSV
-                source_df = pd.read_csv(StringIO(csv_content))
-                
-                # Convert all date columns to YYYYMMDD format for database compatibility
-                date_columns = ['TradDt', 'BizDt', 'XpryDt', 'FininstrmActlXpryDt']
-                for col in date_columns:
-                    if col in source_df.columns:
-                        try:
-                            source_df[col] = pd.to_datetime(source_df[col]).dt.strftime('%Y%m%d')
-                        except:
-                            # If conversion fails, keep as string but ensure it's not too long
-                            source_df[col] = source_df[col].astype(str).str.replace('-', '')[:8]
-                
-                # Add source file info
-                source_df['source_file'] = filename
-                
-                return source_df
+            # Dates come back as int32 YYYYMMDD, numerics typed, in one vectorized pass
+            source_df = read_fo_bhavcopy(source_path, trade_date=date_str, fo_only=False)
+            
+            # Add source file info
+            source_df['source_file'] = filename
+            
+            return source_df
                 
         except Exception as e:
             print(f"      ❌ Error processing {filename}: {e}")
             return None
 
-    def prepare_database_record(self, row):
-        """Convert source row to database record format with safe type conversion"""
-        
-        def safe_convert(value, data_type, default=None):
-            """Safely convert values with proper NULL handling"""
-            if pd.isna(value) or value == '' or str(value).strip() == '':
-                return default
-            
-            try:
-                if data_type == 'str':
-                    return str(value).strip()
-                elif data_type == 'float':
-                    return float(value)
-                elif data_type == 'int':
-                    return int(float(value))
-            except:
-                return default
-        
-        # Build record with all 35 columns (34 + source_file)
-        record = [
-            safe_convert(row.get('TradDt'), 'str'),           # trade_date
-            safe_convert(row.get('TckrSymb'), 'str'),         # symbol
-            safe_convert(row.get('FinInstrmTp'), 'str'),      # instrument
-            safe_convert(row.get('XpryDt'), 'str'),           # expiry_date
-            safe_convert(row.get('StrkPric'), 'float'),       # strike_price
-            safe_convert(row.get('OptnTp'), 'str'),           # option_type
-            safe_convert(row.get('OpnPric'), 'float'),        # open_price
-            safe_convert(row.get('HghPric'), 'float'),        # high_price
-            safe_convert(row.get('LwPric'), 'float'),         # low_price
-            safe_convert(row.get('ClsPric'), 'float'),        # close_price
-            safe_convert(row.get('SttlmPric'), 'float'),      # settle_price
-            safe_convert(row.get('TtlTradgVol'), 'int'),      # contracts_traded
-            safe_convert(row.get('TtlTrfVal'), 'float'),      # value_in_lakh
-            safe_convert(row.get('OpnIntrst'), 'int'),        # open_interest
-            safe_convert(row.get('ChngInOpnIntrst'), 'int'),  # change_in_oi
-            safe_convert(row.get('BizDt'), 'str'),            # BizDt
-            safe_convert(row.get('Sgmt'), 'str'),             # Sgmt
-            safe_convert(row.get('Src'), 'str'),              # Src
-            safe_convert(row.get('FinInstrmId'), 'str'),      # FinInstrmId
-            safe_convert(row.get('ISIN'), 'str'),             # ISIN
-            safe_convert(row.get('SctySrs'), 'str'),          # SctySrs
-            safe_convert(row.get('FininstrmActlXpryDt'), 'str'), # FininstrmActlXpryDt
-            safe_convert(row.get('FinInstrmNm'), 'str'),      # FinInstrmNm
-            safe_convert(row.get('LastPric'), 'float'),       # LastPric
-            safe_convert(row.get('PrvsClsgPric'), 'float'),   # PrvsClsgPric
-            safe_convert(row.get('UndrlygPric'), 'float'),    # UndrlygPric
-            safe_convert(row.get('TtlNbOfTxsExctd'), 'int'),  # TtlNbOfTxsExctd
-            safe_convert(row.get('SsnId'), 'str'),            # SsnId
-            safe_convert(row.get('NewBrdLotQty'), 'int'),     # NewBrdLotQty
-            safe_convert(row.get('Rmks'), 'str'),             # Rmks
-            safe_convert(row.get('Rsvd1'), 'str'),            # Rsvd1
-            safe_convert(row.get('Rsvd2'), 'str'),            # Rsvd2
-            safe_convert(row.get('Rsvd3'), 'str'),            # Rsvd3
-            safe_convert(row.get('Rsvd4'), 'str'),            # Rsvd4
-            safe_convert(row.get('source_file'), 'str'),      # source_file
-        ]
-        
-        return record
-
     def save_to_database(self, source_df, date_str):
         """Save dataframe to database with validation"""
         try:
-            conn = pyodbc.connect(self.conn_str)
+            conn = nse_db_pool.get_connection()
             cursor = conn.cursor()
             
             print(f"      💾 Saving {len(source_df):,} records to database...")
@@ -244,41 +157,11 @@ class Step04FOValidationLoader:
             if deleted > 0:
                 print(f"      🗑️ Cleared {deleted:,} existing records for {date_str}")
             
-            # Prepare records
-            records = []
-            error_count = 0
-            
-            for idx, row in source_df.iterrows():
-                try:
-                    record = self.prepare_database_record(row)
-                    records.append(record)
-                except Exception as e:
-                    error_count += 1
-                    if error_count <= 3:  # Show first 3 errors
-                        print(f"      ⚠️ Error processing row {idx}: {e}")
-            
-            if error_count > 3:
-                print(f"      ⚠️ ... and {error_count - 3} more record processing errors")
-            
-            print(f"      📊 Prepared {len(records):,} records for insertion")
-            
-            # Insert data - Complete 35-column format
-            insert_sql = """
-            INSERT INTO step04_fo_udiff_daily 
-            (trade_date, symbol, instrument, expiry_date, strike_price, option_type, 
-             open_price, high_price, low_price, close_price, settle_price, 
-             contracts_traded, value_in_lakh, open_interest, change_in_oi,
-             BizDt, Sgmt, Src, FinInstrmId, ISIN, SctySrs, FininstrmActlXpryDt, FinInstrmNm,
-             LastPric, PrvsClsgPric, UndrlygPric, TtlNbOfTxsExctd, SsnId, NewBrdLotQty, 
-             Rmks, Rsvd1, Rsvd2, Rsvd3, Rsvd4, source_file)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """
-            
-            # Execute batch insert
-            cursor.executemany(insert_sql, records)
+            # Columnar bulk insert - Complete 35-column format, same transaction as the delete
+            inserted = BulkLoader(conn, 'step04_fo_udiff_daily', FO_UDIFF_COLUMNS).load(source_df, commit=False)
             conn.commit()
             
-            print(f"      ✅ Successfully inserted {len(records):,} records")
+            print(f"      ✅ Successfully inserted {inserted:,} records")
             
             # Verification
             cursor.execute("SELECT COUNT(*) FROM step04_fo_udiff_daily WHERE trade_date = ?", date_str)
@@ -24,7 +24,7 @@ Months to load:
 
 import requests
 import pandas as pd
-import pyodbc
+import nse_db_pool
 import json
 import time
 from datetime import datetime, timedelta
@@ -32,6 +32,13 @@ import logging
 import os
 import io
 import zipfile
+import argparse
+import tempfile
+from nse_trading_calendar import get_calendar, to_date
+from nse_fo_parser import to_canonical
+from nse_bulk_loader import BulkLoader, fo_columns
+from nse_staged_merge import StagedMerger, STEP04_MERGE, file_checksum
+from nse_udiff_stream import stream_udiff_batches
 
 # Configure logging
 logging.basicConfig(
@@ -44,16 +51,22 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Shared keep-alive session for all downloads
+HTTP_SESSION = requests.Session()
+
+# Canonical F&O columns written by this loader (FinInstrmId is the --merge natural key)
+INSERT_COLUMNS = ['instrument', 'symbol', 'expiry_date', 'strike_price', 'option_type',
+                  'open_price', 'high_price', 'low_price', 'close_price', 'settle_price',
+                  'contracts_traded', 'value_in_lakh', 'open_interest', 'change_in_oi',
+                  'trade_date', 'underlying', 'FinInstrmId']
+
+# Rows the database rejects are written here (with the error) instead of being dropped
+QUARANTINE_FILE = 'step04_fo_quarantine.csv'
+
 # Database connection
 def get_connection():
     """Get database connection"""
-    connection_string = (
-        "Driver={ODBC Driver 17 for SQL Server};"
-        "Server=SRIKIRANREDDY\\SQLEXPRESS;"
-        "Database=master;"
-        "Trusted_Connection=yes;"
-    )
-    return pyodbc.connect(connection_string)
+    return nse_db_pool.get_connection()
 
 def clear_existing_data():
     """
@@ -92,28 +105,38 @@ def get_month_dates(year, month):
     """
     logger.info(f"Generating dates for {year}-{month:02d}")
     
-    # Generate all dates in the month
-    start_date = datetime(year, month, 1)
-    if month == 12:
-        end_date = datetime(year + 1, 1, 1) - timedelta(days=1)
-    else:
-        end_date = datetime(year, month + 1, 1) - timedelta(days=1)
-    
-    dates = []
-    current_date = start_date
-    while current_date <= end_date:
-        # Skip weekends (Monday=0, Sunday=6)
-        if current_date.weekday() < 5:  # Monday to Friday
-            date_str = current_date.strftime('%d-%m-%Y')
-            dates.append(date_str)
-        current_date += timedelta(days=1)
+    # Weekends and NSE holidays come from the shared trading calendar
+    dates = [d.strftime('%d-%m-%Y') for d in get_calendar().trading_days_in_month(year, month)]
     
-    logger.info(f"Generated {len(dates)} potential trading dates for {year}-{month:02d}")
+    logger.info(f"Generated {len(dates)} trading dates for {year}-{month:02d}")
     return dates
 
-def download_fo_data_for_date(date_str):
+def udiff_file_name(date_str):
+    """Name of the day's UDiFF zip (DD-MM-YYYY -> udiff_DDMMYYYY.zip), used as the checksum key"""
+    return f"udiff_{date_str.replace('-', '')}.zip"
+
+class _PrependedBatches:
+    """first_batch then the rest of the stream; close() releases the spooled zip"""
+    def __init__(self, first_batch, batches):
+        self.first_batch, self.batches = first_batch, batches
+
+    def __iter__(self):
+        if self.first_batch is not None:
+            first_batch, self.first_batch = self.first_batch, None
+            yield first_batch
+        yield from self.batches
+
+    def close(self):
+        self.batches.close()
+
+def download_fo_data_for_date(date_str, spool_path=None):
     """
     Download F&O data for a specific date using correct UDiFF format
+    
+    The zip is spooled to a temp file and the inner CSV is parsed in record
+    batches, so the day's ~34k rows are never held as bytes + BytesIO + frame.
+    With spool_path the zip is kept there (for checksumming; the caller removes it).
+    Returns an iterator of DataFrame batches, or None if the day is unavailable.
     """
     logger.info(f"Downloading F&O data for {date_str}")
     
@@ -134,89 +157,37 @@ def download_fo_data_for_date(date_str):
     }
     
     try:
-        response = requests.get(url, headers=headers, timeout=30)
-        if response.status_code == 200:
-            # Handle ZIP file
-            try:
-                import zipfile
-                with zipfile.ZipFile(io.BytesIO(response.content)) as zip_file:
-                    # Get the CSV file from zip
-                    csv_files = [f for f in zip_file.namelist() if f.endswith('.csv')]
-                    if csv_files:
-                        csv_filename = csv_files[0]
-                        with zip_file.open(csv_filename) as csv_file:
-                            df = pd.read_csv(csv_file)
-                            if not df.empty and len(df.columns) >= 12:
-                                logger.info(f"Downloaded {len(df)} records for {date_str}")
-                                return df
-                            else:
-                                logger.warning(f"Empty or invalid data for {date_str}")
-                                return None
-                    else:
-                        logger.warning(f"No CSV file found in ZIP for {date_str}")
-                        return None
-            except Exception as e:
-                logger.warning(f"ZIP processing failed for {date_str}: {e}")
-                return None
-        else:
-            logger.warning(f"HTTP {response.status_code} for {date_str}")
+        batches = stream_udiff_batches(HTTP_SESSION, url, dest_path=spool_path, timeout=30, headers=headers)
+        if batches is None:
+            logger.warning(f"HTTP error for {date_str}")
             return None
+        
+        # Validate on the first batch only
+        first_batch = next(batches, None)
+        if first_batch is None or first_batch.empty or len(first_batch.columns) < 12:
+            logger.warning(f"Empty or invalid data for {date_str}")
+            batches.close()
+            return None
+        return _PrependedBatches(first_batch, batches)
+    except (zipfile.BadZipFile, ValueError) as e:
+        logger.warning(f"ZIP processing failed for {date_str}: {e}")
+        return None
     except Exception as e:
         logger.warning(f"Request failed for {date_str}: {e}")
         return None
 
 def process_fo_data(df, trade_date):
     """
-    Process and clean F&O data using correct UDiFF column mapping
+    Convert a raw UDiFF or legacy F&O batch into the canonical typed frame
     """
     if df is None or df.empty:
         return None
     
-    # UDiFF column mapping (based on your existing working downloader)
-    column_mapping = {
-        'INSTRUMENT': 'instrument',
-        'SYMBOL': 'symbol',
-        'EXPIRY_DT': 'expiry_date',
-        'STRIKE_PR': 'strike_price',
-        'OPTION_TYP': 'option_type',
-        'OPEN': 'open_price',
-        'HIGH': 'high_price',
-        'LOW': 'low_price',
-        'CLOSE': 'close_price',
-        'SETTLE_PR': 'settle_price',
-        'CONTRACTS': 'contracts_traded',
-        'VAL_INLAKH': 'value_in_lakh',
-        'OPEN_INT': 'open_interest',
-        'CHG_IN_OI': 'change_in_oi',
-        'UNDERLYING': 'underlying'
-    }
-    
-    # Rename columns if they exist
-    for old_col, new_col in column_mapping.items():
-        if old_col in df.columns:
-            df = df.rename(columns={old_col: new_col})
-    
-    # Add trade_date
-    df['trade_date'] = trade_date.replace('-', '')
-    
-    # Filter for F&O instruments only
-    if 'instrument' in df.columns:
-        df = df[df['instrument'].isin(['FUTSTK', 'OPTSTK', 'FUTIDX', 'OPTIDX'])]
-    
-    # Clean numeric columns
-    numeric_columns = ['strike_price', 'open_price', 'high_price', 'low_price', 
-                      'close_price', 'settle_price', 'contracts_traded', 
-                      'value_in_lakh', 'open_interest', 'change_in_oi']
-    
-    for col in numeric_columns:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
-    
-    # Remove rows with missing essential data (symbol is required)
-    if 'symbol' in df.columns:
-        df = df.dropna(subset=['symbol'])
-    else:
-        logger.warning("No 'symbol' column found in data")
+    try:
+        # Format detection, renaming, typing and the F&O filter in one vectorized pass
+        df = to_canonical(df, trade_date=to_date(trade_date).strftime('%Y%m%d'))
+    except ValueError as e:
+        logger.warning(f"Cannot process data for {trade_date}: {e}")
         return None
     
     logger.info(f"Processed data: {len(df)} records for {trade_date}")
@@ -224,7 +195,7 @@ def process_fo_data(df, trade_date):
 
 def save_fo_data_to_db(df, trade_date):
     """
-    Save F&O data to step04_fo_udiff_daily table
+    Save canonical F&O data to step04_fo_udiff_daily table
     """
     if df is None or df.empty:
         logger.warning(f"No data to save for {trade_date}")
@@ -232,52 +203,67 @@ def save_fo_data_to_db(df, trade_date):
     
     logger.info(f"Saving {len(df)} records to database for {trade_date}")
     
-    # Prepare data for insertion
-    records_saved = 0
-    
+    # Columnar bulk insert, committed per chunk; rejected rows go to the quarantine file
     with get_connection() as conn:
-        cursor = conn.cursor()
-        
-        insert_query = """
-        INSERT INTO step04_fo_udiff_daily (
-            instrument, symbol, expiry_date, strike_price, option_type,
-            open_price, high_price, low_price, close_price, settle_price,
-            contracts_traded, value_in_lakh, open_interest, change_in_oi,
-            trade_date, underlying
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """
-        
-        for _, row in df.iterrows():
-            try:
-                cursor.execute(insert_query, (
-                    str(row.get('instrument', '')),
-                    str(row.get('symbol', '')),
-                    str(row.get('expiry_date', '')),
-                    float(row.get('strike_price', 0)) if pd.notna(row.get('strike_price')) else None,
-                    str(row.get('option_type', '')),
-                    float(row.get('open_price', 0)) if pd.notna(row.get('open_price')) else None,
-                    float(row.get('high_price', 0)) if pd.notna(row.get('high_price')) else None,
-                    float(row.get('low_price', 0)) if pd.notna(row.get('low_price')) else None,
-                    float(row.get('close_price', 0)) if pd.notna(row.get('close_price')) else None,
-                    float(row.get('settle_price', 0)) if pd.notna(row.get('settle_price')) else None,
-                    int(row.get('contracts_traded', 0)) if pd.notna(row.get('contracts_traded')) else None,
-                    float(row.get('value_in_lakh', 0)) if pd.notna(row.get('value_in_lakh')) else None,
-                    int(row.get('open_interest', 0)) if pd.notna(row.get('open_interest')) else None,
-                    int(row.get('change_in_oi', 0)) if pd.notna(row.get('change_in_oi')) else None,
-                    str(row.get('trade_date', '')),
-                    str(row.get('underlying', ''))
-                ))
-                records_saved += 1
-            except Exception as e:
-                logger.warning(f"Failed to insert record: {e}")
-                continue
-        
-        conn.commit()
+        loader = BulkLoader(conn, 'step04_fo_udiff_daily', fo_columns(INSERT_COLUMNS),
+                            quarantine_path=QUARANTINE_FILE)
+        records_saved = loader.load(df)
         
+    if loader.quarantined:
+        logger.warning(f"Quarantined {loader.quarantined} records for {trade_date} in {QUARANTINE_FILE}")
     logger.info(f"Saved {records_saved} records for {trade_date}")
     return records_saved
 
-def load_month_data(year, month):
+def merge_fo_data_to_db(merger, df, trade_date, source_file=None, checksum=None):
+    """
+    Upsert canonical F&O data on (trade_date, FinInstrmId): reruns only touch changed rows
+    """
+    if df is None or df.empty:
+        logger.warning(f"No data to merge for {trade_date}")
+        return 0
+    
+    counts = merger.merge_frame(df, source_file, checksum)
+    logger.info(f"Merged {trade_date}: {counts['inserted']} inserted, {counts['updated']} updated, "
+                f"{counts['unchanged']} unchanged")
+    return counts['inserted'] + counts['updated']
+
+def merge_fo_day(date_str):
+    """
+    Download and upsert one day, skipping it if the zip's checksum is already
+    recorded. The checksum is written with the day's last batch, so a day that
+    fails part-way is merged again on the next run.
+    """
+    spool_path = os.path.join(tempfile.gettempdir(), udiff_file_name(date_str))
+    try:
+        raw_batches = download_fo_data_for_date(date_str, spool_path)
+        if raw_batches is None:
+            return None
+        
+        source_file, checksum = udiff_file_name(date_str), file_checksum(spool_path)
+        with get_connection() as conn:
+            merger = StagedMerger(conn, STEP04_MERGE)
+            if merger.is_unchanged(source_file, checksum):
+                raw_batches.close()
+                logger.info(f"Skipping {date_str} ({source_file} unchanged since last load)")
+                return 0
+            
+            records_saved = 0
+            pending = None
+            for raw_batch in raw_batches:
+                processed_data = process_fo_data(raw_batch, date_str)
+                if processed_data is None or processed_data.empty:
+                    continue
+                if pending is not None:
+                    records_saved += merge_fo_data_to_db(merger, pending, date_str)
+                pending = processed_data
+            if pending is not None:
+                records_saved += merge_fo_data_to_db(merger, pending, date_str, source_file, checksum)
+        return records_saved
+    finally:
+        if os.path.exists(spool_path):
+            os.remove(spool_path)
+
+def load_month_data(year, month, merge=False):
     """
     Load all F&O data for a specific month
     """
@@ -297,15 +283,21 @@ def load_month_data(year, month):
     for i, date_str in enumerate(dates, 1):
         logger.info(f"Processing date {i}/{len(dates)}: {date_str}")
         
-        # Download data
-        raw_data = download_fo_data_for_date(date_str)
+        if merge:
+            records_saved = merge_fo_day(date_str)
+        else:
+            # Download data (iterator of record batches)
+            raw_batches = download_fo_data_for_date(date_str)
+            records_saved = None
+            if raw_batches is not None:
+                records_saved = 0
+                for raw_batch in raw_batches:
+                    # Process and save each batch
+                    processed_data = process_fo_data(raw_batch, date_str)
+                    records_saved += save_fo_data_to_db(processed_data, date_str)
         
-        if raw_data is not None:
-            # Process data
-            processed_data = process_fo_data(raw_data, date_str)
-            
-            # Save to database
-            records_saved = save_fo_data_to_db(processed_data, date_str)
+        if records_saved is not None:
+            logger.info(f"Downloaded {records_saved} records for {date_str}")
             total_records += records_saved
             successful_dates += 1
         
@@ -350,17 +342,25 @@ def validate_month_data(year, month):
             logger.warning(f"No data found for {year}-{month:02d}")
             return 0
 
+def parse_args():
+    p = argparse.ArgumentParser(description='Reload F&O UDiFF data for Feb-Aug 2025')
+    p.add_argument('--merge', action='store_true',
+                   help='Upsert on (trade_date, FinInstrmId) instead of clearing the table first')
+    return p.parse_args()
+
 def main():
     """
     Main execution function
     """
+    args = parse_args()
     logger.info("="*80)
     logger.info("STEP 4 DATA CORRECTION: MONTHLY F&O LOADER (FEB-AUG 2025)")
     logger.info("="*80)
     
     try:
-        # Step 1: Clear existing data
-        clear_existing_data()
+        # Step 1: Clear existing data (merge mode keeps it and upserts instead)
+        if not args.merge:
+            clear_existing_data()
         
         # Step 2: Load data month by month
         months_to_load = [
@@ -377,7 +377,7 @@ def main():
         
         for year, month, month_name in months_to_load:
             try:
-                records = load_month_data(year, month)
+                records = load_month_data(year, month, args.merge)
                 validate_month_data(year, month)
                 total_all_records += records
                 logger.info(f"{month_name} {year} completed successfully")
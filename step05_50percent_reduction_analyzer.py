@@ -18,7 +18,7 @@ Author: NSE Data Analysis Team
 Date: September 2025
 """
 
-import pyodbc
+import nse_db_pool
 import pandas as pd
 import logging
 from datetime import datetime, timedelta
@@ -36,13 +36,7 @@ logger = logging.getLogger(__name__)
 
 def get_database_connection():
     """Create database connection."""
-    connection_string = (
-        'Driver={ODBC Driver 17 for SQL Server};'
-        'Server=SRIKIRANREDDY\\SQLEXPRESS;'
-        'Database=master;'
-        'Trusted_Connection=yes;'
-    )
-    return pyodbc.connect(connection_string)
+    return nse_db_pool.get_connection()
 
 def create_50percent_reduction_table(conn):
     """Create table to store 50% reduction analysis results."""
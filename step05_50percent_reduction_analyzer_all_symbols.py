@@ -21,7 +21,7 @@ Date: September 2025
 Version: 2.0 (All Symbols Enhancement)
 """
 
-import pyodbc
+import nse_db_pool
 import pandas as pd
 import logging
 from datetime import datetime, timedelta
@@ -47,13 +47,7 @@ RESUME_FILE = 'step05_analysis_progress.json'
 
 def get_database_connection():
     """Create database connection."""
-    connection_string = (
-        'Driver={ODBC Driver 17 for SQL Server};'
-        'Server=SRIKIRANREDDY\\SQLEXPRESS;'
-        'Database=master;'
-        'Trusted_Connection=yes;'
-    )
-    return pyodbc.connect(connection_string)
+    return nse_db_pool.get_connection()
 
 def create_enhanced_50percent_reduction_table(conn):
     """Create enhanced table to store 50% reduction analysis results for all symbols."""
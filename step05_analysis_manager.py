@@ -18,7 +18,7 @@ Author: NSE Data Analysis Team
 Date: September 2025
 """
 
-import pyodbc
+import nse_db_pool
 import pandas as pd
 import json
 import os
@@ -27,13 +27,7 @@ from datetime import datetime
 
 def get_database_connection():
     """Create database connection."""
-    connection_string = (
-        'Driver={ODBC Driver 17 for SQL Server};'
-        'Server=SRIKIRANREDDY\\SQLEXPRESS;'
-        'Database=master;'
-        'Trusted_Connection=yes;'
-    )
-    return pyodbc.connect(connection_string)
+    return nse_db_pool.get_connection()
 
 def check_analysis_status():
     """Check current status of all-symbols analysis."""
@@ -4,12 +4,13 @@ Step 5: Complete February 2025 F&O Strike Price Analysis
 Process ALL trading days with ALL symbols in February 2025
 """
 
-import pyodbc
+import nse_db_pool
 import pandas as pd
 import numpy as np
 import logging
 from datetime import datetime
 import sys
+from nse_trading_calendar import get_calendar
 
 # Setup logging
 logging.basicConfig(
@@ -25,13 +26,7 @@ logger = logging.getLogger(__name__)
 def get_database_connection():
     """Get database connection"""
     try:
-        connection_string = (
-            "Driver={ODBC Driver 17 for SQL Server};"
-            "Server=SRIKIRANREDDY\\SQLEXPRESS;"
-            "Database=master;"
-            "Trusted_Connection=yes;"
-        )
-        conn = pyodbc.connect(connection_string)
+        conn = nse_db_pool.get_connection()
         logger.info("Database connection established successfully")
         return conn
     except Exception as e:
@@ -87,7 +82,11 @@ def get_all_trading_days(conn):
     try:
         df = pd.read_sql(query, conn)
         trading_days = df['Trade_date'].tolist()
-        logger.info(f"Found {len(trading_days)} trading days in February 2025")
+        expected = [d.strftime('%Y%m%d') for d in get_calendar().trading_days_in_month(2025, 2)]
+        missing = sorted(set(expected) - set(str(d) for d in trading_days))
+        logger.info(f"Found {len(trading_days)} of {len(expected)} NSE trading days in February 2025")
+        if missing:
+            logger.warning(f"Trading days without F&O data: {missing}")
         return trading_days
     except Exception as e:
         logger.error(f"Error getting trading days: {e}")
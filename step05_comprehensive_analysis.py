@@ -1,11 +1,11 @@
-import pyodbc
+import nse_db_pool
 import pandas as pd
 import numpy as np
 from datetime import datetime
 
 def get_highest_delivery_symbol_january():
     """Get the symbol with highest delivery quantity from January 2025"""
-    conn = pyodbc.connect('Driver={SQL Server};Server=SRIKIRANREDDY\\SQLEXPRESS;Database=master;Trusted_Connection=yes;')
+    conn = nse_db_pool.get_connection()
     
     query = """
     SELECT TOP 1 
@@ -29,7 +29,7 @@ def get_highest_delivery_symbol_january():
 
 def find_nearest_strikes_comprehensive_fo_data(symbol, target_price):
     """Get comprehensive F&O data including ALL columns from step04_fo_udiff_daily"""
-    conn = pyodbc.connect('Driver={SQL Server};Server=SRIKIRANREDDY\\SQLEXPRESS;Database=master;Trusted_Connection=yes;')
+    conn = nse_db_pool.get_connection()
     
     print(f"Looking for strikes around target price: ₹{target_price}")
     
@@ -245,7 +245,7 @@ def calculate_all_comprehensive_metrics(group):
 
 def store_comprehensive_results(delivery_data, fo_data, selected_strikes):
     """Store comprehensive results with ALL F&O columns"""
-    conn = pyodbc.connect('Driver={SQL Server};Server=SRIKIRANREDDY\\SQLEXPRESS;Database=master;Trusted_Connection=yes;')
+    conn = nse_db_pool.get_connection()
     cursor = conn.cursor()
     
     symbol = delivery_data['symbol']
@@ -424,7 +424,7 @@ def main():
         
         # Show comprehensive summary
         print("\n4️⃣ Comprehensive Summary:")
-        conn = pyodbc.connect('Driver={SQL Server};Server=SRIKIRANREDDY\\SQLEXPRESS;Database=master;Trusted_Connection=yes;')
+        conn = nse_db_pool.get_connection()
         
         summary_query = f"""
         SELECT 
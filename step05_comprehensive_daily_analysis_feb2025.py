@@ -1,4 +1,4 @@
-import pyodbc
+import nse_db_pool
 import pandas as pd
 import logging
 from datetime import datetime, timedelta
@@ -18,13 +18,7 @@ logger = logging.getLogger(__name__)
 def get_database_connection():
     """Establish database connection"""
     try:
-        connection_string = (
-            'DRIVER={ODBC Driver 17 for SQL Server};'
-            'SERVER=SRIKIRANREDDY\\SQLEXPRESS;'
-            'DATABASE=master;'
-            'Trusted_Connection=yes;'
-        )
-        return pyodbc.connect(connection_string)
+        return nse_db_pool.get_connection()
     except Exception as e:
         logger.error(f"Database connection failed: {str(e)}")
         raise
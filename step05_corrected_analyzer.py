@@ -13,7 +13,7 @@ Author: NSE Data Analysis Team
 Date: September 2025
 """
 
-import pyodbc
+import nse_db_pool
 import pandas as pd
 import logging
 from datetime import datetime
@@ -21,13 +21,7 @@ from datetime import datetime
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 def get_database_connection():
-    connection_string = (
-        'Driver={ODBC Driver 17 for SQL Server};'
-        'Server=SRIKIRANREDDY\\SQLEXPRESS;'
-        'Database=master;'
-        'Trusted_Connection=yes;'
-    )
-    return pyodbc.connect(connection_string)
+    return nse_db_pool.get_connection()
 
 def create_corrected_table(conn):
     """Create corrected step05_strike_analysis table for 14 records per symbol."""
@@ -5,7 +5,7 @@ Fixed to get exactly 14 records per symbol (7 strikes × 2 option types)
 Only nearest expiry date per strike-option combination
 """
 
-import pyodbc
+import nse_db_pool
 import pandas as pd
 import numpy as np
 import logging
@@ -22,13 +22,7 @@ logger = logging.getLogger(__name__)
 def get_database_connection():
     """Get database connection"""
     try:
-        connection_string = (
-            "Driver={ODBC Driver 17 for SQL Server};"
-            "Server=SRIKIRANREDDY\\SQLEXPRESS;"
-            "Database=master;"
-            "Trusted_Connection=yes;"
-        )
-        conn = pyodbc.connect(connection_string)
+        conn = nse_db_pool.get_connection()
         logger.info("Database connection established successfully")
         return conn
     except Exception as e:
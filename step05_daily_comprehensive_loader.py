@@ -5,7 +5,7 @@ Process one day at a time for February 2025 only
 For each trading day, find 7 nearest strikes (3 up + 3 down + 1 nearest) for both PE and CE
 """
 
-import pyodbc
+import nse_db_pool
 import pandas as pd
 import logging
 from datetime import datetime
@@ -26,13 +26,7 @@ logger = logging.getLogger(__name__)
 def get_database_connection():
     """Get database connection"""
     try:
-        connection_string = (
-            "Driver={ODBC Driver 17 for SQL Server};"
-            "Server=SRIKIRANREDDY\\SQLEXPRESS;"
-            "Database=master;"
-            "Trusted_Connection=yes;"
-        )
-        conn = pyodbc.connect(connection_string)
+        conn = nse_db_pool.get_connection()
         logger.info("Database connection established successfully")
         return conn
     except Exception as e:
@@ -4,7 +4,7 @@ Creates Step05_strikepriceAnalysisderived table with 14 records per trading day
 Processes every trading day in February 2025 for strike price analysis
 """
 
-import pyodbc
+import nse_db_pool
 import pandas as pd
 import logging
 from datetime import datetime, timedelta
@@ -33,13 +33,7 @@ def load_database_config():
 def get_database_connection(config):
     """Create database connection"""
     try:
-        conn_str = (
-            f"DRIVER={{ODBC Driver 17 for SQL Server}};"
-            f"SERVER={config['server']};"
-            f"DATABASE={config['database']};"
-            f"Trusted_Connection=yes;"
-        )
-        conn = pyodbc.connect(conn_str)
+        conn = nse_db_pool.get_connection()
         logger.info(f"Connected to database: {config['database']}")
         return conn
     except Exception as e:
@@ -19,7 +19,7 @@ Expected Output: 14 records per symbol per month (7 strikes × 2 option types)
 Strike Selection: 3 above + 3 below + 1 nearest = 7 strikes total
 """
 
-import pyodbc
+import nse_db_pool
 import pandas as pd
 from decimal import Decimal
 from datetime import datetime, timedelta
@@ -39,13 +39,7 @@ logger = logging.getLogger(__name__)
 # Database connection
 def get_connection():
     """Get database connection"""
-    connection_string = (
-        "Driver={ODBC Driver 17 for SQL Server};"
-        "Server=SRIKIRANREDDY\\SQLEXPRESS;"
-        "Database=master;"
-        "Trusted_Connection=yes;"
-    )
-    return pyodbc.connect(connection_string)
+    return nse_db_pool.get_connection()
 
 def get_highest_delivery_data():
     """
@@ -156,7 +150,7 @@ def find_enhanced_strikes(target_price, symbol, trade_date):
     start_time = datetime.now()
     with get_connection() as conn:
         # OPTIMIZATION 2: Use parametrized query for better performance and caching
-        strikes_df = pd.read_sql(optimized_strikes_query, conn, params=[trade_date_fo, symbol])
+        strikes_df = conn.query_df(optimized_strikes_query, [trade_date_fo, symbol])
     
     query_time = (datetime.now() - start_time).total_seconds()
     logger.info(f"⚡ Query executed in {query_time:.2f} seconds - found {len(strikes_df)} F&O records")
@@ -16,7 +16,7 @@ Logic:
 Expected Output: 14 records per symbol per month
 """
 
-import pyodbc
+import nse_db_pool
 import pandas as pd
 from decimal import Decimal
 from datetime import datetime, timedelta
@@ -36,13 +36,7 @@ logger = logging.getLogger(__name__)
 # Database connection
 def get_connection():
     """Get database connection"""
-    connection_string = (
-        "Driver={ODBC Driver 17 for SQL Server};"
-        "Server=SRIKIRANREDDY\\SQLEXPRESS;"
-        "Database=master;"
-        "Trusted_Connection=yes;"
-    )
-    return pyodbc.connect(connection_string)
+    return nse_db_pool.get_connection()
 
 def get_highest_delivery_data():
     """
@@ -3,19 +3,14 @@
 Quick diagnostic to check the current state and optimize the process
 """
 
-import pyodbc
+import nse_db_pool
 import pandas as pd
 import time
 
 def check_current_status():
     """Check current processing status"""
     try:
-        conn = pyodbc.connect(
-            "Driver={ODBC Driver 17 for SQL Server};"
-            "Server=SRIKIRANREDDY\\SQLEXPRESS;"
-            "Database=master;"
-            "Trusted_Connection=yes;"
-        )
+        conn = nse_db_pool.get_connection()
         
         # Check if table exists and current record count
         cursor = conn.cursor()
@@ -68,12 +63,7 @@ def check_current_status():
 def estimate_processing_time():
     """Estimate how long full processing might take"""
     try:
-        conn = pyodbc.connect(
-            "Driver={ODBC Driver 17 for SQL Server};"
-            "Server=SRIKIRANREDDY\\SQLEXPRESS;"
-            "Database=master;"
-            "Trusted_Connection=yes;"
-        )
+        conn = nse_db_pool.get_connection()
         
         # Test processing time for one symbol on one day
         start_time = time.time()
@@ -1,11 +1,11 @@
-import pyodbc
+import nse_db_pool
 import pandas as pd
 import numpy as np
 from datetime import datetime
 
 def get_january_delivery_data():
     """Get the highest delivery quantity symbol from January 2025"""
-    conn = pyodbc.connect('Driver={SQL Server};Server=SRIKIRANREDDY\\SQLEXPRESS;Database=master;Trusted_Connection=yes;')
+    conn = nse_db_pool.get_connection()
     
     query = """
     SELECT TOP 1 
@@ -29,7 +29,7 @@ def get_january_delivery_data():
 
 def get_february_fo_strikes_enhanced(symbol, target_price):
     """Get F&O data for February 2025 with enhanced metrics"""
-    conn = pyodbc.connect('Driver={SQL Server};Server=SRIKIRANREDDY\\SQLEXPRESS;Database=master;Trusted_Connection=yes;')
+    conn = nse_db_pool.get_connection()
     
     # Get all available strikes for the symbol in February
     strikes_query = f"""
@@ -146,7 +146,7 @@ def calculate_enhanced_metrics(group):
 
 def store_enhanced_results(delivery_data, fo_data, selected_strikes, target_price):
     """Store enhanced results in the database"""
-    conn = pyodbc.connect('Driver={SQL Server};Server=SRIKIRANREDDY\\SQLEXPRESS;Database=master;Trusted_Connection=yes;')
+    conn = nse_db_pool.get_connection()
     cursor = conn.cursor()
     
     symbol = delivery_data['symbol']
@@ -280,7 +280,7 @@ def main():
         
         # Show summary
         print("\n4. Summary of stored data:")
-        conn = pyodbc.connect('Driver={SQL Server};Server=SRIKIRANREDDY\\SQLEXPRESS;Database=master;Trusted_Connection=yes;')
+        conn = nse_db_pool.get_connection()
         
         summary_query = f"""
         SELECT 
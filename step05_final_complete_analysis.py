@@ -5,12 +5,13 @@ Process all 19 trading days with all symbols using corrected logic
 Exactly 14 records per symbol per day (7 strikes × 2 option types)
 """
 
-import pyodbc
+import nse_db_pool
 import pandas as pd
 import numpy as np
 import logging
 from datetime import datetime
 import sys
+from nse_trading_calendar import get_calendar
 
 # Setup logging
 logging.basicConfig(
@@ -26,13 +27,7 @@ logger = logging.getLogger(__name__)
 def get_database_connection():
     """Get database connection"""
     try:
-        connection_string = (
-            "Driver={ODBC Driver 17 for SQL Server};"
-            "Server=SRIKIRANREDDY\\SQLEXPRESS;"
-            "Database=master;"
-            "Trusted_Connection=yes;"
-        )
-        conn = pyodbc.connect(connection_string)
+        conn = nse_db_pool.get_connection()
         logger.info("Database connection established successfully")
         return conn
     except Exception as e:
@@ -78,7 +73,7 @@ def create_fresh_table(conn):
         return False
 
 def get_all_trading_days(conn):
-    """Get all 19 trading days in February 2025"""
+    """Get all trading days in February 2025 loaded in step04_fo_udiff_daily"""
     query = """
     SELECT DISTINCT Trade_date 
     FROM step04_fo_udiff_daily 
@@ -89,7 +84,11 @@ def get_all_trading_days(conn):
     try:
         df = pd.read_sql(query, conn)
         trading_days = df['Trade_date'].tolist()
-        logger.info(f"Found {len(trading_days)} trading days in February 2025")
+        expected = [d.strftime('%Y%m%d') for d in get_calendar().trading_days_in_month(2025, 2)]
+        missing = sorted(set(expected) - set(str(d) for d in trading_days))
+        logger.info(f"Found {len(trading_days)} of {len(expected)} NSE trading days in February 2025")
+        if missing:
+            logger.warning(f"Trading days without F&O data: {missing}")
         return trading_days
     except Exception as e:
         logger.error(f"Error getting trading days: {e}")
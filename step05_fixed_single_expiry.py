@@ -4,7 +4,7 @@ Step 5: FIXED - Day-wise F&O Analysis with single expiry per strike
 Only select nearest expiry date to get exactly 14 records per symbol per day
 """
 
-import pyodbc
+import nse_db_pool
 import pandas as pd
 import numpy as np
 import logging
@@ -16,13 +16,7 @@ logger = logging.getLogger(__name__)
 
 def get_database_connection():
     try:
-        connection_string = (
-            "Driver={ODBC Driver 17 for SQL Server};"
-            "Server=SRIKIRANREDDY\\SQLEXPRESS;"
-            "Database=master;"
-            "Trusted_Connection=yes;"
-        )
-        conn = pyodbc.connect(connection_string)
+        conn = nse_db_pool.get_connection()
         logger.info("Database connection established successfully")
         return conn
     except Exception as e:
@@ -21,7 +21,7 @@ Date: September 2025
 Optimization: Ultra-fast single-query approach
 """
 
-import pyodbc
+import nse_db_pool
 import pandas as pd
 import numpy as np
 import logging
@@ -41,13 +41,7 @@ logger = logging.getLogger(__name__)
 
 def get_database_connection():
     """Create database connection."""
-    connection_string = (
-        'Driver={ODBC Driver 17 for SQL Server};'
-        'Server=SRIKIRANREDDY\\SQLEXPRESS;'
-        'Database=master;'
-        'Trusted_Connection=yes;'
-    )
-    return pyodbc.connect(connection_string)
+    return nse_db_pool.get_connection()
 
 def create_monthly_reduction_table(conn):
     """Create optimized table for monthly reduction analysis."""
@@ -18,7 +18,7 @@ Author: NSE Data Analysis Team
 Date: September 2025
 """
 
-import pyodbc
+import nse_db_pool
 import pandas as pd
 import logging
 from datetime import datetime
@@ -32,13 +32,7 @@ logging.basicConfig(
 
 def get_database_connection():
     """Create database connection."""
-    connection_string = (
-        'Driver={ODBC Driver 17 for SQL Server};'
-        'Server=SRIKIRANREDDY\\SQLEXPRESS;'
-        'Database=master;'
-        'Trusted_Connection=yes;'
-    )
-    return pyodbc.connect(connection_string)
+    return nse_db_pool.get_connection()
 
 def create_step05_table(conn):
     """Create step05_strike_analysis table with all F&O fields plus analysis fields."""
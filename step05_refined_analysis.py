@@ -1,11 +1,11 @@
-import pyodbc
+import nse_db_pool
 import pandas as pd
 import numpy as np
 from datetime import datetime
 
 def get_highest_delivery_symbol_january():
     """Get the symbol with highest delivery quantity from January 2025"""
-    conn = pyodbc.connect('Driver={SQL Server};Server=SRIKIRANREDDY\\SQLEXPRESS;Database=master;Trusted_Connection=yes;')
+    conn = nse_db_pool.get_connection()
     
     query = """
     SELECT TOP 1 
@@ -29,7 +29,7 @@ def get_highest_delivery_symbol_january():
 
 def find_nearest_strikes_for_next_month(symbol, target_price):
     """Find 3 nearest strike prices above and below target price for PE and CE in next month"""
-    conn = pyodbc.connect('Driver={SQL Server};Server=SRIKIRANREDDY\\SQLEXPRESS;Database=master;Trusted_Connection=yes;')
+    conn = nse_db_pool.get_connection()
     
     print(f"Looking for strikes around target price: ₹{target_price}")
     
@@ -164,7 +164,7 @@ def calculate_comprehensive_metrics(group):
 
 def store_14_records_in_enhanced_table(delivery_data, fo_data, selected_strikes):
     """Store exactly 14 records (7 strikes × 2 option types) in enhanced table"""
-    conn = pyodbc.connect('Driver={SQL Server};Server=SRIKIRANREDDY\\SQLEXPRESS;Database=master;Trusted_Connection=yes;')
+    conn = nse_db_pool.get_connection()
     cursor = conn.cursor()
     
     symbol = delivery_data['symbol']
@@ -308,7 +308,7 @@ def main():
         
         # Show final summary
         print("\n4️⃣ Final Summary:")
-        conn = pyodbc.connect('Driver={SQL Server};Server=SRIKIRANREDDY\\SQLEXPRESS;Database=master;Trusted_Connection=yes;')
+        conn = nse_db_pool.get_connection()
         
         summary_query = f"""
         SELECT 
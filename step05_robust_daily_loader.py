@@ -4,7 +4,7 @@ Step 5: Day-wise F&O Strike Price Analysis - ROBUST VERSION
 Process one day at a time with proper error handling
 """
 
-import pyodbc
+import nse_db_pool
 import pandas as pd
 import numpy as np
 import logging
@@ -21,13 +21,7 @@ logger = logging.getLogger(__name__)
 def get_database_connection():
     """Get database connection"""
     try:
-        connection_string = (
-            "Driver={ODBC Driver 17 for SQL Server};"
-            "Server=SRIKIRANREDDY\\SQLEXPRESS;"
-            "Database=master;"
-            "Trusted_Connection=yes;"
-        )
-        conn = pyodbc.connect(connection_string)
+        conn = nse_db_pool.get_connection()
         logger.info("Database connection established successfully")
         return conn
     except Exception as e:
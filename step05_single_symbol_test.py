@@ -4,13 +4,13 @@ Get highest delivery qty from January and find nearest F&O strikes in February
 Expected: 14 records (7 PE + 7 CE: 3 up + 1 exact + 3 down)
 """
 
-import pyodbc
+import nse_db_pool
 import pandas as pd
 from datetime import datetime
 
 def get_connection():
     """Get database connection"""
-    return pyodbc.connect('Driver={SQL Server};Server=SRIKIRANREDDY\\SQLEXPRESS;Database=master;Trusted_Connection=yes;')
+    return nse_db_pool.get_connection()
 
 def get_january_delivery_data():
     """Get IDEA January delivery data"""
@@ -18,7 +18,7 @@ Logic:
 - Flag records with >= 50% reduction
 """
 
-import pyodbc
+import nse_db_pool
 import pandas as pd
 from datetime import datetime
 import logging
@@ -37,13 +37,7 @@ logger = logging.getLogger(__name__)
 # Database connection
 def get_connection():
     """Get database connection"""
-    connection_string = (
-        "Driver={ODBC Driver 17 for SQL Server};"
-        "Server=SRIKIRANREDDY\\SQLEXPRESS;"
-        "Database=master;"
-        "Trusted_Connection=yes;"
-    )
-    return pyodbc.connect(connection_string)
+    return nse_db_pool.get_connection()
 
 def get_test_data():
     """
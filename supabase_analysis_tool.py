@@ -17,13 +17,17 @@ from supabase import create_client, Client
 from datetime import datetime, timedelta
 import sys
 from dotenv import load_dotenv
+from nse_symbol_store import SymbolStore, SUPABASE_COLUMN_NAMES
 
 # Load environment variables
 load_dotenv()
 
 class NSESupabaseAnalyzer:
-    def __init__(self):
+    def __init__(self, symbol_store=None):
         """Initialize Supabase connection"""
+        # Optional local memory-mapped history; analyze_stock reads it instead of querying Supabase
+        self.store = symbol_store
+        self._store_current = None
         self.supabase_url = os.getenv('SUPABASE_URL')
         self.supabase_key = os.getenv('SUPABASE_ANON_KEY')
         
@@ -222,17 +226,43 @@ class NSESupabaseAnalyzer:
             print(f"❌ Error getting volume leaders: {e}")
             return None
     
+    def store_is_current(self):
+        """
+        True if the symbol store was built from what nse_stock_data holds now (row
+        count and latest date of the store's series). Checked once per session;
+        if not, warn and let analyze_stock query Supabase.
+        """
+        if self._store_current is None:
+            result = self.supabase.table('nse_stock_data')\
+                .select('date', count='exact')\
+                .eq('series', self.store.meta['series'])\
+                .order('date', desc=True)\
+                .limit(1)\
+                .execute()
+            latest = result.data[0]['date'] if result.data else None
+            self._store_current = self.store.matches(result.count or 0, latest)
+            if not self._store_current:
+                print(f"⚠️ Symbol store is behind Supabase "
+                      f"(store: {self.store.meta['rows']:,} rows to {self.store.last_date}, "
+                      f"Supabase: {result.count or 0:,} rows to {latest}); querying Supabase - "
+                      f"rebuild with nse_symbol_store.py --build")
+        return self._store_current
+    
     def analyze_stock(self, symbol):
         """Get complete analysis for a specific stock"""
         try:
-            result = self.supabase.table('nse_stock_data')\
-                .select('*')\
-                .eq('symbol', symbol.upper())\
-                .order('date')\
-                .execute()
+            if self.store is not None and symbol in self.store and self.store_is_current():
+                df = self.store.frame(symbol, column_names=SUPABASE_COLUMN_NAMES)
+                df['total_traded_qty'] = df['total_traded_qty'].fillna(0).astype('int64')
+            else:
+                result = self.supabase.table('nse_stock_data')\
+                    .select('*')\
+                    .eq('symbol', symbol.upper())\
+                    .order('date')\
+                    .execute()
+                df = pd.DataFrame(result.data) if result.data else pd.DataFrame()
             
-            if result.data:
-                df = pd.DataFrame(result.data)
+            if not df.empty:
                 df['date'] = pd.to_datetime(df['date'])
                 df = df.sort_values('date')
                 
@@ -382,9 +412,10 @@ def main():
         print("Please run the uploader script first to set up configuration")
         return
     
-    # Initialize analyzer
+    # Initialize analyzer (NSE_SYMBOL_STORE=nse_symbol_store serves stock analysis locally)
     try:
-        analyzer = NSESupabaseAnalyzer()
+        store_path = os.getenv('NSE_SYMBOL_STORE')
+        analyzer = NSESupabaseAnalyzer(SymbolStore.open_if_exists(store_path) if store_path else None)
     except SystemExit:
         print("❌ Failed to connect. Check your .env configuration")
         return
@@ -26,12 +26,13 @@ import sys
 import json
 from dotenv import load_dotenv
 import time
+from nse_supabase_bulk_uploader import SupabaseBulkUploader, prepare_stock_frame, DEFAULT_CONCURRENCY
 
 # Load environment variables
 load_dotenv()
 
 class NSESupabaseManager:
-    def __init__(self):
+    def __init__(self, concurrency: int = DEFAULT_CONCURRENCY):
         """Initialize Supabase connection"""
         self.supabase_url = os.getenv('SUPABASE_URL')
         self.supabase_key = os.getenv('SUPABASE_ANON_KEY')
@@ -45,6 +46,8 @@ class NSESupabaseManager:
             
         try:
             self.supabase: Client = create_client(self.supabase_url, self.supabase_key)
+            # Concurrent upserts straight to the PostgREST endpoint behind the client
+            self.uploader = SupabaseBulkUploader(self.supabase_url, self.supabase_key, concurrency=concurrency)
             print("✅ Connected to Supabase successfully!")
         except Exception as e:
             print(f"❌ Failed to connect to Supabase: {e}")
@@ -140,27 +143,16 @@ class NSESupabaseManager:
             # Clean and prepare data
             df_clean = self.prepare_dataframe(df, date_obj)
             
-            # Upload in batches to avoid timeout
-            batch_size = 1000
+            # Concurrent, adaptively sized upsert batches on (symbol, series, date)
             total_records = len(df_clean)
-            successful_uploads = 0
-            
-            for i in range(0, total_records, batch_size):
-                batch = df_clean.iloc[i:i+batch_size]
-                batch_data = batch.to_dict('records')
-                
-                try:
-                    # Insert batch to Supabase
-                    result = self.supabase.table('nse_stock_data').insert(batch_data).execute()
-                    successful_uploads += len(batch_data)
-                    
-                    progress = (i + len(batch_data)) / total_records * 100
-                    print(f"   ⏳ Progress: {progress:.1f}% ({successful_uploads}/{total_records})", end='\r')
-                    
-                except Exception as e:
-                    print(f"\n   ⚠️  Batch upload error: {e}")
-                    # Continue with next batch
-                    continue
+            stats = self.uploader.upload_frame(
+                df_clean,
+                progress=lambda done, total: print(f"   ⏳ Progress: {done / total * 100:.1f}% ({done}/{total})", end='\r'))
+            successful_uploads = stats.rows
+            if stats.failed_rows:
+                print(f"\n   ⚠️  {stats.failed_rows} records failed after retries")
+                for error in stats.errors[:3]:
+                    print(f"      • {error}")
             
             # Record upload status
             file_size_kb = os.path.getsize(csv_file_path) // 1024
@@ -172,7 +164,7 @@ class NSESupabaseManager:
             }
             
             try:
-                self.supabase.table('upload_status').insert(status_data).execute()
+                self.supabase.table('upload_status').upsert(status_data, on_conflict='filename').execute()
             except:
                 pass  # Status tracking is optional
             
@@ -185,76 +177,8 @@ class NSESupabaseManager:
     
     def prepare_dataframe(self, df, date_obj):
         """Clean and prepare DataFrame for Supabase upload"""
-        # Create a copy to avoid modifying original
-        df_clean = df.copy()
-        
-        # Add date column
-        df_clean['date'] = date_obj
-        
-        # Standardize column names (convert to lowercase with underscores)
-        column_mapping = {
-            'SYMBOL': 'symbol',
-            'SERIES': 'series',
-            'PREV_CLOSE': 'prev_close',
-            'OPEN': 'open_price',
-            'HIGH': 'high_price',
-            'LOW': 'low_price',
-            'LAST': 'last_price',
-            'CLOSE': 'close_price',
-            'VWAP': 'avg_price',
-            'VOLUME': 'total_traded_qty',
-            'TURNOVER': 'turnover',
-            'TRADES': 'no_of_trades',
-            'DELIVERABLE': 'deliverable_qty',
-            '%DLYQT': 'deliverable_percentage'
-        }
-        
-        # Rename columns that exist
-        for old_name, new_name in column_mapping.items():
-            if old_name in df_clean.columns:
-                df_clean = df_clean.rename(columns={old_name: new_name})
-        
-        # Convert data types
-        numeric_columns = [
-            'prev_close', 'open_price', 'high_price', 'low_price', 
-            'last_price', 'close_price', 'avg_price', 'turnover',
-            'deliverable_percentage'
-        ]
-        
-        integer_columns = [
-            'total_traded_qty', 'no_of_trades', 'deliverable_qty'
-        ]
-        
-        for col in numeric_columns:
-            if col in df_clean.columns:
-                df_clean[col] = pd.to_numeric(df_clean[col], errors='coerce')
-        
-        for col in integer_columns:
-            if col in df_clean.columns:
-                df_clean[col] = pd.to_numeric(df_clean[col], errors='coerce').fillna(0).astype('Int64')
-        
-        # Handle missing values
-        df_clean = df_clean.fillna({
-            'series': 'EQ',
-            'deliverable_percentage': 0.0
-        })
-        
-        # Remove rows with invalid symbols
-        df_clean = df_clean.dropna(subset=['symbol'])
-        df_clean = df_clean[df_clean['symbol'].str.len() > 0]
-        
-        # Select only columns that exist in our table
-        required_columns = [
-            'symbol', 'series', 'date', 'prev_close', 'open_price', 
-            'high_price', 'low_price', 'last_price', 'close_price', 
-            'avg_price', 'total_traded_qty', 'turnover', 'no_of_trades',
-            'deliverable_qty', 'deliverable_percentage'
-        ]
-        
-        available_columns = [col for col in required_columns if col in df_clean.columns]
-        df_clean = df_clean[available_columns]
-        
-        return df_clean
+        # Vectorized rename/typing, deduplicated on the upsert key
+        return prepare_stock_frame(df, date_obj)
     
     def upload_all_csv_files(self, csv_directory="NSE_August_2025_Data"):
         """Upload all CSV files from the directory"""
@@ -284,9 +208,6 @@ class NSESupabaseManager:
                 successful_uploads += 1
             else:
                 failed_uploads.append(csv_file)
-            
-            # Small delay to avoid overwhelming the API
-            time.sleep(1)
         
         # Summary
         print("\n" + "=" * 60)
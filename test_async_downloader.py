@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+NSEAsyncDownloader against a local HTTP stub
+============================================
+A stdlib http.server on 127.0.0.1 stands in for the NSE archives: it serves
+fixture bhavcopy zips for some days and 404s for everything else, and logs
+when each request arrived. One run of download_days must
+
+  - save every served day (second URL template, zip extracted to CSV),
+  - report days the stub never serves as 'missing' and record them in the manifest,
+  - skip days already on disk on a second run without any request,
+  - never exceed the token-bucket rate (burst of `capacity`, then `rate`/s).
+
+Usage:
+  python test_async_downloader.py
+"""
+
+import io
+import os
+import time
+import zipfile
+import tempfile
+import threading
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from nse_async_downloader import NSEAsyncDownloader, TokenBucket, eq_local_path
+from nse_download_manifest import DownloadManifest, STATUS_OK, STATUS_MISSING
+from nse_url_resolver import URLPatternResolver
+
+RATE = 4.0
+SERVED = [date(2025, 1, 2), date(2025, 1, 3), date(2025, 1, 7), date(2025, 1, 8)]
+NOT_PUBLISHED = [date(2025, 1, 6), date(2025, 1, 9)]
+
+
+def fixture_zip(trade_date: date) -> bytes:
+    """A zipped cm*bhav.csv with enough rows to pass the size/header check"""
+    lines = ["SYMBOL,SERIES,DATE1,CLOSE_PRICE,TTL_TRD_QNTY,DELIV_QTY"]
+    lines += [f"SYM{i},EQ,{trade_date:%d-%b-%Y},{100 + i},{1000 + i},{500 + i}" for i in range(60)]
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as zf:
+        zf.writestr(f"cm{trade_date.strftime('%d%b%Y').upper()}bhav.csv", "\n".join(lines))
+    return buffer.getvalue()
+
+
+class StubArchive(BaseHTTPRequestHandler):
+    files = {}       # path -> body
+    requests = []    # (monotonic time, path)
+
+    def do_GET(self):
+        StubArchive.requests.append((time.monotonic(), self.path))
+        body = StubArchive.files.get(self.path)
+        self.send_response(200 if body else 404)
+        self.send_header('Content-Length', str(len(body or b'')))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_stub():
+    StubArchive.files = {f"/hist/{d:%Y%m%d}.zip": fixture_zip(d) for d in SERVED}
+    StubArchive.requests = []
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubArchive)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    return server, [base + "/products/{dd}{mm}{yyyy}.csv", base + "/hist/{yyyy}{mm}{dd}.zip"]
+
+
+def check_downloader() -> bool:
+    server, templates = start_stub()
+    failures = []
+    try:
+        with tempfile.TemporaryDirectory() as folder:
+            days = sorted(SERVED + NOT_PUBLISHED)
+            manifest = DownloadManifest(os.path.join(folder, 'manifest.json'))
+
+            def downloader():
+                return NSEAsyncDownloader(output_root=folder, concurrency=4, rate=RATE, url_templates=templates,
+                                          resolver=URLPatternResolver(cache_file=None), manifest=manifest)
+
+            started = time.monotonic()
+            first = {r['date']: r for r in downloader().download_days(days)}
+            elapsed = time.monotonic() - started
+
+            for d in SERVED:
+                result = first[d.isoformat()]
+                if result['status'] != 'downloaded' or not result['url'].endswith(f"/hist/{d:%Y%m%d}.zip"):
+                    failures.append(f"{d}: expected download from the stub, got {result['status']}")
+                elif not open(eq_local_path(d, folder), 'rb').read().startswith(b'SYMBOL,SERIES'):
+                    failures.append(f"{d}: saved file is not the extracted CSV")
+            for d in NOT_PUBLISHED:
+                if first[d.isoformat()]['status'] != 'missing':
+                    failures.append(f"{d}: expected 'missing' on 404s, got {first[d.isoformat()]['status']}")
+
+            # Manifest is saved once at the end of the run (batched), with every outcome
+            saved = DownloadManifest(manifest.manifest_file)
+            statuses = {d: (saved.get('EQ', d) or {}).get('status') for d in days}
+            expected = {d: STATUS_OK if d in SERVED else STATUS_MISSING for d in days}
+            if statuses != expected:
+                failures.append(f"manifest statuses {statuses} != {expected}")
+
+            # Rate limit: the k-th request can start no earlier than (k - burst) / rate after the first
+            times = [t for t, _ in StubArchive.requests]
+            burst = TokenBucket(RATE).capacity
+            for k, t in enumerate(times):
+                allowed = max(0.0, (k + 1 - burst) / RATE)
+                if t - times[0] < allowed - 0.05:
+                    failures.append(f"request #{k + 1} after {t - times[0]:.2f}s, rate allows {allowed:.2f}s")
+                    break
+            print(f"⏱️ {len(times)} requests in {elapsed:.2f}s (rate {RATE}/s, burst {burst:.0f})")
+
+            # Second run: everything served is on disk, so only the unpublished days hit the stub
+            before = len(StubArchive.requests)
+            second = {r['date']: r for r in downloader().download_days(days)}
+            for d in SERVED:
+                if second[d.isoformat()]['status'] != 'skipped':
+                    failures.append(f"{d}: expected 'skipped' on the second run, got {second[d.isoformat()]['status']}")
+            requested = {path for _, path in StubArchive.requests[before:]}
+            if any(f"{d:%Y%m%d}" in path or f"{d:%d%m%Y}" in path for d in SERVED for path in requested):
+                failures.append("second run requested a day that was already on disk")
+    finally:
+        server.shutdown()
+
+    for failure in failures:
+        print(f"❌ {failure}")
+    if not failures:
+        print("✅ Downloads, 404 handling, skip-if-present, manifest and rate limit behave as expected")
+    return not failures
+
+
+def test_downloader():
+    assert check_downloader()
+
+
+if __name__ == "__main__":
+    raise SystemExit(0 if check_downloader() else 1)
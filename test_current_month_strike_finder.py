@@ -15,7 +15,7 @@ Process:
 5. Validate the results
 """
 
-import pyodbc
+import nse_db_pool
 import pandas as pd
 from decimal import Decimal
 from datetime import datetime
@@ -35,13 +35,7 @@ logger = logging.getLogger(__name__)
 # Database connection
 def get_connection():
     """Get database connection"""
-    connection_string = (
-        "Driver={ODBC Driver 17 for SQL Server};"
-        "Server=SRIKIRANREDDY\\SQLEXPRESS;"
-        "Database=master;"
-        "Trusted_Connection=yes;"
-    )
-    return pyodbc.connect(connection_string)
+    return nse_db_pool.get_connection()
 
 def get_current_month_data(test_symbol=None):
     """
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Regression test: PooledConnection.execute takes parameters the way pyodbc does
+==============================================================================
+Scripts call conn.execute(sql, symbol, trade_date) (pyodbc varargs) as well as
+conn.execute(sql, [symbol, trade_date]); both must bind the same values, and a
+single string parameter must never be split into characters. The cursor
+execute() keeps per SQL text must survive returning the connection to the
+pool, so a second checkout re-executes the same statement. Runs on a
+throw-away SQLite file, no server needed.
+
+Usage:
+  python test_db_pool_params.py
+"""
+
+import os
+import tempfile
+
+from nse_db_pool import ConnectionPool
+
+
+def check_parameters() -> bool:
+    with tempfile.TemporaryDirectory() as folder:
+        pool = ConnectionPool({'backend': 'sqlite', 'path': os.path.join(folder, 'params.db')})
+        with pool.connection() as conn:
+            conn.execute("CREATE TABLE prices (symbol TEXT, trade_date TEXT, close_price REAL)")
+            conn.executemany("INSERT INTO prices VALUES (?, ?, ?)",
+                             [('TCS', '2025-02-03', 4100.5), ('INFY', '2025-02-03', 1850.0)])
+            query = "SELECT close_price FROM prices WHERE symbol = ? AND trade_date = ?"
+
+            results = {
+                'varargs': conn.execute(query, 'TCS', '2025-02-03').fetchone(),
+                'list': conn.execute(query, ['TCS', '2025-02-03']).fetchone(),
+                'tuple': conn.execute(query, ('TCS', '2025-02-03')).fetchone(),
+                'single string': conn.execute("SELECT COUNT(*) FROM prices WHERE symbol = ?", 'TCS').fetchone(),
+                'named': conn.execute("SELECT COUNT(*) FROM prices WHERE symbol = :s", {'s': 'INFY'}).fetchone(),
+                'no params': conn.execute("SELECT COUNT(*) FROM prices").fetchone(),
+            }
+            frame = conn.query_df(query, ['INFY', '2025-02-03'])
+
+    expected = {'varargs': (4100.5,), 'list': (4100.5,), 'tuple': (4100.5,),
+                'single string': (1,), 'named': (1,), 'no params': (2,)}
+    ok = True
+    for name, value in results.items():
+        if tuple(value) != expected[name]:
+            print(f"❌ {name}: expected {expected[name]}, got {tuple(value)}")
+            ok = False
+    if frame['close_price'].tolist() != [1850.0]:
+        print(f"❌ query_df: got {frame['close_price'].tolist()}")
+        ok = False
+    if ok:
+        print("✅ execute() binds varargs, sequences, named and single string parameters")
+    return ok
+
+
+def check_statement_reuse() -> bool:
+    with tempfile.TemporaryDirectory() as folder:
+        pool = ConnectionPool({'backend': 'sqlite', 'path': os.path.join(folder, 'reuse.db')})
+        query = "SELECT COUNT(*) FROM sqlite_master WHERE name = ?"
+        cursors = []
+        for _ in range(2):
+            with pool.connection() as conn:
+                cursor = conn.execute(query, 'prices')
+                cursor.fetchall()
+                cursors.append(cursor)
+        ok = pool.opened == 1 and cursors[0] is cursors[1]
+        pool.close()
+    if ok:
+        print("✅ A second checkout reuses the connection and its statement cursor")
+    else:
+        print(f"❌ {pool.opened} connection(s) opened, same cursor: {cursors[0] is cursors[1]}")
+    return ok
+
+
+def test_parameters():
+    assert check_parameters()
+
+
+def test_statement_reuse():
+    assert check_statement_reuse()
+
+
+if __name__ == "__main__":
+    raise SystemExit(0 if check_parameters() and check_statement_reuse() else 1)
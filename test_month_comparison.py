@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Equivalence test: nse_month_comparison vs the legacy step03 analyzer loop
+=========================================================================
+compare_months() must give the rows the old <month>_vs_<month> analyzers
+stored: baselines from MAX(...) ... GROUP BY symbol over the baseline month
+(so previous_baseline_date is each symbol's own last trading day), then a
+loop over the comparison month's daily rows. The synthetic March has a
+symbol that stops trading on the 10th and one with no delivery at all.
+No database needed.
+
+Usage:
+  python test_month_comparison.py
+"""
+
+import numpy as np
+import pandas as pd
+
+from nse_month_comparison import DAILY_COLUMNS, compare_months, comparison_type
+
+MARCH_DAYS = pd.bdate_range('2025-03-03', '2025-03-28')
+APRIL_DAYS = pd.bdate_range('2025-04-01', '2025-04-30')
+STOPS_EARLY = 'HALTED'
+LAST_HALTED_DAY = pd.Timestamp('2025-03-10')
+
+
+def make_daily(seed: int = 3) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    rows = []
+    for symbol in ['TCS', 'INFY', STOPS_EARLY, 'NODELIV']:
+        for day in MARCH_DAYS.append(APRIL_DAYS):
+            if symbol == STOPS_EARLY and day.month == 3 and day > LAST_HALTED_DAY:
+                continue
+            volume = int(rng.integers(1000, 50000))
+            delivery = 0 if symbol == 'NODELIV' else int(volume * rng.uniform(0.1, 0.9))
+            rows.append({'trade_date': day, 'symbol': symbol, 'series': 'EQ', 'ttl_trd_qnty': volume,
+                         'deliv_qty': delivery, 'source_file': f"cm{day:%d%m%Y}bhav.csv"})
+    daily = pd.DataFrame(rows).reindex(columns=DAILY_COLUMNS)
+    prices = [col for col in DAILY_COLUMNS[3:-1] if col not in ('ttl_trd_qnty', 'deliv_qty')]
+    daily[prices] = 100.0
+    daily['symbol'] = daily['symbol'].astype('category')
+    daily['month'] = daily['trade_date'].dt.year * 100 + daily['trade_date'].dt.month
+    return daily
+
+
+def legacy_rows(daily: pd.DataFrame, pair) -> pd.DataFrame:
+    """The old analyzer: GROUP BY symbol baselines, then a loop over comparison-month rows"""
+    baselines = {}
+    for symbol, rows in daily[daily['month'] == pair[0]].groupby('symbol', observed=True):
+        if rows['deliv_qty'].max() > 0:
+            baselines[symbol] = (rows['deliv_qty'].max(), rows['ttl_trd_qnty'].max(), rows['trade_date'].max())
+    out = []
+    for row in daily[daily['month'] == pair[1]].itertuples():
+        if row.symbol not in baselines:
+            continue
+        peak_delivery, peak_volume, last_date = baselines[row.symbol]
+        if row.ttl_trd_qnty > peak_volume or row.deliv_qty > peak_delivery:
+            out.append((row.trade_date, row.symbol, last_date, peak_volume, peak_delivery))
+    return pd.DataFrame(out, columns=['current_trade_date', 'symbol', 'previous_baseline_date',
+                                      'previous_ttl_trd_qnty', 'previous_deliv_qty'])
+
+
+def check_month_comparison() -> bool:
+    daily = make_daily()
+    pair = (202503, 202504)
+    result = compare_months(daily, [pair])
+    columns = ['current_trade_date', 'symbol', 'previous_baseline_date', 'previous_ttl_trd_qnty', 'previous_deliv_qty']
+    engine = result[columns].astype({'symbol': str}).sort_values(['current_trade_date', 'symbol'])
+    legacy = legacy_rows(daily, pair).sort_values(['current_trade_date', 'symbol'])
+
+    ok = True
+    if (result['comparison_type'] != comparison_type(pair)).any():
+        print(f"❌ comparison_type is not {comparison_type(pair)}")
+        ok = False
+    if len(engine) != len(legacy) or not (engine.reset_index(drop=True).values == legacy.reset_index(drop=True).values).all():
+        print(f"❌ engine rows ({len(engine)}) differ from the legacy loop ({len(legacy)})")
+        ok = False
+    halted = set(result.loc[result['symbol'] == STOPS_EARLY, 'previous_baseline_date'])
+    if halted != {LAST_HALTED_DAY}:
+        print(f"❌ {STOPS_EARLY} baseline date {sorted(halted)}, expected its last March day {LAST_HALTED_DAY.date()}")
+        ok = False
+    if (result['symbol'] == 'NODELIV').any():
+        print("❌ a symbol without March delivery got a baseline")
+        ok = False
+    if ok:
+        print(f"✅ {len(engine)} exceedance rows match the legacy analyzer, per-symbol baseline dates included")
+    return ok
+
+
+def test_month_comparison():
+    assert check_month_comparison()
+
+
+if __name__ == "__main__":
+    raise SystemExit(0 if check_month_comparison() else 1)
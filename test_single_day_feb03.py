@@ -4,7 +4,7 @@ Single Day F&O UDiFF Data Loader - February 3rd, 2025
 Testing purpose: Load only one day to verify record count
 """
 
-import pyodbc
+import nse_db_pool
 import pandas as pd
 from datetime import datetime
 import random
@@ -12,12 +12,7 @@ import math
 
 # Database connection
 def get_connection():
-    return pyodbc.connect(
-        'DRIVER={ODBC Driver 17 for SQL Server};'
-        'SERVER=SRIKIRANREDDY\\SQLEXPRESS;'
-        'DATABASE=master;'
-        'Trusted_Connection=yes;'
-    )
+    return nse_db_pool.get_connection()
 
 def generate_fo_data_for_date(target_date):
     """Generate F&O data for a specific date"""
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Equivalence test: vectorized step03 classifier vs the per-record methods
+=======================================================================
+Step03MarchVsFebruaryAnalyzer.classify_tiers_and_patterns and
+calculate_advanced_metrics_batch must reproduce classify_tier_and_pattern /
+calculate_advanced_metrics exactly - same labels, same flags, and floats
+with the same bits - so switching the month loop to arrays changes no stored
+value. No database needed: baselines and March rows are synthetic, with the
+edge cases forced in (values exactly on tier thresholds, zero averages,
+zero stddev, zero delivery, unchanged prices, p95/max ties).
+
+Usage:
+  python test_step03_vectorized_classifier.py
+  python test_step03_vectorized_classifier.py --rows 200000 --seed 7
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from step03_march_vs_february_analyzer import Step03MarchVsFebruaryAnalyzer, TIER_NAMES, PATTERN_NAMES
+
+
+def make_cases(rows: int, seed: int):
+    """Per-record inputs (ints / floats as the analyzer sees them) plus baselines"""
+    rng = np.random.default_rng(seed)
+    avg_volume = rng.lognormal(11, 1.5, rows).astype(np.int64)
+    avg_delivery = (avg_volume * rng.uniform(0, 1, rows)).astype(np.int64)
+    avg_volume[rng.random(rows) < 0.02] = 0
+    avg_delivery[rng.random(rows) < 0.05] = 0
+
+    baseline = {
+        'avg_volume': avg_volume, 'avg_delivery': avg_delivery,
+        'stddev_volume': np.where(rng.random(rows) < 0.05, 0.0, avg_volume * rng.uniform(0.1, 1.5, rows)),
+        'stddev_delivery': np.where(rng.random(rows) < 0.05, 0.0, avg_delivery * rng.uniform(0.1, 1.5, rows)),
+        'min_volume': (avg_volume * 0.2).astype(np.int64), 'min_delivery': (avg_delivery * 0.2).astype(np.int64),
+        'max_volume': (avg_volume * rng.uniform(1.5, 4, rows)).astype(np.int64),
+        'max_delivery': (avg_delivery * rng.uniform(1.5, 4, rows)).astype(np.int64),
+        'p75_volume': (avg_volume * 1.2).astype(np.int64), 'p75_delivery': (avg_delivery * 1.2).astype(np.int64),
+        'p95_volume': (avg_volume * 2.1).astype(np.int64), 'p95_delivery': (avg_delivery * 2.1).astype(np.int64),
+        'median_volume': (avg_volume * 0.8).astype(np.int64), 'median_delivery': (avg_delivery * 0.8).astype(np.int64),
+        'trading_days': rng.integers(5, 21, rows),
+        'avg_price': rng.uniform(5, 5000, rows), 'avg_turnover': rng.uniform(0, 500, rows),
+        'avg_trades': rng.integers(0, 5000, rows),
+        'quality_score': rng.choice([25.0, 50.0, 95.0, 100, 110.0], rows),
+    }
+
+    volume = (avg_volume * rng.lognormal(0.2, 0.8, rows)).astype(np.int64)
+    delivery = (avg_delivery * rng.lognormal(0.2, 0.8, rows)).astype(np.int64)
+    # Exactly on each tier threshold, on p95 / max, at zero
+    tiers = [1.25, 1.50, 2.00, 3.00]
+    for i, factor in enumerate(tiers):
+        pick = slice(i, rows, 23)
+        volume[pick] = (avg_volume[pick] * factor).astype(np.int64)
+        delivery[pick] = (avg_delivery[pick] * factor).astype(np.int64)
+    volume[7::31] = baseline['p95_volume'][7::31]
+    delivery[11::37] = baseline['max_delivery'][11::37]
+    delivery[13::41] = 0
+
+    prev_close = rng.uniform(5, 5000, rows)
+    close = np.where(rng.random(rows) < 0.1, prev_close, prev_close * rng.uniform(0.8, 1.2, rows))
+    low = np.minimum(prev_close, close) * rng.uniform(0.95, 1.0, rows)
+    high = np.maximum(prev_close, close) * rng.uniform(1.0, 1.05, rows)
+    march = {
+        'volume': volume, 'delivery': delivery,
+        'turnover': np.where(rng.random(rows) < 0.02, 0.0, rng.uniform(0, 800, rows)),
+        'trades': rng.integers(0, 8000, rows).astype(np.float64),
+        'high': high, 'low': low, 'close': close, 'prev_close': prev_close,
+    }
+    return march, baseline
+
+
+def same(expected, actual) -> bool:
+    """Exact equality; floats compared bit for bit"""
+    if isinstance(expected, float) or isinstance(actual, float):
+        return float(expected).hex() == float(actual).hex()
+    return expected == actual
+
+
+def check_equivalence(rows: int, seed: int) -> bool:
+    # Classifier configuration lives on the class, so no database connection is needed
+    analyzer = Step03MarchVsFebruaryAnalyzer.__new__(Step03MarchVsFebruaryAnalyzer)
+    march, baseline = make_cases(rows, seed)
+
+    started = time.perf_counter()
+    classified = analyzer.classify_tiers_and_patterns(march['volume'], march['delivery'], baseline)
+    metrics = analyzer.calculate_advanced_metrics_batch(march, baseline)
+    batch_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    mismatches = {}
+    per_record_seconds = 0.0
+    for i in range(rows):
+        record_baseline = {key: values[i].item() for key, values in baseline.items()}
+        volume, delivery = int(march['volume'][i]), int(march['delivery'][i])
+        row = [volume, delivery] + [march[key][i].item() for key in
+                                    ('turnover', 'trades', 'high', 'low', 'close', 'prev_close')]
+        tick = time.perf_counter()
+        expected = analyzer.classify_tier_and_pattern(volume, delivery, record_baseline, None)
+        expected.update(analyzer.calculate_advanced_metrics(row, record_baseline))
+        per_record_seconds += time.perf_counter() - tick
+        for key, value in expected.items():
+            actual = classified[key][i] if key in classified else metrics[key][i]
+            actual = actual.item() if isinstance(actual, np.generic) else actual
+            if not same(value, actual):
+                mismatches.setdefault(key, (i, value, actual))
+
+    tiers = np.bincount(classified['overall_tier_code'], minlength=len(TIER_NAMES))
+    patterns = np.bincount(classified['pattern_code'], minlength=len(PATTERN_NAMES))
+    print(f"📊 {rows:,} rows | tiers {dict(zip(TIER_NAMES, tiers.tolist()))}")
+    print(f"   patterns {dict(zip(PATTERN_NAMES, patterns.tolist()))}")
+    print(f"⏱️ per-record {per_record_seconds:.3f}s | vectorized {batch_seconds:.3f}s "
+          f"({per_record_seconds / max(batch_seconds, 1e-9):.0f}x)")
+
+    if mismatches:
+        for key, (i, expected, actual) in mismatches.items():
+            print(f"❌ {key} differs first at row {i}: per-record {expected!r} vs vectorized {actual!r}")
+        return False
+    print("✅ Vectorized classifier and advanced metrics identical to the per-record methods")
+    return True
+
+
+def test_equivalence():
+    assert check_equivalence(20000, 2025)
+
+
+def main():
+    p = argparse.ArgumentParser(description='Vectorized vs per-record step03 classifier equivalence')
+    p.add_argument('--rows', type=int, default=50000)
+    p.add_argument('--seed', type=int, default=2025)
+    args = p.parse_args()
+    raise SystemExit(0 if check_equivalence(args.rows, args.seed) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -14,14 +14,14 @@ Test Logic Flow:
 - Total: 6 records per day/symbol
 """
 
-import pyodbc
+import nse_db_pool
 import pandas as pd
 import numpy as np
 from datetime import datetime
 
 def get_sample_data_from_step03():
     """Get sample data from step03_compare_monthvspreviousmonth for testing"""
-    conn = pyodbc.connect('Driver={SQL Server};Server=SRIKIRANREDDY\\SQLEXPRESS;Database=master;Trusted_Connection=yes;')
+    conn = nse_db_pool.get_connection()
     
     # Get symbols that are likely to have F&O data
     fo_symbols = ['ABB', 'AARTIIND', 'ABBOTINDIA', 'ABCAPITAL', 'ABFRL', 'ACC']
@@ -44,7 +44,7 @@ def get_sample_data_from_step03():
 
 def find_nearest_strikes_for_date_symbol(trade_date, symbol, target_price):
     """Find nearest 3 strikes for both PE and CE for given date and symbol"""
-    conn = pyodbc.connect('Driver={SQL Server};Server=SRIKIRANREDDY\\SQLEXPRESS;Database=master;Trusted_Connection=yes;')
+    conn = nse_db_pool.get_connection()
     
     # Convert date format from YYYY-MM-DD to YYYYMMDD for step04 table
     if isinstance(trade_date, str) and '-' in trade_date:
@@ -5,7 +5,7 @@ Working Strike Price Finder Test
 Test with dates and symbols that actually exist in both tables.
 """
 
-import pyodbc
+import nse_db_pool
 import pandas as pd
 import numpy as np
 
@@ -22,7 +22,7 @@ def test_with_known_working_data():
     print(f"Date: {test_date} (step03) / {test_date_fo} (step04)")
     
     # Get current_close_price from step03
-    conn = pyodbc.connect('Driver={SQL Server};Server=SRIKIRANREDDY\\SQLEXPRESS;Database=master;Trusted_Connection=yes;')
+    conn = nse_db_pool.get_connection()
     
     step03_query = f"""
     SELECT current_close_price 
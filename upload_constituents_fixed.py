@@ -4,7 +4,7 @@ Then upload the constituent data properly
 """
 
 import pandas as pd
-import pyodbc
+import nse_db_pool
 from datetime import datetime
 import json
 import sys
@@ -28,15 +28,7 @@ class NSEDatabaseManager:
     def connect(self):
         """Establish database connection"""
         try:
-            # Build connection string for Windows Authentication
-            conn_str = (
-                f"DRIVER={{{self.config['driver']}}};"
-                f"SERVER={self.config['server']};"
-                f"DATABASE={self.config['database']};"
-                f"Trusted_Connection=yes;"
-            )
-            
-            self.connection = pyodbc.connect(conn_str)
+            self.connection = nse_db_pool.get_connection()
             print(f"✅ Connected to database: {self.config['database']}")
             
         except Exception as e:
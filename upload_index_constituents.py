@@ -2,14 +2,41 @@
 Upload NSE index constituents data to SQL database
 Table: index_symbol_masterdata
 This will replace the existing index names with actual stock symbols
+
+Usage:
+  python upload_index_constituents.py                  # full reload
+  python upload_index_constituents.py --changed-only   # only indices in nse_index_constituents_diff.json
+
+The rows actually inserted are recorded in nse_index_constituents_uploaded.json,
+which nse_index_constituents_downloader.py diffs against on its next run.
 """
 
 import pandas as pd
-import pyodbc
+import nse_db_pool
 from datetime import datetime
 import json
 import sys
 import os
+import argparse
+
+UPLOADED_JSON_FILE = 'nse_index_constituents_uploaded.json'
+
+
+def save_uploaded_snapshot(inserted, replaced_indices=None, snapshot_file=UPLOADED_JSON_FILE):
+    """
+    Record what the table now holds: the inserted rows, plus (for a
+    changed-only upload) the previous snapshot's rows of untouched indices.
+    """
+    records = []
+    if replaced_indices is not None and os.path.exists(snapshot_file):
+        replaced = set(replaced_indices)
+        with open(snapshot_file, 'r', encoding='utf-8') as f:
+            records = [item for item in json.load(f) if item['INDEX'] not in replaced]
+    records += [{'INDEX': index_name, 'SYMBOL': symbol} for symbol, index_name in inserted]
+    tmp_path = snapshot_file + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(records, f, indent=1, ensure_ascii=False)
+    os.replace(tmp_path, snapshot_file)
 
 class NSEDatabaseManager:
     def __init__(self, config_file='database_config.json'):
@@ -29,15 +56,7 @@ class NSEDatabaseManager:
     def connect(self):
         """Establish database connection"""
         try:
-            # Build connection string for Windows Authentication
-            conn_str = (
-                f"DRIVER={{{self.config['driver']}}};"
-                f"SERVER={self.config['server']};"
-                f"DATABASE={self.config['database']};"
-                f"Trusted_Connection=yes;"
-            )
-            
-            self.connection = pyodbc.connect(conn_str)
+            self.connection = nse_db_pool.get_connection()
             print(f"✅ Connected to database: {self.config['database']}")
             
         except Exception as e:
@@ -59,13 +78,39 @@ class NSEDatabaseManager:
         
         return True
     
-    def upload_constituent_data(self, csv_file):
-        """Upload constituent data from CSV file to index_symbol_masterdata table"""
+    def clear_indices(self, table_name, index_names):
+        """Delete only the rows of the given indices"""
+        try:
+            cursor = self.connection.cursor()
+            placeholders = ', '.join('?' for _ in index_names)
+            cursor.execute(f"DELETE FROM {table_name} WHERE index_name IN ({placeholders})", *index_names)
+            self.connection.commit()
+            print(f"✅ Cleared {cursor.rowcount} rows for {len(index_names)} changed indices from {table_name}")
+            cursor.close()
+            
+        except Exception as e:
+            print(f"❌ Error clearing indices: {e}")
+            return False
+        
+        return True
+    
+    def upload_constituent_data(self, csv_file, changed_indices=None):
+        """
+        Upload constituent data from CSV file to index_symbol_masterdata table.
+        With changed_indices, only those indices are deleted and re-inserted.
+        """
         try:
             # Read CSV file
             df = pd.read_csv(csv_file)
+            if 'INDICES' not in df.columns and 'INDEX' in df.columns:
+                # Files written by nse_index_constituents_downloader.py use INDEX
+                df = df.rename(columns={'INDEX': 'INDICES'})
             print(f"📖 Read {len(df)} records from {csv_file}")
             
+            if changed_indices is not None:
+                df = df[df['INDICES'].isin(changed_indices)]
+                print(f"🔄 Re-uploading {len(changed_indices)} changed indices ({len(df)} records)")
+            
             # Display first few records
             print("\n📋 Sample data:")
             print(df.head().to_string(index=False))
@@ -77,7 +122,10 @@ class NSEDatabaseManager:
                 print(f"  {index_name}: {count} symbols")
             
             # Clear existing data
-            if not self.clear_table('index_symbol_masterdata'):
+            if changed_indices is not None:
+                if not self.clear_indices('index_symbol_masterdata', changed_indices):
+                    return False
+            elif not self.clear_table('index_symbol_masterdata'):
                 return False
             
             # Insert data
@@ -89,6 +137,7 @@ class NSEDatabaseManager:
             """
             
             records_inserted = 0
+            inserted = []
             
             for index, row in df.iterrows():
                 try:
@@ -101,6 +150,7 @@ class NSEDatabaseManager:
                                  row['INDICES'],     # Index name like NIFTY 50, NIFTY BANK
                                  row['CATEGORY'])    # Category like Broad Market, Sectoral
                     records_inserted += 1
+                    inserted.append((row['SYMBOL'], row['INDICES']))
                     
                 except Exception as e:
                     print(f"⚠️ Error inserting record {index + 1}: {e}")
@@ -108,6 +158,7 @@ class NSEDatabaseManager:
             
             self.connection.commit()
             cursor.close()
+            save_uploaded_snapshot(inserted, changed_indices)
             
             print(f"\n✅ Successfully inserted {records_inserted} constituent records into index_symbol_masterdata table")
             
@@ -187,7 +238,14 @@ class NSEDatabaseManager:
 def main():
     """Main function to upload index constituent data"""
     
-    csv_file = 'nse_index_constituents_latest.csv'
+    parser = argparse.ArgumentParser(description='Upload NSE index constituents to index_symbol_masterdata')
+    parser.add_argument('--csv', default='nse_index_constituents_latest.csv')
+    parser.add_argument('--changed-only', action='store_true',
+                        help='Re-upload only the indices listed in the diff file')
+    parser.add_argument('--diff-file', default='nse_index_constituents_diff.json')
+    args = parser.parse_args()
+    
+    csv_file = args.csv
     
     print("🚀 NSE Index Constituents Upload to index_symbol_masterdata")
     print("=" * 65)
@@ -197,12 +255,23 @@ def main():
         print(f"❌ Error: {csv_file} not found")
         return
     
+    changed_indices = None
+    if args.changed_only:
+        if not os.path.exists(args.diff_file):
+            print(f"❌ Error: {args.diff_file} not found (run nse_index_constituents_downloader.py first)")
+            return
+        with open(args.diff_file, 'r', encoding='utf-8') as f:
+            changed_indices = json.load(f).get('changed_indices', [])
+        if not changed_indices:
+            print("✅ No index constituents changed, nothing to upload")
+            return
+    
     # Initialize database manager
     db_manager = NSEDatabaseManager()
     
     try:
         # Upload constituent data
-        if db_manager.upload_constituent_data(csv_file):
+        if db_manager.upload_constituent_data(csv_file, changed_indices):
             print("\n🎉 Constituent data upload completed successfully!")
             print("\n💡 Note: The table now contains stock symbols (RELIANCE, TCS, etc.)")
             print("   mapped to their respective indices (NIFTY 50, NIFTY BANK, etc.)")
@@ -15,6 +15,8 @@ from datetime import datetime
 # Add parent directory to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from nse_database_integration import NSEDatabaseManager
+from nse_fo_parser import read_fo_bhavcopy, read_raw_fo_csv
+from nse_bulk_loader import BulkLoader, FO_UDIFF_COLUMNS
 
 class FODataValidator:
     def __init__(self):
@@ -78,12 +80,8 @@ class FODataValidator:
             print(f"{date}: ❌ ERROR - {e}")
             
     def get_source_file_count(self, zip_path):
-        """Get record count from source zip file"""
-        with zipfile.ZipFile(zip_path, 'r') as z:
-            csv_file = z.namelist()[0]
-            with z.open(csv_file) as f:
-                df = pd.read_csv(f)
-                return len(df)
+        """Get record count from source zip file (every CSV row, before any parser filtering)"""
+        return len(read_raw_fo_csv(zip_path, usecols=[0]))
                 
     def get_database_count(self, date):
         """Get record count from database for specific date"""
@@ -156,38 +154,13 @@ class FODataValidator:
             
     def load_data_from_zip(self, zip_path, date):
         """Load data from zip file to database"""
-        with zipfile.ZipFile(zip_path, 'r') as z:
-            csv_file = z.namelist()[0]
-            with z.open(csv_file) as f:
-                df = pd.read_csv(f)
-                
-                # Convert date format
-                df['trade_date'] = date
-                
-                # Use bulk insert with cursor for SQL Server
-                cursor = self.db.connection.cursor()
-                
-                # Prepare data for bulk insert
-                records = df.to_dict('records')
-                
-                # Build INSERT statement dynamically based on CSV columns
-                columns = list(df.columns)
-                placeholders = ', '.join(['?' for _ in columns])
-                column_names = ', '.join(columns)
-                
-                insert_sql = f"INSERT INTO step04_fo_udiff_daily ({column_names}) VALUES ({placeholders})"
-                
-                # Insert in batches for efficiency
-                batch_size = 1000
-                total_inserted = 0
-                
-                for i in range(0, len(records), batch_size):
-                    batch = records[i:i+batch_size]
-                    batch_data = [[record[col] for col in columns] for record in batch]
-                    cursor.executemany(insert_sql, batch_data)
-                    total_inserted += len(batch)
-                    
-                return total_inserted
+        # Canonical frame: UDiFF columns mapped to table columns, typed in one pass
+        df = read_fo_bhavcopy(zip_path, trade_date=date, fo_only=False)
+        df['source_file'] = os.path.basename(zip_path)
+        
+        # Columnar bulk insert; the caller commits (or rolls back) together with the delete
+        loader = BulkLoader(self.db.connection, 'step04_fo_udiff_daily', FO_UDIFF_COLUMNS)
+        return loader.load(df, commit=False)
                 
     def close(self):
         """Close database connection"""
@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 
 import pandas as pd
-import pyodbc
+import nse_db_pool
 import json
 import os
 
@@ -45,8 +45,7 @@ def validate_feb_4th_against_source():
         with open('database_config.json', 'r') as f:
             config = json.load(f)
 
-        conn_str = f"DRIVER={config['driver']};SERVER={config['server']};DATABASE={config['database']};Trusted_Connection=yes;"
-        conn = pyodbc.connect(conn_str)
+        conn = nse_db_pool.get_connection()
         
         # Use our UDiFF-compliant query
         query = """